@@ -0,0 +1,98 @@
+"""
+Benchmark the preparation of the working folders of the executions, for the former `cp` of the proving artifacts into
+every working folder and the ArtifactStager linking them to an immutable per-circuit artifact set.
+
+The disk bytes are the blocks allocated for the files of the working folders which are not shared with the source
+artifacts or the artifact set, plus the blocks of the artifact set itself.
+
+Run from the origo-executor folder:
+    python -m benchmarks.artifact_staging
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from executor.worker.artifact_stager import ArtifactStager, StagingMode
+
+
+CONTRACT_ADDRESS = '0xbenchmark'
+
+
+def create_sources(root, proving_key_size):
+    sources = {'out': os.path.join(root, 'compiled_code', CONTRACT_ADDRESS + '_out'),
+               'proving.key': os.path.join(root, 'proving_key', CONTRACT_ADDRESS + '.pk'),
+               'variables.inf': os.path.join(root, 'proving_key', CONTRACT_ADDRESS + '.var')}
+    sizes = {'out': 256 * 1024, 'proving.key': proving_key_size, 'variables.inf': 4 * 1024}
+    for name, source_path in sources.items():
+        os.makedirs(os.path.dirname(source_path), exist_ok=True)
+        with open(source_path, 'wb') as source:
+            source.write(os.urandom(sizes[name]))
+    return sources
+
+
+def get_allocated_bytes(folder, excluded_inodes):
+    allocated = 0
+    counted_inodes = set(excluded_inodes)
+    for directory, _, files in os.walk(folder):
+        for name in files:
+            file_stat = os.lstat(os.path.join(directory, name))
+            if file_stat.st_ino not in counted_inodes:
+                counted_inodes.add(file_stat.st_ino)
+                allocated += file_stat.st_blocks * 512
+    return allocated
+
+
+def measure(mode, executions, proving_key_size):
+    root = tempfile.mkdtemp(dir='.')
+    try:
+        sources = create_sources(root, proving_key_size)
+        source_inodes = {os.stat(source_path).st_ino for source_path in sources.values()}
+        stager = None if mode == 'cp' else ArtifactStager(os.path.join(root, 'artifacts'), mode)
+        latencies = []
+        used_modes = set()
+        for execution_id in range(executions):
+            working_path = os.path.join(root, 'working', CONTRACT_ADDRESS + '_' + str(execution_id))
+            start = time.monotonic()
+            if stager is None:
+                subprocess.check_call('mkdir -p ' + working_path + ' && ' + ' && '.join(
+                    'cp ' + source_path + ' ' + os.path.join(working_path, name)
+                    for name, source_path in sources.items()), shell=True)
+                used_modes.add(StagingMode.COPY)
+            else:
+                os.makedirs(working_path)
+                used_modes.add(stager.stage(CONTRACT_ADDRESS, sources, working_path))
+            latencies.append((time.monotonic() - start) * 1000)
+        artifact_set_inodes = set()
+        artifacts_bytes = 0
+        if stager is not None:
+            artifacts_bytes = get_allocated_bytes(os.path.join(root, 'artifacts'), source_inodes)
+            for directory, _, files in os.walk(os.path.join(root, 'artifacts')):
+                artifact_set_inodes.update(os.lstat(os.path.join(directory, name)).st_ino for name in files)
+        working_bytes = get_allocated_bytes(os.path.join(root, 'working'), source_inodes | artifact_set_inodes)
+        return latencies, artifacts_bytes + working_bytes, used_modes
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def report(name, latencies, disk_bytes, used_modes):
+    latencies = sorted(latencies)
+    print('{0:<9} used={1:<9} mean={2:8.2f}ms p50={3:8.2f}ms p95={4:8.2f}ms disk={5:10.1f}MB'.format(
+        name, ','.join(sorted(used_modes)), statistics.mean(latencies), latencies[int(len(latencies) * 0.5)],
+        latencies[int(len(latencies) * 0.95)], disk_bytes / 1024 / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prepare latency and disk bytes of the artifact staging modes.')
+    parser.add_argument('--executions', type=int, default=20, help='The number of executions to prepare.')
+    parser.add_argument('--proving-key-size', type=int, default=64, help='The size of the proving key in MB.')
+    args = parser.parse_args()
+    for mode in ['cp'] + StagingMode.ALL_MODES:
+        report(mode, *measure(mode, args.executions, args.proving_key_size * 1024 * 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark the commitment hash verification of 10, 1,000 and 100,000 commitments: the former bit-string
+implementation against the integer CommitmentVerifier, hashing in the caller thread and in thread pools.
+
+Run from the origo-executor folder:
+    python -m benchmarks.commitment_verification
+"""
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import time
+
+from executor.utils.hash_utils import HashUtils
+from executor.worker.commitment_verifier import CommitmentVerifier
+
+FIELD_PRIME = CommitmentVerifier.FIELD_PRIME
+
+
+def verify_with_bit_strings(commitments, randoms, hashes):
+    mismatches = []
+    for i in range(0, len(commitments)):
+        r = randoms[i]
+        c_str = "{0:0512b}".format(commitments[i])
+        c_1 = (int(c_str[0:128], 2) + r) % FIELD_PRIME
+        c_2 = (int(c_str[128:256], 2) + r) % FIELD_PRIME
+        c_3 = (int(c_str[256:384], 2) + r) % FIELD_PRIME
+        c_4 = (int(c_str[384:512], 2) + r) % FIELD_PRIME
+        oc_str = "{0:0128b}".format(c_1) + "{0:0128b}".format(c_2) + "{0:0128b}".format(c_3) + \
+                 "{0:0128b}".format(c_4)
+        if HashUtils.compute_sha256_for_bitstr(oc_str) != hashes[i]:
+            mismatches.append(i)
+    return mismatches
+
+
+def measure(function, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert not function()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return '{0:>10.3f}ms'.format(statistics.median(latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latency of the commitment hash verification.')
+    parser.add_argument('--commitments', type=int, nargs='+', default=[10, 1000, 100000],
+                        help='The numbers of commitments per batch.')
+    parser.add_argument('--threads', type=int, nargs='+', default=[2, os.cpu_count() or 1],
+                        help='The thread pool sizes of the verifier.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of runs of every measurement.')
+    args = parser.parse_args()
+    rng = random.Random(1)
+    verifiers = [CommitmentVerifier()] + [CommitmentVerifier(threads) for threads in args.threads]
+    print('{0:>11} {1:>12} {2:>12}'.format('commitments', 'bitstring', 'integer') +
+          ''.join(' {0:>12}'.format('threads=' + str(threads)) for threads in args.threads))
+    for count in args.commitments:
+        commitments = [rng.getrandbits(512) for _ in range(count)]
+        randoms = [rng.getrandbits(128) for _ in range(count)]
+        hashes = [int.from_bytes(hashlib.sha256(verifiers[0].get_preimage(c, r)).digest(), 'big')
+                  for c, r in zip(commitments, randoms)]
+        row = '{0:>11} {1}'.format(count, measure(lambda: verify_with_bit_strings(commitments, randoms, hashes),
+                                                   args.repeat))
+        for verifier in verifiers:
+            row += ' ' + measure(lambda: verifier.find_mismatches(commitments, randoms, hashes), args.repeat)
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark the latency between a worker putting its execution result into the execution queue and the executor
+updating the task status, for the former 1-second polling main loop and the current event driven main loop.
+
+Run from the origo-executor folder:
+    python -m benchmarks.main_loop_latency
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from executor.executor import Executor, TaskStatus
+from executor.worker.execution_result import ExecutionResult
+
+
+class BenchmarkExecutor(Executor):
+    """
+    The executor without any listener or worker, which records when each execution result is handled.
+    """
+    def __init__(self, options):
+        Executor.__init__(self, options)
+        self.handled_at = {}
+
+    @staticmethod
+    def check_options(options):
+        pass
+
+    def create_listener(self, listener_config, event_queue):
+        raise NotImplementedError('Not used by the benchmark')
+
+    def create_worker(self, contract_address, execution_id, commitments, execution_queue):
+        raise NotImplementedError('Not used by the benchmark')
+
+    def handle_execution_result(self, execution_result):
+        Executor.handle_execution_result(self, execution_result)
+        self.handled_at[execution_result['execution_id']] = time.monotonic()
+
+
+class PollingBenchmarkExecutor(BenchmarkExecutor):
+    """
+    The executor running the former main loop: check both queues then sleep for 1 second.
+    """
+    def run(self):
+        while not self.should_exit:
+            if not self.event_queue.empty():
+                self.handle_listener_event(*self.handle_event_from_queue())
+            if not self.execution_queue.empty():
+                self.handle_execution_result(self.execution_queue.get())
+            self.dispatch_pending_executions()
+            time.sleep(1)
+
+
+def measure(executor_class, samples, max_gap):
+    options = {'chain_config': {}, 'poll_interval': 1}
+    executor = executor_class(options)
+    contract_address = '0xbenchmark'
+    executor.registered_contracts[contract_address] = {}
+    executor.update_worker_status(contract_address, TaskStatus.REGISTERING)
+    executor.update_worker_status(contract_address, TaskStatus.LISTENING)
+    executor.task_status.start_executions(contract_address, samples + 1)
+    executor.start()
+
+    put_at = {}
+    for execution_id in range(samples):
+        time.sleep(random.uniform(0, max_gap))
+        put_at[execution_id] = time.monotonic()
+        executor.execution_queue.put({'execution_result': ExecutionResult.SUCCESS,
+                                      'contract_address': contract_address, 'execution_id': execution_id,
+                                      'debug_msg': None})
+    while len(executor.handled_at) < samples:
+        time.sleep(0.01)
+    executor.stop()
+    executor.join()
+    return [(executor.handled_at[execution_id] - put_at[execution_id]) * 1000 for execution_id in range(samples)]
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    print('{0:<14} samples={1:<5} mean={2:8.2f}ms p50={3:8.2f}ms p95={4:8.2f}ms max={5:8.2f}ms'.format(
+        name, len(latencies), statistics.mean(latencies), latencies[int(len(latencies) * 0.5)],
+        latencies[int(len(latencies) * 0.95)], latencies[-1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Result-to-status latency of the executor main loop.')
+    parser.add_argument('--samples', type=int, default=20, help='The number of execution results to put.')
+    parser.add_argument('--max-gap', type=float, default=1.5, help='The maximum seconds between two results.')
+    args = parser.parse_args()
+    report('polling', measure(PollingBenchmarkExecutor, args.samples, args.max_gap))
+    report('event driven', measure(BenchmarkExecutor, args.samples, args.max_gap))
+
+
+if __name__ == '__main__':
+    main()
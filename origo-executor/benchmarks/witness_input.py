@@ -0,0 +1,97 @@
+"""
+Benchmark building and passing the compute-witness arguments, from 5 up to 1,000 inputs per execution: the former
+bit-string slicing against the precomputed WitnessLayout, and the former shell command line against the argv, stdin
+and file witness input channels.
+
+The arguments are delivered to `true` (argv) or `cat` (stdin, file) instead of ZoKrates, so the delivery latency is
+the cost of the channel only.
+
+Run from the origo-executor folder:
+    python -m benchmarks.witness_input
+"""
+import argparse
+import errno
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from executor.utils.subprocess_runner import SubprocessRunner
+from executor.worker.witness_input import WitnessInput, WitnessLayout
+
+
+def build_arguments_with_bit_strings(commitments, randoms, hashes):
+    commit_array = []
+    for i in range(0, len(commitments)):
+        args = []
+        bits_str = "{0:0512b}".format(commitments[i])
+        args.append(int(bits_str[0:128], 2))
+        args.append(int(bits_str[128:256], 2))
+        args.append(int(bits_str[256:384], 2))
+        args.append(int(bits_str[384:512], 2))
+        args.append(randoms[i])
+        bits_str = "{0:0256b}".format(hashes[i])
+        args.append(int(bits_str[0:128], 2))
+        args.append(int(bits_str[128:256], 2))
+        commit_array.append(" ".join(str(arg) for arg in args))
+    return " ".join(str(arg) for arg in commit_array)
+
+
+def measure(function, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            function()
+        except OSError as e:
+            # The command line is beyond the limit of the system, e.g. E2BIG.
+            return '{0:>10}'.format(errno.errorcode.get(e.errno, 'error'))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return '{0:>8.3f}ms'.format(statistics.median(latencies))
+
+
+def run_shell(arguments):
+    process = subprocess.Popen('true -a ' + arguments, shell=True, stdout=subprocess.PIPE)
+    process.communicate()
+
+
+def run_channel(channel, arguments, working_path):
+    consumer = [shutil.which('true')] if channel == WitnessInput.ARGV else [shutil.which('cat')]
+    argv, stdin_data, stdin_path = WitnessInput.build(channel, consumer, arguments, working_path)
+    if channel != WitnessInput.ARGV:
+        # cat does not know --stdin.
+        argv = argv[:-1]
+    SubprocessRunner().run(argv, stdin_data=stdin_data, stdin_path=stdin_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and delivery latency of the compute-witness arguments.')
+    parser.add_argument('--inputs', type=int, nargs='+', default=[5, 10, 100, 1000],
+                        help='The numbers of inputs per execution.')
+    parser.add_argument('--repeat', type=int, default=20, help='The number of runs of every measurement.')
+    args = parser.parse_args()
+    rng = random.Random(1)
+    layout = WitnessLayout.get()
+    print('{0:>6} {1:>10} {2:>10} {3:>10} {4:>10} {5:>10} {6:>10} {7:>10}'.format(
+        'inputs', 'bytes', 'bitstring', 'layout', 'shell', 'argv', 'stdin', 'file'))
+    with tempfile.TemporaryDirectory() as working_path:
+        for inputs in args.inputs:
+            commitments = [rng.getrandbits(512) for _ in range(inputs)]
+            randoms = [rng.getrandbits(128) for _ in range(inputs)]
+            hashes = [rng.getrandbits(256) for _ in range(inputs)]
+            arguments = layout.get_arguments(commitments, randoms, hashes)
+            argument_string = " ".join(arguments)
+            print('{0:>6} {1:>10} {2} {3} {4} {5} {6} {7}'.format(
+                inputs, len(argument_string),
+                measure(lambda: build_arguments_with_bit_strings(commitments, randoms, hashes), args.repeat),
+                measure(lambda: layout.get_arguments(commitments, randoms, hashes), args.repeat),
+                measure(lambda: run_shell(argument_string), args.repeat),
+                measure(lambda: run_channel(WitnessInput.ARGV, arguments, working_path), args.repeat),
+                measure(lambda: run_channel(WitnessInput.STDIN, arguments, working_path), args.repeat),
+                measure(lambda: run_channel(WitnessInput.FILE, arguments, working_path), args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import json
+import socket
+import threading
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from web3 import HTTPProvider, IPCProvider
+from web3._utils.threads import Timeout
+
+
+def build_batch(provider, requests):
+    """
+    Build the JSON-RPC batch of the requests.
+    Args:
+        provider: JSONBaseProvider, the provider numbering the requests.
+        requests: [(string, list)], the RPC methods and parameters.
+
+    Returns:
+        [dictionary], the RPC requests.
+
+    """
+    return [{'jsonrpc': '2.0', 'method': method, 'params': params, 'id': next(provider.request_counter)}
+            for method, params in requests]
+
+
+def match_batch_responses(batch, responses):
+    """
+    Match the responses of the node to the requests of the batch, the node may answer them in any order.
+    Args:
+        batch: [dictionary], the RPC requests.
+        responses: the decoded response of the node.
+
+    Returns:
+        [dictionary], the RPC responses in the order of the requests.
+
+    """
+    if not isinstance(responses, list):
+        raise ValueError("The node does not support JSON-RPC batches: " + str(responses))
+    responses_by_id = {response.get('id'): response for response in responses}
+    return [responses_by_id[request['id']] for request in batch]
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """
+    The HTTP provider posting the JSON-RPC requests through a keep-alive session shared by all the threads and
+    greenlets, instead of the session per thread of web3. The session keeps at most pool_size connections to the node,
+    the requests beyond them wait for a free connection.
+    """
+    def __init__(self, endpoint_uri, pool_size, request_kwargs=None):
+        """
+        Init the PooledHTTPProvider.
+        Args:
+            endpoint_uri: string, the HTTP URI of the node.
+            pool_size: int, the maximum number of connections to the node.
+            request_kwargs: dictionary, the keyword arguments of every request, e.g. timeout.
+        """
+        HTTPProvider.__init__(self, endpoint_uri, request_kwargs)
+        self.session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def post(self, request_data):
+        """
+        Post the encoded request to the node.
+        Args:
+            request_data: bytes, the encoded JSON-RPC request.
+
+        Returns:
+            bytes, the raw response.
+
+        """
+        request_kwargs = dict(self.get_request_kwargs())
+        request_kwargs.setdefault('timeout', 10)
+        response = self.session.post(self.endpoint_uri, data=request_data, **request_kwargs)
+        response.raise_for_status()
+        return response.content
+
+    def make_request(self, method, params):
+        """
+        Make the JSON-RPC request.
+        Args:
+            method: string, the RPC method.
+            params: list, the RPC parameters.
+
+        Returns:
+            dictionary, the RPC response.
+
+        """
+        return self.decode_rpc_response(self.post(self.encode_rpc_request(method, params)))
+
+    def make_batch_request(self, requests):
+        """
+        Make the JSON-RPC requests in one batch, i.e. one round trip to the node.
+        Args:
+            requests: [(string, list)], the RPC methods and parameters.
+
+        Returns:
+            [dictionary], the RPC responses in the order of the requests.
+
+        """
+        batch = build_batch(self, requests)
+        return match_batch_responses(batch, json.loads(self.post(json.dumps(batch).encode()).decode()))
+
+    def close(self):
+        """
+        Close the connections of the session.
+
+        """
+        self.session.close()
+
+
+class BatchIPCProvider(IPCProvider):
+    """
+    The IPC provider sending the JSON-RPC batches over its socket as well, so that the batched reads of the chain
+    interface take one round trip to the node instead of one per request.
+    """
+    def make_batch_request(self, requests):
+        """
+        Make the JSON-RPC requests in one batch, i.e. one round trip to the node.
+        Args:
+            requests: [(string, list)], the RPC methods and parameters.
+
+        Returns:
+            [dictionary], the RPC responses in the order of the requests.
+
+        """
+        batch = build_batch(self, requests)
+        request_data = json.dumps(batch).encode()
+        with self._lock, self._socket as sock:
+            try:
+                sock.sendall(request_data)
+            except BrokenPipeError:
+                # One more attempt on a new connection, as the make_request of web3.
+                sock = self._socket.reset()
+                sock.sendall(request_data)
+            raw_response = b''
+            with Timeout(self.timeout) as timeout:
+                while True:
+                    try:
+                        raw_response += sock.recv(4096)
+                    except socket.timeout:
+                        timeout.sleep(0)
+                        continue
+                    # The response is complete once it decodes, a partial one fails to decode.
+                    if raw_response.rstrip().endswith((b']', b'}')):
+                        try:
+                            return match_batch_responses(batch, json.loads(raw_response.decode()))
+                        except json.JSONDecodeError:
+                            pass
+                    timeout.sleep(0)
+
+    def close(self):
+        """
+        Close the connection to the node.
+
+        """
+        with self._lock:
+            if self._socket.sock is not None:
+                self._socket.sock.close()
+                self._socket.sock = None
+
+
+class ChainClientPool:
+    """
+    The chain clients shared by the listeners and the workers of the executor, keyed by the chain interface class and
+    the chain configuration. A chain interface is created, and its connection to the node checked, once per key; the
+    HTTP providers share one keep-alive session with at most pool_size connections to the node. The interfaces do not
+    hold any per-call state, so one interface serves all the threads and greenlets.
+
+    Only the HTTP and IPC providers can be shared: the web3 websocket provider receives the response of a request on
+    its single connection without matching the request id, so the concurrent requests of the borrowers would collide.
+    Every borrower of a websocket configuration gets its own interface and connection.
+    """
+    # The provider types whose providers serve concurrent requests.
+    SHARED_PROVIDER_TYPES = ['http', 'ipc']
+
+    def __init__(self, pool_size=10):
+        """
+        Init the ChainClientPool.
+        Args:
+            pool_size: int, the maximum number of HTTP connections to a node.
+        """
+        self.pool_size = max(1, pool_size)
+        self.__lock = threading.Lock()
+        # {(interface class, chain configuration key): chain interface}
+        self.__clients = {}
+        self.__providers = []
+
+    @staticmethod
+    def get_config_key(chain_config):
+        """
+        Get the key of the chain configuration.
+        Args:
+            chain_config: dictionary, the chain configuration.
+
+        Returns:
+            string, the canonical JSON of the configuration.
+
+        """
+        return json.dumps(chain_config, sort_keys=True, default=str)
+
+    def create_provider(self, chain_config):
+        """
+        Create the provider of the chain configuration, with the pooled session for the HTTP provider. Both the HTTP
+        and the IPC providers send JSON-RPC batches.
+        Args:
+            chain_config: dictionary, the chain configuration.
+
+        Returns:
+            BaseProvider, or None to let the chain interface create its provider.
+
+        """
+        if chain_config.get('provider_type') == 'http':
+            provider = PooledHTTPProvider(chain_config['http_uri'], self.pool_size)
+        elif chain_config.get('provider_type') == 'ipc':
+            provider = BatchIPCProvider(chain_config['ipc_path'])
+        else:
+            return None
+        self.__providers.append(provider)
+        return provider
+
+    def get_client(self, interface_class, chain_config):
+        """
+        Borrow the chain interface of the configuration, it is created at the first call. A new interface is created
+        for every call if the provider of the configuration cannot be shared.
+        Args:
+            interface_class: class, the ChainInterface class, called with the chain configuration and the provider.
+            chain_config: dictionary, the chain configuration.
+
+        Returns:
+            ChainInterface.
+
+        """
+        if chain_config.get('provider_type') not in self.SHARED_PROVIDER_TYPES:
+            return interface_class(chain_config, None)
+        key = (interface_class, self.get_config_key(chain_config))
+        with self.__lock:
+            client = self.__clients.get(key)
+            if client is None:
+                client = self.__clients[key] = interface_class(chain_config, self.create_provider(chain_config))
+            return client
+
+    def close(self):
+        """
+        Drop the chain interfaces and close the connections of their providers.
+
+        """
+        with self.__lock:
+            self.__clients.clear()
+            providers, self.__providers = self.__providers, []
+        for provider in providers:
+            provider.close()
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+import weakref
+
+from executor.metrics.executor_metrics import ExecutorMetrics
+
+
+class ContractCache:
+    """
+    The process-wide cache of the parsed ABIs and of the web3 contract objects. An ABI is parsed once per content: the
+    ABI files are keyed by their path and re-read only when their size or mtime changes, and the parsed ABIs are keyed
+    by the sha256 of their content, so the identical ABIs of several contracts share one parsed ABI and one contract
+    class per web3 instance. The contract objects are keyed by the web3 instance, the address and the ABI hash.
+    """
+    # The ABI key of the default ABI.
+    DEFAULT_ABI_KEY = 'default'
+
+    __default_cache = None
+    __default_cache_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Init the ContractCache.
+        """
+        self.__lock = threading.Lock()
+        # {abi file path: (contract address, (size, mtime), abi key)}
+        self.__abi_files = {}
+        # {abi key: parsed abi}
+        self.__abis = {}
+        # {web3: {abi key: contract class}}, the classes are dropped with their web3 instance.
+        self.__contract_classes = weakref.WeakKeyDictionary()
+        # {web3: {(contract address, abi key): contract}}
+        self.__contracts = weakref.WeakKeyDictionary()
+        # {cache: [hits, lookups]}
+        self.__lookups = {'abi': [0, 0], 'contract': [0, 0]}
+        self.__registry = ExecutorMetrics.get_registry()
+
+    @staticmethod
+    def get_default():
+        """
+        Get the process-wide cache.
+        Returns:
+            ContractCache.
+
+        """
+        with ContractCache.__default_cache_lock:
+            if ContractCache.__default_cache is None:
+                ContractCache.__default_cache = ContractCache()
+            return ContractCache.__default_cache
+
+    @staticmethod
+    def compute_abi_key(abi):
+        """
+        Compute the key of the parsed ABI.
+        Args:
+            abi: list, the parsed ABI.
+
+        Returns:
+            string, the sha256 of the canonical JSON of the ABI.
+
+        """
+        return hashlib.sha256(json.dumps(abi, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+    def _record_lookup(self, cache, hit):
+        """
+        Count the lookup into the metrics.
+        Args:
+            cache: string, 'abi' or 'contract'.
+            hit: boolean, whether the lookup is a hit.
+
+        """
+        lookups = self.__lookups[cache]
+        lookups[0] += 1 if hit else 0
+        lookups[1] += 1
+        self.__registry.increment(ExecutorMetrics.CONTRACT_CACHE_TOTAL, 1,
+                                  {'cache': cache, 'result': 'hit' if hit else 'miss'})
+        self.__registry.set_gauge(ExecutorMetrics.CONTRACT_CACHE_HIT_RATIO, lookups[0] / lookups[1], {'cache': cache})
+
+    def load_abi_file(self, contract_address, abi_file_path):
+        """
+        Get the parsed ABI of the file, the file is read again only when its size or mtime changed.
+        Args:
+            contract_address: string, the address of the contract of the ABI.
+            abi_file_path: string, the ABI file path.
+
+        Returns:
+            (string, list), the ABI key and the parsed ABI.
+
+        """
+        stat = os.stat(abi_file_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self.__lock:
+            entry = self.__abi_files.get(abi_file_path)
+            if entry is not None and entry[1] == signature and entry[2] in self.__abis:
+                self._record_lookup('abi', True)
+                return entry[2], self.__abis[entry[2]]
+        with open(abi_file_path, 'rb') as f:
+            content = f.read()
+        abi_key = hashlib.sha256(content).hexdigest()
+        with self.__lock:
+            abi = self.__abis.get(abi_key)
+            self._record_lookup('abi', abi is not None)
+            if abi is None:
+                abi = self.__abis[abi_key] = json.loads(content.decode())
+            self.__abi_files[abi_file_path] = (contract_address, signature, abi_key)
+            return abi_key, abi
+
+    def get_contract(self, web3, contract_address, abi_key, abi):
+        """
+        Get the contract object of the address with the ABI.
+        Args:
+            web3: Web3, the web3 instance the contract calls through.
+            contract_address: string, the contract address.
+            abi_key: string, the key of the ABI, see compute_abi_key.
+            abi: list, the parsed ABI.
+
+        Returns:
+            Contract.
+
+        """
+        with self.__lock:
+            contracts = self.__contracts.setdefault(web3, {})
+            contract = contracts.get((contract_address, abi_key))
+            self._record_lookup('contract', contract is not None)
+            if contract is None:
+                contract_classes = self.__contract_classes.setdefault(web3, {})
+                contract_class = contract_classes.get(abi_key)
+                if contract_class is None:
+                    contract_class = contract_classes[abi_key] = web3.eth.contract(abi=abi)
+                contract = contracts[(contract_address, abi_key)] = contract_class(address=contract_address)
+            return contract
+
+    def invalidate(self, contract_address):
+        """
+        Drop the ABI files and the contract objects of the contract, e.g. once it is unregistered. The parsed ABIs
+        and the contract classes are kept for the other contracts with the same ABI.
+        Args:
+            contract_address: string, the contract address.
+
+        """
+        with self.__lock:
+            for abi_file_path in [file_path for file_path, entry in self.__abi_files.items()
+                                  if entry[0] == contract_address]:
+                del self.__abi_files[abi_file_path]
+            for contracts in self.__contracts.values():
+                for key in [key for key in contracts if key[0] == contract_address]:
+                    del contracts[key]
+            referenced_keys = {entry[2] for entry in self.__abi_files.values()}
+            for abi_key in [abi_key for abi_key in self.__abis if abi_key not in referenced_keys]:
+                del self.__abis[abi_key]
+                for contract_classes in self.__contract_classes.values():
+                    contract_classes.pop(abi_key, None)
@@ -1,40 +1,60 @@
+from executor.chain_interface.chain_client_pool import BatchIPCProvider
 from executor.chain_interface.chain_interface import ChainInterface
+from executor.chain_interface.contract_cache import ContractCache
+from executor.chain_interface.nonce_manager import NonceManager
 from executor.constants.eth_interface_constants import EthInterfaceConstants
+from executor.metrics.executor_metrics import ExecutorMetrics, rpc_metrics_middleware
+from executor.utils.log_utils import LogUtils
 from gevent import sleep
+from hexbytes import HexBytes
 from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+import time
+import warnings
 
 
 class EthInterface(ChainInterface):
     """
     The ETH block chain interface.
     """
-    def __init__(self, options):
+    def __init__(self, options, provider=None):
         """
         Init the ETH block chain interface.
         Args:
             options: dictionary, all the required information for initializing the interface.
+            provider: BaseProvider, the provider shared with other interfaces, created from the options if None.
         """
-        self.__provider = None
+        self.__provider = provider
         assert 'provider_type' in options
         provider_type = options['provider_type']
-        if provider_type == 'ipc':
-            assert 'ipc_path' in options
-            self.__provider = Web3.IPCProvider(options['ipc_path'])
-        elif provider_type == 'http':
-            assert 'http_uri' in options
-            self.__provider = Web3.HTTPProvider(options['http_uri'])
-        elif provider_type == 'websocket':
-            assert 'websocket_uri' in options
-            self.__provider = Web3.WebsocketProvider(options['websocket_uri'])
+        if self.__provider is None:
+            if provider_type == 'ipc':
+                assert 'ipc_path' in options
+                self.__provider = BatchIPCProvider(options['ipc_path'])
+            elif provider_type == 'http':
+                assert 'http_uri' in options
+                self.__provider = Web3.HTTPProvider(options['http_uri'])
+            elif provider_type == 'websocket':
+                assert 'websocket_uri' in options
+                self.__provider = Web3.WebsocketProvider(options['websocket_uri'])
 
         # The provider must not None
         assert self.__provider is not None
+        if not hasattr(self.__provider, 'make_batch_request'):
+            LogUtils.warning("The " + str(provider_type) + " provider does not send JSON-RPC batches, the contract "
+                             "metadata and the transaction receipts are read with one request each.")
 
         # Check the web3 interface is Connected
         self.__web3 = Web3(self.__provider)
+        # Count and time every JSON-RPC call for the metrics.
+        self.__web3.middleware_onion.add(rpc_metrics_middleware, 'rpc_metrics')
         assert self.__web3.isConnected()
 
         self.__default_abi = self._load_default_abi()
+        # The parsed ABIs and the contract objects, shared by the interfaces of this process.
+        self.__contract_cache = ContractCache.get_default()
 
         assert 'default_account' in options
         self.__default_account = options['default_account']
@@ -112,10 +132,7 @@ class EthInterface(ChainInterface):
             poll_interval: int, the interval of polling event.
 
         """
-        contract_abi = self.get_abi_for_contract(contract_address)
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_contract(contract_address)
         event_filter = target_contract.eventFilter('CommitmentOpen', {'fromBlock': from_block, 'toBlock': to_block})
         self.event_listen_loop(event_filter, callback, poll_interval, owner)
 
@@ -145,7 +162,8 @@ class EthInterface(ChainInterface):
 
     def invoke_verify_and_settle(self, contract_address, execution_id, verification_data):
         """
-        Invoke the "verifyAndSettle" function of the target contract with the verification data.
+        Invoke the "verifyAndSettle" function of the target contract with the verification data, and wait for the
+        transaction receipt.
         Args:
             contract_address: string, the address or id of the target contract.
             execution_id: int, the identity number for different execution of the same contract.
@@ -155,10 +173,34 @@ class EthInterface(ChainInterface):
             The transaction hash of the invoked "verifyAndSettle" function.
 
         """
-        contract_abi = self.get_abi_for_contract(contract_address)
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        tx_hash = self.submit_verify_and_settle(contract_address, execution_id, verification_data)
+        nonce_manager = self.get_nonce_manager()
+        try:
+            self.__web3.eth.waitForTransactionReceipt(tx_hash)
+        except TimeExhausted:
+            # The transaction may be dropped by the node, leaving a gap before the later nonces.
+            if nonce_manager is not None:
+                nonce_manager.check_gap()
+            raise
+        finally:
+            if nonce_manager is not None:
+                nonce_manager.confirm(tx_hash)
+        return tx_hash
+
+    def submit_verify_and_settle(self, contract_address, execution_id, verification_data):
+        """
+        Broadcast the "verifyAndSettle" transaction of the target contract with the verification data, without waiting
+        for it to be mined.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            execution_id: int, the identity number for different execution of the same contract.
+            verification_data: dictionary, the data required for the online verification.
+
+        Returns:
+            The transaction hash of the invoked "verifyAndSettle" function.
+
+        """
+        target_contract = self._get_contract(contract_address)
         if self.__private_key is None or self.__public_key is None:
             tx_hash = target_contract.functions.verifyAndSettle(
                 execution_id,
@@ -172,8 +214,7 @@ class EthInterface(ChainInterface):
                 self.hex_array_to_int_array(verification_data['K']),
                 verification_data['inputs']).transact({'gas': EthInterfaceConstants.VERIFY_AND_SETTLE_GAS})
         else:
-            nonce = self.__web3.eth.getTransactionCount(self.__public_key)
-            vs_txn = target_contract.functions.verifyAndSettle(
+            verify_and_settle = target_contract.functions.verifyAndSettle(
                 execution_id,
                 self.hex_array_to_int_array(verification_data['A']),
                 self.hex_array_to_int_array(verification_data['A_p']),
@@ -183,33 +224,192 @@ class EthInterface(ChainInterface):
                 self.hex_array_to_int_array(verification_data['C_p']),
                 self.hex_array_to_int_array(verification_data['H']),
                 self.hex_array_to_int_array(verification_data['K']),
-                verification_data['inputs']).\
-                buildTransaction({
+                verification_data['inputs'])
+
+            def send(nonce):
+                vs_txn = verify_and_settle.buildTransaction({
                     'chainId': 27,
                     'gas': EthInterfaceConstants.VERIFY_AND_SETTLE_GAS,
                     'gasPrice': self.__web3.toWei('1', 'gwei'),
                     'nonce': nonce})
-            signed_txn = self.__web3.eth.account.signTransaction(vs_txn, private_key=self.__private_key)
-            tx_hash = self.__web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-        self.__web3.eth.waitForTransactionReceipt(tx_hash)
+                signed_txn = self.__web3.eth.account.signTransaction(vs_txn, private_key=self.__private_key)
+                try:
+                    return self.__web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+                except ValueError as e:
+                    # The same transaction is already broadcast, e.g. by a timed out request the node received.
+                    if NonceManager.is_known_transaction_error(e):
+                        return signed_txn.hash
+                    raise
+            # The nonces are assigned locally, so the transactions of the workers are broadcast without waiting for
+            # each other to be mined.
+            tx_hash = self.get_nonce_manager().send_transaction(send)
+        return Web3.toHex(tx_hash)
+
+    def get_nonce_manager(self):
+        """
+        Get the nonce manager of the account signing the transactions.
+        Returns:
+            NonceManager, or None if the transactions are signed by the node.
+
+        """
+        if self.__private_key is None or self.__public_key is None:
+            return None
+        return NonceManager.get(self.__web3, self.__public_key)
+
+    def get_block_number(self):
+        """
+        Get the number of the latest block.
+        Returns:
+            int, the block number.
+
+        """
+        return self.__web3.eth.blockNumber
+
+    @staticmethod
+    def _format_receipt(receipt):
+        """
+        Format the raw JSON-RPC transaction receipt the way web3 does for the fields read by the executor.
+        Args:
+            receipt: dictionary, the receipt in the JSON-RPC response.
+
+        Returns:
+            AttributeDict, the receipt.
 
-    def init_verify_and_settle_event_listener(self, contract_address):
+        """
+        logs = [AttributeDict(dict(log, topics=[HexBytes(topic) for topic in log['topics']],
+                                   blockNumber=int(log['blockNumber'], 16), logIndex=int(log['logIndex'], 16)))
+                for log in receipt['logs']]
+        return AttributeDict(dict(receipt, logs=logs, blockNumber=int(receipt['blockNumber'], 16),
+                                  gasUsed=int(receipt['gasUsed'], 16),
+                                  status=int(receipt['status'], 16) if receipt.get('status') else None))
+
+    def get_transaction_receipts(self, tx_hashes):
+        """
+        Get the receipts of the transactions in one JSON-RPC batch, or one by one if the provider does not support the
+        batches.
+        Args:
+            tx_hashes: [string], the hex transaction hashes.
+
+        Returns:
+            dictionary, {transaction hash: the receipt, or None if the transaction is not mined yet}.
+
+        """
+        if hasattr(self.__provider, 'make_batch_request'):
+            registry = ExecutorMetrics.get_registry()
+            start = time.monotonic()
+            status = 'error'
+            try:
+                responses = self.__provider.make_batch_request(
+                    [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes])
+                errors = [response['error'] for response in responses if 'error' in response]
+                if errors:
+                    raise ValueError("JSON-RPC batch failed: " + str(errors[0]))
+                status = 'ok'
+            finally:
+                registry.observe(ExecutorMetrics.RPC_LATENCY, time.monotonic() - start, {'method': 'batch'})
+                registry.increment(ExecutorMetrics.RPC_CALLS_TOTAL, 1, {'method': 'batch', 'status': status})
+            return {tx_hash: self._format_receipt(response['result']) if response['result'] else None
+                    for tx_hash, response in zip(tx_hashes, responses)}
+        receipts = {}
+        for tx_hash in tx_hashes:
+            try:
+                receipts[tx_hash] = self.__web3.eth.getTransactionReceipt(tx_hash)
+            except TransactionNotFound:
+                receipts[tx_hash] = None
+        return receipts
+
+    def is_transaction_known(self, tx_hash):
+        """
+        Check whether the node knows the transaction, i.e. it is mined or still waiting in the pool of the node.
+        Args:
+            tx_hash: string, the hex hash of the transaction.
+
+        Returns:
+            Boolean, False if the transaction is dropped or was never broadcast.
+
+        """
+        try:
+            return self.__web3.eth.getTransaction(tx_hash) is not None
+        except TransactionNotFound:
+            return False
+
+    def get_verify_and_settle_result(self, contract_address, execution_id, receipt):
+        """
+        Decode the outcome of the mined "verifyAndSettle" transaction from the VerifyAndSettle event in its receipt.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            execution_id: int, the identity number for different execution of the same contract.
+            receipt: AttributeDict, the receipt of the transaction.
+
+        Returns:
+            Boolean, the success of the VerifyAndSettle event, or False if the transaction reverted without the event.
+
+        """
+        target_contract = self._get_contract(contract_address)
+        with warnings.catch_warnings():
+            # The logs of the other events of the contract are not VerifyAndSettle, which web3 warns about.
+            warnings.simplefilter('ignore')
+            events = target_contract.events.VerifyAndSettle().processReceipt(receipt)
+        for event in events:
+            if event.args.execution_id == execution_id:
+                return event.args.success
+        return False
+
+    def init_verify_and_settle_event_listener(self, contract_address, from_block='latest'):
         """
         Init the VerifyAndSettle Event handler before the event emit.
         Args:
             contract_address: contract address
+            from_block: the first block of the filter, the block number or 'latest'.
 
         Returns:
             The EventFilter for the VerifyAndSettle event.
 
         """
-        contract_abi = self.get_abi_for_contract(contract_address)
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
-        return target_contract.events.VerifyAndSettle.createFilter(fromBlock='latest')
+        target_contract = self._get_contract(contract_address)
+        return target_contract.events.VerifyAndSettle.createFilter(fromBlock=from_block)
         # return target_contract.eventFilter('VerifyAndSettle', {'fromBlock': 'latest', 'toBlock': 'latest'})
 
+    def _get_default_contract(self, contract_address):
+        """
+        Get the contract object with the default abi, which has the fixed API of all the supported contracts.
+        Args:
+            contract_address: string, the address or id of the target contract.
+
+        Returns:
+            Contract.
+
+        """
+        return self.__contract_cache.get_contract(self.__web3, contract_address, ContractCache.DEFAULT_ABI_KEY,
+                                                  self.__default_abi)
+
+    def _get_contract(self, contract_address):
+        """
+        Get the contract object with the abi of the target contract.
+        Args:
+            contract_address: string, the address or id of the target contract.
+
+        Returns:
+            Contract.
+
+        """
+        abi_key, contract_abi = self.get_abi_entry_for_contract(contract_address)
+        assert contract_abi is not None
+        return self.__contract_cache.get_contract(self.__web3, contract_address, abi_key, contract_abi)
+
+    def get_abi_entry_for_contract(self, contract_address):
+        """
+        Get the abi for the target contract with its key in the contract cache.
+        Args:
+            contract_address: string, the address or id of the target contract.
+
+        Returns:
+            (string, list), the abi key and the abi for the target contract.
+
+        """
+        contract_abi = self.get_abi_for_contract(contract_address)
+        return ContractCache.compute_abi_key(contract_abi), contract_abi
+
     def get_abi_for_contract(self, contract_address):
         """
         Get the abi for the target contract.
@@ -241,10 +441,7 @@ class EthInterface(ChainInterface):
             string, the http uri to download the abi file.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getAbiPath().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -261,10 +458,7 @@ class EthInterface(ChainInterface):
             string, the http uri to download the code file.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getCodePath().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -281,10 +475,7 @@ class EthInterface(ChainInterface):
             string, the http uri to download the code file.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getProvingKeyPath().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -301,10 +492,7 @@ class EthInterface(ChainInterface):
             string, the http uri to download the variables file.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getVariablesPath().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -321,10 +509,7 @@ class EthInterface(ChainInterface):
             int, the hash value.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getAbiSha2().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -341,10 +526,7 @@ class EthInterface(ChainInterface):
             int, the hash value.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getProvingKeySha2().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -361,10 +543,7 @@ class EthInterface(ChainInterface):
             int, the hash value.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getVariablesSha2().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -381,10 +560,7 @@ class EthInterface(ChainInterface):
             int, the hash value.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.getCodeSha2().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -401,10 +577,7 @@ class EthInterface(ChainInterface):
             boolean.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         return target_contract.functions.isOpenFinished().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -421,10 +594,7 @@ class EthInterface(ChainInterface):
             the commitment list from contract.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         commitment = target_contract.functions.getInputAndCommitment().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
@@ -442,13 +612,113 @@ class EthInterface(ChainInterface):
             the commitment list from contract.
 
         """
-        contract_abi = self.get_default_abi()
-        assert contract_abi is not None
-        target_contract = self.__web3.eth.contract(address=contract_address, abi=contract_abi)
-        target_contract.address = contract_address
+        target_contract = self._get_default_contract(contract_address)
         size = target_contract.functions.getSingleExecutionCommitmentSize().call({
             'from': self.__default_account,
             'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
             'gasPrice': EthInterfaceConstants.DEFAULT_CALL_GAS_PRICE
         })
         return size
+
+    def _get_call_transaction(self, contract_address, function_name):
+        """
+        Build the eth_call transaction of the getter of the default abi.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            function_name: string, the getter without arguments.
+
+        Returns:
+            dictionary, the transaction.
+
+        """
+        transaction = {'to': contract_address,
+                       'data': self._get_default_contract(contract_address).encodeABI(fn_name=function_name),
+                       'gas': hex(EthInterfaceConstants.DEFAULT_CALL_GAS),
+                       'gasPrice': hex(EthInterfaceConstants.DEFAULT_CALL_GAS_PRICE)}
+        if self.__default_account:
+            transaction['from'] = self.__default_account
+        return transaction
+
+    def _decode_call_result(self, function_name, result):
+        """
+        Decode the result of the eth_call of the getter of the default abi.
+        Args:
+            function_name: string, the getter.
+            result: string, the hex result of eth_call.
+
+        Returns:
+            The decoded value, or the tuple of the values for several outputs.
+
+        """
+        function_abi = next(item for item in self.__default_abi
+                            if item.get('type') == 'function' and item['name'] == function_name)
+        output_types = [output['type'] for output in function_abi['outputs']]
+        values = self.__web3.codec.decode_abi(output_types, bytes.fromhex(result[2:]))
+        return values[0] if len(values) == 1 else tuple(values)
+
+    def _send_call_batch(self, contract_address, function_names, block_identifier):
+        """
+        Send the eth_calls in one JSON-RPC batch, between two eth_blockNumber when they are not pinned to a block.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            function_names: [string], the getters.
+            block_identifier: string, the hex block number, or 'latest'.
+
+        Returns:
+            ([string], boolean, int), the hex results, whether they were all read at one block, and the latest block
+            number seen by the batch.
+
+        """
+        requests = [('eth_call', [self._get_call_transaction(contract_address, function_name), block_identifier])
+                    for function_name in function_names]
+        unpinned = block_identifier == 'latest'
+        if unpinned:
+            requests = [('eth_blockNumber', [])] + requests + [('eth_blockNumber', [])]
+        registry = ExecutorMetrics.get_registry()
+        start = time.monotonic()
+        status = 'error'
+        try:
+            responses = self.__provider.make_batch_request(requests)
+            errors = [response['error'] for response in responses if 'error' in response]
+            if errors:
+                raise ValueError("JSON-RPC batch failed: " + str(errors[0]))
+            status = 'ok'
+        finally:
+            registry.observe(ExecutorMetrics.RPC_LATENCY, time.monotonic() - start, {'method': 'batch'})
+            registry.increment(ExecutorMetrics.RPC_CALLS_TOTAL, 1, {'method': 'batch', 'status': status})
+        results = [response['result'] for response in responses]
+        if not unpinned:
+            return results, True, int(block_identifier, 16)
+        first_block, last_block = int(results[0], 16), int(results[-1], 16)
+        return results[1:-1], first_block == last_block, last_block
+
+    def batch_call(self, contract_address, function_names):
+        """
+        Call the getters of the default abi of the target contract in one JSON-RPC batch, i.e. one round trip, all
+        of them reading the same block. The node answers the batch in order, so the calls read one block if the block
+        number is the same before and after them; otherwise the batch is sent again pinned to the latter block. The
+        getters are called one by one if the provider or the node does not support the batches.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            function_names: [string], the getters without arguments, e.g. EthInterfaceConstants.METADATA_FUNCTIONS.
+
+        Returns:
+            dictionary, {function name: the returned value}.
+
+        """
+        if hasattr(self.__provider, 'make_batch_request'):
+            try:
+                results, consistent, block_number = self._send_call_batch(contract_address, function_names, 'latest')
+                if not consistent:
+                    results, _, _ = self._send_call_batch(contract_address, function_names, hex(block_number))
+                return {function_name: self._decode_call_result(function_name, result)
+                        for function_name, result in zip(function_names, results)}
+            except (ValueError, KeyError, OSError) as e:
+                LogUtils.warning("Failed to read " + contract_address + " in a JSON-RPC batch, read it call by call: " +
+                                 str(e))
+        target_contract = self._get_default_contract(contract_address)
+        return {function_name: target_contract.functions[function_name]().call({
+            'from': self.__default_account,
+            'gas': EthInterfaceConstants.DEFAULT_CALL_GAS,
+            'gasPrice': EthInterfaceConstants.DEFAULT_CALL_GAS_PRICE
+        }) for function_name in function_names}
@@ -1,20 +1,20 @@
+from executor.chain_interface.contract_cache import ContractCache
 from executor.chain_interface.eth_interface import EthInterface
 from os import path
 
-import json
-
 
 class EthLocalABIInterface(EthInterface):
     """
     The ETH interface with local stored contract Abi files.
     """
-    def __init__(self, options):
+    def __init__(self, options, provider=None):
         """
         Init the ETH block chain interface.
         Args:
             options: dictionary, all the required information for initializing the interface.
+            provider: BaseProvider, the provider shared with other interfaces, created from the options if None.
         """
-        EthInterface.__init__(self, options)
+        EthInterface.__init__(self, options, provider)
 
         assert 'abi_path' in options
         self.__abi_path = options['abi_path']
@@ -28,7 +28,19 @@ class EthLocalABIInterface(EthInterface):
         Returns:
             The abi for the target contract or None if failed to get the abi.
 
+        """
+        return self.get_abi_entry_for_contract(contract_address)[1]
+
+    def get_abi_entry_for_contract(self, contract_address):
+        """
+        Get the abi for the target contract with its key in the contract cache, the abi file is parsed again only
+        when it changed.
+        Args:
+            contract_address: string, the address or id of the target contract.
+
+        Returns:
+            (string, list), the abi key and the abi for the target contract.
+
         """
         abi_file_path = path.join(self.__abi_path, contract_address) + '.abi'
-        with open(abi_file_path) as f:
-            return json.load(f)
+        return ContractCache.get_default().load_abi_file(contract_address, abi_file_path)
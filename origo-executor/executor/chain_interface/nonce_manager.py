@@ -0,0 +1,176 @@
+import threading
+
+from executor.constants.eth_interface_constants import EthInterfaceConstants
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.utils.log_utils import LogUtils
+from web3 import Web3
+
+
+class NonceManager:
+    """
+    The local nonce manager of a sending account. The nonces are assigned locally, so the signed transactions of the
+    account are broadcast back-to-back without waiting for each other to be mined. The next nonce is read from the
+    pending transaction count of the chain on the first use, and again after any failed broadcast or any detected gap:
+    the nonce of a transaction failed to broadcast, or accepted and then dropped by the node, would otherwise hold all
+    the later transactions in the node's queue.
+    """
+    __managers = {}
+    __managers_lock = threading.Lock()
+
+    def __init__(self, web3, account):
+        """
+        Init the NonceManager.
+        Args:
+            web3: Web3, the web3 instance to read the transaction count with.
+            account: string, the address of the sending account.
+        """
+        self.__web3 = web3
+        self.__account = account
+        self.__lock = threading.Lock()
+        # The nonce of the next transaction, None until it is read from the chain.
+        self.__next_nonce = None
+        # The number of the transactions being signed and broadcast.
+        self.__sending = 0
+        # {transaction hash: nonce} of the broadcast transactions not mined yet.
+        self.__outstanding = {}
+        self.__registry = ExecutorMetrics.get_registry()
+
+    @staticmethod
+    def get(web3, account):
+        """
+        Get the process-wide nonce manager of the sending account, all the workers signing with the account share it.
+        Args:
+            web3: Web3, the web3 instance to read the transaction count with if the manager is created.
+            account: string, the address of the sending account.
+
+        Returns:
+            NonceManager.
+
+        """
+        key = account.lower()
+        with NonceManager.__managers_lock:
+            if key not in NonceManager.__managers:
+                NonceManager.__managers[key] = NonceManager(web3, account)
+            return NonceManager.__managers[key]
+
+    @staticmethod
+    def is_nonce_error(error):
+        """
+        Check whether the broadcast failed because of the nonce, i.e. the local nonce is behind the chain.
+        Args:
+            error: Exception, the error of the broadcast.
+
+        Returns:
+            Boolean, True if the transaction is worth resending with a nonce read from the chain.
+
+        """
+        message = str(error).lower()
+        return any(nonce_error in message for nonce_error in EthInterfaceConstants.NONCE_ERRORS)
+
+    @staticmethod
+    def is_known_transaction_error(error):
+        """
+        Check whether the broadcast failed because the same transaction is already in the node's pool.
+        Args:
+            error: Exception, the error of the broadcast.
+
+        Returns:
+            Boolean, True if the transaction is already broadcast, it must not be sent again.
+
+        """
+        message = str(error).lower()
+        return any(known_error in message for known_error in EthInterfaceConstants.KNOWN_TRANSACTION_ERRORS)
+
+    def allocate(self):
+        """
+        Assign the next nonce of the account.
+        Returns:
+            int, the nonce.
+
+        """
+        with self.__lock:
+            if self.__next_nonce is None:
+                self.__next_nonce = self.__web3.eth.getTransactionCount(self.__account, 'pending')
+            nonce = self.__next_nonce
+            self.__next_nonce += 1
+            return nonce
+
+    def resync(self):
+        """
+        Drop the local nonce, the next nonce is read from the chain again.
+
+        """
+        with self.__lock:
+            self.__next_nonce = None
+        self.__registry.increment(ExecutorMetrics.NONCE_RESYNCS_TOTAL)
+
+    def send_transaction(self, send):
+        """
+        Send a transaction with the next nonce. The nonce is resynced from the chain if the broadcast fails, and the
+        transaction is sent once more if it failed because of its nonce.
+        Args:
+            send: function, send(nonce) signs and broadcasts the transaction with the nonce and returns its hash.
+
+        Returns:
+            The hash of the transaction.
+
+        """
+        for attempt in range(EthInterfaceConstants.NONCE_SEND_ATTEMPTS):
+            nonce = self.allocate()
+            with self.__lock:
+                self.__sending += 1
+            try:
+                tx_hash = send(nonce)
+            except Exception as e:
+                self.resync()
+                if attempt + 1 == EthInterfaceConstants.NONCE_SEND_ATTEMPTS or not self.is_nonce_error(e):
+                    raise
+                LogUtils.warning("Nonce " + str(nonce) + " of " + self.__account + " was rejected, resend with the "
+                                 "nonce from chain: " + str(e))
+                continue
+            finally:
+                with self.__lock:
+                    self.__sending -= 1
+            with self.__lock:
+                self.__outstanding[Web3.toHex(tx_hash)] = nonce
+            return tx_hash
+
+    def confirm(self, tx_hash):
+        """
+        Forget the transaction once it is mined, or given up.
+        Args:
+            tx_hash: string, the hex hash of the transaction.
+
+        """
+        with self.__lock:
+            self.__outstanding.pop(tx_hash, None)
+
+    def get_outstanding_count(self):
+        with self.__lock:
+            return len(self.__outstanding)
+
+    def check_gap(self):
+        """
+        Check whether a broadcast transaction of the account was dropped by the node, and resync the nonce if so. The
+        pending transaction count only covers the transactions without a gap before them, so a local nonce beyond it
+        means a nonce below the local one is missing from the node's pool; the next transaction then takes the missing
+        nonce, which releases the transactions held after it.
+
+        Returns:
+            Boolean, True if a gap was found and the nonce is resynced.
+
+        """
+        latest_count = self.__web3.eth.getTransactionCount(self.__account, 'latest')
+        pending_count = self.__web3.eth.getTransactionCount(self.__account, 'pending')
+        with self.__lock:
+            # The transactions below the latest count are mined, or replaced by others of the same nonce.
+            for tx_hash in [tx_hash for tx_hash, nonce in self.__outstanding.items() if nonce < latest_count]:
+                del self.__outstanding[tx_hash]
+            if self.__sending or self.__next_nonce is None or self.__next_nonce <= pending_count:
+                return False
+            lowest_nonce = min(self.__outstanding.values()) if self.__outstanding else None
+        LogUtils.warning("Nonce gap of " + self.__account + ": the chain is at nonce " + str(latest_count) + ", " +
+                         str(pending_count) + " pending, the lowest outstanding nonce is " + str(lowest_nonce) +
+                         ", resync the nonce from chain.")
+        self.resync()
+        return True
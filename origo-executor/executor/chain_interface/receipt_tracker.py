@@ -0,0 +1,130 @@
+import time
+
+from executor.utils.log_utils import LogUtils
+from gevent import Greenlet, sleep
+from gevent.event import AsyncResult
+from web3.exceptions import TimeExhausted
+
+
+class ReceiptTracker(Greenlet):
+    """
+    The tracker of the receipts of the submitted "verifyAndSettle" transactions, shared by all the workers. The workers
+    hand over the transaction hashes and wait on the returned futures, instead of each polling the node for its own
+    receipt and event. The tracker checks all the pending receipts in one JSON-RPC batch per new block, and resolves
+    the futures with the receipts and the decoded VerifyAndSettle outcomes. A transaction not mined before its deadline,
+    e.g. dropped or replaced, fails its future with TimeExhausted, and the nonce of the sending account is checked for
+    the gap the transaction may leave.
+    """
+    def __init__(self, chain_interface, poll_interval, timeout):
+        """
+        Init the ReceiptTracker.
+        Args:
+            chain_interface: EthInterface, the chain interface to read the blocks and the receipts with.
+            poll_interval: float, the seconds between the checks of the latest block number.
+            timeout: float, the seconds a transaction may take to be mined after it is tracked.
+        """
+        Greenlet.__init__(self)
+        self.__chain_interface = chain_interface
+        self.__poll_interval = poll_interval
+        self.__timeout = timeout
+        self.__should_exit = False
+        # {transaction hash: (contract address, execution id, AsyncResult, deadline)}
+        self.__pending = {}
+        # The latest block whose receipts are checked.
+        self.__checked_block = None
+
+    def track(self, contract_address, execution_id, tx_hash):
+        """
+        Track the receipt of the submitted "verifyAndSettle" transaction.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            execution_id: int, the identity number for different execution of the same contract.
+            tx_hash: string, the hex hash of the transaction.
+
+        Returns:
+            AsyncResult, resolved with {'receipt': receipt, 'success': boolean} once the transaction is mined, or with
+            TimeExhausted if it is not mined before the deadline.
+
+        """
+        future = AsyncResult()
+        self.__pending[tx_hash] = (contract_address, execution_id, future, time.monotonic() + self.__timeout)
+        return future
+
+    def get_pending_count(self):
+        return len(self.__pending)
+
+    def check_receipts(self):
+        """
+        Check the receipts of all the pending transactions at once, and resolve the futures of the mined ones.
+
+        """
+        tx_hashes = list(self.__pending.keys())
+        if not tx_hashes:
+            return
+        receipts = self.__chain_interface.get_transaction_receipts(tx_hashes)
+        for tx_hash in tx_hashes:
+            receipt = receipts.get(tx_hash)
+            if receipt is None:
+                continue
+            contract_address, execution_id, future, _ = self.__pending.pop(tx_hash)
+            nonce_manager = self.__chain_interface.get_nonce_manager()
+            if nonce_manager is not None:
+                nonce_manager.confirm(tx_hash)
+            try:
+                success = self.__chain_interface.get_verify_and_settle_result(contract_address, execution_id, receipt)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            future.set({'receipt': receipt, 'success': success})
+
+    def expire_receipts(self):
+        """
+        Fail the futures of the transactions not mined before their deadlines, and resync the nonce of the sending
+        account if any of them was dropped.
+
+        """
+        now = time.monotonic()
+        expired = [tx_hash for tx_hash, (_, _, _, deadline) in self.__pending.items() if deadline <= now]
+        if not expired:
+            return
+        nonce_manager = self.__chain_interface.get_nonce_manager()
+        for tx_hash in expired:
+            _, _, future, _ = self.__pending.pop(tx_hash)
+            LogUtils.error("Transaction " + tx_hash + " is not mined in " + str(self.__timeout) + " seconds.")
+            if nonce_manager is not None:
+                nonce_manager.confirm(tx_hash)
+            future.set_exception(TimeExhausted("Transaction " + tx_hash + " is not mined in " + str(self.__timeout) +
+                                               " seconds."))
+        if nonce_manager is not None:
+            nonce_manager.check_gap()
+
+    def run(self):
+        """
+        Check the pending receipts once per new block, and their deadlines once per poll, until stopped.
+
+        """
+        while not self.__should_exit:
+            try:
+                block_number = self.__chain_interface.get_block_number()
+                if block_number != self.__checked_block:
+                    self.check_receipts()
+                    self.__checked_block = block_number
+            except Exception as e:
+                # The receipts are checked again in the next poll.
+                LogUtils.error("Failed to check the transaction receipts: " + str(e))
+            # The deadlines pass even if the node cannot be reached.
+            try:
+                self.expire_receipts()
+            except Exception as e:
+                LogUtils.error("Failed to check the nonce gap: " + str(e))
+            sleep(self.__poll_interval)
+
+    def stop(self):
+        """
+        Stop the tracker, the futures of the pending transactions are resolved with an exception.
+
+        """
+        self.__should_exit = True
+        for tx_hash in list(self.__pending.keys()):
+            _, _, future, _ = self.__pending.pop(tx_hash)
+            future.set_exception(Exception("Receipt tracker stopped before " + tx_hash + " was mined."))
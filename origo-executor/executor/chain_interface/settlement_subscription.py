@@ -0,0 +1,177 @@
+from collections import OrderedDict
+from executor.utils.log_utils import LogUtils
+from gevent import Greenlet, sleep
+from gevent.event import AsyncResult
+
+
+class SettlementTracking:
+    """
+    The ways the workers learn the outcomes of their "verifyAndSettle" transactions.
+    """
+    # The ReceiptTracker reads the receipts of the transactions, and decodes the VerifyAndSettle events in them.
+    RECEIPT = 'receipt'
+    # The SettlementSubscription polls one VerifyAndSettle filter per contract.
+    EVENT = 'event'
+    ALL_MODES = [RECEIPT, EVENT]
+
+
+class SettlementSubscription(Greenlet):
+    """
+    The VerifyAndSettle log subscription shared by all the workers: one filter per contract, polled by this single
+    greenlet, whose events are demultiplexed by their execution ids to the waiting workers. The events of the
+    executions nobody waits for yet are buffered, so a worker starting to wait after its event arrived gets the event
+    from the buffer. A filter failing to poll, e.g. expired or lost by a node restart, is created again from the last
+    block it was polled at, and its events since that block are read again.
+    """
+    def __init__(self, chain_interface, poll_interval, buffer_size):
+        """
+        Init the SettlementSubscription.
+        Args:
+            chain_interface: EthInterface, the chain interface to create and poll the filters with.
+            poll_interval: float, the seconds between the polls of the filters.
+            buffer_size: int, the maximum number of buffered events, the oldest ones are dropped beyond it.
+        """
+        Greenlet.__init__(self)
+        self.__chain_interface = chain_interface
+        self.__poll_interval = poll_interval
+        self.__buffer_size = buffer_size
+        self.__should_exit = False
+        # {contract address: event filter}
+        self.__filters = {}
+        # {contract address: the latest block number before the last successful poll of the filter}
+        self.__polled_blocks = {}
+        # {(contract address, execution id): AsyncResult}
+        self.__waiters = {}
+        # {(contract address, execution id): event}, from the oldest.
+        self.__buffered = OrderedDict()
+
+    def watch(self, contract_address, execution_id):
+        """
+        Wait for the VerifyAndSettle event of the execution. The filter of the contract is created by its first watch,
+        so an execution must be watched before its transaction is broadcast.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            execution_id: int, the identity number for different execution of the same contract.
+
+        Returns:
+            AsyncResult, resolved with {'event': event, 'success': boolean} once the event arrives.
+
+        """
+        if contract_address not in self.__filters:
+            self.__polled_blocks[contract_address] = self.__chain_interface.get_block_number()
+            self.__filters[contract_address] = \
+                self.__chain_interface.init_verify_and_settle_event_listener(contract_address)
+        future = AsyncResult()
+        key = (contract_address, execution_id)
+        if key in self.__buffered:
+            event = self.__buffered.pop(key)
+            future.set({'event': event, 'success': event.args.success})
+        else:
+            self.__waiters[key] = future
+        return future
+
+    def unwatch(self, contract_address, execution_id):
+        """
+        Stop waiting for the VerifyAndSettle event of the execution, e.g. its transaction failed to broadcast.
+        Args:
+            contract_address: string, the address or id of the target contract.
+            execution_id: int, the identity number for different execution of the same contract.
+
+        """
+        self.__waiters.pop((contract_address, execution_id), None)
+
+    def get_buffered_count(self):
+        return len(self.__buffered)
+
+    def dispatch(self, contract_address, event):
+        """
+        Hand the event to the worker waiting for it, or buffer it until a worker waits for it.
+        Args:
+            contract_address: string, the address or id of the contract emitting the event.
+            event: the received VerifyAndSettle event.
+
+        """
+        key = (contract_address, event.args.execution_id)
+        future = self.__waiters.pop(key, None)
+        if future is not None:
+            future.set({'event': event, 'success': event.args.success})
+            return
+        self.__buffered[key] = event
+        while len(self.__buffered) > self.__buffer_size:
+            self.__buffered.popitem(last=False)
+
+    def poll(self):
+        """
+        Poll the new events of every contract once.
+
+        """
+        if not self.__filters:
+            return
+        block_number = self.__chain_interface.get_block_number()
+        for contract_address, event_filter in list(self.__filters.items()):
+            try:
+                events = event_filter.get_new_entries()
+            except Exception as e:
+                LogUtils.error("Failed to poll the VerifyAndSettle filter of contract@" + contract_address + ": " +
+                               str(e) + ", create it again.")
+                events = self._recreate_filter(contract_address)
+            if contract_address not in self.__filters:
+                # The contract is removed while polling.
+                continue
+            for event in events:
+                self.dispatch(contract_address, event)
+            self.__polled_blocks[contract_address] = block_number
+
+    def _recreate_filter(self, contract_address):
+        """
+        Create the filter of the contract again from the block of its last successful poll.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            list, the events since the block of the last successful poll.
+
+        """
+        event_filter = self.__chain_interface.init_verify_and_settle_event_listener(
+            contract_address, self.__polled_blocks[contract_address])
+        if contract_address not in self.__filters:
+            # The contract is removed while creating the filter.
+            return []
+        self.__filters[contract_address] = event_filter
+        return event_filter.get_all_entries()
+
+    def remove_contract(self, contract_address):
+        """
+        Drop the filter, the waiters and the buffered events of the unregistered contract.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        self.__filters.pop(contract_address, None)
+        self.__polled_blocks.pop(contract_address, None)
+        for key in [key for key in self.__waiters if key[0] == contract_address]:
+            self.__waiters.pop(key).set_exception(Exception("Contract@" + contract_address + " is unregistered."))
+        for key in [key for key in self.__buffered if key[0] == contract_address]:
+            del self.__buffered[key]
+
+    def run(self):
+        """
+        Poll the filters until stopped.
+
+        """
+        while not self.__should_exit:
+            try:
+                self.poll()
+            except Exception as e:
+                # The filters are polled again in the next poll.
+                LogUtils.error("Failed to poll the VerifyAndSettle events: " + str(e))
+            sleep(self.__poll_interval)
+
+    def stop(self):
+        """
+        Stop the subscription, the futures of the waiting workers are resolved with an exception.
+
+        """
+        self.__should_exit = True
+        for key in list(self.__waiters.keys()):
+            self.__waiters.pop(key).set_exception(Exception("Settlement subscription stopped."))
@@ -0,0 +1,168 @@
+import time
+
+from executor.cluster.cluster_membership import ClusterMembership
+from executor.constants.executor_constants import ExecutorConstants
+from executor.utils.log_utils import LogUtils
+
+
+class ClusterCoordinator:
+    """
+    Keep the contracts registered in the executor in line with the contracts the cluster assigns to this node. It is
+    driven by the executor main loop: every heartbeat interval it refreshes the heartbeat of this node, registers the
+    newly claimed contracts and hands off the contracts the hash ring moved to another node once they are idle.
+
+    A node failing to refresh its heartbeat, e.g. cut off from the shared storage, is considered left by the other
+    nodes once its heartbeat is older than the heartbeat timeout, and they take over its contracts. So the node stops
+    all its contracts at that point as well, and registers them again once its heartbeat is refreshed.
+    """
+
+    def __init__(self, executor, options, clock=time.monotonic):
+        """
+        Init the ClusterCoordinator.
+        Args:
+            executor: Executor, the executor of this node.
+            options: dictionary, with cluster_membership_path, cluster_node_id and cluster_node_url, and optionally
+                cluster_heartbeat_interval, cluster_heartbeat_timeout and cluster_virtual_nodes.
+            clock: function, returns the current time in seconds.
+        """
+        self.__executor = executor
+        self.__heartbeat_interval = options.get('cluster_heartbeat_interval',
+                                                ExecutorConstants.DEFAULT_CLUSTER_HEARTBEAT_INTERVAL)
+        self.__heartbeat_timeout = options.get('cluster_heartbeat_timeout',
+                                               ExecutorConstants.DEFAULT_CLUSTER_HEARTBEAT_TIMEOUT)
+        self.__clock = clock
+        self.__last_rebalance = None
+        # The time of the last successful heartbeat of this node.
+        self.__last_heartbeat = None
+        self.membership = ClusterMembership(
+            options['cluster_membership_path'], options['cluster_node_id'], options['cluster_node_url'],
+            self.__heartbeat_timeout,
+            options.get('cluster_virtual_nodes', ExecutorConstants.DEFAULT_CLUSTER_VIRTUAL_NODES))
+
+    def is_local_node(self, node_id):
+        """
+        Check whether the node is this node.
+        Args:
+            node_id: string, the node id.
+
+        Returns:
+            Boolean.
+
+        """
+        return node_id == self.membership.node_id
+
+    def is_heartbeat_expired(self):
+        """
+        Check whether the last successful heartbeat of this node is older than the heartbeat timeout, i.e. the other
+        nodes consider this node left.
+        Returns:
+            Boolean.
+
+        """
+        return self.__last_heartbeat is None or self.__clock() - self.__last_heartbeat > self.__heartbeat_timeout
+
+    def owns_contract(self, contract_address):
+        """
+        Check whether this node still owns the contract, so that the proof of its execution may be submitted.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            Boolean, False if the heartbeat of this node is expired or the ownership cannot be read.
+
+        """
+        if self.is_heartbeat_expired():
+            return False
+        try:
+            return self.membership.is_owner(contract_address)
+        except Exception as e:
+            LogUtils.error("Failed to read the owner of contract@" + contract_address + ": " + str(e))
+            return False
+
+    def route_registration(self, contract_address, contract_info):
+        """
+        Add the contract into the cluster registry, and register it right away if this node owns it.
+        Args:
+            contract_address: string, contract address.
+            contract_info: dictionary, the contract info given at the registration.
+
+        Returns:
+            (node id, node url) of the owner node the request should be routed to.
+
+        """
+        node_id, node_url = self.membership.register_contract(contract_address, contract_info)
+        if self.is_local_node(node_id):
+            self.rebalance()
+        return node_id, node_url
+
+    def route_unregistration(self, contract_address):
+        """
+        Remove the contract from the cluster registry.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            (node id, node url) of the node which proved the contract, or (None, None).
+
+        """
+        return self.membership.unregister_contract(contract_address)
+
+    def tick(self):
+        """
+        Rebalance if the heartbeat interval elapsed since the last rebalance, and stop all the contracts of this node
+        if its heartbeat is expired.
+
+        """
+        now = self.__clock()
+        if self.__last_rebalance is None or now - self.__last_rebalance >= self.__heartbeat_interval:
+            try:
+                self.rebalance()
+            except Exception as e:
+                # The rebalance is retried in the next heartbeat interval.
+                LogUtils.error("Failed to refresh the heartbeat of this node: " + str(e))
+        if self.is_heartbeat_expired():
+            self.stop_contracts()
+
+    def stop_contracts(self):
+        """
+        Stop all the contracts registered in the executor, as the other nodes may have taken them over.
+
+        """
+        for contract_address in list(self.__executor.registered_contracts.keys()):
+            LogUtils.warning("Heartbeat of this node is expired, stop contract@" + contract_address)
+            self.__executor.unregister_contract(contract_address)
+
+    def rebalance(self):
+        """
+        Refresh the heartbeat, then register the contracts claimed by this node, unregister the contracts which are
+        removed from the cluster, and hand off the contracts assigned to another node once they have no running
+        executions.
+
+        """
+        self.__last_rebalance = self.__clock()
+        claimed, handoff = self.membership.rebalance()
+        self.__last_heartbeat = self.__last_rebalance
+        for contract_address, contract_info in claimed.items():
+            if contract_address not in self.__executor.registered_contracts:
+                LogUtils.info("Cluster assigned contract@" + contract_address + " to this node")
+                self.__executor.register_contract(contract_address, dict(contract_info))
+        for contract_address in list(self.__executor.registered_contracts.keys()):
+            if contract_address not in claimed:
+                LogUtils.info("Contract@" + contract_address + " is removed from the cluster")
+                self.__executor.unregister_contract(contract_address)
+        released = []
+        for contract_address in handoff:
+            if self.__executor.is_contract_executing(contract_address):
+                continue
+            LogUtils.info("Hand off contract@" + contract_address + " to another node of the cluster")
+            self.__executor.unregister_contract(contract_address)
+            released.append(contract_address)
+        if released:
+            self.membership.release_contracts(released)
+
+    def leave(self):
+        """
+        Leave the cluster, the contracts of this node are taken over by the other nodes.
+
+        """
+        self.membership.leave()
@@ -0,0 +1,238 @@
+import fcntl
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from executor.cluster.hash_ring import HashRing
+
+
+class ClusterMembership:
+    """
+    The membership of the executor nodes and the registry of the contracts shared by the cluster, stored in a JSON
+    file on storage shared by all the nodes. Every read-modify-write of the file holds an exclusive flock, so the
+    nodes see a consistent state.
+
+    The file keeps, for every node, its url and last heartbeat, and for every contract, its contract info and the
+    node which claimed it. The contracts are partitioned by the consistent hash ring of the live nodes, and a
+    contract is only claimed by its node on the ring once the former owner released it or left the cluster, so every
+    contract is proved by exactly one node.
+    """
+
+    def __init__(self, membership_path, node_id, node_url, heartbeat_timeout, virtual_nodes, clock=time.time):
+        """
+        Init the ClusterMembership.
+        Args:
+            membership_path: string, the shared membership file path.
+            node_id: string, the unique id of this node.
+            node_url: string, the url of the executor service of this node, used to route the requests.
+            heartbeat_timeout: float, the node is considered left if its heartbeat is older than this seconds.
+            virtual_nodes: int, the number of points of every node on the consistent hash ring.
+            clock: function, returns the current unix time in seconds.
+        """
+        self.membership_path = membership_path
+        self.node_id = node_id
+        self.node_url = node_url
+        self.__heartbeat_timeout = heartbeat_timeout
+        self.__virtual_nodes = virtual_nodes
+        self.__clock = clock
+        # flock is held per open file, so the threads of this process are serialized by the lock first.
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def _locked_state(self, write=True):
+        """
+        Load the shared state under the file lock, and write it back when the block exits if write is True.
+        Args:
+            write: boolean, whether the state is modified.
+
+        Returns:
+            dictionary, {'nodes': {node id: node info}, 'contracts': {contract address: contract entry}}.
+
+        """
+        with self.__lock, open(self.membership_path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if write else fcntl.LOCK_SH)
+            try:
+                f.seek(0)
+                content = f.read()
+                state = json.loads(content) if content else {}
+                state.setdefault('nodes', {})
+                state.setdefault('contracts', {})
+                yield state
+                if write:
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f, indent=2, sort_keys=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _get_live_nodes(self, state):
+        """
+        Get the nodes whose heartbeat is not expired yet.
+        Args:
+            state: dictionary, the shared state.
+
+        Returns:
+            set of string, the live node ids.
+
+        """
+        expiry = self.__clock() - self.__heartbeat_timeout
+        return {node_id for node_id, node in state['nodes'].items() if node['heartbeat'] >= expiry}
+
+    def _build_ring(self, state):
+        """
+        Build the consistent hash ring of the live nodes.
+        Args:
+            state: dictionary, the shared state.
+
+        Returns:
+            HashRing.
+
+        """
+        return HashRing(sorted(self._get_live_nodes(state)), self.__virtual_nodes)
+
+    def heartbeat(self):
+        """
+        Join the cluster or refresh the heartbeat of this node.
+
+        """
+        with self._locked_state() as state:
+            state['nodes'][self.node_id] = {'url': self.node_url, 'heartbeat': self.__clock()}
+
+    def leave(self):
+        """
+        Leave the cluster and release all the contracts claimed by this node, so that the other nodes take them
+        over immediately.
+
+        """
+        with self._locked_state() as state:
+            state['nodes'].pop(self.node_id, None)
+            for entry in state['contracts'].values():
+                if entry['owner'] == self.node_id:
+                    entry['owner'] = None
+
+    def register_contract(self, contract_address, contract_info):
+        """
+        Add the contract into the registry of the cluster. The heartbeat of this node is refreshed as well, since it
+        is alive to handle the registration.
+        Args:
+            contract_address: string, contract address.
+            contract_info: dictionary, the contract info given at the registration.
+
+        Returns:
+            (node id, node url) of the node the contract is assigned to, or (None, None) if no node is live.
+
+        """
+        with self._locked_state() as state:
+            state['nodes'][self.node_id] = {'url': self.node_url, 'heartbeat': self.__clock()}
+            if contract_address not in state['contracts']:
+                state['contracts'][contract_address] = {'contract_info': contract_info, 'owner': None}
+            return self._get_assigned_node(state, contract_address)
+
+    def unregister_contract(self, contract_address):
+        """
+        Remove the contract from the registry of the cluster.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            (node id, node url) of the node which claimed the contract, or (None, None) if it is not claimed.
+
+        """
+        with self._locked_state() as state:
+            entry = state['contracts'].pop(contract_address, None)
+            if entry is None or entry['owner'] is None:
+                return None, None
+            node = state['nodes'].get(entry['owner'])
+            return entry['owner'], node['url'] if node else None
+
+    def get_owner(self, contract_address):
+        """
+        Get the node the contract is assigned to.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            (node id, node url), or (None, None) if no node is live.
+
+        """
+        with self._locked_state(write=False) as state:
+            return self._get_assigned_node(state, contract_address)
+
+    def is_owner(self, contract_address):
+        """
+        Check whether the contract is assigned to this node, e.g. before submitting a proof of the contract, since the
+        contract may have been taken over by another node since its execution started.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            Boolean.
+
+        """
+        return self.get_owner(contract_address)[0] == self.node_id
+
+    def _get_assigned_node(self, state, contract_address):
+        """
+        Get the node the contract is assigned to: the node which claimed it, or its node on the hash ring.
+        Args:
+            state: dictionary, the shared state.
+            contract_address: string, contract address.
+
+        Returns:
+            (node id, node url), or (None, None) if no node is live.
+
+        """
+        entry = state['contracts'].get(contract_address)
+        live_nodes = self._get_live_nodes(state)
+        if entry is not None and entry['owner'] in live_nodes:
+            node_id = entry['owner']
+        else:
+            node_id = self._build_ring(state).get_node(contract_address)
+        if node_id is None:
+            return None, None
+        return node_id, state['nodes'][node_id]['url']
+
+    def rebalance(self):
+        """
+        Refresh the heartbeat of this node and claim the unclaimed contracts which the hash ring assigns to it,
+        including the contracts claimed by the nodes which left.
+
+        Returns:
+            dictionary {contract address: contract info} of the contracts claimed by this node, and the list of the
+            claimed contract addresses which the ring assigns to another node now. They should be stopped locally,
+            then passed to release_contracts for the new owner to claim.
+
+        """
+        with self._locked_state() as state:
+            state['nodes'][self.node_id] = {'url': self.node_url, 'heartbeat': self.__clock()}
+            live_nodes = self._get_live_nodes(state)
+            ring = self._build_ring(state)
+            claimed = {}
+            handoff = []
+            for contract_address, entry in state['contracts'].items():
+                assigned_node = ring.get_node(contract_address)
+                if entry['owner'] != self.node_id and assigned_node == self.node_id and \
+                        entry['owner'] not in live_nodes:
+                    entry['owner'] = self.node_id
+                if entry['owner'] == self.node_id:
+                    claimed[contract_address] = entry['contract_info']
+                    if assigned_node != self.node_id:
+                        handoff.append(contract_address)
+            return claimed, handoff
+
+    def release_contracts(self, contract_addresses):
+        """
+        Release the contracts claimed by this node, so that their new owner can claim them.
+        Args:
+            contract_addresses: list of string, the contract addresses.
+
+        """
+        with self._locked_state() as state:
+            for contract_address in contract_addresses:
+                entry = state['contracts'].get(contract_address)
+                if entry is not None and entry['owner'] == self.node_id:
+                    entry['owner'] = None
@@ -0,0 +1,92 @@
+import bisect
+import hashlib
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping the contract addresses to the executor nodes. Every node is placed on the ring with
+    several virtual nodes, so that adding or removing a node only moves the contracts between it and its neighbours.
+    """
+
+    def __init__(self, nodes=(), virtual_nodes=64):
+        """
+        Init the HashRing.
+        Args:
+            nodes: iterable of string, the node ids.
+            virtual_nodes: int, the number of points of every node on the ring.
+        """
+        assert virtual_nodes > 0
+        self.__virtual_nodes = virtual_nodes
+        self.__nodes = set()
+        self.__points = []
+        self.__point_nodes = []
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key):
+        """
+        Hash the key onto the ring.
+        Args:
+            key: string.
+
+        Returns:
+            int, the position on the ring.
+
+        """
+        return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big')
+
+    def add_node(self, node):
+        """
+        Add the node onto the ring.
+        Args:
+            node: string, the node id.
+
+        """
+        if node in self.__nodes:
+            return
+        self.__nodes.add(node)
+        for index in range(self.__virtual_nodes):
+            point = self._hash(node + '#' + str(index))
+            position = bisect.bisect(self.__points, point)
+            self.__points.insert(position, point)
+            self.__point_nodes.insert(position, node)
+
+    def remove_node(self, node):
+        """
+        Remove the node from the ring.
+        Args:
+            node: string, the node id.
+
+        """
+        if node not in self.__nodes:
+            return
+        self.__nodes.discard(node)
+        kept = [(point, point_node) for point, point_node in zip(self.__points, self.__point_nodes)
+                if point_node != node]
+        self.__points = [point for point, _ in kept]
+        self.__point_nodes = [point_node for _, point_node in kept]
+
+    def get_nodes(self):
+        """
+        Get the nodes on the ring.
+        Returns:
+            set of string, the node ids.
+
+        """
+        return set(self.__nodes)
+
+    def get_node(self, key):
+        """
+        Get the node owning the key, i.e. the first node clockwise from the hash of the key.
+        Args:
+            key: string, e.g. the contract address.
+
+        Returns:
+            string, the node id, or None if the ring is empty.
+
+        """
+        if not self.__points:
+            return None
+        position = bisect.bisect(self.__points, self._hash(key.lower())) % len(self.__points)
+        return self.__point_nodes[position]
@@ -5,6 +5,15 @@ class EthInterfaceConstants:
     DEFAULT_CALL_GAS = 6000000
     DEFAULT_CALL_GAS_PRICE = 1
     VERIFY_AND_SETTLE_GAS = 6000000
+    # The broadcast errors of the transactions whose nonce is behind the chain, they are resent with a synced nonce.
+    NONCE_ERRORS = ['nonce too low', 'replacement transaction underpriced']
+    # The broadcast errors of the transactions already in the node's pool, they must not be sent again.
+    KNOWN_TRANSACTION_ERRORS = ['already known', 'known transaction']
+    NONCE_SEND_ATTEMPTS = 2
+    # The getters of the contract metadata read when a contract is registered.
+    ARTIFACT_PATH_FUNCTIONS = ['getAbiPath', 'getProvingKeyPath', 'getVariablesPath', 'getCodePath']
+    ARTIFACT_HASH_FUNCTIONS = ['getAbiSha2', 'getProvingKeySha2', 'getVariablesSha2', 'getCodeSha2']
+    METADATA_FUNCTIONS = ['getSingleExecutionCommitmentSize'] + ARTIFACT_PATH_FUNCTIONS + ARTIFACT_HASH_FUNCTIONS
 
     DEFAULT_ABI = [
         {'constant': True, 'inputs': [], 'name': 'getProvingKeyPath', 'outputs': [{'name': '', 'type': 'string'}],
@@ -7,3 +7,73 @@ class ExecutorConstants:
     COMMITMENT_HASH_SIZE = 1
 
     ENCRYPTED_DATA_SIZE = ENCRYPTED_USER_INPUT_SIZE + ENCRYPTED_USER_RANDOM_SIZE + COMMITMENT_HASH_SIZE
+
+    # Admission control of the worker pool.
+    DEFAULT_MAX_CONCURRENT_EXECUTIONS = 2
+    DEFAULT_MAX_QUEUED_EXECUTIONS = 1000
+
+    # Main loop of the executor.
+    DEFAULT_EVENT_QUEUE_SIZE = 1000
+    DEFAULT_EXECUTION_QUEUE_SIZE = 1000
+    # The longest time in seconds the main loop sleeps without any queue item, just to check whether it should exit.
+    DEFAULT_IDLE_TIMEOUT = 5
+
+    # Execution scheduler.
+    # The average seconds between two blocks, used to convert the deadline in blocks of contracts into seconds.
+    DEFAULT_BLOCK_INTERVAL = 15
+    # The executions whose deadline is within this number of seconds are dispatched before all the others.
+    DEFAULT_DEADLINE_URGENCY_WINDOW = 120
+
+    # Cluster mode.
+    # The number of points of every node on the consistent hash ring.
+    DEFAULT_CLUSTER_VIRTUAL_NODES = 64
+    # The seconds between two heartbeats of a node into the membership file.
+    DEFAULT_CLUSTER_HEARTBEAT_INTERVAL = 5
+    # A node is considered left if its last heartbeat is older than this number of seconds.
+    DEFAULT_CLUSTER_HEARTBEAT_TIMEOUT = 20
+
+    # Metrics.
+    # The window in seconds over which the proof rate is computed.
+    PROOF_RATE_WINDOW = 60
+
+    # Admission control.
+    # The memory in MB kept free on top of the peak RSS of the circuit of a new execution.
+    DEFAULT_ADMISSION_MIN_FREE_MEMORY = 512
+    # The new executions are held while the 1-minute load average per CPU is above it, 0 disables the check.
+    DEFAULT_ADMISSION_MAX_LOAD_PER_CPU = 2.0
+    # The free disk in MB kept under the working path.
+    DEFAULT_ADMISSION_MIN_FREE_DISK = 1024
+    # The peak RSS of a circuit is estimated as this factor times the proving key size until it is measured.
+    DEFAULT_ADMISSION_MEMORY_FACTOR = 3.0
+    # The seconds the memory of an admitted execution is reserved, until the prover has loaded the proving key.
+    ADMISSION_RESERVATION_WINDOW = 30
+
+    # ZoKrates commands.
+    # The seconds after which compute-witness is killed, 0 means no limit.
+    DEFAULT_WITNESS_TIMEOUT = 600
+    # The seconds after which generate-proof is killed, 0 means no limit.
+    DEFAULT_PROOF_TIMEOUT = 3600
+
+    # Scratch workspaces.
+    # The scratch capacity in MB the workspaces may reserve.
+    DEFAULT_SCRATCH_CAPACITY = 1024
+    # The MB reserved by the workspace of a circuit until an execution of it has measured the bytes it writes.
+    DEFAULT_SCRATCH_ESTIMATE = 64
+
+    # Chain clients.
+    # The maximum number of HTTP connections to the chain node.
+    DEFAULT_CHAIN_POOL_SIZE = 10
+    # The seconds between the checks of the latest block by the receipt tracker.
+    DEFAULT_RECEIPT_POLL_INTERVAL = 1.0
+    # The seconds a submitted transaction may take to be mined, as the default timeout of waitForTransactionReceipt.
+    DEFAULT_RECEIPT_TIMEOUT = 120
+    # The maximum number of VerifyAndSettle events buffered until a worker waits for them.
+    DEFAULT_SETTLEMENT_BUFFER_SIZE = 1000
+
+    # Decryption.
+    # The number of values decrypted by a decryption process at once.
+    DEFAULT_DECRYPTION_BATCH_SIZE = 16
+
+    # Proof cache.
+    # The MB of the proof cache on the disk.
+    DEFAULT_PROOF_CACHE_CAPACITY = 1024
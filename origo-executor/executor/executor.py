@@ -1,46 +1,23 @@
 import threading
 import time
 
+from collections import deque
 from abc import abstractmethod, abstractstaticmethod
+from executor.chain_interface.chain_client_pool import ChainClientPool
+from executor.cluster.cluster_coordinator import ClusterCoordinator
 from executor.constants.executor_constants import ExecutorConstants
+from executor.journal.execution_journal import ExecutionJournal
 from executor.listener.event_listener_status import EventListenerStatus
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.metrics.latency_recorder import LatencyRecorder
+from executor.scheduler.admission_controller import AdmissionController, AdmissionState
+from executor.scheduler.execution_scheduler import ExecutionScheduler
+from executor.status.task_status_store import TaskStatus, TaskStatusStore
 from executor.worker.execution_result import ExecutionResult
+from executor.worker.decryptor.decryption_service import DecryptionService
+from executor.worker.stage_runner import StageRunner
 from executor.utils.log_utils import LogUtils
-from gevent.lock import Semaphore
-from queue import Queue
-
-
-class TaskStatus:
-    """
-    The task status maintained by the executor.
-    """
-    REGISTERING, FAILED_TO_REGISTER, LISTENING, EXECUTING, FINISHED, UNREGISTERING, UNREGISTERED = range(7)
-
-    @staticmethod
-    def get_status_info(status):
-        """
-        Get the status info string.
-        Args:
-            status: TaskStatus.
-
-        Returns:
-            string, the status description string.
-
-        """
-        if status == TaskStatus.REGISTERING:
-            return "REGISTERING"
-        elif status == TaskStatus.LISTENING:
-            return "LISTENING"
-        elif status == TaskStatus.EXECUTING:
-            return "EXECUTING"
-        elif status == TaskStatus.FINISHED:
-            return "FINISHED"
-        elif status == TaskStatus.UNREGISTERING:
-            return "UNREGISTERING"
-        elif status == TaskStatus.UNREGISTERED:
-            return "UNREGISTERED"
-        elif status == TaskStatus.FAILED_TO_REGISTER:
-            return "FAILED_TO_REGISTER"
+from executor.utils.notifying_queue import NotifyingQueue
 
 
 class Executor(threading.Thread):
@@ -67,81 +44,169 @@ class Executor(threading.Thread):
 
         # List of registered contracts.
         self.registered_contracts = {}
-        # The latest execution id for the register contract.
-        self.registered_contracts_execution_count = {}
-        self.registered_contract_verification_failed_result_count = {}
-        self.registered_contract_verification_result_count = {}
         # The pool of the execution worker threads.
         self.worker_pool = {}
         # The pool of the listener threads.
         self.listener_pool = {}
-        self.execution_queue = Queue()
-        self.event_queue = Queue()
-        self.submit_lock = Semaphore()
-
-        # The map of the status information for all the workers
-        self.__task_status = {}
+        # Both queues notify the wakeup event, so the main loop wakes up as soon as any of them receives an item.
+        # The queues are bounded: the listeners and workers block on putting into a full queue until the main loop
+        # catches up.
+        self.__wakeup_event = threading.Event()
+        self.__idle_timeout = options.get('idle_timeout', ExecutorConstants.DEFAULT_IDLE_TIMEOUT)
+        self.execution_queue = NotifyingQueue(self.__wakeup_event, options.get(
+            'execution_queue_size', ExecutorConstants.DEFAULT_EXECUTION_QUEUE_SIZE))
+        self.event_queue = NotifyingQueue(self.__wakeup_event, options.get(
+            'event_queue_size', ExecutorConstants.DEFAULT_EVENT_QUEUE_SIZE))
+
+        # Admission control: at most max_concurrent_executions workers run at the same time, the other executions
+        # wait in the scheduler (up to max_queued_executions) until a worker slot is freed.
+        self.max_concurrent_executions = options.get('max_concurrent_executions',
+                                                     ExecutorConstants.DEFAULT_MAX_CONCURRENT_EXECUTIONS)
+        self.max_queued_executions = options.get('max_queued_executions',
+                                                 ExecutorConstants.DEFAULT_MAX_QUEUED_EXECUTIONS)
+        assert self.max_concurrent_executions > 0
+        self.block_interval = options.get('block_interval', ExecutorConstants.DEFAULT_BLOCK_INTERVAL)
+        self.scheduler = ExecutionScheduler(self.max_queued_executions, options.get(
+            'deadline_urgency_window', ExecutorConstants.DEFAULT_DEADLINE_URGENCY_WINDOW))
+        # Load-aware admission: the queued executions are held while the host resources would be exceeded.
+        self.admission = None
+        if options.get('admission_control', True):
+            self.admission = AdmissionController(options)
+        # The chain clients shared by all the listeners and the workers.
+        self.chain_clients = ChainClientPool(options.get('chain_pool_size', ExecutorConstants.DEFAULT_CHAIN_POOL_SIZE))
+        # The runner of the CPU-bound stages shared by all the workers.
+        self.stage_runner = StageRunner.create(options)
+        # The decryption shared by all the workers, loading the key once for the executor process and its pool.
+        self.decryption_service = None
+        if options.get('encryption_info'):
+            self.decryption_service = DecryptionService(
+                options['encryption_info'], options.get('decryption_pool_size', 0),
+                options.get('decryption_batch_size', ExecutorConstants.DEFAULT_DECRYPTION_BATCH_SIZE))
+        # The journal of the registered contracts and the execution stages, disabled if journal_path is not given.
+        self.journal = None
+        if options.get('journal_path'):
+            self.journal = ExecutionJournal(options['journal_path'])
+        # The latency of the execution stages, aggregated over all the workers.
+        self.latency_recorder = LatencyRecorder(enabled=options.get('latency_metrics', True))
+        self.metrics = ExecutorMetrics.get_registry()
+        # The time.monotonic() times of the proofs settled within the proof rate window.
+        self.__settled_proof_times = deque()
+        # In cluster mode, the contracts registered in this executor are the ones the cluster assigns to this node.
+        self.cluster = None
+        if options.get('cluster_membership_path'):
+            self.cluster = ClusterCoordinator(self, options)
+
+        # The status information for all the contracts and their executions.
+        self.task_status = TaskStatusStore()
 
     def update_worker_status(self, contract_address, status, info=None):
         if status == TaskStatus.REGISTERING:
-            if contract_address in self.__task_status and \
-                    self.__task_status[contract_address]['status'] != TaskStatus.UNREGISTERED:
+            if not self.task_status.register(contract_address):
                 LogUtils.error(
                     "Cannot register again registered contract@" + contract_address)
-                return
-        else:
-            if contract_address not in self.__task_status:
-                LogUtils.error(
-                    "Cannot update status:" + TaskStatus.get_status_info(status) + " for not registered contract"
-                    + '@' + contract_address)
-                return
-
-        if status == TaskStatus.REGISTERING:
-            self.__task_status[contract_address] = {'status': status, 'finished_task': 0, 'successful_task': 0,
-                                                    'progress': 0.0, 'failed_tasks': {}, 'info': ''}
-        elif status == TaskStatus.LISTENING:
-            self.__task_status[contract_address]['status'] = status
-        elif status == TaskStatus.EXECUTING:
-            assert self.__task_status[contract_address]['status'] in {TaskStatus.LISTENING, TaskStatus.EXECUTING}
-            self.__task_status[contract_address]['status'] = status
-            progress = \
-                1.0 * self.registered_contract_verification_result_count[contract_address] / \
-                self.registered_contracts_execution_count[contract_address]
-            self.__task_status[contract_address]['progress'] = progress
-            for failed_execution_id, info in \
-                    self.registered_contract_verification_failed_result_count[contract_address].items():
-                if failed_execution_id not in self.__task_status[contract_address]['failed_tasks']:
-                    self.__task_status[contract_address]['failed_tasks'][failed_execution_id] = info
+            return
+        if contract_address not in self.task_status:
+            LogUtils.error(
+                "Cannot update status:" + TaskStatus.get_status_info(status) + " for not registered contract"
+                + '@' + contract_address)
+            return
+
+        if status == TaskStatus.EXECUTING:
+            assert self.task_status.get(contract_address).status in {TaskStatus.LISTENING, TaskStatus.EXECUTING}
+            self.task_status.set_status(contract_address, status)
         elif status == TaskStatus.FINISHED:
-            self.__task_status[contract_address]['finished_task'] += 1
-            if not self.registered_contract_verification_failed_result_count[contract_address]:
-                self.__task_status[contract_address]['successful_task'] += 1
-            self.__task_status[contract_address]['progress'] = 0.0
-            if contract_address in self.listener_pool and not self.listener_pool[contract_address].ready():
-                # Go back to listening status if listener is still up after task is finished. but set the finished task
-                # count incrementally.
-                self.__task_status[contract_address]['status'] = TaskStatus.LISTENING
-            else:
-                self.__task_status[contract_address]['status'] = status
-        elif status == TaskStatus.UNREGISTERING:
-            self.__task_status[contract_address]['status'] = status
-        elif status == TaskStatus.UNREGISTERED:
-            self.__task_status[contract_address]['status'] = status
+            # Go back to listening status if listener is still up after task is finished. but set the finished task
+            # count incrementally.
+            still_listening = contract_address in self.listener_pool and \
+                not self.listener_pool[contract_address].ready()
+            self.task_status.finish_executions(contract_address, still_listening)
+        elif status in {TaskStatus.LISTENING, TaskStatus.UNREGISTERING, TaskStatus.UNREGISTERED}:
+            self.task_status.set_status(contract_address, status)
         elif status == TaskStatus.FAILED_TO_REGISTER:
-            self.__task_status[contract_address]['status'] = status
+            self.task_status.set_status(contract_address, status)
             if info is not None:
-                self.__task_status[contract_address]['info'] += (info + '; ')
+                self.task_status.add_info(contract_address, info)
         else:
             raise Exception("Unknown TaskStatus:" + str(status))
 
     def get_all_task_status(self):
         """
-        Get the html element for task status.
+        Get a snapshot of the status of all the tasks, including the scheduler queue state of each contract.
+        Returns:
+            dictionary, {contract address: task status dictionary}.
+
+        """
+        snapshots = self.task_status.get_all_snapshots()
+        for contract_address, task_status in snapshots.items():
+            task_status['scheduler'] = self.scheduler.get_queue_state(contract_address)
+        return snapshots
+
+    def get_latency_stats(self, contract_address=None):
+        """
+        Get the latency summary of the execution stages.
+        Args:
+            contract_address: string, the contract address, or None for all the contracts.
+
+        Returns:
+            dictionary, {stage: {'count', 'p50', 'p95', 'p99', 'max'}}, the latencies in seconds.
+
+        """
+        return self.latency_recorder.get_stage_stats(contract_address)
+
+    def collect_metrics(self):
+        """
+        Update the gauges of the metrics with the current state of the executor.
+        Returns:
+            MetricsRegistry, the registry with all the executor metrics.
+
+        """
+        self.metrics.set_gauge(ExecutorMetrics.QUEUE_DEPTH, self.event_queue.qsize(), {'queue': 'event'})
+        self.metrics.set_gauge(ExecutorMetrics.QUEUE_DEPTH, self.execution_queue.qsize(), {'queue': 'execution'})
+        self.metrics.set_gauge(ExecutorMetrics.QUEUE_DEPTH, self.get_queued_execution_count(), {'queue': 'scheduler'})
+        self.metrics.set_gauge(ExecutorMetrics.WORKERS, self.get_active_worker_count(), {'state': 'active'})
+        self.metrics.set_gauge(ExecutorMetrics.WORKERS, self.get_queued_execution_count(), {'state': 'queued'})
+        self._expire_settled_proof_times()
+        self.metrics.set_gauge(ExecutorMetrics.PROOFS_PER_SECOND,
+                               len(self.__settled_proof_times) / ExecutorConstants.PROOF_RATE_WINDOW)
+        if self.admission is not None:
+            self.metrics.set_gauge(ExecutorMetrics.ADMISSION_HELD, int(self.admission.state == AdmissionState.HELD))
+            self.metrics.set_gauge(ExecutorMetrics.ADMISSION_HELD_TOTAL, self.admission.held_count)
+        for stage, (count, total, bucket_counts) in self.latency_recorder.get_stage_histograms().items():
+            self.metrics.set_histogram(ExecutorMetrics.STAGE_LATENCY, count, total, bucket_counts, {'stage': stage})
+        return self.metrics
+
+    def get_backpressure_state(self):
+        """
+        Get the backpressure state of the admission control.
+        Returns:
+            dictionary, {'state', 'reason', 'held_count'}, see AdmissionController.get_backpressure_state.
+
+        """
+        if self.admission is None:
+            return {'state': AdmissionState.STATE_EXPLANATION[AdmissionState.OPEN], 'reason': '', 'held_count': 0}
+        return self.admission.get_backpressure_state()
+
+    def _expire_settled_proof_times(self):
+        """
+        Drop the settled proof times out of the proof rate window.
+
+        """
+        window_start = time.monotonic() - ExecutorConstants.PROOF_RATE_WINDOW
+        while self.__settled_proof_times and self.__settled_proof_times[0] < window_start:
+            self.__settled_proof_times.popleft()
+
+    def get_execution_latency(self, contract_address, execution_id):
+        """
+        Get the latency of every stage of a recent execution.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+
         Returns:
-            string, the html element for task status.
+            dictionary, {stage: seconds}.
 
         """
-        return self.__task_status
+        return self.latency_recorder.get_execution_spans(contract_address, execution_id)
 
     @abstractstaticmethod
     def check_options(options):
@@ -160,6 +225,9 @@ class Executor(threading.Thread):
             contract_info: dictionary, the necessary contract info, may include (but not limited to)
                 * contract code location to get
                 * proving key location to get
+                * priority: the weight of the contract when scheduling executions of several contracts
+                * deadline_blocks: the number of blocks the settlement must land within after the commitment opening
+                * prover_backend: the prover computing the witness and generating the proof of the contract
 
         Returns:
             Boolean, if registration succeeded, return True, otherwise return False.
@@ -167,12 +235,14 @@ class Executor(threading.Thread):
         if contract_address in self.registered_contracts.keys():
             return False
         self.registered_contracts[contract_address] = contract_info
-        self.registered_contracts_execution_count[contract_address] = 0
-        self.registered_contract_verification_result_count[contract_address] = 0
-        self.registered_contract_verification_failed_result_count[contract_address] = {}
+        if 'priority' in contract_info:
+            self.scheduler.set_contract_weight(contract_address, contract_info['priority'])
+        if self.journal is not None:
+            self.journal.record_registration(contract_address, contract_info)
         self.update_worker_status(contract_address, TaskStatus.REGISTERING)
         listener_config = {'contract_address': contract_address, 'poll_interval': self.options['poll_interval'],
                            'chain_config': self.options['chain_config'],
+                           'chain_client_pool': self.chain_clients,
                            'proving_key_path': self.options['proving_key_path'],
                            'code_path': self.options['code_path'],
                            'abi_path': self.options['abi_path'],
@@ -185,6 +255,20 @@ class Executor(threading.Thread):
         listener.start()
         return True
 
+    def resume_registered_contracts(self):
+        """
+        Register again the contracts recorded in the journal before the restart. Their executions resume from the
+        stages recorded in the journal once the commitments are opened again. In cluster mode, the contracts are
+        registered by the cluster instead.
+
+        """
+        if self.journal is None or self.cluster is not None:
+            return
+        for contract_address, contract_info in self.journal.get_registered_contracts().items():
+            if contract_address not in self.registered_contracts:
+                LogUtils.info("Resume the registered contract@" + contract_address + " from the journal")
+                self.register_contract(contract_address, contract_info)
+
     def update_contract_info(self, contract_address, key, value):
         """
         Update the contract info for target contract address.
@@ -222,6 +306,13 @@ class Executor(threading.Thread):
         """
         pass
 
+    def shutdown_clean_up(self):
+        """
+        Release the resources held by the executor after the main loop exits.
+
+        """
+        pass
+
     def unregister_contract(self, contract_address):
         """
         Unregister the contract which is already registered with this Executor.
@@ -240,14 +331,18 @@ class Executor(threading.Thread):
             self.listener_pool[contract_address].stop()
         self.listener_pool[contract_address].join()
         del self.listener_pool[contract_address]
+        # Drop the executions still waiting for a worker slot.
+        self.scheduler.remove_contract(contract_address)
         # Stop progressing workers if any
         if contract_address in self.worker_pool:
             self._clean_worker_pool(contract_address)
         del self.registered_contracts[contract_address]
-        del self.registered_contracts_execution_count[contract_address]
-        del self.registered_contract_verification_result_count[contract_address]
-        del self.registered_contract_verification_failed_result_count[contract_address]
         self.unregister_clean_up(contract_address)
+        self.latency_recorder.remove_contract(contract_address)
+        if self.admission is not None:
+            self.admission.remove_contract(contract_address)
+        if self.journal is not None:
+            self.journal.record_unregistration(contract_address)
         self.update_worker_status(contract_address, TaskStatus.UNREGISTERED)
         if self.debug:
             LogUtils.info('Unregister contract@' + contract_address + ' succeeds')
@@ -315,7 +410,8 @@ class Executor(threading.Thread):
         """
         if contract_address not in self.worker_pool.keys():
             self.worker_pool[contract_address] = {}
-        if execution_id not in self.worker_pool[contract_address] or self.worker_pool[contract_address].ready():
+        if execution_id not in self.worker_pool[contract_address] or \
+                self.worker_pool[contract_address][execution_id].ready():
             worker_thread = self.create_worker(contract_address, execution_id, commitments, self.execution_queue)
             self.worker_pool[contract_address][execution_id] = worker_thread
             worker_thread.start()
@@ -326,6 +422,90 @@ class Executor(threading.Thread):
             LogUtils.error("Cannot create more than one worker for the same contract and same execution id at the same"
                            "time.")
 
+    def get_active_worker_count(self):
+        """
+        Get the number of the workers which are still running.
+        Returns:
+            int, the number of running workers.
+
+        """
+        active_worker_count = 0
+        for workers in self.worker_pool.values():
+            for worker in workers.values():
+                if not worker.ready():
+                    active_worker_count += 1
+        return active_worker_count
+
+    def is_contract_executing(self, contract_address):
+        """
+        Check whether the contract has any execution running or waiting for a worker slot.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            Boolean.
+
+        """
+        record = self.task_status.get(contract_address)
+        return record is not None and record.status == TaskStatus.EXECUTING
+
+    def get_queued_execution_count(self):
+        """
+        Get the number of the executions waiting for a free worker slot.
+        Returns:
+            int, the number of queued executions.
+
+        """
+        return len(self.scheduler)
+
+    def enqueue_execution(self, contract_address, execution_id, commitments, deadline=None):
+        """
+        Queue the execution until a worker slot is available.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            commitments: commitments released by the given contract.
+            deadline: float, the time.monotonic() time the execution should be dispatched before, or None.
+
+        Returns:
+            Boolean, return True if the execution is queued, or False if the queue is already full.
+
+        """
+        return self.scheduler.push(contract_address, execution_id, commitments, deadline)
+
+    def dispatch_pending_executions(self):
+        """
+        Dispatch the queued executions in the scheduler order as long as there are free worker slots and the admission
+        control lets them start.
+
+        """
+        active_worker_count = self.get_active_worker_count()
+        while active_worker_count < self.max_concurrent_executions:
+            execution = self.scheduler.peek()
+            if execution is None:
+                break
+            if self.admission is not None and \
+                    not self.admission.admit(execution.contract_address, active_worker_count):
+                break
+            execution = self.scheduler.pop()
+            self.dispatch_worker(execution.contract_address, execution.execution_id, execution.commitments)
+            active_worker_count += 1
+
+    def _get_execution_deadline(self, contract_address):
+        """
+        Get the deadline of the executions of the contract opened just now.
+        Args:
+            contract_address: string, contract address or id.
+
+        Returns:
+            float, the time.monotonic() time of the deadline, or None if the contract has no deadline.
+
+        """
+        contract_info = self.registered_contracts.get(contract_address, {})
+        if contract_info.get('deadline_blocks') is None:
+            return None
+        return time.monotonic() + contract_info['deadline_blocks'] * self.block_interval
+
     def _get_single_execution_commitment_size(self, contract_address):
         """
         Get the required number of commitments for a single execution of the target contract.
@@ -342,88 +522,132 @@ class Executor(threading.Thread):
                 return contract_info['single_execution_commitment_size']
         return None
 
+    def handle_listener_event(self, contract_address, commitments, status, debug_msg):
+        """
+        Handle the setup status or the opened commitments received from the listener of the contract.
+        Args:
+            contract_address: string, contract address.
+            commitments: list, the commitments released by the contract or None.
+            status: EventListenerStatus or None.
+            debug_msg: string, the additional info of the event or None.
+
+        """
+        if status == EventListenerStatus.SETUP_SUCCEEDED:
+            if self.debug:
+                LogUtils.info("Status update for contract@" + contract_address + ": " +
+                              EventListenerStatus.STATUS_EXPLANATION[status])
+            self.update_worker_status(contract_address, TaskStatus.LISTENING)
+        elif status == EventListenerStatus.SETUP_FAILED:
+            if self.debug:
+                LogUtils.error(("Status update for contract@" + contract_address + ": " +
+                                EventListenerStatus.STATUS_EXPLANATION[status]))
+            self.update_worker_status(contract_address, TaskStatus.FAILED_TO_REGISTER, debug_msg)
+        elif commitments is not None:
+            if self.debug:
+                LogUtils.info("Received commitment with length [" + str(len(commitments)) + "] from contract@" +
+                              contract_address)
+            single_execution_commitment_size = self._get_single_execution_commitment_size(contract_address)
+            if self.debug:
+                LogUtils.info("single_execution_commitment_size for contract:" + contract_address +
+                              " is [" + str(single_execution_commitment_size) + "]")
+            if single_execution_commitment_size is None:
+                LogUtils.error("No single_execution_commitment_size found!")
+                self.update_worker_status(contract_address, TaskStatus.FINISHED)
+                return
+            single_execution_commitment_length = single_execution_commitment_size * \
+                ExecutorConstants.ENCRYPTED_DATA_SIZE
+            if len(commitments) % single_execution_commitment_length != 0:
+                LogUtils.error("Invalid commitment length, cannot be divided by single_execution_commitment size")
+                self.update_worker_status(contract_address, TaskStatus.FINISHED)
+                return
+            execution_num = int(len(commitments) / single_execution_commitment_length)
+            self.task_status.start_executions(contract_address, execution_num)
+            self.update_worker_status(contract_address, TaskStatus.EXECUTING)
+            deadline = self._get_execution_deadline(contract_address)
+            for execution_id in range(execution_num):
+                single_execution_commitments = \
+                    commitments[execution_id * single_execution_commitment_length:
+                                (execution_id + 1) * single_execution_commitment_length]
+                if self.debug:
+                    LogUtils.info("Queue commitment[" + str(single_execution_commitments) + "] from contract@" +
+                                  contract_address)
+                if not self.enqueue_execution(contract_address, execution_id, single_execution_commitments, deadline):
+                    LogUtils.error("Execution queue is full, rejected execution_id: " + str(execution_id) +
+                                   " of contract@" + contract_address)
+                    self.handle_execution_result(
+                        {'execution_result': ExecutionResult.QUEUE_FULL, 'contract_address': contract_address,
+                         'execution_id': execution_id, 'debug_msg': None})
+
     def run(self):
         """
         Listening on all the registered contracts' commitment opening event. If the event is triggered, then dispatch
         an ExecutorWorker thread to finish the proof.
 
+        The loop sleeps until either the event queue or the execution queue receives an item, then handles everything
+        already queued in both of them.
+
         """
+        self.resume_registered_contracts()
         while not self.should_exit:
-            if not self.event_queue.empty():
-                # Check the listener setup status first.
-                contract_address, commitments, status, debug_msg = self.handle_event_from_queue()
-                if status == EventListenerStatus.SETUP_SUCCEEDED:
-                    if self.debug:
-                        LogUtils.info("Status update for contract@" + contract_address + ": " +
-                                      EventListenerStatus.STATUS_EXPLANATION[status])
-                    self.update_worker_status(contract_address, TaskStatus.LISTENING)
-                elif status == EventListenerStatus.SETUP_FAILED:
-                    if self.debug:
-                        LogUtils.error(("Status update for contract@" + contract_address + ": " +
-                                        EventListenerStatus.STATUS_EXPLANATION[status]))
-                    self.update_worker_status(contract_address, TaskStatus.FAILED_TO_REGISTER, debug_msg)
-                elif commitments is not None:
-                    if self.debug:
-                        LogUtils.info("Received commitment with length [" + str(len(commitments)) + "] from contract@" +
-                                      contract_address)
-                    single_execution_commitment_size = self._get_single_execution_commitment_size(contract_address)
-                    if self.debug:
-                        LogUtils.info("single_execution_commitment_size for contract:" + contract_address +
-                                      " is [" + str(single_execution_commitment_size) + "]")
-                    if single_execution_commitment_size is None:
-                        LogUtils.error("No single_execution_commitment_size found!")
-                        self.update_worker_status(contract_address, TaskStatus.FINISHED)
-                    else:
-                        single_execution_commitment_length = single_execution_commitment_size * \
-                                                             ExecutorConstants.ENCRYPTED_DATA_SIZE
-                        if len(commitments) % single_execution_commitment_length != 0:
-                            LogUtils.error("Invalid commitment length, cannot be divided by single_execution_commitment"
-                                           " size")
-                            self.update_worker_status(contract_address, TaskStatus.FINISHED)
-                        else:
-                            execution_num = int(len(commitments) / single_execution_commitment_length)
-                            self.registered_contracts_execution_count[contract_address] = execution_num
-                            self.update_worker_status(contract_address, TaskStatus.EXECUTING)
-                            for execution_id in range(execution_num):
-                                single_execution_commitments = \
-                                    commitments[execution_id * single_execution_commitment_length:
-                                                (execution_id + 1) * single_execution_commitment_length]
-                                if self.debug:
-                                    LogUtils.info("Execute commitment[" + str(single_execution_commitments) +
-                                                  "] from contract@" + contract_address)
-                                self.dispatch_worker(contract_address, execution_id, single_execution_commitments)
-                                # Wait for 10 second before staring another worker thread for a new task to avoid too
-                                # heavy job.
-                                time.sleep(10)
+            # Follow the contract assignment of the cluster.
+            if self.cluster is not None:
+                self.cluster.tick()
+
+            self.__wakeup_event.wait(self.__idle_timeout)
+            self.__wakeup_event.clear()
+
+            # Check the listener events first, so the setup status is updated before the results.
+            while not self.event_queue.empty():
+                self.handle_listener_event(*self.handle_event_from_queue())
 
             # Check the result queue.
-            if not self.execution_queue.empty():
-                execution_result = self.execution_queue.get()
-                if self.debug:
-                    LogUtils.info('Received execution result' + str(execution_result))
-                contract_address = execution_result['contract_address']
-                self.registered_contract_verification_result_count[contract_address] += 1
-                # If there is any failed execution, need to count down.
-                if execution_result['execution_result'] != ExecutionResult.SUCCESS:
-                    execution_id = execution_result['execution_id']
-                    self.registered_contract_verification_failed_result_count[contract_address][execution_id] = \
-                        str(execution_result['execution_result'])
-                    if execution_result['debug_msg'] is not None:
-                        self.registered_contract_verification_failed_result_count[contract_address][execution_id] += \
-                            ' (' + execution_result['debug_msg'] + ')'
-                # always update the worker status with EXECUTING after received each execution id's result.
-                self.update_worker_status(contract_address, TaskStatus.EXECUTING)
-                if self.registered_contract_verification_result_count[contract_address] == \
-                   self.registered_contracts_execution_count[contract_address]:
-                    self.update_worker_status(contract_address, TaskStatus.FINISHED)
-                    # Once finished, cleanup all the execution counters.
-                    self.registered_contract_verification_result_count[contract_address] = 0
-                    self.registered_contract_verification_failed_result_count[contract_address].clear()
-                    self.registered_contracts_execution_count[contract_address] = 0
-                    if self.debug:
-                        LogUtils.info('Start to clean worker pool for @' + contract_address)
-                    self._clean_worker_pool(contract_address)
-            time.sleep(1)
+            while not self.execution_queue.empty():
+                self.handle_execution_result(self.execution_queue.get())
+
+            # Start the queued executions if any worker slot is freed.
+            self.dispatch_pending_executions()
+        if self.cluster is not None:
+            self.cluster.leave()
+        self.stage_runner.shutdown()
+        if self.decryption_service is not None:
+            self.decryption_service.shutdown()
+        self.shutdown_clean_up()
+        self.chain_clients.close()
+        if self.journal is not None:
+            self.journal.close()
+
+    def handle_execution_result(self, execution_result):
+        """
+        Update the execution counters and task status with the execution result of a single execution.
+        Args:
+            execution_result: dictionary, the execution result submitted by the worker.
+
+        """
+        if self.debug:
+            LogUtils.info('Received execution result' + str(execution_result))
+        contract_address = execution_result['contract_address']
+        if self.admission is not None and execution_result.get('peak_rss'):
+            # Admit the next executions of the circuit with its measured memory usage.
+            self.admission.record_peak_rss(contract_address, execution_result['peak_rss'])
+        self.metrics.increment(ExecutorMetrics.EXECUTIONS_TOTAL, 1, {
+            'result': ExecutionResult.RESULT_NAMES[execution_result['execution_result']]})
+        if execution_result['execution_result'] in (ExecutionResult.SUCCESS, ExecutionResult.FAIL):
+            # The proof is generated and the online verification is settled, whatever the verification result is.
+            self.metrics.increment(ExecutorMetrics.PROOFS_TOTAL)
+            self.__settled_proof_times.append(time.monotonic())
+            self._expire_settled_proof_times()
+        if contract_address not in self.registered_contracts:
+            # The contract is unregistered while the execution is running.
+            return
+        all_finished = self.task_status.record_result(contract_address, execution_result['execution_id'],
+                                                      execution_result['execution_result'],
+                                                      execution_result['debug_msg'])
+        if all_finished:
+            # The execution counters are reset once finished.
+            self.update_worker_status(contract_address, TaskStatus.FINISHED)
+            if self.debug:
+                LogUtils.info('Start to clean worker pool for @' + contract_address)
+            self._clean_worker_pool(contract_address)
 
     def _clean_worker_pool(self, contract_address):
         cleaned_worker_cnt = 0
@@ -446,6 +670,7 @@ class Executor(threading.Thread):
 
         """
         self.should_exit = True
+        self.__wakeup_event.set()
 
     def should_exit(self):
         return self.should_exit
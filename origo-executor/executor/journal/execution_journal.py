@@ -0,0 +1,188 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class ExecutionStage:
+    """
+    The stages of an execution recorded in the ExecutionJournal, in the order they are reached.
+    """
+    STARTED, PREPARED, PROVED, SUBMITTED, SETTLED = range(5)
+    STAGE_EXPLANATION = [
+        'execution started', 'witness computed', 'proof generated', 'proof submitted', 'verification settled'
+    ]
+
+
+class ExecutionJournal:
+    """
+    The write-ahead journal of the registered contracts and the stage transitions of their executions, stored in a
+    local SQLite database, so that the executor can resume after a restart from the last completed stage instead of
+    generating the proofs again.
+
+    The executions are identified by the contract address, the execution id and the digest of the commitments, so the
+    journal of an execution is never applied to another opening of the same contract. Only the latest opening of every
+    execution id is kept: the journal of the former opening is dropped once the execution is recorded for a new one, so
+    the journal of a long-lived contract does not grow with every opening.
+    """
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS contracts (contract_address TEXT PRIMARY KEY, contract_info TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS executions (contract_address TEXT NOT NULL, execution_id INTEGER NOT NULL, '
+        'commitments_digest TEXT NOT NULL, stage INTEGER NOT NULL, witness TEXT, output TEXT, proof TEXT, '
+        'tx_hash TEXT, result INTEGER, updated_at REAL NOT NULL, '
+        'PRIMARY KEY (contract_address, execution_id, commitments_digest))',
+        'CREATE TABLE IF NOT EXISTS stage_transitions (contract_address TEXT NOT NULL, execution_id INTEGER NOT NULL, '
+        'commitments_digest TEXT NOT NULL, stage INTEGER NOT NULL, recorded_at REAL NOT NULL)'
+    ]
+
+    def __init__(self, journal_path):
+        """
+        Init the ExecutionJournal.
+        Args:
+            journal_path: string, the path of the SQLite database file, created if it does not exist.
+        """
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(journal_path, check_same_thread=False)
+        # Every transition is committed before the execution goes on, WAL keeps these small commits cheap.
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        with self.__connection:
+            for statement in self.SCHEMA:
+                self.__connection.execute(statement)
+
+    @staticmethod
+    def digest_commitments(commitments):
+        """
+        Compute the digest identifying the commitments of an execution.
+        Args:
+            commitments: list of int, the commitments of the execution.
+
+        Returns:
+            string, the hex sha256 digest.
+
+        """
+        return hashlib.sha256(' '.join(str(commitment) for commitment in commitments).encode()).hexdigest()
+
+    def record_registration(self, contract_address, contract_info):
+        """
+        Record the registered contract.
+        Args:
+            contract_address: string, contract address.
+            contract_info: dictionary, the contract info given at the registration.
+
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute('INSERT OR REPLACE INTO contracts VALUES (?, ?)',
+                                      (contract_address, json.dumps(contract_info)))
+
+    def record_unregistration(self, contract_address):
+        """
+        Forget the unregistered contract and the journal of its executions.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute('DELETE FROM contracts WHERE contract_address = ?', (contract_address,))
+            self.__connection.execute('DELETE FROM executions WHERE contract_address = ?', (contract_address,))
+            self.__connection.execute('DELETE FROM stage_transitions WHERE contract_address = ?',
+                                      (contract_address,))
+
+    def get_registered_contracts(self):
+        """
+        Get the contracts registered before.
+        Returns:
+            dictionary, {contract address: contract info}.
+
+        """
+        with self.__lock:
+            rows = self.__connection.execute('SELECT contract_address, contract_info FROM contracts').fetchall()
+        return {contract_address: json.loads(contract_info) for contract_address, contract_info in rows}
+
+    def record_stage(self, contract_address, execution_id, commitments_digest, stage, witness=None, output=None,
+                     proof=None, tx_hash=None, result=None):
+        """
+        Record that the execution reached the stage, with the artifacts produced by the stage. The artifacts recorded
+        by the former stages are kept.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            commitments_digest: string, the digest of the commitments of the execution.
+            stage: ExecutionStage.
+            witness: string, the location of the computed witness.
+            output: list, the output of the execution.
+            proof: dictionary, the generated proof.
+            tx_hash: string, the hash of the transaction submitting the proof.
+            result: ExecutionResult, the settled result.
+
+        """
+        now = time.time()
+        key = (contract_address, execution_id, commitments_digest)
+        with self.__lock, self.__connection:
+            inserted = self.__connection.execute(
+                'INSERT OR IGNORE INTO executions (contract_address, execution_id, commitments_digest, stage, '
+                'updated_at) VALUES (?, ?, ?, ?, ?)', key + (stage, now)).rowcount
+            if inserted:
+                # The execution starts a new opening, the former openings are settled or given up.
+                for table in ['executions', 'stage_transitions']:
+                    self.__connection.execute(
+                        'DELETE FROM ' + table + ' WHERE contract_address = ? AND execution_id = ? AND '
+                        'commitments_digest != ?', key)
+            self.__connection.execute(
+                'UPDATE executions SET stage = ?, witness = COALESCE(?, witness), output = COALESCE(?, output), '
+                'proof = COALESCE(?, proof), tx_hash = COALESCE(?, tx_hash), result = COALESCE(?, result), '
+                'updated_at = ? WHERE contract_address = ? AND execution_id = ? AND commitments_digest = ?',
+                (stage, witness, None if output is None else json.dumps(output),
+                 None if proof is None else json.dumps(proof), tx_hash, result, now) + key)
+            self.__connection.execute('INSERT INTO stage_transitions VALUES (?, ?, ?, ?, ?)', key + (stage, now))
+
+    def get_execution(self, contract_address, execution_id, commitments_digest):
+        """
+        Get the last recorded stage and the artifacts of the execution.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            commitments_digest: string, the digest of the commitments of the execution.
+
+        Returns:
+            dictionary with keys stage, witness, output, proof, tx_hash and result, or None if the execution is not
+            recorded.
+
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT stage, witness, output, proof, tx_hash, result FROM executions WHERE contract_address = ? '
+                'AND execution_id = ? AND commitments_digest = ?',
+                (contract_address, execution_id, commitments_digest)).fetchone()
+        if row is None:
+            return None
+        stage, witness, output, proof, tx_hash, result = row
+        return {'stage': stage, 'witness': witness, 'output': None if output is None else json.loads(output),
+                'proof': None if proof is None else json.loads(proof), 'tx_hash': tx_hash, 'result': result}
+
+    def get_stage_transitions(self, contract_address, execution_id, commitments_digest):
+        """
+        Get the recorded stage transitions of the execution.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            commitments_digest: string, the digest of the commitments of the execution.
+
+        Returns:
+            list of (ExecutionStage, recorded unix time) in the recorded order.
+
+        """
+        with self.__lock:
+            return self.__connection.execute(
+                'SELECT stage, recorded_at FROM stage_transitions WHERE contract_address = ? AND execution_id = ? '
+                'AND commitments_digest = ? ORDER BY rowid',
+                (contract_address, execution_id, commitments_digest)).fetchall()
+
+    def close(self):
+        """
+        Close the journal database.
+
+        """
+        with self.__lock:
+            self.__connection.close()
@@ -1,4 +1,5 @@
 from executor.listener.event_listener import EventListener
+from executor.constants.eth_interface_constants import EthInterfaceConstants
 from executor.chain_interface.eth_localabi_interface import EthLocalABIInterface
 from executor.utils.log_utils import LogUtils
 from executor.zokrates_utils.zokrates_eth_file_downloader import ZokratesEthFileDownloader
@@ -31,6 +32,9 @@ class EthEventListener(EventListener):
             ChainInterface.
 
         """
+        chain_client_pool = self.config.get('chain_client_pool')
+        if chain_client_pool is not None:
+            return chain_client_pool.get_client(EthLocalABIInterface, chain_config)
         return EthLocalABIInterface(chain_config)
 
     def setup(self, executor):
@@ -40,8 +44,10 @@ class EthEventListener(EventListener):
             executor: the owner Executor.
 
         """
-        # Update the single commitment size info first.
-        secs = self.chain_interface.get_single_execution_commitment_size(self.contract_address)
+        # Read the single commitment size and the artifact paths and hashes in one round trip, then update the single
+        # commitment size info first.
+        metadata = self.chain_interface.batch_call(self.contract_address, EthInterfaceConstants.METADATA_FUNCTIONS)
+        secs = metadata['getSingleExecutionCommitmentSize']
         executor.update_contract_info(self.contract_address, 'single_execution_commitment_size', secs)
 
         # For current Zokrates based executor, we need to download the required files before listening started.
@@ -54,7 +60,7 @@ class EthEventListener(EventListener):
         if self.debug:
             LogUtils.info("Start to download required files")
         self.__downloader.download_required_files(self.contract_address, destination_paths,
-                                                  self.config['use_existing_data'])
+                                                  self.config['use_existing_data'], metadata)
         if self.debug:
             LogUtils.info("Start to compile required Zokrates code")
         assert 'zokrates_path' in self.config
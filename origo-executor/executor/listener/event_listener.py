@@ -30,11 +30,11 @@ class EventListener(Greenlet):
         assert 'poll_interval' in listener_config
         self.__poll_interval = listener_config['poll_interval']
 
+        self.config = listener_config
+
         assert 'chain_config' in listener_config
         self.chain_interface = self.create_chain_interface(listener_config['chain_config'])
 
-        self.config = listener_config
-
     @abstractmethod
     def create_chain_interface(self, chain_config):
         """
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from executor.metrics.metrics_registry import MetricsRegistry
+
+
+class ExecutorMetrics:
+    """
+    The names of the metrics exported by the executor, all of them are recorded into the process-wide registry
+    returned by get_registry().
+    """
+    QUEUE_DEPTH = 'origo_executor_queue_depth'
+    WORKERS = 'origo_executor_workers'
+    EXECUTIONS_TOTAL = 'origo_executor_executions_total'
+    PROOFS_TOTAL = 'origo_executor_proofs_total'
+    PROOFS_PER_SECOND = 'origo_executor_proofs_per_second'
+    STAGE_LATENCY = 'origo_executor_stage_latency_seconds'
+    ADMISSION_HELD = 'origo_executor_admission_held'
+    ADMISSION_HELD_TOTAL = 'origo_executor_admission_held_total'
+    RPC_CALLS_TOTAL = 'origo_executor_rpc_calls_total'
+    RPC_LATENCY = 'origo_executor_rpc_latency_seconds'
+    DOWNLOAD_BYTES_TOTAL = 'origo_executor_artifact_download_bytes_total'
+    DOWNLOAD_LATENCY = 'origo_executor_artifact_download_seconds'
+    ZOKRATES_CPU_SECONDS_TOTAL = 'origo_executor_zokrates_cpu_seconds_total'
+    ZOKRATES_PEAK_RSS = 'origo_executor_zokrates_peak_rss_bytes'
+    SCRATCH_RESERVED_BYTES = 'origo_executor_scratch_reserved_bytes'
+    SCRATCH_WORKSPACES_TOTAL = 'origo_executor_scratch_workspaces_total'
+    PROOF_CACHE_TOTAL = 'origo_executor_proof_cache_total'
+    DECRYPTION_BATCH_LATENCY = 'origo_executor_decryption_batch_seconds'
+    CONTRACT_CACHE_TOTAL = 'origo_executor_contract_cache_total'
+    CONTRACT_CACHE_HIT_RATIO = 'origo_executor_contract_cache_hit_ratio'
+    NONCE_RESYNCS_TOTAL = 'origo_executor_nonce_resyncs_total'
+
+    DESCRIPTIONS = [
+        (QUEUE_DEPTH, MetricsRegistry.GAUGE, 'Number of items waiting in the executor queues.'),
+        (WORKERS, MetricsRegistry.GAUGE, 'Number of executions running in a worker or waiting for a worker slot.'),
+        (EXECUTIONS_TOTAL, MetricsRegistry.COUNTER, 'Number of finished executions by result.'),
+        (PROOFS_TOTAL, MetricsRegistry.COUNTER, 'Number of proofs generated and settled on chain.'),
+        (PROOFS_PER_SECOND, MetricsRegistry.GAUGE, 'Proofs settled per second over the last minute.'),
+        (STAGE_LATENCY, MetricsRegistry.HISTOGRAM, 'Latency of the execution stages.'),
+        (ADMISSION_HELD, MetricsRegistry.GAUGE, '1 if the admission control holds the queued executions, else 0.'),
+        (ADMISSION_HELD_TOTAL, MetricsRegistry.COUNTER, 'Number of dispatch attempts held by the admission control.'),
+        (RPC_CALLS_TOTAL, MetricsRegistry.COUNTER, 'Number of JSON-RPC calls to the chain node by method and status.'),
+        (RPC_LATENCY, MetricsRegistry.HISTOGRAM, 'Latency of the JSON-RPC calls to the chain node by method.'),
+        (DOWNLOAD_BYTES_TOTAL, MetricsRegistry.COUNTER, 'Bytes of the downloaded contract artifacts.'),
+        (DOWNLOAD_LATENCY, MetricsRegistry.HISTOGRAM, 'Latency of the contract artifact downloads.'),
+        (ZOKRATES_CPU_SECONDS_TOTAL, MetricsRegistry.COUNTER, 'CPU seconds used by the ZoKrates subprocesses.'),
+        (ZOKRATES_PEAK_RSS, MetricsRegistry.GAUGE, 'Peak resident set size of the ZoKrates subprocesses.'),
+        (SCRATCH_RESERVED_BYTES, MetricsRegistry.GAUGE, 'Bytes reserved by the workspaces on the scratch path.'),
+        (SCRATCH_WORKSPACES_TOTAL, MetricsRegistry.COUNTER, 'Number of execution workspaces by placement.'),
+        (PROOF_CACHE_TOTAL, MetricsRegistry.COUNTER, 'Number of proof cache lookups by result.'),
+        (DECRYPTION_BATCH_LATENCY, MetricsRegistry.HISTOGRAM, 'Decryption time of the batches of encrypted inputs.'),
+        (CONTRACT_CACHE_TOTAL, MetricsRegistry.COUNTER, 'Number of ABI and contract object cache lookups by result.'),
+        (CONTRACT_CACHE_HIT_RATIO, MetricsRegistry.GAUGE, 'Hit ratio of the ABI and contract object caches.'),
+        (NONCE_RESYNCS_TOTAL, MetricsRegistry.COUNTER, 'Number of local nonces resynced from chain after a failure.'),
+    ]
+
+    __described = False
+    __describe_lock = threading.Lock()
+
+    @staticmethod
+    def get_registry():
+        """
+        Get the process-wide registry with the executor metrics described.
+        Returns:
+            MetricsRegistry.
+
+        """
+        registry = MetricsRegistry.get_default()
+        with ExecutorMetrics.__describe_lock:
+            if not ExecutorMetrics.__described:
+                for name, metric_type, help_text in ExecutorMetrics.DESCRIPTIONS:
+                    registry.describe(name, metric_type, help_text)
+                ExecutorMetrics.__described = True
+        return registry
+
+
+def rpc_metrics_middleware(make_request, web3):
+    """
+    The web3 middleware counting and timing every JSON-RPC call to the chain node.
+    Args:
+        make_request: function, the next request function of the middleware onion.
+        web3: Web3.
+
+    Returns:
+        function, the request function recording the metrics.
+
+    """
+    registry = ExecutorMetrics.get_registry()
+
+    def middleware(method, params):
+        start = time.monotonic()
+        status = 'error'
+        try:
+            response = make_request(method, params)
+            if 'error' not in response:
+                status = 'ok'
+            return response
+        finally:
+            registry.observe(ExecutorMetrics.RPC_LATENCY, time.monotonic() - start, {'method': method})
+            registry.increment(ExecutorMetrics.RPC_CALLS_TOTAL, 1, {'method': method, 'status': status})
+    return middleware
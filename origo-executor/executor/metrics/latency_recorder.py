@@ -0,0 +1,244 @@
+import bisect
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class LatencyStage:
+    """
+    The stages of ExecutorWorker._run which are timed by the LatencyRecorder.
+    """
+    VALIDATE = 'validate'
+    DECRYPT = 'decrypt'
+    HASH_CHECK = 'hash_check'
+    PREPARE = 'prepare'
+    PROVE = 'prove'
+    SUBMIT = 'submit'
+    SETTLE = 'settle'
+    ALL_STAGES = [VALIDATE, DECRYPT, HASH_CHECK, PREPARE, PROVE, SUBMIT, SETTLE]
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with logarithmic buckets, from 1 millisecond up to about 70 minutes with 4 buckets per doubling,
+    so the percentiles are accurate within 19% whatever the stage.
+    """
+    __slots__ = ('count', 'sum', 'max', 'bucket_counts')
+
+    BUCKET_BOUNDS = [0.001 * 2 ** (index / 4) for index in range(89)]
+
+    def __init__(self):
+        """
+        Init the LatencyHistogram.
+        """
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        # The last bucket counts the latencies beyond the last bound.
+        self.bucket_counts = [0] * (len(self.BUCKET_BOUNDS) + 1)
+
+    def observe(self, seconds):
+        """
+        Add a latency into the histogram.
+        Args:
+            seconds: float, the latency.
+
+        """
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.bucket_counts[bisect.bisect_left(self.BUCKET_BOUNDS, seconds)] += 1
+
+    def get_percentile(self, percentile):
+        """
+        Get the upper bound of the bucket holding the percentile, capped by the max latency.
+        Args:
+            percentile: float, between 0 and 1.
+
+        Returns:
+            float, the latency in seconds, or 0.0 if nothing is observed.
+
+        """
+        if self.count == 0:
+            return 0.0
+        rank = percentile * self.count
+        cumulative_count = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            cumulative_count += bucket_count
+            if cumulative_count >= rank and bucket_count:
+                if index == len(self.BUCKET_BOUNDS):
+                    return self.max
+                return min(self.BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+    def get_summary(self):
+        """
+        Get the summary of the histogram.
+        Returns:
+            dictionary, {'count', 'p50', 'p95', 'p99', 'max'}, the latencies in seconds.
+
+        """
+        return {'count': self.count, 'p50': self.get_percentile(0.5), 'p95': self.get_percentile(0.95),
+                'p99': self.get_percentile(0.99), 'max': self.max}
+
+
+class NullSpan:
+    """
+    The span returned by a disabled LatencyRecorder, which records nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class LatencySpan:
+    """
+    Time a stage of an execution with the monotonic clock, and record it into the LatencyRecorder when it exits,
+    whether the stage succeeded or not.
+    """
+    __slots__ = ('recorder', 'stage', 'contract_address', 'execution_id', 'start')
+
+    def __init__(self, recorder, stage, contract_address, execution_id):
+        """
+        Init the LatencySpan.
+        Args:
+            recorder: LatencyRecorder.
+            stage: LatencyStage.
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+        """
+        self.recorder = recorder
+        self.stage = stage
+        self.contract_address = contract_address
+        self.execution_id = execution_id
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.record(self.stage, self.contract_address, self.execution_id, time.monotonic() - self.start)
+        return False
+
+
+class LatencyRecorder:
+    """
+    In memory aggregation of the latency of the execution stages: a histogram per stage over all the contracts, a
+    histogram per stage of every contract, and the spans of the most recent executions. When disabled, span() returns
+    a shared no-op span and nothing is recorded.
+    """
+    NULL_SPAN = NullSpan()
+    DEFAULT_MAX_RECENT_EXECUTIONS = 1000
+
+    def __init__(self, enabled=True, max_recent_executions=DEFAULT_MAX_RECENT_EXECUTIONS):
+        """
+        Init the LatencyRecorder.
+        Args:
+            enabled: boolean, whether the latency is recorded.
+            max_recent_executions: int, the number of the most recent executions whose spans are kept.
+        """
+        self.enabled = enabled
+        self.__max_recent_executions = max_recent_executions
+        self.__lock = threading.Lock()
+        self.__stage_histograms = {stage: LatencyHistogram() for stage in LatencyStage.ALL_STAGES}
+        self.__contract_histograms = {}
+        self.__execution_spans = OrderedDict()
+
+    def span(self, stage, contract_address, execution_id):
+        """
+        Get the span timing a stage of an execution, to be used as a context manager.
+        Args:
+            stage: LatencyStage.
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+
+        Returns:
+            LatencySpan, or the shared no-op span if the recorder is disabled.
+
+        """
+        if not self.enabled:
+            return self.NULL_SPAN
+        return LatencySpan(self, stage, contract_address, execution_id)
+
+    def record(self, stage, contract_address, execution_id, seconds):
+        """
+        Record the latency of a stage of an execution.
+        Args:
+            stage: LatencyStage.
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            seconds: float, the latency.
+
+        """
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.__stage_histograms.setdefault(stage, LatencyHistogram()).observe(seconds)
+            contract_histograms = self.__contract_histograms.setdefault(contract_address, {})
+            contract_histograms.setdefault(stage, LatencyHistogram()).observe(seconds)
+            execution_key = (contract_address, execution_id)
+            spans = self.__execution_spans.pop(execution_key, None) or {}
+            spans[stage] = spans.get(stage, 0.0) + seconds
+            self.__execution_spans[execution_key] = spans
+            if len(self.__execution_spans) > self.__max_recent_executions:
+                self.__execution_spans.popitem(last=False)
+
+    def get_stage_stats(self, contract_address=None):
+        """
+        Get the latency summary of every stage.
+        Args:
+            contract_address: string, the contract address, or None for all the contracts.
+
+        Returns:
+            dictionary, {stage: {'count', 'p50', 'p95', 'p99', 'max'}}.
+
+        """
+        with self.__lock:
+            if contract_address is None:
+                histograms = self.__stage_histograms
+            else:
+                histograms = self.__contract_histograms.get(contract_address, {})
+            return {stage: histogram.get_summary() for stage, histogram in histograms.items()}
+
+    def get_stage_histograms(self):
+        """
+        Get a copy of the histogram of every stage over all the contracts.
+        Returns:
+            dictionary, {stage: (count, sum, bucket counts)}, the bucket bounds are LatencyHistogram.BUCKET_BOUNDS.
+
+        """
+        with self.__lock:
+            return {stage: (histogram.count, histogram.sum, list(histogram.bucket_counts))
+                    for stage, histogram in self.__stage_histograms.items()}
+
+    def get_execution_spans(self, contract_address, execution_id):
+        """
+        Get the latency of the stages of a recent execution.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+
+        Returns:
+            dictionary, {stage: seconds}, empty if the execution is not recent.
+
+        """
+        with self.__lock:
+            return dict(self.__execution_spans.get((contract_address, execution_id), {}))
+
+    def remove_contract(self, contract_address):
+        """
+        Drop the latency of the unregistered contract, the stage histograms over all the contracts are kept.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        with self.__lock:
+            self.__contract_histograms.pop(contract_address, None)
+            for execution_key in [key for key in self.__execution_spans if key[0] == contract_address]:
+                del self.__execution_spans[execution_key]
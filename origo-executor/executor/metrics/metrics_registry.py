@@ -0,0 +1,207 @@
+import threading
+
+from executor.metrics.latency_recorder import LatencyHistogram
+
+
+class MetricsRegistry:
+    """
+    The registry of the executor metrics, rendered in the Prometheus text exposition format. The counters, gauges and
+    histograms are keyed by the metric name and the label values. The process-wide registry is get_default(), the
+    components record into it without holding a reference to the executor.
+    """
+    COUNTER, GAUGE, HISTOGRAM = 'counter', 'gauge', 'histogram'
+    # The histograms are exported with one bucket per doubling of the LatencyHistogram buckets.
+    EXPORTED_BUCKET_STEP = 4
+
+    __default_registry = None
+    __default_registry_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Init the MetricsRegistry.
+        """
+        self.__lock = threading.Lock()
+        self.__descriptions = {}
+        # {name: {label items: value}}, the histogram values are LatencyHistogram.
+        self.__values = {}
+
+    @staticmethod
+    def get_default():
+        """
+        Get the process-wide registry.
+        Returns:
+            MetricsRegistry.
+
+        """
+        with MetricsRegistry.__default_registry_lock:
+            if MetricsRegistry.__default_registry is None:
+                MetricsRegistry.__default_registry = MetricsRegistry()
+            return MetricsRegistry.__default_registry
+
+    @staticmethod
+    def _label_key(labels):
+        return tuple(sorted(labels.items())) if labels else ()
+
+    def describe(self, name, metric_type, help_text):
+        """
+        Describe the metric, the metrics are rendered in the order they are described.
+        Args:
+            name: string, the metric name.
+            metric_type: string, MetricsRegistry.COUNTER, GAUGE or HISTOGRAM.
+            help_text: string, the description of the metric.
+
+        """
+        with self.__lock:
+            if name not in self.__descriptions:
+                self.__descriptions[name] = (metric_type, help_text)
+                self.__values[name] = {}
+
+    def increment(self, name, value=1, labels=None):
+        """
+        Increase the counter.
+        Args:
+            name: string, the metric name.
+            value: float, the increment.
+            labels: dictionary, {label name: label value}.
+
+        """
+        key = self._label_key(labels)
+        with self.__lock:
+            values = self.__values.setdefault(name, {})
+            values[key] = values.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels=None):
+        """
+        Set the gauge.
+        Args:
+            name: string, the metric name.
+            value: float, the gauge value.
+            labels: dictionary, {label name: label value}.
+
+        """
+        with self.__lock:
+            self.__values.setdefault(name, {})[self._label_key(labels)] = value
+
+    def set_max(self, name, value, labels=None):
+        """
+        Set the gauge to the value if it is larger than the current one.
+        Args:
+            name: string, the metric name.
+            value: float, the gauge value.
+            labels: dictionary, {label name: label value}.
+
+        """
+        key = self._label_key(labels)
+        with self.__lock:
+            values = self.__values.setdefault(name, {})
+            if value > values.get(key, 0):
+                values[key] = value
+
+    def observe(self, name, seconds, labels=None):
+        """
+        Add the latency into the histogram.
+        Args:
+            name: string, the metric name.
+            seconds: float, the latency.
+            labels: dictionary, {label name: label value}.
+
+        """
+        key = self._label_key(labels)
+        with self.__lock:
+            values = self.__values.setdefault(name, {})
+            if key not in values:
+                values[key] = LatencyHistogram()
+            values[key].observe(seconds)
+
+    def set_histogram(self, name, count, total, bucket_counts, labels=None):
+        """
+        Set the histogram from the state of a LatencyHistogram aggregated elsewhere.
+        Args:
+            name: string, the metric name.
+            count: int, the number of the observations.
+            total: float, the sum of the observations.
+            bucket_counts: list of int, the bucket counts of the LatencyHistogram.
+            labels: dictionary, {label name: label value}.
+
+        """
+        histogram = LatencyHistogram()
+        histogram.count = count
+        histogram.sum = total
+        histogram.bucket_counts = list(bucket_counts)
+        with self.__lock:
+            self.__values.setdefault(name, {})[self._label_key(labels)] = histogram
+
+    def get_value(self, name, labels=None):
+        """
+        Get the value of the counter or the gauge.
+        Args:
+            name: string, the metric name.
+            labels: dictionary, {label name: label value}.
+
+        Returns:
+            float, or None if the metric is not recorded.
+
+        """
+        with self.__lock:
+            return self.__values.get(name, {}).get(self._label_key(labels))
+
+    @staticmethod
+    def _format_labels(label_items, extra_label=None):
+        if extra_label is not None:
+            label_items = label_items + (extra_label,)
+        if not label_items:
+            return ''
+        return '{' + ','.join(label_name + '="' + str(label_value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+                              for label_name, label_value in label_items) + '}'
+
+    @staticmethod
+    def _format_value(value):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    def render(self):
+        """
+        Render all the metrics in the Prometheus text exposition format.
+        Returns:
+            string.
+
+        """
+        lines = []
+        with self.__lock:
+            names = list(self.__descriptions.keys()) + sorted(set(self.__values) - set(self.__descriptions))
+            for name in names:
+                metric_type, help_text = self.__descriptions.get(name, (self.GAUGE, ''))
+                lines.append('# HELP ' + name + ' ' + help_text)
+                lines.append('# TYPE ' + name + ' ' + metric_type)
+                for label_items, value in sorted(self.__values.get(name, {}).items()):
+                    if metric_type == self.HISTOGRAM:
+                        lines.extend(self._render_histogram(name, label_items, value))
+                    else:
+                        lines.append(name + self._format_labels(label_items) + ' ' + self._format_value(value))
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, name, label_items, histogram):
+        """
+        Render the histogram with cumulative buckets.
+        Args:
+            name: string, the metric name.
+            label_items: tuple, the label items.
+            histogram: LatencyHistogram.
+
+        Returns:
+            list of string, the lines.
+
+        """
+        lines = []
+        cumulative_count = 0
+        for index, bound in enumerate(LatencyHistogram.BUCKET_BOUNDS):
+            cumulative_count += histogram.bucket_counts[index]
+            if index % self.EXPORTED_BUCKET_STEP == 0:
+                lines.append(name + '_bucket' + self._format_labels(label_items, ('le', '%g' % bound)) + ' ' +
+                             str(cumulative_count))
+        lines.append(name + '_bucket' + self._format_labels(label_items, ('le', '+Inf')) + ' ' +
+                     str(histogram.count))
+        lines.append(name + '_sum' + self._format_labels(label_items) + ' ' + repr(float(histogram.sum)))
+        lines.append(name + '_count' + self._format_labels(label_items) + ' ' + str(histogram.count))
+        return lines
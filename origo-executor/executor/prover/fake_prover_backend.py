@@ -0,0 +1,142 @@
+import hashlib
+import json
+
+from executor.prover.prover_backend import ProverBackend
+from executor.worker.executor_worker_exception import ProofException, PreparationException
+from gevent import sleep
+from os import path
+
+
+class FakeProverBackend(ProverBackend):
+    """
+    The deterministic in-process prover: the output and the proof are derived from the sha256 of the witness
+    arguments, after the configured latencies. It exercises the orchestration of the executor, e.g. for benchmarks,
+    without ZoKrates nor the artifacts of the circuit, and its proofs do not pass any online verification.
+    """
+    # The names of the points of a ZoKrates proof, with their number of coordinates, the B point is on G2.
+    PROOF_POINTS = [('A', 2), ('A_p', 2), ('B', 4), ('B_p', 2), ('C', 2), ('C_p', 2), ('H', 2), ('K', 2)]
+    # The files written into the working folder of the execution.
+    WITNESS_FILE = 'witness'
+    PROOF_FILE = 'proof.json'
+
+    def __init__(self, witness_latency=0.0, proof_latency=0.0):
+        """
+        Init the FakeProverBackend.
+        Args:
+            witness_latency: float, the seconds the witness computation takes.
+            proof_latency: float, the seconds the proof generation takes.
+        """
+        self.witness_latency = witness_latency
+        self.proof_latency = proof_latency
+
+    def get_artifacts(self, contract_address):
+        """
+        The fake prover does not need any artifact.
+        Args:
+            contract_address: string, the contract address.
+
+        Returns:
+            dictionary, empty.
+
+        """
+        return {}
+
+    @staticmethod
+    def _derive(seed, count):
+        """
+        Derive the field elements from the seed.
+        Args:
+            seed: bytes, the seed.
+            count: int, the number of elements.
+
+        Returns:
+            [int], the elements.
+
+        """
+        return [int.from_bytes(hashlib.sha256(seed + index.to_bytes(4, 'big')).digest(), 'big') >> 8
+                for index in range(count)]
+
+    def compute_witness(self, job, arguments):
+        """
+        Write the digest of the witness arguments as the witness, and its first element as the output.
+        Args:
+            job: ProverJob.
+            arguments: [string], the witness arguments.
+
+        """
+        if self.witness_latency > 0:
+            sleep(self.witness_latency)
+        if job.should_exit():
+            raise PreparationException
+        digest = hashlib.sha256(" ".join(str(argument) for argument in arguments).encode()).digest()
+        try:
+            with open(self.get_witness_artifact(job), 'w') as witness:
+                witness.write('~out_0 ' + str(self._derive(digest, 1)[0]) + '\n~digest ' + digest.hex() + '\n')
+        except OSError:
+            raise PreparationException
+
+    def generate_proof(self, job):
+        """
+        Write the proof derived from the witness.
+        Args:
+            job: ProverJob.
+
+        """
+        if self.proof_latency > 0:
+            sleep(self.proof_latency)
+        if job.should_exit():
+            raise ProofException
+        try:
+            with open(self.get_witness_artifact(job)) as witness:
+                digest = bytes.fromhex(witness.read().split('~digest ')[1].strip())
+            elements = iter(self._derive(digest, sum(count for _, count in self.PROOF_POINTS)))
+            proof = {}
+            for name, count in self.PROOF_POINTS:
+                coordinates = [hex(next(elements)) for _ in range(count)]
+                proof[name] = [coordinates[:2], coordinates[2:]] if count == 4 else coordinates
+            with open(path.join(job.working_path, self.PROOF_FILE), 'w') as proof_file:
+                json.dump({'proof': proof}, proof_file)
+        except (OSError, IndexError, ValueError):
+            raise ProofException
+
+    def parse_output(self, job):
+        """
+        Read the output from the witness and the proof.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            (list, dictionary), the outputs as strings and the proof.
+
+        """
+        try:
+            with open(self.get_witness_artifact(job)) as witness:
+                output = witness.readline().split(' ')[1].rstrip('\n')
+            with open(path.join(job.working_path, self.PROOF_FILE)) as proof_file:
+                return [output], json.load(proof_file)['proof']
+        except (OSError, IndexError, ValueError, KeyError):
+            raise ProofException
+
+    def get_witness_artifact(self, job):
+        """
+        Get the witness file of the execution.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            string, the witness file path.
+
+        """
+        return path.join(job.working_path, self.WITNESS_FILE)
+
+    def has_witness(self, job):
+        """
+        Check whether the witness file is in the working folder of the execution.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            Boolean.
+
+        """
+        return path.isfile(self.get_witness_artifact(job))
@@ -0,0 +1,146 @@
+from abc import ABC
+from abc import abstractmethod
+
+
+class ProverJob:
+    """
+    The execution a prover backend computes the witness and generates the proof for.
+    """
+    __slots__ = ('contract_address', 'execution_id', 'working_path', 'witness_timeout', 'proof_timeout',
+                 'witness_input', 'subprocess_runner', 'prover_client', 'record_peak_rss', 'should_exit', 'debug')
+
+    def __init__(self, contract_address, execution_id, working_path, witness_timeout=None, proof_timeout=None,
+                 witness_input=None, subprocess_runner=None, prover_client=None, record_peak_rss=None,
+                 should_exit=None, debug=False):
+        """
+        Init the ProverJob.
+        Args:
+            contract_address: string, the contract address.
+            execution_id: int, the execution id.
+            working_path: string, the working folder of the execution, holding the staged artifacts.
+            witness_timeout: float, the seconds after which the witness computation is killed, None means no limit.
+            proof_timeout: float, the seconds after which the proof generation is killed, None means no limit.
+            witness_input: string, the channel passing the witness arguments, see WitnessInput.
+            subprocess_runner: SubprocessRunner, the runner of the subprocesses of the execution.
+            prover_client: ProverClient, the client of the prover daemon of the circuit, or None.
+            record_peak_rss: function, called with the peak RSS bytes of the prover processes.
+            should_exit: function, returns True once the execution is stopped.
+            debug: boolean, debug flag.
+        """
+        self.contract_address = contract_address
+        self.execution_id = execution_id
+        self.working_path = working_path
+        self.witness_timeout = witness_timeout
+        self.proof_timeout = proof_timeout
+        self.witness_input = witness_input
+        self.subprocess_runner = subprocess_runner
+        self.prover_client = prover_client
+        self.record_peak_rss = record_peak_rss or (lambda peak_rss: None)
+        self.should_exit = should_exit or (lambda: False)
+        self.debug = debug
+
+
+class ProverBackend(ABC):
+    """
+    Base class for the provers computing the witness of an execution and generating its proof. The worker stages the
+    artifacts of the backend into the working folder of the execution, then calls compute_witness, generate_proof and
+    parse_output in order. compute_witness raises PreparationException and generate_proof or parse_output raise
+    ProofException if they failed.
+    """
+    ZOKRATES = 'zokrates'
+    FAKE = 'fake'
+    ALL_BACKENDS = [ZOKRATES, FAKE]
+
+    @abstractmethod
+    def get_artifacts(self, contract_address):
+        """
+        Get the artifacts of the circuit staged into the working folder of every execution.
+        Args:
+            contract_address: string, the contract address.
+
+        Returns:
+            dictionary, {file name in the working folder: source path}.
+
+        """
+        raise NotImplementedError('Abstract method, not implemented yet')
+
+    def get_cache_files(self, contract_address):
+        """
+        Get the files identifying the circuit in the proof cache.
+        Args:
+            contract_address: string, the contract address.
+
+        Returns:
+            (string, string), the program and proving key paths, or None if the proofs are not cached.
+
+        """
+        return None
+
+    @abstractmethod
+    def compute_witness(self, job, arguments):
+        """
+        Compute the witness of the execution in its working folder.
+        Args:
+            job: ProverJob.
+            arguments: [string], the witness arguments.
+
+        """
+        raise NotImplementedError('Abstract method, not implemented yet')
+
+    @abstractmethod
+    def generate_proof(self, job):
+        """
+        Generate the proof from the witness in the working folder.
+        Args:
+            job: ProverJob.
+
+        """
+        raise NotImplementedError('Abstract method, not implemented yet')
+
+    @abstractmethod
+    def parse_output(self, job):
+        """
+        Read the output of the execution and the generated proof.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            (list, dictionary), the outputs as strings and the proof submitted to verifyAndSettle.
+
+        """
+        raise NotImplementedError('Abstract method, not implemented yet')
+
+    @abstractmethod
+    def get_witness_artifact(self, job):
+        """
+        Get the location of the computed witness, which is recorded in the journal.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            string, the witness location.
+
+        """
+        raise NotImplementedError('Abstract method, not implemented yet')
+
+    @abstractmethod
+    def has_witness(self, job):
+        """
+        Check whether the witness of the execution is computed.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            Boolean.
+
+        """
+        raise NotImplementedError('Abstract method, not implemented yet')
+
+    def cancel(self, job):
+        """
+        Cancel the running witness computation or proof generation of the job.
+        Args:
+            job: ProverJob.
+
+        """
+        pass
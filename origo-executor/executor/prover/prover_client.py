@@ -0,0 +1,73 @@
+import json
+import socket
+
+
+class ProverClient:
+    """
+    The client submitting the witness and proof jobs of the workers to the ProverDaemon of their circuit.
+    """
+    def __init__(self, socket_path):
+        """
+        Init the ProverClient.
+        Args:
+            socket_path: string, the Unix socket of the daemon.
+        """
+        self.socket_path = socket_path
+        self.__connection = None
+        self.__cancelled = False
+
+    def run(self, command, working_path, arguments=None, timeout=None, witness_input=None):
+        """
+        Run the ZoKrates command in the daemon and wait until it finishes. The caller greenlet yields while waiting.
+        Args:
+            command: string, 'compute-witness', 'generate-proof' or 'ping'.
+            working_path: string, the working folder of the execution, holding the staged artifacts.
+            arguments: list, the witness arguments of compute-witness.
+            timeout: float, the seconds after which the daemon kills the command, None means no limit.
+            witness_input: string, the channel passing the witness arguments, see WitnessInput.
+
+        Returns:
+            dictionary, {'returncode': int, 'stderr': string, 'cpu_seconds': float, 'peak_rss': int}.
+
+        """
+        if self.__cancelled:
+            raise ConnectionAbortedError("The prover job is cancelled")
+        job = {'command': command, 'working_path': working_path, 'arguments': [str(arg) for arg in arguments or []],
+               'timeout': timeout, 'witness_input': witness_input}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(self.socket_path)
+            self.__connection = connection
+            try:
+                connection.sendall((json.dumps(job) + '\n').encode())
+                with connection.makefile('rb') as response:
+                    line = response.readline()
+            finally:
+                self.__connection = None
+        if not line:
+            raise ConnectionError("The prover daemon closed the connection: " + self.socket_path)
+        return json.loads(line.decode())
+
+    def cancel(self):
+        """
+        Cancel the running job, the daemon kills its command once the connection is closed.
+
+        """
+        self.__cancelled = True
+        connection = self.__connection
+        if connection is not None:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def ping(self):
+        """
+        Check the daemon is serving.
+        Returns:
+            Boolean.
+
+        """
+        try:
+            return self.run('ping', '')['returncode'] == 0
+        except OSError:
+            return False
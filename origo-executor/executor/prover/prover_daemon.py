@@ -0,0 +1,131 @@
+import json
+import os
+import select
+import socket
+import socketserver
+
+from executor.utils.subprocess_runner import SubprocessRunner
+from executor.worker.witness_input import WitnessInput
+
+
+class ProverJobHandler(socketserver.StreamRequestHandler):
+    """
+    Handle one job per connection: a JSON line with the command, the working folder and the arguments, answered by a
+    JSON line with the return code, the stderr and the resource usage of the prover.
+    """
+    def handle(self):
+        try:
+            job = json.loads(self.rfile.readline().decode())
+            response = self.server.run_job(job, self.is_disconnected)
+        except Exception as e:
+            response = {'returncode': -1, 'stderr': 'Invalid prover job: ' + str(e), 'cpu_seconds': 0.0,
+                        'peak_rss': 0}
+        try:
+            self.wfile.write((json.dumps(response) + '\n').encode())
+        except OSError:
+            pass
+
+    def is_disconnected(self):
+        """
+        Check whether the client closed the connection, i.e. the job is cancelled.
+        Returns:
+            Boolean.
+
+        """
+        readable, _, _ = select.select([self.connection], [], [], 0)
+        try:
+            return bool(readable) and self.connection.recv(1, socket.MSG_PEEK) == b''
+        except OSError:
+            return True
+
+
+class ProverDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    The long-lived prover service of a circuit, serving the witness and proof jobs of its executions over a Unix
+    socket. The jobs run the ZoKrates binary directly without a shell, so the per-job cost of the executor is a
+    connection instead of a shell and a fork of the executor process.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, zokrates_path):
+        """
+        Init the ProverDaemon and bind its socket.
+        Args:
+            socket_path: string, the Unix socket path.
+            zokrates_path: string, the ZoKrates binary.
+        """
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        socketserver.UnixStreamServer.__init__(self, socket_path, ProverJobHandler)
+        self.socket_path = socket_path
+        self.zokrates_path = zokrates_path
+
+    def build_command(self, command, working_path, arguments, witness_input=None):
+        """
+        Build the invocation of the ZoKrates command.
+        Args:
+            command: string, 'compute-witness' or 'generate-proof'.
+            working_path: string, the working folder of the execution.
+            arguments: [string], the witness arguments, only for compute-witness.
+            witness_input: string, the channel passing the witness arguments, see WitnessInput.
+
+        Returns:
+            ([string], bytes, string), the argument vector, the data to stream over stdin or None, and the file to
+            open as stdin or None.
+
+        """
+        if command == 'compute-witness':
+            return WitnessInput.build(witness_input or WitnessInput.AUTO,
+                                      [self.zokrates_path, 'compute-witness', '-i', os.path.join(working_path, 'out'),
+                                       '-o', os.path.join(working_path, 'witness')],
+                                      [str(argument) for argument in arguments], working_path)
+        elif command == 'generate-proof':
+            return [self.zokrates_path, 'generate-proof'], None, None
+        raise Exception("Unsupported prover command: " + str(command))
+
+    def run_job(self, job, should_cancel=None):
+        """
+        Run the job and wait until it finishes.
+        Args:
+            job: dictionary, {'command': string, 'working_path': string, 'arguments': [string], 'timeout': float,
+                'witness_input': string}.
+                The 'ping' command only checks the daemon is serving.
+            should_cancel: function, the command is killed once it returns True.
+
+        Returns:
+            dictionary, {'returncode': int, 'stderr': string, 'cpu_seconds': float, 'peak_rss': int}.
+
+        """
+        response = {'returncode': 0, 'stderr': '', 'cpu_seconds': 0.0, 'peak_rss': 0}
+        if job['command'] == 'ping':
+            return response
+        argv, stdin_data, stdin_path = self.build_command(job['command'], job['working_path'],
+                                                          job.get('arguments', []), job.get('witness_input'))
+        result = SubprocessRunner().run(argv, cwd=job['working_path'], timeout=job.get('timeout'),
+                                        should_cancel=should_cancel, stdin_data=stdin_data, stdin_path=stdin_path)
+        # A killed command has a negative return code.
+        response['returncode'] = result.returncode if result.returncode is not None else -1
+        response['stderr'] = ('timed out. ' if result.timed_out else '') + result.stderr
+        response['cpu_seconds'] = result.cpu_seconds
+        response['peak_rss'] = result.peak_rss
+        return response
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def run_prover_daemon(socket_path, zokrates_path):
+    """
+    Serve the prover jobs until the process is terminated, this is the entry of the daemon process.
+    Args:
+        socket_path: string, the Unix socket path.
+        zokrates_path: string, the ZoKrates binary.
+
+    """
+    daemon = ProverDaemon(socket_path, zokrates_path)
+    try:
+        daemon.serve_forever()
+    finally:
+        daemon.server_close()
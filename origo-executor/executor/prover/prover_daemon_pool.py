@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import time
+
+from executor.prover.prover_client import ProverClient
+from executor.utils.log_utils import LogUtils
+
+
+class ProverDaemonPool:
+    """
+    Start and stop the ProverDaemon of every circuit, one process per registered contract listening on
+    <socket_dir>/<contract address>.sock. A daemon already serving on the socket, e.g. started outside of the executor,
+    is used as is.
+    """
+    # The seconds to wait for a started daemon to serve.
+    START_TIMEOUT = 10
+    # The entry of the daemon process. The daemon runs in a fresh interpreter importing only the prover modules, as
+    # multiprocessing would re-import the main module of the executor in it, i.e. run the gevent patch_all() and build
+    # the Flask app of the service. It is passed with -c, because -m cannot run a cythonized module.
+    DAEMON_ENTRY = 'import sys; from executor.prover.prover_daemon import run_prover_daemon; ' \
+                   'run_prover_daemon(sys.argv[1], sys.argv[2])'
+
+    def __init__(self, socket_dir, zokrates_path):
+        """
+        Init the ProverDaemonPool.
+        Args:
+            socket_dir: string, the folder of the Unix sockets.
+            zokrates_path: string, the ZoKrates binary.
+        """
+        self.__socket_dir = socket_dir
+        self.__zokrates_path = zokrates_path
+        # {contract address: subprocess.Popen}
+        self.__daemons = {}
+        os.makedirs(socket_dir, exist_ok=True)
+
+    def get_socket_path(self, contract_address):
+        return os.path.join(self.__socket_dir, contract_address + '.sock')
+
+    @staticmethod
+    def get_daemon_env():
+        """
+        Get the environment of the daemon process, whose interpreter must find the executor package wherever the
+        executor is run from.
+        Returns:
+            dictionary, the environment variables.
+
+        """
+        env = dict(os.environ)
+        package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env['PYTHONPATH'] = os.pathsep.join([package_root] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+        return env
+
+    def get_client(self, contract_address):
+        """
+        Get the client of the contract's daemon, and start the daemon if it is not serving.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            ProverClient.
+
+        """
+        client = ProverClient(self.get_socket_path(contract_address))
+        daemon = self.__daemons.get(contract_address)
+        if daemon is not None and daemon.poll() is None:
+            return client
+        if client.ping():
+            return client
+        LogUtils.info("Start the prover daemon of " + contract_address)
+        daemon = subprocess.Popen([sys.executable, '-c', self.DAEMON_ENTRY, client.socket_path, self.__zokrates_path],
+                                  env=self.get_daemon_env(), stdin=subprocess.DEVNULL)
+        self.__daemons[contract_address] = daemon
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while not client.ping():
+            if daemon.poll() is not None or time.monotonic() > deadline:
+                self.stop(contract_address)
+                raise Exception("Failed to start the prover daemon of " + contract_address)
+            time.sleep(0.05)
+        return client
+
+    def stop(self, contract_address):
+        """
+        Stop the daemon of the unregistered contract, if it was started by this pool.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        daemon = self.__daemons.pop(contract_address, None)
+        if daemon is None:
+            return
+        daemon.terminate()
+        try:
+            daemon.wait(self.START_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            daemon.kill()
+            daemon.wait()
+        socket_path = self.get_socket_path(contract_address)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+    def shutdown(self):
+        """
+        Stop all the daemons started by this pool.
+
+        """
+        for contract_address in list(self.__daemons):
+            self.stop(contract_address)
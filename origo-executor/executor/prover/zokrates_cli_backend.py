@@ -0,0 +1,217 @@
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.prover.prover_backend import ProverBackend
+from executor.worker.executor_worker_exception import ProofException, PreparationException
+from executor.worker.witness_input import WitnessInput
+from executor.utils.log_utils import LogUtils
+from os import path
+import json
+
+
+class ZokratesCliBackend(ProverBackend):
+    """
+    The prover running the ZoKrates(https://github.com/Zokrates/ZoKrates) CLI, either as a subprocess of the worker or
+    in the prover daemon of the circuit.
+    """
+    def __init__(self, zokrates_path, proving_key_path, working_path):
+        """
+        Init the ZokratesCliBackend.
+        Args:
+            zokrates_path: string, the ZoKrates binary.
+            proving_key_path: string, the folder of the proving keys and variables of the circuits.
+            working_path: string, the working folder of the executor, holding the compiled programs.
+        """
+        self.zokrates_path = zokrates_path
+        self.__proving_key_path = proving_key_path
+        self.__working_path = working_path
+
+    def get_artifacts(self, contract_address):
+        """
+        Get the compiled program, the proving key and the variables of the circuit.
+        Args:
+            contract_address: string, the contract address.
+
+        Returns:
+            dictionary, {file name in the working folder: source path}.
+
+        """
+        code_path, pk_path = self.get_cache_files(contract_address)
+        return {'out': code_path, 'proving.key': pk_path,
+                'variables.inf': path.join(self.__proving_key_path, contract_address) + '.var'}
+
+    def get_cache_files(self, contract_address):
+        """
+        Get the compiled program and the proving key of the circuit.
+        Args:
+            contract_address: string, the contract address.
+
+        Returns:
+            (string, string), the program and proving key paths.
+
+        """
+        return (path.join(self.__working_path, 'compiled_code', contract_address) + '_out',
+                path.join(self.__proving_key_path, contract_address) + '.pk')
+
+    @staticmethod
+    def record_command_usage(command_name, usage):
+        """
+        Record the resource usage of the ZoKrates command into the metrics.
+        Args:
+            command_name: string, the command key.
+            usage: (float, int), the CPU seconds and the peak RSS bytes of the command.
+
+        """
+        cpu_seconds, peak_rss = usage
+        registry = ExecutorMetrics.get_registry()
+        registry.increment(ExecutorMetrics.ZOKRATES_CPU_SECONDS_TOTAL, cpu_seconds, {'command': command_name})
+        registry.set_max(ExecutorMetrics.ZOKRATES_PEAK_RSS, peak_rss)
+
+    def _run_command(self, job, command, arguments, timeout, exception_class):
+        """
+        Run the ZoKrates command in the working folder of the execution and wait until it finishes. The command
+        runs without a shell and is killed once it times out or the worker is stopped.
+        Args:
+            job: ProverJob.
+            command: string, 'compute-witness' or 'generate-proof'.
+            arguments: [string], the witness arguments of compute-witness, passed through the witness input channel.
+            timeout: float, the seconds after which the command is killed, None means no limit.
+            exception_class: ExecutorWorkerException, the exception raised if the command failed.
+
+        """
+        stdin_data, stdin_path = None, None
+        if command == 'compute-witness':
+            argv, stdin_data, stdin_path = WitnessInput.build(
+                job.witness_input or WitnessInput.AUTO,
+                [self.zokrates_path, 'compute-witness', '-i', path.join(job.working_path, 'out'),
+                 '-o', path.join(job.working_path, 'witness')], arguments, job.working_path)
+        else:
+            argv = [self.zokrates_path, command]
+        if job.debug:
+            LogUtils.info("Run command: " + " ".join(argv))
+        result = job.subprocess_runner.run(argv, cwd=job.working_path, timeout=timeout,
+                                           stdin_data=stdin_data, stdin_path=stdin_path)
+        self.record_command_usage(command.replace('-', '_'), (result.cpu_seconds, result.peak_rss))
+        job.record_peak_rss(result.peak_rss)
+        if not result.succeeded:
+            if result.timed_out:
+                LogUtils.error("ZoKrates " + command + " timed out after " + str(timeout) + " seconds for " +
+                               job.contract_address + ": " + result.stderr)
+            elif not result.cancelled:
+                LogUtils.error("ZoKrates " + command + " exited with " + str(result.returncode) + " for " +
+                               job.contract_address + ": " + result.stderr)
+            raise exception_class
+
+    def _run_in_prover_daemon(self, job, command, arguments, timeout, exception_class):
+        """
+        Run the ZoKrates command in the prover daemon of the circuit.
+        Args:
+            job: ProverJob.
+            command: string, 'compute-witness' or 'generate-proof'.
+            arguments: [string], the witness arguments of compute-witness.
+            timeout: float, the seconds after which the command is killed, None means no limit.
+            exception_class: ExecutorWorkerException, the exception raised if the command failed.
+
+        """
+        try:
+            response = job.prover_client.run(command, job.working_path, arguments, timeout, job.witness_input)
+        except OSError as e:
+            if not job.should_exit():
+                LogUtils.error("Failed to reach the prover daemon of " + job.contract_address + ": " + str(e))
+            raise exception_class
+        self.record_command_usage(command.replace('-', '_'), (response['cpu_seconds'], response['peak_rss']))
+        job.record_peak_rss(response['peak_rss'])
+        if response['returncode'] != 0:
+            LogUtils.error("Prover daemon failed to run " + command + " for " + job.contract_address + ": " +
+                           response['stderr'])
+            raise exception_class
+
+    def _run(self, job, command, arguments, timeout, exception_class):
+        if job.prover_client is None:
+            self._run_command(job, command, arguments, timeout, exception_class)
+        else:
+            self._run_in_prover_daemon(job, command, arguments, timeout, exception_class)
+
+    def compute_witness(self, job, arguments):
+        """
+        Run ZoKrates compute-witness.
+        Args:
+            job: ProverJob.
+            arguments: [string], the witness arguments.
+
+        """
+        self._run(job, 'compute-witness', arguments, job.witness_timeout, PreparationException)
+        if not self.has_witness(job):
+            raise PreparationException
+
+    def generate_proof(self, job):
+        """
+        Run ZoKrates generate-proof.
+        Args:
+            job: ProverJob.
+
+        """
+        self._run(job, 'generate-proof', [], job.proof_timeout, ProofException)
+        if not path.isfile(path.join(job.working_path, 'proof.json')):
+            if job.debug:
+                LogUtils.info("Missing the required file: " + path.join(job.working_path, 'proof.json'))
+            raise ProofException
+
+    def parse_output(self, job):
+        """
+        Read the outputs from the witness file and the proof from proof.json.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            (list, dictionary), the outputs as strings and the proof.
+
+        """
+        try:
+            with open(path.join(job.working_path, 'proof.json')) as f:
+                proof = json.load(f)
+            if proof is None or 'proof' not in proof:
+                raise ProofException
+            outputs = {}
+            with open(path.join(job.working_path, 'witness')) as lines:
+                for line in lines:
+                    if line.startswith('~out_'):
+                        output_index = int(line.split(" ")[0].split("_")[1])
+                        outputs[output_index] = line.split(" ")[1].rstrip("\n")
+                    else:
+                        break
+            return [outputs[index] for index in range(0, len(outputs))], proof['proof']
+        except FileNotFoundError:
+            raise ProofException
+
+    def get_witness_artifact(self, job):
+        """
+        Get the witness file of the execution.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            string, the witness file path.
+
+        """
+        return path.join(job.working_path, 'witness')
+
+    def has_witness(self, job):
+        """
+        Check whether the witness file is in the working folder of the execution.
+        Args:
+            job: ProverJob.
+
+        Returns:
+            Boolean.
+
+        """
+        return path.isfile(self.get_witness_artifact(job))
+
+    def cancel(self, job):
+        """
+        Cancel the job running in the prover daemon, the subprocesses are killed by the runner of the worker.
+        Args:
+            job: ProverJob.
+
+        """
+        if job.prover_client is not None:
+            job.prover_client.cancel()
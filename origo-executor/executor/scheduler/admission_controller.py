@@ -0,0 +1,214 @@
+import os
+import shutil
+import time
+
+from collections import deque
+from executor.constants.executor_constants import ExecutorConstants
+from executor.utils.log_utils import LogUtils
+
+
+class AdmissionState:
+    """
+    The backpressure state of the AdmissionController.
+    """
+    OPEN, HELD = range(2)
+    STATE_EXPLANATION = ['open', 'held']
+
+
+class AdmissionController:
+    """
+    Check the live resource signals of the host before a new execution starts: the available memory against the peak
+    RSS of the circuit, the load average per CPU, and the free disk under the working path. The executions are held
+    in the scheduler while any limit would be exceeded.
+
+    The peak RSS of a circuit is the measured one once reported by record_peak_rss, or estimated from the size of its
+    proving key before. The memory of the executions admitted within the reservation window is reserved against the
+    available memory, since the prover has not loaded the key yet. When no execution is running, only the disk limit
+    holds the executions, so that the executions always make progress.
+    """
+
+    def __init__(self, options, meminfo_path='/proc/meminfo', clock=time.monotonic):
+        """
+        Init the AdmissionController.
+        Args:
+            options: dictionary, with working_path and proving_key_path, and optionally the admission limits
+                admission_min_free_memory (MB), admission_max_load_per_cpu (0 disables it),
+                admission_min_free_disk (MB) and admission_memory_factor.
+            meminfo_path: string, the path of the meminfo file.
+            clock: function, returns the current time in seconds.
+        """
+        self.__working_path = options.get('working_path', '')
+        self.__proving_key_path = options.get('proving_key_path', '')
+        self.__min_free_memory = options.get('admission_min_free_memory',
+                                             ExecutorConstants.DEFAULT_ADMISSION_MIN_FREE_MEMORY) * 1024 * 1024
+        self.__max_load_per_cpu = options.get('admission_max_load_per_cpu',
+                                              ExecutorConstants.DEFAULT_ADMISSION_MAX_LOAD_PER_CPU)
+        self.__min_free_disk = options.get('admission_min_free_disk',
+                                           ExecutorConstants.DEFAULT_ADMISSION_MIN_FREE_DISK) * 1024 * 1024
+        self.__memory_factor = options.get('admission_memory_factor',
+                                           ExecutorConstants.DEFAULT_ADMISSION_MEMORY_FACTOR)
+        self.__meminfo_path = meminfo_path
+        self.__clock = clock
+        self.__cpu_count = os.cpu_count() or 1
+        # {contract address: measured peak RSS in bytes}
+        self.__measured_peak_rss = {}
+        # (admission time, reserved bytes) of the executions admitted within the reservation window.
+        self.__reservations = deque()
+        self.state = AdmissionState.OPEN
+        self.reason = ''
+        self.held_count = 0
+
+    def record_peak_rss(self, contract_address, peak_rss):
+        """
+        Record the measured peak RSS of the prover of the contract's circuit.
+        Args:
+            contract_address: string, contract address.
+            peak_rss: int, the peak RSS in bytes.
+
+        """
+        self.__measured_peak_rss[contract_address] = max(peak_rss, self.__measured_peak_rss.get(contract_address, 0))
+
+    def remove_contract(self, contract_address):
+        """
+        Forget the measured peak RSS of the unregistered contract.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        self.__measured_peak_rss.pop(contract_address, None)
+
+    def get_peak_rss(self, contract_address):
+        """
+        Get the peak RSS of the circuit of the contract.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            int, the measured peak RSS in bytes, or the estimation from the proving key size, or 0 if unknown.
+
+        """
+        if contract_address in self.__measured_peak_rss:
+            return self.__measured_peak_rss[contract_address]
+        try:
+            proving_key_size = os.path.getsize(os.path.join(self.__proving_key_path, contract_address) + '.pk')
+        except OSError:
+            return 0
+        return int(proving_key_size * self.__memory_factor)
+
+    def get_available_memory(self):
+        """
+        Get the memory available for new processes without swapping.
+        Returns:
+            (int, int), the available and the total memory in bytes, or (None, None) if unknown.
+
+        """
+        meminfo = {}
+        try:
+            with open(self.__meminfo_path) as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) >= 2:
+                        meminfo[fields[0].rstrip(':')] = int(fields[1]) * 1024
+        except OSError:
+            return None, None
+        available = meminfo.get('MemAvailable', meminfo.get('MemFree'))
+        return available, meminfo.get('MemTotal')
+
+    def get_load_per_cpu(self):
+        """
+        Get the 1-minute load average per CPU.
+        Returns:
+            float, or None if unknown.
+
+        """
+        try:
+            return os.getloadavg()[0] / self.__cpu_count
+        except OSError:
+            return None
+
+    def get_free_disk(self):
+        """
+        Get the free disk space under the working path.
+        Returns:
+            int, the free bytes, or None if unknown.
+
+        """
+        try:
+            return shutil.disk_usage(self.__working_path or '.').free
+        except OSError:
+            return None
+
+    def get_reserved_memory(self):
+        """
+        Get the memory reserved by the executions admitted within the reservation window.
+        Returns:
+            int, the reserved bytes.
+
+        """
+        window_start = self.__clock() - ExecutorConstants.ADMISSION_RESERVATION_WINDOW
+        while self.__reservations and self.__reservations[0][0] < window_start:
+            self.__reservations.popleft()
+        return sum(reserved for _, reserved in self.__reservations)
+
+    def check(self, contract_address, active_worker_count):
+        """
+        Check whether a new execution of the contract can start now.
+        Args:
+            contract_address: string, contract address.
+            active_worker_count: int, the number of the running executions.
+
+        Returns:
+            string, the reason why the execution is held, or None if it can start.
+
+        """
+        free_disk = self.get_free_disk()
+        if free_disk is not None and free_disk < self.__min_free_disk:
+            return 'free disk ' + str(free_disk // (1024 * 1024)) + 'MB under the working path'
+        if active_worker_count == 0:
+            return None
+        if self.__max_load_per_cpu:
+            load_per_cpu = self.get_load_per_cpu()
+            if load_per_cpu is not None and load_per_cpu > self.__max_load_per_cpu:
+                return 'load average ' + '{0:.2f}'.format(load_per_cpu) + ' per CPU'
+        available_memory, _ = self.get_available_memory()
+        if available_memory is not None:
+            required_memory = self.get_peak_rss(contract_address) + self.__min_free_memory
+            available_memory -= self.get_reserved_memory()
+            if available_memory < required_memory:
+                return 'available memory ' + str(max(available_memory, 0) // (1024 * 1024)) + 'MB, the circuit needs ' \
+                       + str(required_memory // (1024 * 1024)) + 'MB'
+        return None
+
+    def admit(self, contract_address, active_worker_count):
+        """
+        Admit a new execution of the contract if the resources allow it, and update the backpressure state.
+        Args:
+            contract_address: string, contract address.
+            active_worker_count: int, the number of the running executions.
+
+        Returns:
+            Boolean, return True if the execution can start now.
+
+        """
+        reason = self.check(contract_address, active_worker_count)
+        if reason is not None:
+            if self.state != AdmissionState.HELD or self.reason != reason:
+                LogUtils.warning("Hold the executions in the queue, " + reason)
+            self.state = AdmissionState.HELD
+            self.reason = reason
+            self.held_count += 1
+            return False
+        self.state = AdmissionState.OPEN
+        self.reason = ''
+        self.__reservations.append((self.__clock(), self.get_peak_rss(contract_address)))
+        return True
+
+    def get_backpressure_state(self):
+        """
+        Get the current backpressure state.
+        Returns:
+            dictionary, {'state', 'reason', 'held_count'}, held_count is the number of the held dispatch attempts.
+
+        """
+        return {'state': AdmissionState.STATE_EXPLANATION[self.state], 'reason': self.reason,
+                'held_count': self.held_count}
@@ -0,0 +1,217 @@
+import heapq
+import time
+
+from collections import deque
+from executor.utils.log_utils import LogUtils
+
+
+class ScheduledExecution:
+    """
+    A single execution waiting in the ExecutionScheduler.
+    """
+    __slots__ = ('contract_address', 'execution_id', 'commitments', 'deadline', 'finish_tag')
+
+    def __init__(self, contract_address, execution_id, commitments, deadline, finish_tag):
+        """
+        Init the ScheduledExecution.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            commitments: commitments of this execution.
+            deadline: float, the clock time the execution should be dispatched before, or None.
+            finish_tag: float, the virtual finish time of the execution in weighted fair queuing.
+        """
+        self.contract_address = contract_address
+        self.execution_id = execution_id
+        self.commitments = commitments
+        self.deadline = deadline
+        self.finish_tag = finish_tag
+
+
+class ContractQueue:
+    """
+    The executions of one contract waiting in the ExecutionScheduler, in arrival order.
+    """
+    __slots__ = ('executions', 'weight', 'last_finish_tag', 'missed_deadlines')
+
+    def __init__(self, weight):
+        """
+        Init the ContractQueue.
+        Args:
+            weight: float, the share of the contract in weighted fair queuing.
+        """
+        self.executions = deque()
+        self.weight = weight
+        self.last_finish_tag = 0.0
+        self.missed_deadlines = 0
+
+
+class ExecutionScheduler:
+    """
+    The scheduler between the executor main loop and the worker dispatching.
+
+    The executions are served with self-clocked weighted fair queuing across contracts, so a contract with many
+    executions cannot starve the contracts opened after it: every execution of a contract with weight w advances the
+    contract's virtual finish time by 1 / w, and the execution with the smallest virtual finish time is served first.
+    Executions with a deadline closer than the urgency window are served before all the others, earliest deadline
+    first.
+    """
+    DEFAULT_WEIGHT = 1.0
+
+    def __init__(self, max_queued_executions, urgency_window, clock=time.monotonic):
+        """
+        Init the ExecutionScheduler.
+        Args:
+            max_queued_executions: int, the maximum number of the queued executions of all contracts.
+            urgency_window: float, the executions whose deadline is within this number of seconds are urgent.
+            clock: function, returns the current time in seconds.
+        """
+        self.__max_queued_executions = max_queued_executions
+        self.__urgency_window = urgency_window
+        self.__clock = clock
+        self.__contract_queues = {}
+        self.__queued_execution_count = 0
+        self.__virtual_time = 0.0
+        # Heads of the non empty contract queues, ordered by virtual finish time and by deadline. Entries of removed
+        # or already served executions are skipped lazily when popped.
+        self.__finish_tag_heap = []
+        self.__deadline_heap = []
+        self.__sequence = 0
+
+    def __len__(self):
+        return self.__queued_execution_count
+
+    def set_contract_weight(self, contract_address, weight):
+        """
+        Set the weight (priority) of the contract, the contract with weight 2 gets twice as many worker slots as the
+        contract with weight 1 when both have queued executions.
+        Args:
+            contract_address: string, contract address.
+            weight: float, positive weight.
+
+        """
+        assert weight > 0
+        self._get_contract_queue(contract_address).weight = weight
+
+    def push(self, contract_address, execution_id, commitments, deadline=None):
+        """
+        Queue the execution.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            commitments: commitments of this execution.
+            deadline: float, the clock time the execution should be dispatched before, or None.
+
+        Returns:
+            Boolean, return True if the execution is queued, or False if the scheduler is already full.
+
+        """
+        if self.__queued_execution_count >= self.__max_queued_executions:
+            return False
+        contract_queue = self._get_contract_queue(contract_address)
+        finish_tag = max(self.__virtual_time, contract_queue.last_finish_tag) + 1.0 / contract_queue.weight
+        contract_queue.last_finish_tag = finish_tag
+        execution = ScheduledExecution(contract_address, execution_id, commitments, deadline, finish_tag)
+        contract_queue.executions.append(execution)
+        self.__queued_execution_count += 1
+        if len(contract_queue.executions) == 1:
+            self._push_head(execution)
+        return True
+
+    def peek(self):
+        """
+        Get the next execution to dispatch without taking it.
+        Returns:
+            ScheduledExecution, or None if no execution is queued.
+
+        """
+        execution = self._peek_urgent_head()
+        if execution is None:
+            execution = self._peek_head(self.__finish_tag_heap)
+        return execution
+
+    def pop(self):
+        """
+        Take the next execution to dispatch.
+        Returns:
+            ScheduledExecution, or None if no execution is queued.
+
+        """
+        execution = self.peek()
+        if execution is None:
+            return None
+
+        contract_queue = self.__contract_queues[execution.contract_address]
+        contract_queue.executions.popleft()
+        self.__queued_execution_count -= 1
+        self.__virtual_time = max(self.__virtual_time, execution.finish_tag)
+        if execution.deadline is not None and execution.deadline < self.__clock():
+            contract_queue.missed_deadlines += 1
+            LogUtils.warning("Execution_id: " + str(execution.execution_id) + " of contract@" +
+                             execution.contract_address + " is dispatched after its deadline.")
+        if contract_queue.executions:
+            self._push_head(contract_queue.executions[0])
+        return execution
+
+    def remove_contract(self, contract_address):
+        """
+        Drop all the queued executions and the scheduling state of the contract.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        contract_queue = self.__contract_queues.pop(contract_address, None)
+        if contract_queue is not None:
+            self.__queued_execution_count -= len(contract_queue.executions)
+
+    def get_queue_state(self, contract_address):
+        """
+        Get the scheduling state of the contract.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            dictionary, includes the number of queued executions, the weight, the seconds left before the deadline of
+            the next execution (None if no deadline) and the number of executions dispatched after their deadline.
+
+        """
+        contract_queue = self.__contract_queues.get(contract_address)
+        if contract_queue is None:
+            return {'queued': 0, 'weight': self.DEFAULT_WEIGHT, 'deadline_in': None, 'missed_deadlines': 0}
+        deadline_in = None
+        if contract_queue.executions and contract_queue.executions[0].deadline is not None:
+            deadline_in = contract_queue.executions[0].deadline - self.__clock()
+        return {'queued': len(contract_queue.executions), 'weight': contract_queue.weight,
+                'deadline_in': deadline_in, 'missed_deadlines': contract_queue.missed_deadlines}
+
+    def _get_contract_queue(self, contract_address):
+        if contract_address not in self.__contract_queues:
+            self.__contract_queues[contract_address] = ContractQueue(self.DEFAULT_WEIGHT)
+        return self.__contract_queues[contract_address]
+
+    def _push_head(self, execution):
+        self.__sequence += 1
+        heapq.heappush(self.__finish_tag_heap, (execution.finish_tag, self.__sequence, execution))
+        if execution.deadline is not None:
+            heapq.heappush(self.__deadline_heap, (execution.deadline, self.__sequence, execution))
+
+    def _is_head(self, execution):
+        contract_queue = self.__contract_queues.get(execution.contract_address)
+        return contract_queue is not None and contract_queue.executions and \
+            contract_queue.executions[0] is execution
+
+    def _peek_head(self, heap):
+        # The entries of the executions which are not the head of their contract queue any more are dropped here,
+        # the entry of the returned execution is dropped once it is popped from its contract queue.
+        while heap:
+            execution = heap[0][2]
+            if self._is_head(execution):
+                return execution
+            heapq.heappop(heap)
+        return None
+
+    def _peek_urgent_head(self):
+        execution = self._peek_head(self.__deadline_heap)
+        if execution is None or execution.deadline - self.__clock() > self.__urgency_window:
+            return None
+        return execution
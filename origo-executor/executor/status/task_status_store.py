@@ -0,0 +1,257 @@
+import threading
+
+from collections import OrderedDict, deque
+from executor.worker.execution_result import ExecutionResult
+
+
+class TaskStatus:
+    """
+    The task status maintained by the executor.
+    """
+    REGISTERING, FAILED_TO_REGISTER, LISTENING, EXECUTING, FINISHED, UNREGISTERING, UNREGISTERED = range(7)
+
+    @staticmethod
+    def get_status_info(status):
+        """
+        Get the status info string.
+        Args:
+            status: TaskStatus.
+
+        Returns:
+            string, the status description string.
+
+        """
+        if status == TaskStatus.REGISTERING:
+            return "REGISTERING"
+        elif status == TaskStatus.LISTENING:
+            return "LISTENING"
+        elif status == TaskStatus.EXECUTING:
+            return "EXECUTING"
+        elif status == TaskStatus.FINISHED:
+            return "FINISHED"
+        elif status == TaskStatus.UNREGISTERING:
+            return "UNREGISTERING"
+        elif status == TaskStatus.UNREGISTERED:
+            return "UNREGISTERED"
+        elif status == TaskStatus.FAILED_TO_REGISTER:
+            return "FAILED_TO_REGISTER"
+
+
+class ContractTaskRecord:
+    """
+    The task status of a single contract in the TaskStatusStore.
+    """
+    __slots__ = ('status', 'execution_count', 'result_count', 'failed_count', 'finished_task', 'successful_task',
+                 'recent_failures', 'recent_infos')
+
+    def __init__(self, max_recent_failures, max_recent_infos):
+        """
+        Init the ContractTaskRecord.
+        Args:
+            max_recent_failures: int, the number of the most recent failed executions kept.
+            max_recent_infos: int, the number of the most recent registration infos kept.
+        """
+        self.status = TaskStatus.REGISTERING
+        # The counters of the executions of the current commitment opening.
+        self.execution_count = 0
+        self.result_count = 0
+        self.failed_count = 0
+        # The counters of the finished commitment openings.
+        self.finished_task = 0
+        self.successful_task = 0
+        # (execution id, failure description) of the most recent failed executions, over all the openings.
+        self.recent_failures = deque(maxlen=max_recent_failures)
+        self.recent_infos = deque(maxlen=max_recent_infos)
+
+    def get_progress(self):
+        """
+        Get the progress of the current commitment opening.
+        Returns:
+            float, between 0 and 1.
+
+        """
+        if self.execution_count == 0:
+            return 0.0
+        return 1.0 * self.result_count / self.execution_count
+
+
+class TaskStatusStore:
+    """
+    The task status of all the registered contracts. Every update costs O(1) whatever the number of executions, the
+    failures of every contract are kept in a bounded ring buffer, and the readers get a snapshot copy, so they never
+    hold the store while rendering. The records of the unregistered contracts are kept for the status readers, up to
+    the most recently unregistered ones, so the store does not grow with every contract ever registered.
+    """
+    DEFAULT_MAX_RECENT_FAILURES = 100
+    DEFAULT_MAX_RECENT_INFOS = 10
+    DEFAULT_MAX_UNREGISTERED_RECORDS = 100
+
+    def __init__(self, max_recent_failures=DEFAULT_MAX_RECENT_FAILURES, max_recent_infos=DEFAULT_MAX_RECENT_INFOS,
+                 max_unregistered_records=DEFAULT_MAX_UNREGISTERED_RECORDS):
+        """
+        Init the TaskStatusStore.
+        Args:
+            max_recent_failures: int, the number of the most recent failed executions kept per contract.
+            max_recent_infos: int, the number of the most recent registration infos kept per contract.
+            max_unregistered_records: int, the number of the records of the most recently unregistered contracts kept,
+                the record of the least recently unregistered one is dropped beyond it.
+        """
+        self.__max_recent_failures = max_recent_failures
+        self.__max_recent_infos = max_recent_infos
+        self.__max_unregistered_records = max_unregistered_records
+        self.__records = {}
+        # The addresses of the unregistered contracts whose records are kept, from the least recently unregistered.
+        self.__unregistered = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __contains__(self, contract_address):
+        with self.__lock:
+            return contract_address in self.__records
+
+    def get(self, contract_address):
+        """
+        Get the record of the contract.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            ContractTaskRecord, or None if the contract is never registered or its record is dropped.
+
+        """
+        with self.__lock:
+            return self.__records.get(contract_address)
+
+    def register(self, contract_address):
+        """
+        Start the record of the registered contract, the record of a former registration is replaced.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            Boolean, return False if the contract is registered and not unregistered yet.
+
+        """
+        with self.__lock:
+            record = self.__records.get(contract_address)
+            if record is not None and record.status != TaskStatus.UNREGISTERED:
+                return False
+            self.__unregistered.pop(contract_address, None)
+            self.__records[contract_address] = ContractTaskRecord(self.__max_recent_failures,
+                                                                  self.__max_recent_infos)
+            return True
+
+    def set_status(self, contract_address, status):
+        """
+        Set the status of the contract.
+        Args:
+            contract_address: string, contract address.
+            status: TaskStatus.
+
+        """
+        with self.__lock:
+            self.__records[contract_address].status = status
+            if status != TaskStatus.UNREGISTERED:
+                self.__unregistered.pop(contract_address, None)
+                return
+            self.__unregistered[contract_address] = None
+            self.__unregistered.move_to_end(contract_address)
+            while len(self.__unregistered) > self.__max_unregistered_records:
+                del self.__records[self.__unregistered.popitem(last=False)[0]]
+
+    def add_info(self, contract_address, info):
+        """
+        Add the information about the registration of the contract.
+        Args:
+            contract_address: string, contract address.
+            info: string, the information.
+
+        """
+        with self.__lock:
+            self.__records[contract_address].recent_infos.append(info)
+
+    def start_executions(self, contract_address, execution_count):
+        """
+        Start counting the executions of a commitment opening.
+        Args:
+            contract_address: string, contract address.
+            execution_count: int, the number of the executions of the opening.
+
+        """
+        with self.__lock:
+            record = self.__records[contract_address]
+            record.execution_count = execution_count
+            record.result_count = 0
+            record.failed_count = 0
+
+    def record_result(self, contract_address, execution_id, execution_result, debug_msg=None):
+        """
+        Count the result of an execution.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id for unique execution of this contract.
+            execution_result: ExecutionResult.
+            debug_msg: string, the additional information of the result.
+
+        Returns:
+            Boolean, return True if all the executions of the opening have their result.
+
+        """
+        with self.__lock:
+            record = self.__records[contract_address]
+            record.result_count += 1
+            if execution_result != ExecutionResult.SUCCESS:
+                record.failed_count += 1
+                failure = str(execution_result)
+                if debug_msg is not None:
+                    failure += ' (' + debug_msg + ')'
+                record.recent_failures.append((execution_id, failure))
+            return record.result_count == record.execution_count
+
+    def finish_executions(self, contract_address, still_listening):
+        """
+        Count the finished commitment opening, and reset the execution counters.
+        Args:
+            contract_address: string, contract address.
+            still_listening: boolean, whether the listener of the contract is still up, then the status goes back to
+                LISTENING, otherwise it is FINISHED.
+
+        """
+        with self.__lock:
+            record = self.__records[contract_address]
+            record.finished_task += 1
+            if record.failed_count == 0:
+                record.successful_task += 1
+            record.execution_count = 0
+            record.result_count = 0
+            record.failed_count = 0
+            record.status = TaskStatus.LISTENING if still_listening else TaskStatus.FINISHED
+
+    def get_snapshot(self, contract_address):
+        """
+        Get a copy of the task status of the contract.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            dictionary with keys status, progress, finished_task, successful_task, failed_tasks ({execution id:
+            failure} of the recent failures) and info.
+
+        """
+        with self.__lock:
+            return self._get_snapshot(self.__records[contract_address])
+
+    @staticmethod
+    def _get_snapshot(record):
+        return {'status': record.status, 'progress': record.get_progress(), 'finished_task': record.finished_task,
+                'successful_task': record.successful_task, 'failed_tasks': dict(record.recent_failures),
+                'info': ''.join(info + '; ' for info in record.recent_infos)}
+
+    def get_all_snapshots(self):
+        """
+        Get a copy of the task status of all the contracts.
+        Returns:
+            dictionary, {contract address: snapshot}, see get_snapshot.
+
+        """
+        with self.__lock:
+            return {contract_address: self._get_snapshot(record) for contract_address, record in self.__records.items()}
@@ -32,3 +32,21 @@ class HashUtils:
 
         """
         return int(hashlib.sha256(DataUtils.bits2str(bits_str).encode('raw_unicode_escape')).hexdigest(), 16)
+
+    @staticmethod
+    def compute_file_sha256(file_path, chunk_size=1024 * 1024):
+        """
+        Compute the sha256 of the given file.
+        Args:
+            file_path: string, the file path.
+            chunk_size: int, the bytes read at once.
+
+        Returns:
+            string, the hex digest.
+
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
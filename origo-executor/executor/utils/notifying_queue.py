@@ -0,0 +1,30 @@
+from queue import Queue
+
+
+class NotifyingQueue(Queue):
+    """
+    The bounded queue which sets a shared wakeup event whenever an item is put into it. Consumer can wait on the
+    event to wake up on any of several queues without polling them.
+    """
+    def __init__(self, wakeup_event, maxsize=0):
+        """
+        Init the NotifyingQueue.
+        Args:
+            wakeup_event: threading.Event, the event set after each put.
+            maxsize: int, the maximum number of items in the queue, put blocks when the queue is full. If maxsize is
+                less than or equal to zero, the queue size is infinite.
+        """
+        Queue.__init__(self, maxsize)
+        self.__wakeup_event = wakeup_event
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Put the item into the queue and notify the consumer.
+        Args:
+            item: the item to put.
+            block: boolean, whether block until a free slot is available.
+            timeout: float, the longest time in seconds to block, None means blocking without timeout.
+
+        """
+        Queue.put(self, item, block, timeout)
+        self.__wakeup_event.set()
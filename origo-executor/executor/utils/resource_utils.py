@@ -0,0 +1,37 @@
+import os
+
+
+class ResourceUtils:
+    """
+    The util class for the resource usage of the subprocesses.
+    """
+    # The clock ticks per second of the CPU times in /proc/<pid>/stat.
+    CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    @staticmethod
+    def get_process_usage(pid, proc_path='/proc'):
+        """
+        Sample the resource usage of a running process from procfs.
+        Args:
+            pid: int, the process id.
+            proc_path: string, the procfs mount point.
+
+        Returns:
+            (float, int), the CPU seconds used by the process so far, and its peak resident set size in bytes, or
+            None if the process is gone or procfs is not available.
+
+        """
+        try:
+            with open(os.path.join(proc_path, str(pid), 'stat')) as stat_file:
+                # The command name may contain spaces, the fields are counted after its closing parenthesis.
+                fields = stat_file.read().rsplit(')', 1)[1].split()
+            peak_rss = 0
+            with open(os.path.join(proc_path, str(pid), 'status')) as status_file:
+                for line in status_file:
+                    if line.startswith('VmHWM:'):
+                        peak_rss = int(line.split()[1]) * 1024
+                        break
+        except (OSError, IndexError, ValueError):
+            return None
+        # utime and stime are the 14th and 15th fields of /proc/<pid>/stat.
+        return (int(fields[11]) + int(fields[12])) / ResourceUtils.CLOCK_TICKS, peak_rss
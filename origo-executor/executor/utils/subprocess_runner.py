@@ -0,0 +1,152 @@
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+from executor.utils.resource_utils import ResourceUtils
+
+
+class SubprocessResult:
+    """
+    The result of a subprocess run by the SubprocessRunner.
+    """
+    __slots__ = ['returncode', 'stderr', 'cpu_seconds', 'peak_rss', 'timed_out', 'cancelled']
+
+    def __init__(self, returncode, stderr, cpu_seconds, peak_rss, timed_out=False, cancelled=False):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.cpu_seconds = cpu_seconds
+        self.peak_rss = peak_rss
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+
+    @property
+    def succeeded(self):
+        return self.returncode == 0 and not self.timed_out and not self.cancelled
+
+
+class SubprocessRunner:
+    """
+    Run a subprocess from its argument vector without a shell, in its own process group, with a timeout and
+    cancellation. The stderr of the subprocess is captured, and its CPU time and peak RSS are sampled from procfs while
+    it runs.
+
+    The runner waits by polling, so the caller greenlet yields to the others while the subprocess runs. One runner runs
+    one subprocess at a time, cancel() kills the whole process group of the running one.
+    """
+    # The maximum bytes of stderr kept, the tail of the output is kept.
+    STDERR_LIMIT = 8192
+    # The shortest and longest seconds between two polls, the interval doubles while the subprocess runs.
+    MIN_POLL_INTERVAL = 0.001
+    MAX_POLL_INTERVAL = 0.1
+
+    def __init__(self):
+        self.__process = None
+        self.__cancelled = False
+
+    def run(self, argv, cwd=None, timeout=None, should_cancel=None, stdin_data=None, stdin_path=None):
+        """
+        Run the subprocess and wait until it exits, times out or is cancelled.
+        Args:
+            argv: [string], the argument vector.
+            cwd: string, the working folder of the subprocess.
+            timeout: float, the seconds after which the subprocess is killed, None or 0 means no limit.
+            should_cancel: function, polled while waiting, the subprocess is killed once it returns True.
+            stdin_data: bytes, the data streamed over the stdin of the subprocess.
+            stdin_path: string, the file opened as the stdin of the subprocess.
+
+        Returns:
+            SubprocessResult. The return code is negative if the subprocess is killed by a signal.
+
+        """
+        if self.__cancelled:
+            return SubprocessResult(None, '', 0.0, 0, cancelled=True)
+        deadline = time.monotonic() + timeout if timeout else None
+        cpu_seconds, peak_rss = 0.0, 0
+        timed_out = False
+        stdin = subprocess.DEVNULL
+        if stdin_data is not None:
+            stdin = subprocess.PIPE
+        elif stdin_path is not None:
+            stdin = open(stdin_path, 'rb')
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                self.__process = subprocess.Popen(argv, cwd=cwd, stdin=stdin, stdout=subprocess.DEVNULL,
+                                                  stderr=stderr, start_new_session=True)
+            finally:
+                if stdin_path is not None and stdin_data is None:
+                    stdin.close()
+            process = self.__process
+            if stdin_data is not None:
+                threading.Thread(target=self._write_stdin, args=(process.stdin, stdin_data), daemon=True).start()
+            try:
+                poll_interval = self.MIN_POLL_INTERVAL
+                while process.poll() is None:
+                    usage = ResourceUtils.get_process_usage(process.pid)
+                    if usage is not None:
+                        cpu_seconds, peak_rss = max(cpu_seconds, usage[0]), max(peak_rss, usage[1])
+                    if deadline is not None and time.monotonic() >= deadline:
+                        timed_out = True
+                        self.kill()
+                    elif should_cancel is not None and should_cancel():
+                        self.cancel()
+                    time.sleep(poll_interval)
+                    poll_interval = min(poll_interval * 2, self.MAX_POLL_INTERVAL)
+            finally:
+                self.__process = None
+                if process.returncode is None:
+                    self._kill_process_group(process)
+                    process.wait()
+            stderr.seek(max(0, stderr.seek(0, os.SEEK_END) - self.STDERR_LIMIT))
+            stderr_tail = stderr.read().decode(errors='replace')
+        return SubprocessResult(process.returncode, stderr_tail, cpu_seconds, peak_rss, timed_out, self.__cancelled)
+
+    @staticmethod
+    def _write_stdin(stdin, data):
+        """
+        Stream the data over the stdin of the subprocess, while the runner polls it.
+        Args:
+            stdin: file, the stdin pipe of the subprocess.
+            data: bytes, the data.
+
+        """
+        try:
+            stdin.write(data)
+        except OSError:
+            # The subprocess exited or was killed before reading all its input.
+            pass
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _kill_process_group(process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def kill(self):
+        """
+        Kill the process group of the running subprocess, if any.
+
+        """
+        process = self.__process
+        if process is not None and process.returncode is None:
+            self._kill_process_group(process)
+
+    def cancel(self):
+        """
+        Kill the running subprocess, and refuse to run any subprocess afterwards.
+
+        """
+        self.__cancelled = True
+        self.kill()
+
+    @property
+    def cancelled(self):
+        return self.__cancelled
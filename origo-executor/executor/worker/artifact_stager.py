@@ -0,0 +1,256 @@
+import errno
+import fcntl
+import hashlib
+import os
+import shutil
+import stat
+import threading
+
+from executor.utils.log_utils import LogUtils
+
+
+class StagingMode:
+    """
+    The ways to stage an artifact into the working folder of an execution, from the cheapest.
+    """
+    HARDLINK = 'hardlink'
+    REFLINK = 'reflink'
+    SYMLINK = 'symlink'
+    COPY = 'copy'
+    # Try every mode in this order, and fall back to the next one when the filesystem does not support it.
+    AUTO_ORDER = [HARDLINK, REFLINK, SYMLINK, COPY]
+    ALL_MODES = ['auto'] + AUTO_ORDER
+
+
+class ArtifactStager:
+    """
+    Stage the artifacts of a circuit (compiled program, proving key and variables) into the working folder of every
+    execution without copying them.
+
+    The artifacts of a circuit are snapshotted once into an immutable, read-only artifact set under the staging root,
+    with a reflink if the filesystem supports it or a copy otherwise, so that downloading the artifacts again never
+    changes the files an execution is using. The working folders link to the artifact set with the configured mode;
+    in auto mode the first mode the filesystem supports is used, and a configured mode the filesystem does not support
+    falls back to copying. A mode is verified once per artifact set and filesystem of the working folders, e.g. the
+    scratch path and the working path, and only the verified mode is used afterwards.
+    """
+    # The ioctl request cloning a file on Linux, i.e. a reflink.
+    FICLONE = 0x40049409
+
+    def __init__(self, staging_root, mode='auto'):
+        """
+        Init the ArtifactStager.
+        Args:
+            staging_root: string, the folder holding the artifact sets.
+            mode: string, one of StagingMode.ALL_MODES.
+        """
+        if mode not in StagingMode.ALL_MODES:
+            raise Exception("Unsupported artifact staging mode:" + str(mode))
+        # Symlinks are resolved from the working folders, so the artifact sets are addressed by absolute paths.
+        self.__staging_root = os.path.abspath(staging_root)
+        # A configured mode falls back to copying when the file system does not support it.
+        self.__modes = StagingMode.AUTO_ORDER if mode == 'auto' else list(dict.fromkeys([mode, StagingMode.COPY]))
+        self.__lock = threading.Lock()
+        # {contract address: (version key, artifact set folder)}
+        self.__artifact_sets = {}
+        # {(artifact set folder, device of the working folder): verified StagingMode}
+        self.__verified_modes = {}
+        self.__stats = {'artifact_sets': 0, 'bytes_snapshotted': 0, 'bytes_copied': 0}
+        for staging_mode in StagingMode.AUTO_ORDER:
+            self.__stats[staging_mode] = 0
+
+    @staticmethod
+    def _get_version_key(sources):
+        """
+        Get the key identifying the version of the source artifacts.
+        Args:
+            sources: dictionary, {artifact name: source path}.
+
+        Returns:
+            string, the hex digest of the names, sizes and modification times of the sources.
+
+        """
+        version = hashlib.sha256()
+        for name, source_path in sorted(sources.items()):
+            source_stat = os.stat(source_path)
+            version.update((name + ':' + str(source_stat.st_size) + ':' + str(source_stat.st_mtime_ns) + ';').encode())
+        return version.hexdigest()[:16]
+
+    @staticmethod
+    def reflink(source_path, destination_path):
+        """
+        Clone the file, sharing the data blocks with the source until either is modified.
+        Args:
+            source_path: string, the source file.
+            destination_path: string, the destination file.
+
+        """
+        with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+            try:
+                fcntl.ioctl(destination.fileno(), ArtifactStager.FICLONE, source.fileno())
+            except OSError:
+                destination.close()
+                os.remove(destination_path)
+                raise
+
+    def _snapshot(self, source_path, destination_path):
+        """
+        Snapshot the source artifact into the artifact set, with a reflink if possible or a copy otherwise.
+        Args:
+            source_path: string, the source file.
+            destination_path: string, the file in the artifact set.
+
+        """
+        try:
+            self.reflink(source_path, destination_path)
+        except OSError:
+            shutil.copyfile(source_path, destination_path)
+            self.__stats['bytes_copied'] += os.path.getsize(destination_path)
+        self.__stats['bytes_snapshotted'] += os.path.getsize(destination_path)
+        os.chmod(destination_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    def get_artifact_set(self, contract_address, sources):
+        """
+        Get the immutable artifact set of the contract's circuit, and snapshot it if the sources changed.
+        Args:
+            contract_address: string, contract address.
+            sources: dictionary, {artifact name: source path}.
+
+        Returns:
+            string, the artifact set folder, holding one file per artifact name.
+
+        """
+        version_key = self._get_version_key(sources)
+        with self.__lock:
+            artifact_set = self.__artifact_sets.get(contract_address)
+            if artifact_set is not None and artifact_set[0] == version_key:
+                return artifact_set[1]
+            artifact_set_path = os.path.join(self.__staging_root, contract_address + '_' + version_key)
+            if not os.path.isdir(artifact_set_path):
+                building_path = artifact_set_path + '.building'
+                shutil.rmtree(building_path, ignore_errors=True)
+                os.makedirs(building_path)
+                for name, source_path in sources.items():
+                    self._snapshot(source_path, os.path.join(building_path, name))
+                os.rename(building_path, artifact_set_path)
+                self.__stats['artifact_sets'] += 1
+            # The former artifact set may still be used by running executions through symlinks, it is removed with
+            # the contract.
+            self.__artifact_sets[contract_address] = (version_key, artifact_set_path)
+            return artifact_set_path
+
+    def _link(self, mode, source_path, destination_path):
+        """
+        Link the artifact into the working folder with the given mode.
+        Args:
+            mode: StagingMode.
+            source_path: string, the file in the artifact set.
+            destination_path: string, the file in the working folder.
+
+        """
+        if mode == StagingMode.HARDLINK:
+            os.link(source_path, destination_path)
+        elif mode == StagingMode.REFLINK:
+            self.reflink(source_path, destination_path)
+        elif mode == StagingMode.SYMLINK:
+            os.symlink(source_path, destination_path)
+        else:
+            shutil.copyfile(source_path, destination_path)
+            self.__stats['bytes_copied'] += os.path.getsize(destination_path)
+
+    @staticmethod
+    def _verify_link(mode, source_path, destination_path):
+        """
+        Verify the staged artifact is the artifact of the artifact set.
+        Args:
+            mode: StagingMode.
+            source_path: string, the file in the artifact set.
+            destination_path: string, the file in the working folder.
+
+        Returns:
+            Boolean.
+
+        """
+        source_stat = os.stat(source_path)
+        destination_stat = os.stat(destination_path)
+        if mode in (StagingMode.HARDLINK, StagingMode.SYMLINK):
+            return os.path.samestat(source_stat, destination_stat)
+        return source_stat.st_size == destination_stat.st_size
+
+    def stage(self, contract_address, sources, working_path):
+        """
+        Stage the artifacts of the contract's circuit into the working folder of an execution.
+        Args:
+            contract_address: string, contract address.
+            sources: dictionary, {artifact name in the working folder: source path}.
+            working_path: string, the existing working folder of the execution.
+
+        Returns:
+            StagingMode, the mode used.
+
+        """
+        artifact_set_path = self.get_artifact_set(contract_address, sources)
+        # The modes supported by the working folders depend on their filesystem.
+        verified_key = (artifact_set_path, os.stat(working_path).st_dev)
+        verified_mode = self.__verified_modes.get(verified_key)
+        modes = [verified_mode] if verified_mode is not None else self.__modes
+        for mode in modes:
+            staged = []
+            try:
+                for name in sources:
+                    destination_path = os.path.join(working_path, name)
+                    self._link(mode, os.path.join(artifact_set_path, name), destination_path)
+                    staged.append(destination_path)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL,
+                                   errno.EMLINK, errno.ENOSYS) or mode == modes[-1]:
+                    raise
+                self._remove_files(staged)
+                LogUtils.warning("Artifact staging mode " + mode + " is not supported for " + artifact_set_path +
+                                 ": " + str(e))
+                continue
+            if verified_mode is None:
+                if not all(self._verify_link(mode, os.path.join(artifact_set_path, name),
+                                             os.path.join(working_path, name)) for name in sources):
+                    LogUtils.warning("Artifact staging mode " + mode + " cannot be verified for " + artifact_set_path)
+                    self._remove_files(staged)
+                    if mode == modes[-1]:
+                        raise OSError(errno.EIO, "Failed to stage the artifacts", artifact_set_path)
+                    continue
+                self.__verified_modes[verified_key] = mode
+            self.__stats[mode] += 1
+            return mode
+
+    @staticmethod
+    def _remove_files(file_paths):
+        for file_path in file_paths:
+            if os.path.lexists(file_path):
+                os.remove(file_path)
+
+    def release(self, contract_address):
+        """
+        Remove all the artifact sets of the unregistered contract.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        with self.__lock:
+            self.__artifact_sets.pop(contract_address, None)
+            if not os.path.isdir(self.__staging_root):
+                return
+            for folder in os.listdir(self.__staging_root):
+                if folder.startswith(contract_address + '_'):
+                    artifact_set_path = os.path.join(self.__staging_root, folder)
+                    for verified_key in [key for key in self.__verified_modes if key[0] == artifact_set_path]:
+                        del self.__verified_modes[verified_key]
+                    shutil.rmtree(artifact_set_path, ignore_errors=True)
+
+    def get_stats(self):
+        """
+        Get the staging statistics.
+        Returns:
+            dictionary, the number of artifact sets, the bytes snapshotted into them, the bytes copied (by the
+            snapshots without reflink and by the copy mode), and the number of stagings per mode.
+
+        """
+        return dict(self.__stats)
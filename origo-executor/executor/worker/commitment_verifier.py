@@ -0,0 +1,137 @@
+import hashlib
+
+from concurrent.futures import ThreadPoolExecutor
+from executor.worker.witness_input import WitnessLayout
+
+
+class CommitmentVerifier:
+    """
+    Verify the sha256 hashes of the commitments with integer arithmetic: the limbs of a commitment are extracted with
+    shifts and masks, biased by the random in the field, concatenated into one integer and hashed from its bytes.
+    All the commitments of a batch, e.g. of an execution or of all the executions of a contract, are hashed in one
+    pass, which can be spread across a thread pool.
+
+    The hashed bytes are exactly the former bit string ones: every biased limb takes at least limb_bits bits, and the
+    trailing bits beyond a whole byte are dropped.
+    """
+    # The prime of the field used by Zokrates.
+    FIELD_PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495616
+    # The verifiers created in this process, keyed by their thread pool size.
+    __verifiers = {}
+
+    def __init__(self, thread_pool_size=0, layout=None):
+        """
+        Init the CommitmentVerifier.
+        Args:
+            thread_pool_size: int, the number of threads hashing a batch, 0 hashes in the caller thread.
+            layout: WitnessLayout, the layout of the commitments, the default layout if None.
+        """
+        self.__layout = layout or WitnessLayout.get()
+        self.__limb_bits = self.__layout.limb_bits
+        self.thread_pool_size = thread_pool_size
+        self.__thread_pool = ThreadPoolExecutor(max_workers=thread_pool_size) if thread_pool_size > 0 else None
+
+    @staticmethod
+    def get(thread_pool_size=0):
+        """
+        Get the shared verifier of this process with the given thread pool size.
+        Returns:
+            CommitmentVerifier.
+
+        """
+        verifier = CommitmentVerifier.__verifiers.get(thread_pool_size)
+        if verifier is None:
+            verifier = CommitmentVerifier.__verifiers[thread_pool_size] = CommitmentVerifier(thread_pool_size)
+        return verifier
+
+    def concatenate_limbs(self, limbs):
+        """
+        Concatenate the limbs, each of them taking at least limb_bits bits.
+        Args:
+            limbs: [int], the limbs, from the most significant one.
+
+        Returns:
+            (int, int), the concatenated value and its bit width.
+
+        """
+        value = 0
+        width = 0
+        for limb in limbs:
+            limb_width = max(self.__limb_bits, limb.bit_length())
+            value = (value << limb_width) | limb
+            width += limb_width
+        return value, width
+
+    def bias(self, commitment, random, sign=1):
+        """
+        Bias every limb of the commitment by the random in the field.
+        Args:
+            commitment: int, the commitment.
+            random: int, the random.
+            sign: int, 1 to add the random, -1 to subtract it.
+
+        Returns:
+            [int], the biased limbs.
+
+        """
+        return [(limb + sign * random) % self.FIELD_PRIME for limb in self.__layout.split_commitment(commitment)]
+
+    def get_preimage(self, commitment, random):
+        """
+        Get the bytes hashed into the commitment hash.
+        Args:
+            commitment: int, the commitment.
+            random: int, the random.
+
+        Returns:
+            bytes.
+
+        """
+        value, width = self.concatenate_limbs(self.bias(commitment, random))
+        extra_bits = width % 8
+        return (value >> extra_bits).to_bytes(width // 8, 'big')
+
+    def _find_mismatches_in_chunk(self, items):
+        return [index for index, commitment, random, commitment_hash in items
+                if int.from_bytes(hashlib.sha256(self.get_preimage(commitment, random)).digest(), 'big') !=
+                commitment_hash]
+
+    def find_mismatches(self, commitments, randoms, hashes, skipped_indices=None):
+        """
+        Hash all the commitments of the batch and find the ones not matching their hashes.
+        Args:
+            commitments: list, commitments.
+            randoms: list, random values.
+            hashes: list, hash value of commitments.
+            skipped_indices: list, indices of elements that should be skipped for the checking.
+
+        Returns:
+            [int], the indices of the mismatched commitments, in order.
+
+        """
+        skipped = set(skipped_indices or [])
+        items = [(index, commitment, random, commitment_hash)
+                 for index, (commitment, random, commitment_hash) in enumerate(zip(commitments, randoms, hashes))
+                 if index not in skipped]
+        if self.__thread_pool is None or len(items) < 2 * self.thread_pool_size:
+            return self._find_mismatches_in_chunk(items)
+        chunk_size = -(-len(items) // self.thread_pool_size)
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+        mismatches = []
+        for chunk_mismatches in self.__thread_pool.map(self._find_mismatches_in_chunk, chunks):
+            mismatches.extend(chunk_mismatches)
+        return mismatches
+
+    def unbias(self, biased_commitments, randoms):
+        """
+        Get the original commitments from the biased commitments and their randoms.
+        Args:
+            biased_commitments: list, biased commitments.
+            randoms: list, random values.
+
+        Returns:
+            [int], the original commitments.
+
+        """
+        return [self.concatenate_limbs(self.bias(commitment, random, -1))[0]
+                for commitment, random in zip(biased_commitments, randoms)]
@@ -0,0 +1,137 @@
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.worker.decryptor.null_decryptor import NullDecryptor
+from executor.worker.decryptor.rsa_decryptor import RSADecryptor
+from executor.worker.executor_worker_exception import DecryptionException
+
+# The encryption info of the decryption processes, set by the pool initializer.
+_process_encryption_info = None
+
+
+def _init_decryption_process(encryption_info):
+    """
+    Load the key once when a decryption process starts.
+    Args:
+        encryption_info: dictionary, the encryption type and key.
+
+    """
+    global _process_encryption_info
+    _process_encryption_info = encryption_info
+    DecryptionService.get_decryptor(encryption_info)
+
+
+def _decrypt_batch(encrypted_data):
+    """
+    Decrypt a batch in a decryption process.
+    Args:
+        encrypted_data: [int], the encrypted values.
+
+    Returns:
+        ([int], float), the decrypted values in order and the seconds spent decrypting them.
+
+    """
+    start = time.perf_counter()
+    decryptor = DecryptionService.get_decryptor(_process_encryption_info)
+    decrypted_data = [decryptor.decrypt(datum) for datum in encrypted_data]
+    return decrypted_data, time.perf_counter() - start
+
+
+class DecryptionService:
+    """
+    The decryption shared by all the workers of the executor process. The key is loaded once in every process of a
+    pool, and the encrypted inputs of an execution are decrypted in batches spread across the pool, so the executions
+    do not decrypt one value after another in their greenlet. The null encryption is decrypted in the caller.
+    """
+    # The decryptors created in this process, keyed by the encryption info, so that the key is loaded once per process.
+    __decryptor_cache = {}
+
+    def __init__(self, encryption_info, pool_size=0, batch_size=16):
+        """
+        Init the DecryptionService.
+        Args:
+            encryption_info: dictionary, the encryption type and key.
+            pool_size: int, the number of decryption processes, 0 means the number of CPUs.
+            batch_size: int, the number of values decrypted by a process at once.
+        """
+        # Check the encryption info and load the key before the executions start.
+        DecryptionService.get_decryptor(encryption_info)
+        self.encryption_info = encryption_info
+        if pool_size <= 0:
+            pool_size = os.cpu_count() or 1
+        self.pool_size = pool_size
+        self.batch_size = max(1, batch_size)
+        self.__pool = None
+        if encryption_info['type'] != 'null':
+            self.__pool = ProcessPoolExecutor(max_workers=pool_size, initializer=_init_decryption_process,
+                                              initargs=(encryption_info,))
+        self.__registry = ExecutorMetrics.get_registry()
+
+    @staticmethod
+    def get_decryptor(encryption_info):
+        """
+        Get the decryptor for the encryption info, the decryptor is created once per process.
+        Args:
+            encryption_info: dictionary, the encryption type and key.
+
+        Returns:
+            Decryptor.
+
+        """
+        cache_key = (encryption_info['type'], encryption_info.get('rsa_key'))
+        if cache_key not in DecryptionService.__decryptor_cache:
+            if encryption_info['type'] == 'ecdsa':
+                raise NotImplementedError("ECDSA encryption is not supported yet. Use RSA")
+            elif encryption_info['type'] == 'rsa':
+                assert 'rsa_key' in encryption_info
+                decryptor = RSADecryptor(encryption_info['rsa_key'])
+            elif encryption_info['type'] == 'null':
+                decryptor = NullDecryptor()
+            else:
+                raise Exception("Not supported encryption type:" + encryption_info['type'])
+            DecryptionService.__decryptor_cache[cache_key] = decryptor
+        return DecryptionService.__decryptor_cache[cache_key]
+
+    def decrypt(self, encrypted_private_inputs, skipped_indices):
+        """
+        Decrypt the encrypted inputs of an execution, the commitments followed by their randoms.
+        Args:
+            encrypted_private_inputs: list, encrypted user inputs.
+            skipped_indices: list, the indices of the commitments whose commitment and random are not decrypted and
+                keep the original.
+
+        Returns:
+            List, the decrypted users' private inputs in the same order as the original encrypted list.
+
+        """
+        commitment_size = len(encrypted_private_inputs) // 2
+        skipped = set(skipped_indices or [])
+        decrypted_ret = list(encrypted_private_inputs)
+        indices = [index for index in range(len(encrypted_private_inputs))
+                   if not commitment_size or index % commitment_size not in skipped]
+        if self.__pool is None:
+            return decrypted_ret
+        batches = [indices[start:start + self.batch_size] for start in range(0, len(indices), self.batch_size)]
+        futures = [self.__pool.submit(_decrypt_batch, [encrypted_private_inputs[index] for index in batch])
+                   for batch in batches]
+        try:
+            for batch, future in zip(batches, futures):
+                decrypted_data, seconds = future.result()
+                self.__registry.observe(ExecutorMetrics.DECRYPTION_BATCH_LATENCY, seconds)
+                for index, datum in zip(batch, decrypted_data):
+                    decrypted_ret[index] = datum
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise DecryptionException
+        return decrypted_ret
+
+    def shutdown(self):
+        """
+        Shutdown the decryption processes.
+
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False)
@@ -1,6 +1,5 @@
 from Crypto.Cipher import PKCS1_v1_5
 from Crypto.PublicKey import RSA
-from executor.utils.data_utils import DataUtils
 from executor.worker.decryptor.decryptor import Decryptor
 
 
@@ -12,9 +11,10 @@ class RSADecryptor(Decryptor):
         """
         Init RSADecryptor.
         """
-        key_file = open(pem_path, 'rb')
-        private_key = RSA.importKey(key_file.read())
+        with open(pem_path, 'rb') as key_file:
+            private_key = RSA.importKey(key_file.read())
         self.__decryptor = PKCS1_v1_5.new(private_key)
+        self.__key_bytes = private_key.size_in_bytes()
 
     def decrypt(self, encrypted_data):
         """
@@ -26,7 +26,6 @@ class RSADecryptor(Decryptor):
             Decrypted data from the input encrypted data.
 
         """
-
-        encrypted_bytes = DataUtils.int2bytes(encrypted_data, 128)
+        encrypted_bytes = encrypted_data.to_bytes(self.__key_bytes, 'big')
         re = self.__decryptor.decrypt(encrypted_bytes, None)
-        return DataUtils.bytes2int(re)
+        return int.from_bytes(re, 'big')
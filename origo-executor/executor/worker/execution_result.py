@@ -3,11 +3,16 @@ class ExecutionResult:
     The execution result returned by the ExecutionWorker. Executor main thread will use this to check the worker status.
     """
     SUCCESS, FAIL, FAILED_TO_PREPARE, FAILED_TO_GENERATE_PROOF, FAILED_TO_SUBMIT_PROOF, FAILED_TO_DECRYPT,\
-        MISS_EXECUTION_INFO, INVALID_COMMITMENTS, HASH_NOT_MATCH = range(9)
+        MISS_EXECUTION_INFO, INVALID_COMMITMENTS, HASH_NOT_MATCH, QUEUE_FULL = range(10)
     RESULT_EXPLANATION = [
         'worker execution succeed', 'online verification failed', 'worker failed to prepare proof generation', 'worker failed to generate proof',
         'worker failed to submit proof to chain', 'worker failed to decrypt encrypted data', 'missing execution info',
-        'invalid input commitment', 'commitment hashes cannot match'
+        'invalid input commitment', 'commitment hashes cannot match', 'execution queue is full'
+    ]
+    # The short names used as the label values of the metrics.
+    RESULT_NAMES = [
+        'success', 'fail', 'failed_to_prepare', 'failed_to_generate_proof', 'failed_to_submit_proof',
+        'failed_to_decrypt', 'miss_execution_info', 'invalid_commitments', 'hash_not_match', 'queue_full'
     ]
 
     @staticmethod
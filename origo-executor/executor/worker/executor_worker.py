@@ -1,12 +1,15 @@
 from abc import abstractmethod
 from executor.constants.executor_constants import ExecutorConstants
-from executor.worker.decryptor.rsa_decryptor import RSADecryptor
-from executor.worker.decryptor.null_decryptor import NullDecryptor
+from executor.journal.execution_journal import ExecutionJournal, ExecutionStage
+from executor.metrics.latency_recorder import LatencyRecorder, LatencyStage
+from executor.worker.decryptor.decryption_service import DecryptionService
 from executor.worker.execution_result import ExecutionResult
 from executor.worker.executor_worker_exception import DecryptionException, \
     PreparationException, ProofException, SubmissionException, CommitmentHashNotMatch, CommitmentValidationFailed
+from executor.worker.stage_runner import InlineStageRunner
 from executor.utils.data_utils import DataUtils
 from executor.utils.log_utils import LogUtils
+from executor.utils.subprocess_runner import SubprocessRunner
 from gevent import Greenlet
 
 
@@ -14,8 +17,7 @@ class ExecutorWorker(Greenlet):
     """
     Executor base class.
     """
-
-    def __init__(self, execution_info, execution_result_queue, submit_lock=None, debug=False):
+    def __init__(self, execution_info, execution_result_queue, debug=False):
         """
         Init the Executor.
         Args:
@@ -31,17 +33,15 @@ class ExecutorWorker(Greenlet):
         self.__should_exit = False
 
         assert 'encryption_info' in execution_info
-        encryption_info = execution_info['encryption_info']
-        self.__decryptor = None
-        if encryption_info['type'] == 'ecdsa':
-            raise NotImplementedError("ECDSA encryption is not supported yet. Use RSA")
-        elif encryption_info['type'] == 'rsa':
-            assert 'rsa_key' in encryption_info
-            self.__decryptor = RSADecryptor(encryption_info['rsa_key'])
-        elif encryption_info['type'] == 'null':
-            self.__decryptor = NullDecryptor()
-        else:
-            raise Exception("Not supported encryption type:" + encryption_info['type'])
+        self.__encryption_info = execution_info['encryption_info']
+        # The decryption shared by the workers, the inputs are decrypted by the decryption stage if not given.
+        self.__decryption_service = execution_info.get('decryption_service')
+        if self.__decryption_service is None:
+            # Check the encryption info and load the key before the execution starts.
+            self.get_decryptor(self.__encryption_info)
+
+        # The runner of the CPU-bound stages, the stages run inside this greenlet if not given.
+        self.__stage_runner = execution_info.get('stage_runner') or InlineStageRunner()
 
         assert 'commitments' in execution_info
         self.__encrypted_commitments = execution_info['commitments']
@@ -54,21 +54,94 @@ class ExecutorWorker(Greenlet):
         else:
             self.__execution_id = None
 
-        self.submit_lock = submit_lock
+        # The journal of the execution stages, the journal is disabled if not given.
+        self.__journal = execution_info.get('journal')
+        self.__commitments_digest = ExecutionJournal.digest_commitments(self.__encrypted_commitments)
+
+        # The ClusterCoordinator of this node in cluster mode, the proof is only submitted while this node owns the
+        # contract.
+        self.__cluster = execution_info.get('cluster')
+
+        # The recorder of the stage latencies, the latency is not recorded if not given.
+        self.__latency_recorder = execution_info.get('latency_recorder') or LatencyRecorder(enabled=False)
+
+        # The runner of the subprocesses of this execution, stopping the worker kills the running one.
+        self.subprocess_runner = SubprocessRunner()
+        # The peak RSS of the prover processes of this execution, reported with the execution result.
+        self.peak_rss = 0
+
         self.commitments = None
         self.randoms = None
         self.hashes = None
 
-    def decrypt_inputs(self, encrypted_private_inputs, skipped_indices):
+    def run_stage(self, function, *args):
         """
-        Decrypt the encrypted inputs from users.
+        Run a CPU-bound stage with the stage runner of the worker.
+        Args:
+            function: function, the stage function. It must be a module level function or static method, and the
+                arguments must be picklable, as the stage may run in another process.
+            *args: the arguments of the stage function.
+
+        Returns:
+            The return value of the stage function.
+
+        """
+        return self.__stage_runner.run(function, *args)
+
+    def record_peak_rss(self, peak_rss):
+        """
+        Record the peak RSS of a prover process of this execution.
+        Args:
+            peak_rss: int, the peak RSS in bytes.
+
+        """
+        self.peak_rss = max(self.peak_rss, peak_rss)
+
+    def discard_proof(self):
+        """
+        Discard the proof of this execution wherever it is kept for reuse, as it failed the online verification.
+
+        """
+        pass
+
+    def time_stage(self, stage):
+        """
+        Time a stage of this execution, to be used as a context manager.
+        Args:
+            stage: LatencyStage.
+
+        Returns:
+            The span of the latency recorder.
+
+        """
+        return self.__latency_recorder.span(stage, self.contract_address, self.__execution_id)
+
+    @staticmethod
+    def get_decryptor(encryption_info):
+        """
+        Get the decryptor for the encryption info, the decryptor is created once per process.
+        Args:
+            encryption_info: dictionary, the encryption type and key.
+
+        Returns:
+            Decryptor.
+
+        """
+        return DecryptionService.get_decryptor(encryption_info)
+
+    @staticmethod
+    def decrypt_data(encryption_info, encrypted_private_inputs, skipped_indices):
+        """
+        Decrypt the encrypted inputs from users, this is the decryption stage run by the stage runner.
         Args:
+            encryption_info: dictionary, the encryption type and key.
             encrypted_private_inputs: list, encrypted user inputs.
             skipped_indices: list, the indices of elements in the list that should be skipped decryption and keep
                 the original.
         Returns:
             List, the decrypted users' private inputs in the same order as the original encrypted list.
         """
+        decryptor = ExecutorWorker.get_decryptor(encryption_info)
         decrypted_ret = []
         commitment_size = len(encrypted_private_inputs) / 2
         for index in range(len(encrypted_private_inputs)):
@@ -77,12 +150,27 @@ class ExecutorWorker(Greenlet):
                 if skipped_indices is not None and (index % commitment_size) in skipped_indices:
                     decrypted_ret.append(datum)
                 else:
-                    decrypted_datum = self.__decryptor.decrypt(datum)
+                    decrypted_datum = decryptor.decrypt(datum)
                     decrypted_ret.append(decrypted_datum)
             except Exception:
                 raise DecryptionException
         return decrypted_ret
 
+    def decrypt_inputs(self, encrypted_private_inputs, skipped_indices):
+        """
+        Decrypt the encrypted inputs from users.
+        Args:
+            encrypted_private_inputs: list, encrypted user inputs.
+            skipped_indices: list, the indices of elements in the list that should be skipped decryption and keep
+                the original.
+        Returns:
+            List, the decrypted users' private inputs in the same order as the original encrypted list.
+        """
+        if self.__decryption_service is not None:
+            return self.__decryption_service.decrypt(encrypted_private_inputs, skipped_indices)
+        return self.run_stage(ExecutorWorker.decrypt_data, self.__encryption_info, encrypted_private_inputs,
+                              skipped_indices)
+
     @abstractmethod
     def generate_proof(self, contract_id, execution_id):
         """
@@ -128,11 +216,27 @@ class ExecutorWorker(Greenlet):
             proof: the ZKP proof for the execution result based on the given users' inputs.
 
         Returns:
-            Boolean, if submission succeeds, then return True, otherwise return False.
+            The hash of the submission transaction, or None if not available. SubmissionException is raised if the
+            submission failed.
 
         """
         raise NotImplementedError('Abstract method, not implemented yet')
 
+    def resume_settlement(self, contract_id, execution_id, tx_hash):
+        """
+        Follow the settlement of the transaction submitted before the restart, so that wait_for_verify_and_settle_event
+        waits for it instead of a new submission.
+        Args:
+            contract_id: string, the unique identifier for the contract.
+            execution_id: string, the identity number for different execution of the same contract.
+            tx_hash: string, the hash of the submission transaction recorded in the journal.
+
+        Returns:
+            Boolean, False if the transaction cannot be followed, e.g. it is dropped, then the proof is submitted again.
+
+        """
+        return False
+
     @abstractmethod
     def wait_for_verify_and_settle_event(self, contract_id, execution_id):
         """
@@ -156,14 +260,20 @@ class ExecutorWorker(Greenlet):
             debug_msg: string, the additional info for the execution result if not None
 
         """
+        if self.__should_exit:
+            # The worker is stopped by the executor, which does not wait for its result any more.
+            return
         debug_str = ExecutionResult.get_result_description(execution_result)
         if debug_msg is not None:
             debug_str += (', ' + debug_msg)
         result = {'execution_result': execution_result, 'contract_address': self.contract_address,
                   'execution_id': self.__execution_id, 'debug_msg': debug_str}
+        if self.peak_rss:
+            result['peak_rss'] = self.peak_rss
         self.__execution_result_queue.put(result)
 
-    def _check_commitments_validation(self, inputs):
+    @staticmethod
+    def _check_commitments_validation(inputs):
         """
         Check the validation of the input commitments.
         Args:
@@ -241,88 +351,238 @@ class ExecutorWorker(Greenlet):
         """
         raise NotImplementedError('Abstract method, not implemented yet')
 
-    def _run(self):
+    def get_witness_artifact(self):
         """
-        Finish the execution and proof generation and submit all the result back to block chain.
+        Get the location of the witness computed by prepare_proof_generation, which is recorded in the journal.
+        Returns:
+            string, the witness location, or None if the witness cannot be reused.
 
         """
-        if self.debug:
-            LogUtils.info("Start to check commitment validation")
-        try:
-            commitments, randoms, self.hashes = self._check_commitments_validation(self.__encrypted_commitments)
-        except CommitmentValidationFailed:
-            self.submit_execution_result(ExecutionResult.INVALID_COMMITMENTS)
-            return
-        if self.debug:
-            LogUtils.info("Start to decrypt")
-        try:
+        return None
+
+    def restore_witness(self, witness_artifact):
+        """
+        Check whether the witness recorded in the journal before the restart can be used to generate the proof.
+        Args:
+            witness_artifact: string, the witness location returned by get_witness_artifact.
+
+        Returns:
+            Boolean, return True if generate_proof can use the witness without preparing the proof generation again.
+
+        """
+        return False
+
+    def _record_stage(self, stage, **artifacts):
+        """
+        Record the stage transition of this execution into the journal, if the journal is enabled.
+        Args:
+            stage: ExecutionStage.
+            **artifacts: the artifacts produced by the stage, see ExecutionJournal.record_stage.
+
+        """
+        if self.__journal is not None:
+            self.__journal.record_stage(self.contract_address, self.__execution_id, self.__commitments_digest, stage,
+                                        **artifacts)
+
+    def _generate_output_and_proof(self, witness_restored):
+        """
+        Check and decrypt the commitments, then compute the witness and generate the proof.
+        Args:
+            witness_restored: boolean, whether the witness is restored from the journal, then the stages before the
+                proof generation are skipped.
+
+        Returns:
+            The output and the proof, or None, None if any stage failed and the failure is already submitted, or the
+            worker is stopped.
+
+        """
+        if not witness_restored:
             if self.debug:
-                LogUtils.info("Input encrypted commitment:" + str(commitments))
-                LogUtils.info("Input encrypted random:" + str(randoms))
-            # find out the data that should be skipped: if the commitment, random and hash are all the same value, then
-            # the decryption and hash check will be skipped for those input.
-            skipped_indices = self._find_skipped_commitment_indices(commitments, randoms, self.hashes)
-            decrypted_commitments_and_randoms = self.decrypt_inputs(commitments + randoms, skipped_indices)
-            half = int(len(decrypted_commitments_and_randoms) / 2)
-            self.commitments = decrypted_commitments_and_randoms[:half]
-            self.randoms = decrypted_commitments_and_randoms[half:]
+                LogUtils.info("Start to check commitment validation")
+            try:
+                with self.time_stage(LatencyStage.VALIDATE):
+                    commitments, randoms, self.hashes = self.run_stage(
+                        ExecutorWorker._check_commitments_validation, self.__encrypted_commitments)
+            except CommitmentValidationFailed:
+                self.submit_execution_result(ExecutionResult.INVALID_COMMITMENTS)
+                return None, None
             if self.debug:
-                LogUtils.info("Input decrypted commitment:" + str(self.commitments))
-                LogUtils.info("Input decrypted random:" + str(self.randoms))
-        except DecryptionException:
-            self.submit_execution_result(ExecutionResult.FAILED_TO_DECRYPT)
-            return
-        if self.debug:
-            LogUtils.info("Start to check sha256 of commitments")
-        try:
-            self.check_commitments(self.commitments, self.randoms, self.hashes, skipped_indices)
-        except CommitmentHashNotMatch:
-            self.submit_execution_result(ExecutionResult.HASH_NOT_MATCH)
-            return
-        if self.debug:
-            LogUtils.info("Start to prepare proof")
-        try:
-            self.prepare_proof_generation(self.contract_address, self.__execution_id)
-        except PreparationException:
-            self.submit_execution_result(ExecutionResult.FAILED_TO_PREPARE)
-            return
+                LogUtils.info("Start to decrypt")
+            try:
+                if self.debug:
+                    LogUtils.info("Input encrypted commitment:" + str(commitments))
+                    LogUtils.info("Input encrypted random:" + str(randoms))
+                # find out the data that should be skipped: if the commitment, random and hash are all the same value,
+                # then the decryption and hash check will be skipped for those input.
+                skipped_indices = self._find_skipped_commitment_indices(commitments, randoms, self.hashes)
+                with self.time_stage(LatencyStage.DECRYPT):
+                    decrypted_commitments_and_randoms = self.decrypt_inputs(commitments + randoms, skipped_indices)
+                half = int(len(decrypted_commitments_and_randoms) / 2)
+                self.commitments = decrypted_commitments_and_randoms[:half]
+                self.randoms = decrypted_commitments_and_randoms[half:]
+                if self.debug:
+                    LogUtils.info("Input decrypted commitment:" + str(self.commitments))
+                    LogUtils.info("Input decrypted random:" + str(self.randoms))
+            except DecryptionException:
+                self.submit_execution_result(ExecutionResult.FAILED_TO_DECRYPT)
+                return None, None
+            if self.debug:
+                LogUtils.info("Start to check sha256 of commitments")
+            try:
+                with self.time_stage(LatencyStage.HASH_CHECK):
+                    self.check_commitments(self.commitments, self.randoms, self.hashes, skipped_indices)
+            except CommitmentHashNotMatch:
+                self.submit_execution_result(ExecutionResult.HASH_NOT_MATCH)
+                return None, None
+            if self.should_exit():
+                return None, None
+            if self.debug:
+                LogUtils.info("Start to prepare proof")
+            try:
+                with self.time_stage(LatencyStage.PREPARE):
+                    self.prepare_proof_generation(self.contract_address, self.__execution_id)
+            except PreparationException:
+                self.submit_execution_result(ExecutionResult.FAILED_TO_PREPARE)
+                return None, None
+            self._record_stage(ExecutionStage.PREPARED, witness=self.get_witness_artifact())
+        if self.should_exit():
+            return None, None
         if self.debug:
             LogUtils.info("Start to generate_proof")
         try:
-            output, proof = self.generate_proof(self.contract_address, self.__execution_id)
+            with self.time_stage(LatencyStage.PROVE):
+                output, proof = self.generate_proof(self.contract_address, self.__execution_id)
             if self.debug:
                 LogUtils.info('output is:' + str(output))
                 LogUtils.info('proof is:' + str(proof))
         except ProofException:
             self.submit_execution_result(ExecutionResult.FAILED_TO_GENERATE_PROOF)
-            return
+            return None, None
+        self._record_stage(ExecutionStage.PROVED, output=output, proof=proof)
+        return output, proof
+
+    def _resume_settlement(self, tx_hash):
+        """
+        Wait for the settlement of the transaction submitted before the restart.
+        Args:
+            tx_hash: string, the hash of the submission transaction recorded in the journal.
+
+        Returns:
+            Boolean, the verification result, or None if the transaction is not mined, then the proof is submitted
+            again.
+
+        """
+        if not self.resume_settlement(self.contract_address, self.__execution_id, tx_hash):
+            LogUtils.warning("Transaction " + tx_hash + " of execution " + str(self.__execution_id) + " is dropped, "
+                             "submit the proof again.")
+            return None
+        if self.debug:
+            LogUtils.info("Proof is already submitted before, wait for its settlement.")
+        try:
+            with self.time_stage(LatencyStage.SETTLE):
+                return self.wait_for_verify_and_settle_event(self.contract_address, self.__execution_id)
+        except SubmissionException as e:
+            LogUtils.warning(str(e) + ", submit the proof again.")
+            return None
+
+    def _submit_and_settle(self, output, proof):
+        """
+        Submit the proof and wait for its settlement.
+        Args:
+            output: the result of the final execution.
+            proof: the ZKP proof for the execution result.
+
+        Returns:
+            Boolean, the verification result, or None if the submission failed and its result is reported.
+
+        """
+        if self.__cluster is not None and not self.__cluster.owns_contract(self.contract_address):
+            # Another node took over the contract, and proves the execution itself.
+            LogUtils.warning("Contract@" + self.contract_address + " is no longer owned by this node, the proof of "
+                             "execution " + str(self.__execution_id) + " is not submitted.")
+            self.submit_execution_result(ExecutionResult.FAILED_TO_SUBMIT_PROOF, 'contract is owned by another node')
+            return None
         if self.debug:
             LogUtils.info("Start to submit proof")
         try:
-            if self.submit_lock and self.submit_lock.acquire():
-                try:
-                    self.submit_proof_to_chain(self.contract_address, self.__execution_id, output, proof)
-                finally:
-                    self.submit_lock.release()
-            else:
-                self.submit_proof_to_chain(self.contract_address, self.__execution_id, output, proof)
+            # The submissions of the workers run concurrently, the chain interface orders the transactions.
+            with self.time_stage(LatencyStage.SUBMIT):
+                tx_hash = self.submit_proof_to_chain(self.contract_address, self.__execution_id, output, proof)
         except SubmissionException:
             self.submit_execution_result(ExecutionResult.FAILED_TO_SUBMIT_PROOF)
-            return
+            return None
+        self._record_stage(ExecutionStage.SUBMITTED, tx_hash=tx_hash)
         if self.debug:
             LogUtils.info("Finished proof submission, waiting for VerifyAndSettleEvent")
-        verification_result = self.wait_for_verify_and_settle_event(self.contract_address, self.__execution_id)
+        try:
+            with self.time_stage(LatencyStage.SETTLE):
+                return self.wait_for_verify_and_settle_event(self.contract_address, self.__execution_id)
+        except SubmissionException:
+            # The transaction is not mined, e.g. dropped by the node.
+            self.submit_execution_result(ExecutionResult.FAILED_TO_SUBMIT_PROOF)
+            return None
+
+    def _run(self):
+        """
+        Finish the execution and proof generation and submit all the result back to block chain.
+
+        If the journal is enabled, the execution resumes from the last stage recorded before the restart: a settled
+        execution only reports its result again, a generated proof is submitted again without generating it again, and
+        a submitted proof waits for the settlement of its recorded transaction, it is submitted again only if the
+        transaction is dropped or not mined.
+
+        """
+        journal_entry = None
+        if self.__journal is not None:
+            journal_entry = self.__journal.get_execution(self.contract_address, self.__execution_id,
+                                                         self.__commitments_digest)
+        if journal_entry is not None and journal_entry['stage'] == ExecutionStage.SETTLED:
+            if self.debug:
+                LogUtils.info("Execution is already settled before, resumed from the journal.")
+            self.submit_execution_result(journal_entry['result'], 'resumed from journal')
+            return
+        if journal_entry is not None and journal_entry['stage'] >= ExecutionStage.PROVED:
+            if self.debug:
+                LogUtils.info("Proof is already generated before, resumed from the journal.")
+            output, proof = journal_entry['output'], journal_entry['proof']
+        else:
+            witness_restored = journal_entry is not None and journal_entry['stage'] == ExecutionStage.PREPARED and \
+                self.restore_witness(journal_entry['witness'])
+            if not witness_restored:
+                self._record_stage(ExecutionStage.STARTED)
+            output, proof = self._generate_output_and_proof(witness_restored)
+            if proof is None:
+                return
+        if self.should_exit():
+            return
+        verification_result = None
+        if journal_entry is not None and journal_entry['stage'] == ExecutionStage.SUBMITTED and \
+                journal_entry['tx_hash']:
+            # The transaction submitted before the restart may be mined already, a new one would be a duplicate.
+            verification_result = self._resume_settlement(journal_entry['tx_hash'])
+        if verification_result is None:
+            verification_result = self._submit_and_settle(output, proof)
+        if verification_result is None or self.should_exit():
+            return
         if verification_result:
             if self.debug:
                 LogUtils.info("Online verification succeeded.")
+            self._record_stage(ExecutionStage.SETTLED, result=ExecutionResult.SUCCESS)
             self.submit_execution_result(ExecutionResult.SUCCESS)
         else:
             if self.debug:
                 LogUtils.info("Online verification failed.")
+            self.discard_proof()
+            self._record_stage(ExecutionStage.SETTLED, result=ExecutionResult.FAIL)
             self.submit_execution_result(ExecutionResult.FAIL)
 
     def should_exit(self):
         return self.__should_exit
 
     def stop(self):
+        """
+        Stop the worker: the running subprocess is killed, and the execution stops before its next stage.
+
+        """
         self.__should_exit = True
+        self.subprocess_runner.cancel()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+
+from collections import OrderedDict
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.utils.hash_utils import HashUtils
+from executor.utils.log_utils import LogUtils
+
+
+class ProofCache:
+    """
+    The content-addressed cache of the generated proofs on the disk. An entry is keyed by the sha256 of the compiled
+    program, the sha256 of the proving key and the witness arguments, so an execution with the same circuit and the
+    same inputs, e.g. a retried execution or an execution with all the slots skipped, reuses the output and the proof
+    without computing the witness or generating the proof.
+
+    The cache is bounded by its size on the disk, the least recently used entries are evicted first. The recency is
+    kept in the modification time of the entry files, so it survives a restart.
+    """
+    def __init__(self, cache_path, capacity):
+        """
+        Init the ProofCache and index the entries already on the disk.
+        Args:
+            cache_path: string, the cache folder.
+            capacity: int, the maximum bytes of the entries.
+        """
+        self.__cache_path = cache_path
+        self.capacity = capacity
+        self.__lock = threading.Lock()
+        # {key: entry bytes}, from the least recently used.
+        self.__entries = OrderedDict()
+        self.size = 0
+        # {(file path, size, mtime_ns): sha256}, so the proving key is hashed once per version.
+        self.__file_digests = {}
+        self.__registry = ExecutorMetrics.get_registry()
+        os.makedirs(cache_path, exist_ok=True)
+        entries = []
+        for entry in os.scandir(cache_path):
+            if entry.name.endswith('.json'):
+                entry_stat = entry.stat()
+                entries.append((entry_stat.st_mtime_ns, entry.name[:-len('.json')], entry_stat.st_size))
+            elif entry.name.endswith('.tmp'):
+                os.remove(entry.path)
+        for _, key, entry_size in sorted(entries):
+            self.__entries[key] = entry_size
+            self.size += entry_size
+        self._evict()
+
+    def _get_file_digest(self, file_path):
+        file_stat = os.stat(file_path)
+        version = (os.path.realpath(file_path), file_stat.st_size, file_stat.st_mtime_ns)
+        digest = self.__file_digests.get(version)
+        if digest is None:
+            digest = self.__file_digests[version] = HashUtils.compute_file_sha256(file_path)
+        return digest
+
+    def get_key(self, code_path, proving_key_path, arguments):
+        """
+        Get the cache key of an execution.
+        Args:
+            code_path: string, the compiled program of the circuit.
+            proving_key_path: string, the proving key of the circuit.
+            arguments: [string], the witness arguments.
+
+        Returns:
+            string, the key.
+
+        """
+        key = hashlib.sha256()
+        key.update(self._get_file_digest(code_path).encode())
+        key.update(self._get_file_digest(proving_key_path).encode())
+        key.update(' '.join(str(argument) for argument in arguments).encode())
+        return key.hexdigest()
+
+    def _get_entry_path(self, key):
+        return os.path.join(self.__cache_path, key + '.json')
+
+    def get(self, key):
+        """
+        Get the cached output and proof.
+        Args:
+            key: string, the key returned by get_key.
+
+        Returns:
+            (list, dictionary), the output and the proof, or None if not cached.
+
+        """
+        with self.__lock:
+            cached = key in self.__entries
+            if cached:
+                self.__entries.move_to_end(key)
+        entry = None
+        if cached:
+            try:
+                with open(self._get_entry_path(key)) as entry_file:
+                    entry = json.load(entry_file)
+                os.utime(self._get_entry_path(key))
+            except (OSError, ValueError) as e:
+                LogUtils.warning("Failed to read the cached proof " + key + ": " + str(e))
+                self.remove(key)
+        self.__registry.increment(ExecutorMetrics.PROOF_CACHE_TOTAL, 1, {'result': 'miss' if entry is None else 'hit'})
+        if entry is None:
+            return None
+        return entry['output'], entry['proof']
+
+    def put(self, key, output, proof):
+        """
+        Cache the output and proof, and evict the least recently used entries beyond the capacity.
+        Args:
+            key: string, the key returned by get_key.
+            output: list, the output of the execution.
+            proof: dictionary, the proof.
+
+        """
+        entry_path = self._get_entry_path(key)
+        tmp_path = entry_path + '.' + str(threading.get_ident()) + '.tmp'
+        with open(tmp_path, 'w') as entry_file:
+            json.dump({'output': output, 'proof': proof}, entry_file)
+        entry_size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, entry_path)
+        with self.__lock:
+            self.size += entry_size - self.__entries.pop(key, 0)
+            self.__entries[key] = entry_size
+            self._evict()
+
+    def remove(self, key):
+        """
+        Remove the entry, e.g. its proof failed the online verification.
+        Args:
+            key: string, the key returned by get_key.
+
+        """
+        with self.__lock:
+            self.size -= self.__entries.pop(key, 0)
+        try:
+            os.remove(self._get_entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self.size > self.capacity and self.__entries:
+            key, entry_size = self.__entries.popitem(last=False)
+            self.size -= entry_size
+            try:
+                os.remove(self._get_entry_path(key))
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self.__entries)
@@ -0,0 +1,184 @@
+import os
+import shutil
+import threading
+
+from executor.constants.executor_constants import ExecutorConstants
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.utils.log_utils import LogUtils
+
+
+class ScratchWorkspace:
+    """
+    The working folder of an execution, holding its staged artifacts, witness and proof.
+    """
+    __slots__ = ['path', 'contract_address', 'on_scratch', 'reserved_bytes']
+
+    def __init__(self, path, contract_address, on_scratch, reserved_bytes):
+        self.path = path
+        self.contract_address = contract_address
+        # Whether the workspace is on the scratch path, otherwise it is spilled to the working path.
+        self.on_scratch = on_scratch
+        self.reserved_bytes = reserved_bytes
+
+
+class ScratchWorkspacePool:
+    """
+    Place the working folders of the executions on a fast scratch path, e.g. a tmpfs, as long as the workspaces fit in
+    its capacity, and spill them to the working path on the disk otherwise.
+
+    Every execution on the scratch path reserves the bytes its circuit is expected to write, which is the most bytes a
+    former execution of the circuit left in its workspace, or a default estimate until then. The workspace folders are
+    created once and reused: a released workspace is emptied and returned to the pool instead of being removed.
+    """
+    # The prefix of the pooled workspace folders.
+    SLOT_PREFIX = 'slot-'
+
+    def __init__(self, scratch_path, spill_path, capacity, pool_size,
+                 default_estimate=ExecutorConstants.DEFAULT_SCRATCH_ESTIMATE * 1024 * 1024):
+        """
+        Init the ScratchWorkspacePool and create the pooled workspace folders.
+        Args:
+            scratch_path: string, the scratch folder.
+            spill_path: string, the folder of the spilled workspaces.
+            capacity: int, the bytes the workspaces may reserve on the scratch path.
+            pool_size: int, the number of pooled workspace folders kept, usually the maximum concurrent executions.
+            default_estimate: int, the bytes reserved for a circuit without any former execution.
+        """
+        self.__scratch_path = scratch_path
+        self.__spill_path = spill_path
+        self.capacity = capacity
+        self.__pool_size = pool_size
+        self.__default_estimate = default_estimate
+        self.__lock = threading.Lock()
+        self.reserved_bytes = 0
+        # {contract address: the most bytes written by an execution}
+        self.__estimates = {}
+        self.__free_slots = []
+        self.__slot_count = 0
+        self.__registry = ExecutorMetrics.get_registry()
+        os.makedirs(scratch_path, exist_ok=True)
+        # The workspaces left by a former run are not resumable from the scratch path, they are emptied.
+        for name in os.listdir(scratch_path):
+            if name.startswith(self.SLOT_PREFIX):
+                shutil.rmtree(os.path.join(scratch_path, name), ignore_errors=True)
+        for _ in range(pool_size):
+            self.__free_slots.append(self._create_slot())
+
+    def _create_slot(self):
+        slot_path = os.path.join(self.__scratch_path, self.SLOT_PREFIX + str(self.__slot_count))
+        self.__slot_count += 1
+        os.makedirs(slot_path, exist_ok=True)
+        return slot_path
+
+    def get_estimate(self, contract_address):
+        """
+        Get the bytes an execution of the contract is expected to write into its workspace.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            int, bytes.
+
+        """
+        return self.__estimates.get(contract_address, self.__default_estimate)
+
+    def _get_free_space(self):
+        stat = os.statvfs(self.__scratch_path)
+        return stat.f_bavail * stat.f_frsize
+
+    def acquire(self, contract_address, execution_id):
+        """
+        Acquire the workspace of an execution, on the scratch path if the reservation fits, spilled otherwise.
+        Args:
+            contract_address: string, contract address.
+            execution_id: int, the execution id.
+
+        Returns:
+            ScratchWorkspace, the workspace folder exists and is empty.
+
+        """
+        estimate = self.get_estimate(contract_address)
+        with self.__lock:
+            if self.reserved_bytes + estimate <= self.capacity and estimate <= self._get_free_space():
+                slot_path = self.__free_slots.pop() if self.__free_slots else self._create_slot()
+                self.reserved_bytes += estimate
+                self._update_metrics('scratch')
+                return ScratchWorkspace(slot_path, contract_address, True, estimate)
+        spill_path = os.path.join(self.__spill_path, contract_address + '_' + str(execution_id))
+        os.makedirs(spill_path, exist_ok=True)
+        LogUtils.info("Scratch path is full, spill the workspace of " + contract_address + " to " + spill_path)
+        with self.__lock:
+            self._update_metrics('spill')
+        return ScratchWorkspace(spill_path, contract_address, False, 0)
+
+    @staticmethod
+    def get_used_bytes(folder):
+        """
+        Get the bytes allocated by the files written into the folder, the linked artifacts are not counted.
+        Args:
+            folder: string, the folder.
+
+        Returns:
+            int, bytes.
+
+        """
+        used_bytes = 0
+        for directory, _, files in os.walk(folder):
+            for name in files:
+                file_stat = os.lstat(os.path.join(directory, name))
+                # The hard links share the blocks of the artifact set.
+                if file_stat.st_nlink == 1:
+                    used_bytes += file_stat.st_blocks * 512
+        return used_bytes
+
+    @staticmethod
+    def _empty_folder(folder):
+        for entry in os.scandir(folder):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+
+    def release(self, workspace):
+        """
+        Release the workspace of a finished execution: a scratch workspace is emptied and returned to the pool, a
+        spilled one is removed.
+        Args:
+            workspace: ScratchWorkspace.
+
+        """
+        if not workspace.on_scratch:
+            shutil.rmtree(workspace.path, ignore_errors=True)
+            return
+        used_bytes = self.get_used_bytes(workspace.path)
+        try:
+            self._empty_folder(workspace.path)
+            reusable = True
+        except OSError as e:
+            LogUtils.error("Failed to empty the workspace " + workspace.path + ": " + str(e))
+            shutil.rmtree(workspace.path, ignore_errors=True)
+            reusable = False
+        with self.__lock:
+            self.reserved_bytes -= workspace.reserved_bytes
+            self.__estimates[workspace.contract_address] = max(used_bytes,
+                                                               self.__estimates.get(workspace.contract_address, 0))
+            if reusable and len(self.__free_slots) < self.__pool_size:
+                self.__free_slots.append(workspace.path)
+            else:
+                shutil.rmtree(workspace.path, ignore_errors=True)
+            self._update_metrics()
+
+    def remove_contract(self, contract_address):
+        """
+        Forget the estimate of the unregistered contract.
+        Args:
+            contract_address: string, contract address.
+
+        """
+        with self.__lock:
+            self.__estimates.pop(contract_address, None)
+
+    def _update_metrics(self, placement=None):
+        if placement is not None:
+            self.__registry.increment(ExecutorMetrics.SCRATCH_WORKSPACES_TOTAL, 1, {'placement': placement})
+        self.__registry.set_gauge(ExecutorMetrics.SCRATCH_RESERVED_BYTES, self.reserved_bytes)
@@ -0,0 +1,111 @@
+import os
+
+from abc import ABC
+from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+
+class StageRunner(ABC):
+    """
+    Base class for running the CPU-bound stages (decryption, commitment checking, witness and proof generation) of the
+    workers.
+    """
+    @staticmethod
+    def create(options):
+        """
+        Create the stage runner configured by the executor options.
+        Args:
+            options: dictionary, the executor options, may include
+                * worker_backend: 'greenlet' runs the stages inside the worker greenlet, 'process_pool' runs them in a
+                  pool of processes shared by all the workers. Default: 'greenlet'.
+                * process_pool_size: int, the number of processes of 'process_pool', 0 means the number of CPUs.
+
+        Returns:
+            StageRunner.
+
+        """
+        worker_backend = options.get('worker_backend', 'greenlet')
+        if worker_backend == 'greenlet':
+            return InlineStageRunner()
+        elif worker_backend == 'process_pool':
+            return ProcessPoolStageRunner(options.get('process_pool_size', 0))
+        else:
+            raise Exception("Not supported worker backend:" + worker_backend)
+
+    @abstractmethod
+    def run(self, function, *args):
+        """
+        Run the stage and return its result, exceptions raised by the stage are raised again to the caller.
+        Args:
+            function: function, the stage function. It must be a module level function or static method, and the
+                arguments must be picklable, as the stage may run in another process.
+            *args: the arguments of the stage function.
+
+        Returns:
+            The return value of the stage function.
+
+        """
+        raise NotImplementedError('Abstract method, not implemented yet')
+
+    def shutdown(self):
+        """
+        Release the resources held by the stage runner.
+
+        """
+        pass
+
+
+class InlineStageRunner(StageRunner):
+    """
+    Run the stages in the caller greenlet.
+    """
+    def run(self, function, *args):
+        """
+        Run the stage and return its result.
+        Args:
+            function: function, the stage function.
+            *args: the arguments of the stage function.
+
+        Returns:
+            The return value of the stage function.
+
+        """
+        return function(*args)
+
+
+class ProcessPoolStageRunner(StageRunner):
+    """
+    Run the stages in a pool of processes shared by all the workers, so the CPU-bound stages of different executions
+    use different CPU cores and do not hold the GIL of the executor process. The caller greenlet yields until the stage
+    is finished.
+    """
+    def __init__(self, pool_size=0):
+        """
+        Init the ProcessPoolStageRunner.
+        Args:
+            pool_size: int, the number of processes, 0 means the number of CPUs.
+        """
+        if pool_size <= 0:
+            pool_size = os.cpu_count() or 1
+        self.pool_size = pool_size
+        self.__pool = ProcessPoolExecutor(max_workers=pool_size)
+
+    def run(self, function, *args):
+        """
+        Run the stage in the pool and return its result.
+        Args:
+            function: function, the stage function.
+            *args: the arguments of the stage function.
+
+        Returns:
+            The return value of the stage function.
+
+        """
+        return self.__pool.submit(function, *args).result()
+
+    def shutdown(self):
+        """
+        Shutdown the process pool.
+
+        """
+        self.__pool.shutdown(wait=False)
@@ -0,0 +1,146 @@
+import os
+
+
+class WitnessLayout:
+    """
+    The layout of the compute-witness arguments of a circuit: for every input, the limbs of the commitment, the random
+    and the limbs of the commitment hash, from the most significant limb. The shifts of the limbs are computed once per
+    layout, and the limbs are extracted with shifts and masks instead of formatting every value as a bit string.
+    """
+    # The layouts created in this process, keyed by their bit widths.
+    __layouts = {}
+
+    def __init__(self, commitment_bits=512, hash_bits=256, limb_bits=128):
+        """
+        Init the WitnessLayout.
+        Args:
+            commitment_bits: int, the bit width of a commitment.
+            hash_bits: int, the bit width of a commitment hash.
+            limb_bits: int, the bit width of a limb, i.e. of a field element argument.
+        """
+        self.commitment_bits = commitment_bits
+        self.hash_bits = hash_bits
+        self.limb_bits = limb_bits
+        self.__mask = (1 << limb_bits) - 1
+        self.__commitment_shifts = self._get_shifts(commitment_bits)
+        self.__hash_shifts = self._get_shifts(hash_bits)
+        # The number of arguments of every input.
+        self.arguments_per_input = len(self.__commitment_shifts) + 1 + len(self.__hash_shifts)
+
+    def _get_shifts(self, bits):
+        return list(range(bits - self.limb_bits, -1, -self.limb_bits))
+
+    @staticmethod
+    def get(commitment_bits=512, hash_bits=256, limb_bits=128):
+        """
+        Get the shared layout of the given bit widths.
+        Returns:
+            WitnessLayout.
+
+        """
+        key = (commitment_bits, hash_bits, limb_bits)
+        layout = WitnessLayout.__layouts.get(key)
+        if layout is None:
+            layout = WitnessLayout.__layouts[key] = WitnessLayout(commitment_bits, hash_bits, limb_bits)
+        return layout
+
+    def _split(self, value, bits, shifts):
+        """
+        Split the value into limbs, from the most significant one.
+        Args:
+            value: int, the value.
+            bits: int, the bit width of the value.
+            shifts: [int], the precomputed shifts of the bit width.
+
+        Returns:
+            [int], the limbs.
+
+        """
+        extra_bits = value.bit_length() - bits
+        if extra_bits > 0:
+            # A value wider than the layout is split from its most significant bit, like its bit string would be.
+            return [(value >> (shift + extra_bits)) & self.__mask for shift in shifts]
+        return [(value >> shift) & self.__mask for shift in shifts]
+
+    def split_commitment(self, commitment):
+        """
+        Split the commitment into its limbs.
+        Args:
+            commitment: int, the commitment.
+
+        Returns:
+            [int], the limbs, from the most significant one.
+
+        """
+        return self._split(commitment, self.commitment_bits, self.__commitment_shifts)
+
+    def get_arguments(self, commitments, randoms, hashes):
+        """
+        Build the compute-witness arguments of the inputs.
+        Args:
+            commitments: list of commitments.
+            randoms: list of randoms.
+            hashes: list of hashes.
+
+        Returns:
+            [string], the arguments.
+
+        """
+        arguments = []
+        for commitment, random, commitment_hash in zip(commitments, randoms, hashes):
+            arguments.extend(self._split(commitment, self.commitment_bits, self.__commitment_shifts))
+            arguments.append(random)
+            arguments.extend(self._split(commitment_hash, self.hash_bits, self.__hash_shifts))
+        return [str(argument) for argument in arguments]
+
+
+class WitnessInput:
+    """
+    The channels passing the arguments to compute-witness.
+
+    * argv: on the command line after -a.
+    * stdin: streamed over the stdin of the prover, with --stdin.
+    * file: written into the working folder of the execution, which becomes the stdin of the prover, with --stdin.
+    * auto: argv if the arguments fit in a quarter of ARG_MAX, file otherwise.
+
+    stdin and file require a ZoKrates build supporting `compute-witness --stdin`.
+    """
+    ARGV = 'argv'
+    STDIN = 'stdin'
+    FILE = 'file'
+    AUTO = 'auto'
+    ALL_CHANNELS = [AUTO, ARGV, STDIN, FILE]
+    # The file of the arguments in the working folder.
+    ARGUMENTS_FILE = 'arguments'
+    # The command line bytes available to the arguments in auto mode.
+    ARGV_LIMIT = (os.sysconf('SC_ARG_MAX') if hasattr(os, 'sysconf') else 131072) // 4
+
+    @staticmethod
+    def build(channel, command, arguments, working_path):
+        """
+        Build the compute-witness invocation passing the arguments through the channel.
+        Args:
+            channel: string, one of ALL_CHANNELS.
+            command: [string], the compute-witness argument vector without the witness arguments.
+            arguments: [string], the witness arguments.
+            working_path: string, the working folder of the execution, for the file channel.
+
+        Returns:
+            ([string], bytes, string), the argument vector, the data to stream over stdin or None, and the file to
+            open as stdin or None.
+
+        """
+        if channel == WitnessInput.AUTO:
+            argv_bytes = sum(len(argument) + 1 for argument in arguments)
+            channel = WitnessInput.ARGV if argv_bytes <= WitnessInput.ARGV_LIMIT else WitnessInput.FILE
+        if channel == WitnessInput.ARGV:
+            return command + ['-a'] + arguments, None, None
+        data = (' '.join(arguments) + '\n').encode()
+        if channel == WitnessInput.STDIN:
+            return command + ['--stdin'], data, None
+        if channel == WitnessInput.FILE:
+            arguments_path = os.path.join(working_path, WitnessInput.ARGUMENTS_FILE)
+            with open(arguments_path, 'wb') as arguments_file:
+                arguments_file.write(data)
+            return command + ['--stdin'], None, arguments_path
+        raise Exception("Unsupported witness input channel: " + str(channel))
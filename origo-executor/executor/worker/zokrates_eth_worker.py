@@ -1,7 +1,9 @@
 from executor.worker.zokrates_worker import ZokratesWorker
 from executor.chain_interface.eth_localabi_interface import EthLocalABIInterface
 from executor.utils.log_utils import LogUtils
-from gevent import sleep
+from executor.worker.executor_worker_exception import SubmissionException
+from gevent import Timeout, sleep
+from gevent.event import AsyncResult
 from queue import Queue
 import traceback
 
@@ -10,7 +12,10 @@ class ZokratesEthWorker(ZokratesWorker):
     """
     The Worker works for Eth chain and is based on Zokrates.
     """
-    def __init__(self, execution_info, chain_config, execution_result_queue, submit_lock=None, debug=False):
+    # The seconds between the checks whether the worker is stopped while waiting for the settlement.
+    SETTLEMENT_POLL_INTERVAL = 1
+
+    def __init__(self, execution_info, chain_config, execution_result_queue, debug=False):
         """
         Init the ZokratesEthWorker.
         Args:
@@ -20,10 +25,20 @@ class ZokratesEthWorker(ZokratesWorker):
                 result into the result queue for main thread to check.
             debug: boolean, debug flag.
         """
-        ZokratesWorker.__init__(self, execution_info, execution_result_queue, submit_lock, debug)
-        self.__chain_interface = EthLocalABIInterface(chain_config)
+        ZokratesWorker.__init__(self, execution_info, execution_result_queue, debug)
+        # Borrow the chain interface shared by the listeners and the workers, or create one if not given the pool.
+        chain_client_pool = execution_info.get('chain_client_pool')
+        if chain_client_pool is not None:
+            self.__chain_interface = chain_client_pool.get_client(EthLocalABIInterface, chain_config)
+        else:
+            self.__chain_interface = EthLocalABIInterface(chain_config)
         self.__verification_result = Queue()
         self.verify_and_settle_event = None
+        # The tracker of the submitted transactions, or the VerifyAndSettle subscription, shared by the workers. The
+        # worker polls its own receipt and event if neither is given.
+        self.__receipt_tracker = execution_info.get('receipt_tracker')
+        self.__settlement_subscription = execution_info.get('settlement_subscription')
+        self.__settlement = None
 
     def submit_proof_to_chain(self, contract_id, execution_id, output, proof):
         """
@@ -36,15 +51,79 @@ class ZokratesEthWorker(ZokratesWorker):
                     proof: the ZKP proof for the execution result based on the given users' inputs.
 
                 Returns:
-                    Boolean, if submission succeeds, then return True, otherwise return False.
+                    The hash of the submission transaction.
 
                 """
         inputs = [int(x) for x in output]
         verification_info = {'inputs': inputs}
         verification_info = {**verification_info, **proof}
+        if self.__receipt_tracker is not None:
+            tx_hash = self.__chain_interface.submit_verify_and_settle(contract_id, execution_id, verification_info)
+            self.__settlement = self.__receipt_tracker.track(contract_id, execution_id, tx_hash)
+            return tx_hash
+        if self.__settlement_subscription is not None:
+            # Watch the event before the transaction is broadcast, so the event cannot arrive before the watch.
+            self.__settlement = self.__settlement_subscription.watch(contract_id, execution_id)
+            try:
+                return self.__chain_interface.submit_verify_and_settle(contract_id, execution_id, verification_info)
+            except Exception as e:
+                self.unwatch_settlement(contract_id, execution_id)
+                raise SubmissionException("Failed to submit execution " + str(execution_id) + ": " + str(e))
         self.verify_and_settle_event = \
             self.__chain_interface.init_verify_and_settle_event_listener(self.contract_address)
-        self.__chain_interface.invoke_verify_and_settle(contract_id, execution_id, verification_info)
+        return self.__chain_interface.invoke_verify_and_settle(contract_id, execution_id, verification_info)
+
+    def resume_settlement(self, contract_id, execution_id, tx_hash):
+        """
+        Follow the settlement of the transaction submitted before the restart: a mined transaction settles right away
+        from its receipt, a pending one is tracked as if it was just submitted.
+        Args:
+            contract_id: string, the unique identifier for the contract.
+            execution_id: int, the identity number for different execution of the same contract.
+            tx_hash: string, the hash of the submission transaction recorded in the journal.
+
+        Returns:
+            Boolean, False if the transaction is dropped or its state cannot be read.
+
+        """
+        try:
+            # The event is watched before the receipt is read, so an event mined in between is not missed.
+            if self.__receipt_tracker is None:
+                if self.__settlement_subscription is not None:
+                    self.__settlement = self.__settlement_subscription.watch(contract_id, execution_id)
+                else:
+                    self.verify_and_settle_event = \
+                        self.__chain_interface.init_verify_and_settle_event_listener(self.contract_address)
+            receipt = self.__chain_interface.get_transaction_receipts([tx_hash])[tx_hash]
+            if receipt is not None:
+                success = self.__chain_interface.get_verify_and_settle_result(contract_id, execution_id, receipt)
+                self.unwatch_settlement(contract_id, execution_id)
+                self.__settlement = AsyncResult()
+                self.__settlement.set({'receipt': receipt, 'success': success})
+                return True
+            if self.__receipt_tracker is not None:
+                # The tracker fails the settlement if the transaction is not mined before its deadline.
+                self.__settlement = self.__receipt_tracker.track(contract_id, execution_id, tx_hash)
+                return True
+            if self.__chain_interface.is_transaction_known(tx_hash):
+                return True
+        except Exception as e:
+            LogUtils.error("Failed to read transaction " + tx_hash + ": " + str(e))
+        self.unwatch_settlement(contract_id, execution_id)
+        return False
+
+    def unwatch_settlement(self, contract_id, execution_id):
+        """
+        Stop waiting for the VerifyAndSettle event of the execution.
+        Args:
+            contract_id: string, the unique identifier for the contract.
+            execution_id: int, the identity number for different execution of the same contract.
+
+        """
+        if self.__settlement_subscription is not None:
+            self.__settlement_subscription.unwatch(contract_id, execution_id)
+        self.__settlement = None
+        self.verify_and_settle_event = None
 
     def _put_result_into_queue(self, event):
         """
@@ -67,6 +146,15 @@ class ZokratesEthWorker(ZokratesWorker):
             Boolean, if verification succeeds, then return True, otherwise return False.
 
         """
+        if self.__settlement is not None:
+            while not self.should_exit():
+                try:
+                    return self.__settlement.get(timeout=self.SETTLEMENT_POLL_INTERVAL)['success']
+                except Timeout:
+                    continue
+                except Exception as e:
+                    raise SubmissionException("Failed to settle execution " + str(execution_id) + ": " + str(e))
+            return False
         retry_times = 3
         while retry_times > 0:
             try:
@@ -1,20 +1,26 @@
 from abc import abstractmethod
-from executor.utils.hash_utils import HashUtils
+from executor.prover.prover_backend import ProverJob
+from executor.prover.zokrates_cli_backend import ZokratesCliBackend
+from executor.worker.commitment_verifier import CommitmentVerifier
 from executor.worker.executor_worker import ExecutorWorker
 from executor.worker.executor_worker_exception import ProofException, PreparationException, CommitmentHashNotMatch
 from executor.worker.execution_result import ExecutionResult
+from executor.worker.witness_input import WitnessInput, WitnessLayout
 from executor.utils.log_utils import LogUtils
 from pathlib import Path
-from os import path
-import json
-import subprocess
+from os import path, makedirs
+import shutil
 
 
 class ZokratesWorker(ExecutorWorker):
     """
-    The Executor Worker based on Zokrates(https://github.com/Zokrates/ZoKrates)
+    The Executor Worker based on Zokrates(https://github.com/Zokrates/ZoKrates). The witness and the proof are
+    computed by the prover backend of the contract, the ZoKrates CLI by default.
     """
-    def __init__(self, execution_info, execution_result_queue, submit_lock=None, debug=False):
+    # The prime of the field used by Zokrates.
+    FIELD_PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495616
+
+    def __init__(self, execution_info, execution_result_queue, debug=False):
         """
         Init ZokratesWorker.
         Args:
@@ -23,7 +29,7 @@ class ZokratesWorker(ExecutorWorker):
                 result into the result queue for main thread to check.
             debug: boolean, debug flag.
         """
-        ExecutorWorker.__init__(self, execution_info, execution_result_queue, submit_lock, debug)
+        ExecutorWorker.__init__(self, execution_info, execution_result_queue, debug)
         try:
             self.__working_path = execution_info['working_path']
         except KeyError:
@@ -49,31 +55,65 @@ class ZokratesWorker(ExecutorWorker):
         except KeyError:
             self.submit_execution_result(ExecutionResult.MISS_EXECUTION_INFO)
 
-        # self.__field_bit_limit = int(pow(2, 128)) Use Zokrates prime instead
-        self.__field_bit_limit = 21888242871839275222246405745257275088548364400416034343698204186575808495616
-
-        # commands need to be run by the workers.
-        self.__commands = {}
-        self._build_commands()
+        # The stager linking the artifacts of the circuit into the working folder, copy them with cp if None.
+        self.__artifact_stager = execution_info.get('artifact_stager')
+        # The prover computing the witness and generating the proof, the ZoKrates CLI if None.
+        self.__prover_backend = execution_info.get('prover_backend') or ZokratesCliBackend(
+            self.__zokrates_path, self.__proving_key_path, self.__working_path)
+        # The client of the prover daemon of the circuit, run the ZoKrates commands in this worker if None.
+        self.__prover_client = execution_info.get('prover_client')
+        # The seconds after which compute-witness and generate-proof are killed, None means no limit.
+        self.__witness_timeout = execution_info.get('witness_timeout') or None
+        self.__proof_timeout = execution_info.get('proof_timeout') or None
+        # The channel passing the witness arguments to compute-witness, see WitnessInput.
+        self.__witness_input = execution_info.get('witness_input') or WitnessInput.AUTO
+        # The pool placing the working folder of this execution, the folder is under the working path if None.
+        self.__scratch_pool = execution_info.get('scratch_pool')
+        self.__workspace = None
+        # The cache of the generated proofs, the proof is always generated if None.
+        self.__proof_cache = execution_info.get('proof_cache')
+        self.__proof_cache_key = None
+        self.__cached_proof = None
+
+        # The number of threads hashing the commitments in the commitment checking stage.
+        self.__commitment_hash_threads = execution_info.get('commitment_hash_threads') or 0
+
+        # The execution handed to the prover backend.
+        self.__prover_job = None
+        self._build_prover_job()
         if self.debug:
             LogUtils.info("Start to prepare files for ZokratesWorker!")
-        self._prepare_files()
+        try:
+            self._prepare_files()
+        except PreparationException:
+            self._release_workspace()
+            raise
         if self.debug:
             LogUtils.info("Finished file preparation!")
 
-    def _run_commands(self, commands, append_str=''):
+    def stop(self):
+        """
+        Stop the worker, and kill its running ZoKrates command.
+
+        """
+        ExecutorWorker.stop(self)
+        if self.__prover_job is not None:
+            self.__prover_backend.cancel(self.__prover_job)
+
+    @staticmethod
+    def verify_commitment_hashes(commitments, randoms, hashes, skipped_indices, hash_threads=0):
         """
-        List of command keys to run in the given order.
+        Check the hashes of the commitments, this is the commitment checking stage run by the stage runner.
         Args:
-            commands: [string], list of command keys.
-            append_str: string to append after the commands.
+            commitments: list, commitments.
+            randoms: list, random values.
+            hashes: list, hash value of commitments.
+            skipped_indices: list, indices of elements that should be skipped for the checking.
+            hash_threads: int, the number of threads hashing the commitments, 0 hashes them in the stage.
 
         """
-        if self.debug:
-            LogUtils.info("Run command: " + str(" && ".join(str(self.__commands[command]) for command in commands)) + append_str)
-        process = subprocess.Popen(" && ".join(str(self.__commands[command]) for command in commands), shell=True,
-                                   stdout=subprocess.PIPE)
-        process.communicate()
+        if CommitmentVerifier.get(hash_threads).find_mismatches(commitments, randoms, hashes, skipped_indices):
+            raise CommitmentHashNotMatch
 
     def check_commitments(self, commitments, randoms, hashes, skipped_indices):
         """
@@ -87,21 +127,8 @@ class ZokratesWorker(ExecutorWorker):
         Returns:
 
         """
-        cl = len(commitments)
-        for i in range(0, cl):
-            if skipped_indices is not None and i in skipped_indices:
-                continue
-            r = randoms[i]
-            c_str = "{0:0512b}".format(commitments[i])
-            c_1 = (int(c_str[0:128], 2) + r) % self.__field_bit_limit
-            c_2 = (int(c_str[128:256], 2) + r) % self.__field_bit_limit
-            c_3 = (int(c_str[256:384], 2) + r) % self.__field_bit_limit
-            c_4 = (int(c_str[384:512], 2) + r) % self.__field_bit_limit
-            oc_str = "{0:0128b}".format(c_1) + "{0:0128b}".format(c_2) + "{0:0128b}".format(c_3) + \
-                     "{0:0128b}".format(c_4)
-            # now oc_str is a 512 bit string.
-            if HashUtils.compute_sha256_for_bitstr(oc_str) != hashes[i]:
-                raise CommitmentHashNotMatch
+        self.run_stage(ZokratesWorker.verify_commitment_hashes, commitments, randoms, hashes, skipped_indices,
+                       self.__commitment_hash_threads)
 
     def generate_commitments(self, biased_commitment, randoms):
         """
@@ -114,18 +141,7 @@ class ZokratesWorker(ExecutorWorker):
             List of original user commitments.
 
         """
-        original_commitments = []
-        for i in range(0, len(biased_commitment)):
-            r = randoms[i]
-            c_str = "{0:0512b}".format(biased_commitment[i])
-            c_1 = (int(c_str[0:128], 2) - r) % self.__field_bit_limit
-            c_2 = (int(c_str[128:256], 2) - r) % self.__field_bit_limit
-            c_3 = (int(c_str[256:384], 2) - r) % self.__field_bit_limit
-            c_4 = (int(c_str[384:512], 2) - r) % self.__field_bit_limit
-            oc_str = "{0:0128b}".format(c_1) + "{0:0128b}".format(c_2) + "{0:0128b}".format(c_3) + \
-                     "{0:0128b}".format(c_4)
-            original_commitments.append(int(oc_str, 2))
-        return original_commitments
+        return CommitmentVerifier.get().unbias(biased_commitment, randoms)
 
     @staticmethod
     def build_arguments(commitments, randoms, hashes):
@@ -140,81 +156,46 @@ class ZokratesWorker(ExecutorWorker):
             string, the built argument string.
 
         """
-        commit_array = []
-        for i in range(0, len(commitments)):
-            # Original commitments and randoms.
-            args = []
-            bits_str = "{0:0512b}".format(commitments[i])
-            args.append(int(bits_str[0:128], 2))
-            args.append(int(bits_str[128:256], 2))
-            args.append(int(bits_str[256:384], 2))
-            args.append(int(bits_str[384:512], 2))
-            args.append(randoms[i])
-            bits_str = "{0:0256b}".format(hashes[i])
-            args.append(int(bits_str[0:128], 2))
-            args.append(int(bits_str[128:256], 2))
-            commit_array.append(" ".join(str(arg) for arg in args))
-        return " ".join(str(arg) for arg in commit_array)
-
-    def _build_commands(self):
-        """
-        Build the required commands for the ZokratesWorker and add them into the dictionary self.__commands.
-
-        """
-        self.__tmp_working_path = path.join(self.__working_path, self.contract_address + "_" + str(self.__execution_id))
-        self.__code_path = path.join(self.__working_path, 'compiled_code', self.contract_address) + '_out'
-        self.__pk_path = path.join(self.__proving_key_path, self.contract_address) + '.pk'
-        self.__var_path = path.join(self.__proving_key_path, self.contract_address) + '.var'
-        self.__commands['goto_tmp_working_path'] = 'cd ' + self.__tmp_working_path
-        #self.__commands['compile'] = self.__zokrates_path + ' compile -i ' + \
-        #                             path.join(self.__tmp_working_path, self.contract_address) + '.code' +\
-        #                             ' -o ' + path.join(self.__tmp_working_path, 'out')
-        self.__commands['compute_witness'] =\
-            self.__zokrates_path + " compute-witness -i " + path.join(self.__tmp_working_path, 'out') + ' -o ' + \
-            path.join(self.__tmp_working_path, 'witness') + " -a "
-        self.__commands['generate_proof'] = self.__zokrates_path + " generate-proof"
-        self.__commands['copy_code'] = 'cp ' + self.__code_path + ' ' + path.join(self.__tmp_working_path, 'out')
-        self.__commands['copy_proving_key'] = 'cp ' + self.__pk_path + ' ' + \
-                                              path.join(self.__tmp_working_path, 'proving.key')
-        self.__commands['copy_variables'] = 'cp ' + self.__var_path + ' ' + \
-                                            path.join(self.__tmp_working_path, 'variables.inf')
-        self.__commands['build_tmp_working_folder'] = 'mkdir -p ' + self.__tmp_working_path
-        self.__commands['rm_tmp_working_folder'] = 'rm -rf ' + self.__tmp_working_path
+        return " ".join(WitnessLayout.get().get_arguments(commitments, randoms, hashes))
 
-    def _prepare_files(self):
+    def _build_prover_job(self):
         """
-        Prepare the files required for the execution and proof generation of the worker.
+        Place the working folder of this execution and build the job of the prover backend.
 
         """
-        self._run_commands(['build_tmp_working_folder', 'copy_code', 'copy_proving_key', 'copy_variables'])
-        if not self._check_generated_files('prepare'):
-            if self.debug:
-                LogUtils.info("Failed to copy required files and to finish Zokrates compiling!")
-            raise PreparationException
+        if self.__scratch_pool is not None:
+            self.__workspace = self.__scratch_pool.acquire(self.contract_address, self.__execution_id)
+            self.__tmp_working_path = self.__workspace.path
+        else:
+            self.__tmp_working_path = path.join(self.__working_path,
+                                                self.contract_address + "_" + str(self.__execution_id))
+        self.__prover_job = ProverJob(self.contract_address, self.__execution_id, self.__tmp_working_path,
+                                      witness_timeout=self.__witness_timeout, proof_timeout=self.__proof_timeout,
+                                      witness_input=self.__witness_input, subprocess_runner=self.subprocess_runner,
+                                      prover_client=self.__prover_client, record_peak_rss=self.record_peak_rss,
+                                      should_exit=self.should_exit, debug=self.debug)
 
-    def _get_output(self):
+    def _prepare_files(self):
         """
-        Get the output of the execution from witness file.
-        Returns:
-            list of the output as string.
+        Prepare the files required for the execution and proof generation of the worker.
 
         """
-        witness_path = path.join(self.__tmp_working_path, "witness")
-        outputs = {}
+        artifacts = self.__prover_backend.get_artifacts(self.contract_address)
         try:
-            with open(witness_path) as lines:
-                for line in lines:
-                    if line.startswith('~out_'):
-                        output_index = int(line.split(" ")[0].split("_")[1])
-                        outputs[output_index] = line.split(" ")[1].rstrip("\n")
-                    else:
-                        break
-                ret = []
-                for index in range(0, len(outputs)):
-                    ret.append(outputs[index])
-                return ret
-        except FileNotFoundError:
-            raise ProofException
+            makedirs(self.__tmp_working_path, exist_ok=True)
+            if self.__artifact_stager is None:
+                for name, artifact_path in artifacts.items():
+                    if path.isfile(artifact_path):
+                        shutil.copyfile(artifact_path, path.join(self.__tmp_working_path, name))
+            else:
+                self.__artifact_stager.stage(self.contract_address, artifacts, self.__tmp_working_path)
+        except OSError as e:
+            LogUtils.error("Failed to stage the artifacts of " + self.contract_address + ": " + str(e))
+            raise PreparationException
+        if not self._check_file_exists([path.join(self.__tmp_working_path, name) for name in artifacts]):
+            if self.debug:
+                LogUtils.info("Failed to copy required files and to finish Zokrates compiling!")
+            raise PreparationException
 
     def _check_file_exists(self, file_list):
         """
@@ -234,31 +215,27 @@ class ZokratesWorker(ExecutorWorker):
                 return False
         return True
 
-    def _check_generated_files(self, step):
+    def get_witness_artifact(self):
+        """
+        Get the location of the witness computed by prepare_proof_generation, which is recorded in the journal.
+        Returns:
+            string, the witness file path.
+
+        """
+        return self.__prover_backend.get_witness_artifact(self.__prover_job)
+
+    def restore_witness(self, witness_artifact):
         """
-        Check the generated files after each Zokrates step.
+        Check whether the witness recorded in the journal before the restart can be used to generate the proof.
         Args:
-            step: string, the steps includes "prepare", "compute_witness", "generate_proof"
+            witness_artifact: string, the witness file path returned by get_witness_artifact.
 
         Returns:
-            Return true if all the required files are generated successfully after each step.
-
-        """
-        generated_files = []
-        if step == 'prepare':
-            # proving key file
-            generated_files.append(path.join(self.__tmp_working_path, 'proving.key'))
-            # variable file
-            generated_files.append(path.join(self.__tmp_working_path, 'variables.inf'))
-            # out file
-            generated_files.append(path.join(self.__tmp_working_path, 'out'))
-        elif step == 'compute-witness':
-            # witness files
-            generated_files.append(path.join(self.__tmp_working_path, 'witness'))
-        elif step == 'generate_proof':
-            # proof file
-            generated_files.append(path.join(self.__tmp_working_path, 'proof.json'))
-        return self._check_file_exists(generated_files)
+            Boolean, return True if the witness file is still in the working folder of this execution.
+
+        """
+        return witness_artifact == self.get_witness_artifact() and \
+            self.__prover_backend.has_witness(self.__prover_job)
 
     def _clean_up(self):
         """
@@ -267,9 +244,31 @@ class ZokratesWorker(ExecutorWorker):
             boolean, if succeeds, then return True, otherwise return False.
 
         """
-        self._run_commands(['rm_tmp_working_folder'])
+        if self.__workspace is not None:
+            self._release_workspace()
+            return True
+        shutil.rmtree(self.__tmp_working_path, ignore_errors=True)
         return not self._check_file_exists([self.__tmp_working_path])
 
+    def _release_workspace(self):
+        """
+        Return the workspace of this execution to the scratch pool, if it is not returned yet.
+
+        """
+        workspace, self.__workspace = self.__workspace, None
+        if workspace is not None:
+            self.__scratch_pool.release(workspace)
+
+    def _run(self):
+        """
+        Run the execution, and release its workspace whatever the result is.
+
+        """
+        try:
+            ExecutorWorker._run(self)
+        finally:
+            self._release_workspace()
+
     def generate_proof(self, contract_id, execution_id):
         """
         Generate the proof for the target contract id with given inputs.
@@ -282,21 +281,18 @@ class ZokratesWorker(ExecutorWorker):
             The ZKP proof for the target contract with given inputs.
 
         """
-        self._run_commands(['goto_tmp_working_path', 'generate_proof'])
-        if not self._check_generated_files('generate_proof'):
-            raise ProofException
-        proof_path = path.join(self.__tmp_working_path, "proof.json")
-        try:
-            with open(proof_path) as f:
-                proof = json.load(f)
-                if proof is None or 'proof' not in proof:
-                    raise ProofException
-                output = self._get_output()
-                if not self._clean_up():
-                    raise ProofException
-                return output, proof['proof']
-        except FileNotFoundError:
+        if self.__cached_proof is not None:
+            if self.debug:
+                LogUtils.info("Reuse the cached proof " + self.__proof_cache_key)
+            self._clean_up()
+            return self.__cached_proof
+        self.__prover_backend.generate_proof(self.__prover_job)
+        output, proof = self.__prover_backend.parse_output(self.__prover_job)
+        if not self._clean_up():
             raise ProofException
+        if self.__proof_cache_key is not None:
+            self._put_cached_proof(output, proof)
+        return output, proof
 
     def prepare_proof_generation(self, contract_id, execution_id):
         """
@@ -313,17 +309,51 @@ class ZokratesWorker(ExecutorWorker):
             Boolean, if preparation succeeded, return True, otherwise return False.
 
         """
-        command = self.__zokrates_path + " compute-witness -i " + path.join(self.__tmp_working_path, 'out') + ' -o ' + \
-                  path.join(self.__tmp_working_path, 'witness') + " -a " + \
-                  self.build_arguments(self.commitments, self.randoms, self.hashes)
-        if self.debug:
-            LogUtils.info("Run command: " + command)
-        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE)
-        process.communicate()
-        #self._run_commands(['compute_witness'],
-        #                   self.build_arguments(self.commitments, self.hashes))
-        if not self._check_generated_files('compute-witness'):
-            raise PreparationException
+        arguments = WitnessLayout.get().get_arguments(self.commitments, self.randoms, self.hashes)
+        cache_files = self.__prover_backend.get_cache_files(self.contract_address)
+        if self.__proof_cache is not None and cache_files is not None:
+            self._get_cached_proof(cache_files, arguments)
+            if self.__cached_proof is not None:
+                # The witness is not needed by the cached proof.
+                return
+        self.__prover_backend.compute_witness(self.__prover_job, arguments)
+
+    def _get_cached_proof(self, cache_files, arguments):
+        """
+        Look up the proof of the witness arguments in the proof cache.
+        Args:
+            cache_files: (string, string), the program and proving key paths of the circuit.
+            arguments: [string], the witness arguments.
+
+        """
+        code_path, pk_path = cache_files
+        try:
+            self.__proof_cache_key = self.__proof_cache.get_key(code_path, pk_path, arguments)
+            self.__cached_proof = self.__proof_cache.get(self.__proof_cache_key)
+        except OSError as e:
+            LogUtils.warning("Failed to look up the proof cache: " + str(e))
+            self.__proof_cache_key = None
+
+    def _put_cached_proof(self, output, proof):
+        """
+        Cache the generated proof.
+        Args:
+            output: list, the output of the execution.
+            proof: dictionary, the proof.
+
+        """
+        try:
+            self.__proof_cache.put(self.__proof_cache_key, output, proof)
+        except OSError as e:
+            LogUtils.warning("Failed to cache the proof: " + str(e))
+
+    def discard_proof(self):
+        """
+        Remove the proof of this execution from the proof cache, as it failed the online verification.
+
+        """
+        if self.__proof_cache_key is not None:
+            self.__proof_cache.remove(self.__proof_cache_key)
 
     @abstractmethod
     def submit_proof_to_chain(self, contract_id, execution_id, output, proof):
@@ -337,7 +367,8 @@ class ZokratesWorker(ExecutorWorker):
             proof: the ZKP proof for the execution result based on the given users' inputs.
 
         Returns:
-            Boolean, if submission succeeds, then return True, otherwise return False.
+            The hash of the submission transaction, or None if not available. SubmissionException is raised if the
+            submission failed.
 
         """
         raise NotImplementedError('Abstract method, not implemented yet')
@@ -1,4 +1,17 @@
+from executor.constants.executor_constants import ExecutorConstants
+from executor.chain_interface.contract_cache import ContractCache
+from executor.chain_interface.eth_localabi_interface import EthLocalABIInterface
+from executor.chain_interface.receipt_tracker import ReceiptTracker
+from executor.chain_interface.settlement_subscription import SettlementSubscription, SettlementTracking
 from executor.executor import Executor
+from executor.prover.fake_prover_backend import FakeProverBackend
+from executor.prover.prover_backend import ProverBackend
+from executor.prover.prover_daemon_pool import ProverDaemonPool
+from executor.prover.zokrates_cli_backend import ZokratesCliBackend
+from executor.worker.artifact_stager import ArtifactStager, StagingMode
+from executor.worker.proof_cache import ProofCache
+from executor.worker.scratch_workspace import ScratchWorkspacePool
+from executor.worker.witness_input import WitnessInput
 from executor.worker.zokrates_eth_worker import ZokratesEthWorker
 from executor.listener.eth_event_listener import EthEventListener
 from executor.utils.log_utils import LogUtils
@@ -25,6 +38,91 @@ class ZokratesEthExecutor(Executor):
         self.__working_folder_path = executor_options['working_path']
         self.__zokrates_path = executor_options['zokrates_path']
         self.__chain_config = executor_options['chain_config']
+        # Link the artifacts of the circuits into the working folders instead of copying them per execution.
+        staging_mode = executor_options.get('artifact_staging', 'auto')
+        self.__artifact_stager = None
+        if staging_mode != StagingMode.COPY:
+            self.__artifact_stager = ArtifactStager(path.join(self.__working_folder_path, 'artifacts'), staging_mode)
+        # Place the working folders of the executions on the scratch path, e.g. a tmpfs.
+        self.__scratch_pool = None
+        if executor_options.get('scratch_path'):
+            self.__scratch_pool = ScratchWorkspacePool(
+                executor_options['scratch_path'], self.__working_folder_path,
+                executor_options.get('scratch_capacity', ExecutorConstants.DEFAULT_SCRATCH_CAPACITY) * 1024 * 1024,
+                self.max_concurrent_executions)
+        # Reuse the proofs of the executions with the same circuit and inputs.
+        self.__proof_cache = None
+        if executor_options.get('proof_cache_path'):
+            self.__proof_cache = ProofCache(
+                executor_options['proof_cache_path'],
+                executor_options.get('proof_cache_capacity', ExecutorConstants.DEFAULT_PROOF_CACHE_CAPACITY) * 1024 *
+                1024)
+        # Run the ZoKrates commands in a long-lived prover daemon per circuit.
+        self.__prover_daemons = None
+        if executor_options.get('prover_socket_path'):
+            self.__prover_daemons = ProverDaemonPool(executor_options['prover_socket_path'], self.__zokrates_path)
+        # The prover backends shared by the workers, keyed by their names.
+        self.__prover_backends = {}
+        # The tracker of the submitted transactions, or the VerifyAndSettle subscription, started with the first
+        # worker.
+        self.__receipt_tracker = None
+        self.__settlement_subscription = None
+
+    def get_receipt_tracker(self):
+        """
+        Get the tracker of the receipts of the submitted transactions, shared by the workers.
+        Returns:
+            ReceiptTracker.
+
+        """
+        if self.__receipt_tracker is None:
+            chain_interface = self.chain_clients.get_client(EthLocalABIInterface, self.__chain_config)
+            self.__receipt_tracker = ReceiptTracker(
+                chain_interface,
+                self.options.get('receipt_poll_interval', ExecutorConstants.DEFAULT_RECEIPT_POLL_INTERVAL),
+                self.options.get('receipt_timeout', ExecutorConstants.DEFAULT_RECEIPT_TIMEOUT))
+            self.__receipt_tracker.start()
+        return self.__receipt_tracker
+
+    def get_settlement_subscription(self):
+        """
+        Get the VerifyAndSettle subscription, shared by the workers.
+        Returns:
+            SettlementSubscription.
+
+        """
+        if self.__settlement_subscription is None:
+            chain_interface = self.chain_clients.get_client(EthLocalABIInterface, self.__chain_config)
+            self.__settlement_subscription = SettlementSubscription(
+                chain_interface,
+                self.options.get('receipt_poll_interval', ExecutorConstants.DEFAULT_RECEIPT_POLL_INTERVAL),
+                ExecutorConstants.DEFAULT_SETTLEMENT_BUFFER_SIZE)
+            self.__settlement_subscription.start()
+        return self.__settlement_subscription
+
+    def get_prover_backend(self, contract_address):
+        """
+        Get the prover backend of the contract, selected by the prover_backend of the contract info, or of the
+        executor options if the contract info does not select any.
+        Args:
+            contract_address: string, contract address.
+
+        Returns:
+            ProverBackend.
+
+        """
+        name = self.registered_contracts.get(contract_address, {}).get('prover_backend') or \
+            self.options.get('prover_backend', ProverBackend.ZOKRATES)
+        if name not in self.__prover_backends:
+            if name == ProverBackend.ZOKRATES:
+                backend = ZokratesCliBackend(self.__zokrates_path, self.__proving_key_path, self.__working_folder_path)
+            elif name == ProverBackend.FAKE:
+                backend = FakeProverBackend(self.options.get('fake_witness_latency', 0.0),
+                                            self.options.get('fake_proof_latency', 0.0))
+            else:
+                raise Exception("Not supported prover backend:" + str(name))
+            self.__prover_backends[name] = backend
+        return self.__prover_backends[name]
 
     @staticmethod
     def check_options(options):
@@ -45,6 +143,14 @@ class ZokratesEthExecutor(Executor):
             raise Exception("Executor cannot find chain option in configuration")
         if "use_existing_data" not in options:
             raise Exception("Executor cannot find use_existing_data setting in configuration")
+        if options.get('artifact_staging', 'auto') not in StagingMode.ALL_MODES:
+            raise Exception("Executor does not support artifact staging mode " + str(options['artifact_staging']))
+        if options.get('witness_input', WitnessInput.AUTO) not in WitnessInput.ALL_CHANNELS:
+            raise Exception("Executor does not support witness input channel " + str(options['witness_input']))
+        if options.get('prover_backend', ProverBackend.ZOKRATES) not in ProverBackend.ALL_BACKENDS:
+            raise Exception("Executor does not support prover backend " + str(options['prover_backend']))
+        if options.get('settlement_tracking', SettlementTracking.RECEIPT) not in SettlementTracking.ALL_MODES:
+            raise Exception("Executor does not support settlement tracking " + str(options['settlement_tracking']))
 
     def create_worker(self, contract_address, execution_id, commitments, execution_queue):
         """
@@ -59,6 +165,7 @@ class ZokratesEthExecutor(Executor):
             ExecutionWorker. The worker for the given execution.
 
         """
+        prover_backend = self.get_prover_backend(contract_address)
         execution_info = {'contract_address': contract_address,
                           'execution_id': execution_id,
                           'zokrates_path': self.__zokrates_path,
@@ -66,12 +173,39 @@ class ZokratesEthExecutor(Executor):
                           'proving_key_path': self.__proving_key_path,
                           'code_path': self.__code_path,
                           'working_path': self.__working_folder_path,
-                          'encryption_info': self.options['encryption_info']}
+                          'encryption_info': self.options['encryption_info'],
+                          'stage_runner': self.stage_runner,
+                          'decryption_service': self.decryption_service,
+                          'chain_client_pool': self.chain_clients,
+                          'receipt_tracker': None,
+                          'settlement_subscription': None,
+                          'journal': self.journal,
+                          'cluster': self.cluster,
+                          'latency_recorder': self.latency_recorder,
+                          'artifact_stager': self.__artifact_stager,
+                          'prover_backend': prover_backend,
+                          'prover_client': None,
+                          'witness_timeout': self.options.get('witness_timeout',
+                                                              ExecutorConstants.DEFAULT_WITNESS_TIMEOUT),
+                          'proof_timeout': self.options.get('proof_timeout', ExecutorConstants.DEFAULT_PROOF_TIMEOUT),
+                          'witness_input': self.options.get('witness_input', WitnessInput.AUTO),
+                          'scratch_pool': self.__scratch_pool,
+                          'proof_cache': self.__proof_cache,
+                          'commitment_hash_threads': self.options.get('commitment_hash_threads', 0)}
+        if self.options.get('settlement_tracking', SettlementTracking.RECEIPT) == SettlementTracking.EVENT:
+            execution_info['settlement_subscription'] = self.get_settlement_subscription()
+        else:
+            execution_info['receipt_tracker'] = self.get_receipt_tracker()
+        if self.__prover_daemons is not None and isinstance(prover_backend, ZokratesCliBackend):
+            try:
+                execution_info['prover_client'] = self.__prover_daemons.get_client(contract_address)
+            except Exception as e:
+                LogUtils.error(str(e) + ", run the ZoKrates commands in the worker.")
 
         if self.debug:
             LogUtils.info("Enable debug mode for worker!")
 
-        return ZokratesEthWorker(execution_info, self.__chain_config, execution_queue, self.submit_lock, self.debug)
+        return ZokratesEthWorker(execution_info, self.__chain_config, execution_queue, self.debug)
 
     def create_listener(self, listener_config, event_queue):
         """
@@ -115,3 +249,31 @@ class ZokratesEthExecutor(Executor):
 
         if path.isfile(compiled_code_path):
             remove(compiled_code_path)
+
+        ContractCache.get_default().invalidate(contract_address)
+
+        if self.__artifact_stager is not None:
+            self.__artifact_stager.release(contract_address)
+
+        if self.__prover_daemons is not None:
+            self.__prover_daemons.stop(contract_address)
+
+        if self.__scratch_pool is not None:
+            self.__scratch_pool.remove_contract(contract_address)
+
+        if self.__settlement_subscription is not None:
+            self.__settlement_subscription.remove_contract(contract_address)
+
+    def shutdown_clean_up(self):
+        """
+        Stop the prover daemons, the receipt tracker and the VerifyAndSettle subscription after the main loop exits.
+
+        """
+        if self.__receipt_tracker is not None:
+            self.__receipt_tracker.stop()
+            self.__receipt_tracker.join()
+        if self.__settlement_subscription is not None:
+            self.__settlement_subscription.stop()
+            self.__settlement_subscription.join()
+        if self.__prover_daemons is not None:
+            self.__prover_daemons.shutdown()
@@ -1,7 +1,10 @@
 import hashlib
+import time
 import urllib.request
 
+from executor.constants.eth_interface_constants import EthInterfaceConstants
 from executor.listener.event_listener_exception import FileDownloadException, CheckSumException
+from executor.metrics.executor_metrics import ExecutorMetrics
 from executor.utils.file_utils import FileUtils
 from os import path
 from urllib.error import URLError
@@ -39,13 +42,34 @@ class ZokratesEthFileDownloader:
         computed_hash = int(sha256_hash.hexdigest(), 16)
         return computed_hash == hash_value
 
-    def download_required_files(self, contract_address, destination_paths, use_existing_data):
+    @staticmethod
+    def download_file(download_path, destination, artifact):
+        """
+        Download the file to the destination, and record the downloaded bytes and the download time into the metrics.
+        Args:
+            download_path: string, the uri to download the file.
+            destination: string, the destination file path.
+            artifact: string, the kind of the file: abi, proving_key, variables or code.
+
+        """
+        start = time.monotonic()
+        try:
+            urllib.request.urlretrieve(download_path, destination)
+        except urllib.error.URLError:
+            raise FileDownloadException
+        registry = ExecutorMetrics.get_registry()
+        registry.observe(ExecutorMetrics.DOWNLOAD_LATENCY, time.monotonic() - start, {'artifact': artifact})
+        registry.increment(ExecutorMetrics.DOWNLOAD_BYTES_TOTAL, path.getsize(destination), {'artifact': artifact})
+
+    def download_required_files(self, contract_address, destination_paths, use_existing_data, metadata=None):
         """
         Download the required files to the destination paths.
         Args:
             contract_address: string, contract_address
             destination_paths: dictionary, the destination paths.
             use_existing_data: boolean, whether skipping downloading if local data already exists.
+            metadata: dictionary, the artifact paths and hashes already read from the contract by
+                      EthInterface.batch_call, or None to read them here in one batch.
 
         Returns:
             Boolean, whether the required files are all downloaded successfully.
@@ -58,6 +82,10 @@ class ZokratesEthFileDownloader:
         local_code_path = destination_paths['code_path']
         local_abi_path = destination_paths['abi_path']
         FileUtils.create_folders([local_proving_key_path, local_code_path, local_abi_path])
+        if metadata is None:
+            metadata = self.__eth_interface.batch_call(
+                contract_address,
+                EthInterfaceConstants.ARTIFACT_PATH_FUNCTIONS + EthInterfaceConstants.ARTIFACT_HASH_FUNCTIONS)
 
         abi_destination = path.join(local_abi_path, contract_address) + '.abi'
         proving_key_destination = path.join(local_proving_key_path, contract_address) + '.pk'
@@ -65,42 +93,30 @@ class ZokratesEthFileDownloader:
         code_destination = path.join(local_code_path, contract_address) + '.code'
 
         if not use_existing_data or not FileUtils.files_exisit([abi_destination]):
-            abi_download_path = self.__eth_interface.get_abi_file_path(contract_address)
-            try:
-                urllib.request.urlretrieve(abi_download_path, abi_destination)
-            except urllib.error.URLError:
-                raise FileDownloadException
+            abi_download_path = metadata['getAbiPath']
+            self.download_file(abi_download_path, abi_destination, 'abi')
         if not use_existing_data or not FileUtils.files_exisit([proving_key_destination]):
-            proving_key_download_path = self.__eth_interface.get_proving_key_path(contract_address)
-            try:
-                urllib.request.urlretrieve(proving_key_download_path, proving_key_destination)
-            except urllib.error.URLError:
-                raise FileDownloadException
+            proving_key_download_path = metadata['getProvingKeyPath']
+            self.download_file(proving_key_download_path, proving_key_destination, 'proving_key')
         if not use_existing_data or not FileUtils.files_exisit([variables_destination]):
-            variables_download_path = self.__eth_interface.get_variables_file_path(contract_address)
-            try:
-                urllib.request.urlretrieve(variables_download_path, variables_destination)
-            except urllib.error.URLError:
-                raise FileDownloadException
+            variables_download_path = metadata['getVariablesPath']
+            self.download_file(variables_download_path, variables_destination, 'variables')
         if not use_existing_data or not FileUtils.files_exisit([code_destination]):
-            code_download_path = self.__eth_interface.get_code_file_path(contract_address)
-            try:
-                urllib.request.urlretrieve(code_download_path, code_destination)
-            except urllib.error.URLError:
-                raise FileDownloadException
+            code_download_path = metadata['getCodePath']
+            self.download_file(code_download_path, code_destination, 'code')
 
-        abi_hash = self.__eth_interface.get_abi_hash(contract_address)
+        abi_hash = metadata['getAbiSha2']
         if not self.file_checksum(abi_destination, abi_hash):
             raise CheckSumException("abi file failed checksum.")
 
-        code_hash = self.__eth_interface.get_code_hash(contract_address)
+        code_hash = metadata['getCodeSha2']
         if not self.file_checksum(code_destination, code_hash):
             raise CheckSumException("code file failed checksum.")
 
-        proving_key_hash = self.__eth_interface.get_proving_key_hash(contract_address)
+        proving_key_hash = metadata['getProvingKeySha2']
         if not self.file_checksum(proving_key_destination, proving_key_hash):
             raise CheckSumException("proving key file failed checksum.")
 
-        variables_hash = self.__eth_interface.get_variables_hash(contract_address)
+        variables_hash = metadata['getVariablesSha2']
         if not self.file_checksum(variables_destination, variables_hash):
             raise CheckSumException("variables file failed checksum.")
@@ -10,6 +10,7 @@ class TaskTable(Table):
     finished_task = Col('Finished Task #')
     successful_task = Col('Successful Task #')
     failed_task_info = Col('Failed Tasks info')
+    queue_info = Col('Queue')
     info = Col('Information')
 
 
@@ -30,3 +31,10 @@ class TaskTableItem(object):
         for execution_id, info in task_status['failed_tasks'].items():
             failed_tasks.append('Execution ID ' + str(execution_id) + ': ' + str(info))
         self.failed_task_info = '\n'.join(failed_tasks)
+        queue_state = task_status['scheduler']
+        queue_info = ['queued: ' + str(queue_state['queued']), 'priority: ' + str(queue_state['weight'])]
+        if queue_state['deadline_in'] is not None:
+            queue_info.append('deadline in: ' + str(int(queue_state['deadline_in'])) + 's')
+        if queue_state['missed_deadlines']:
+            queue_info.append('missed deadlines: ' + str(queue_state['missed_deadlines']))
+        self.queue_info = ', '.join(queue_info)
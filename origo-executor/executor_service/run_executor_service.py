@@ -9,10 +9,14 @@ patch_all()
 import gevent
 import os
 import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from executor.prover.prover_backend import ProverBackend
 from executor.zokrates_proactive_eth_executor import ZokratesProactiveEthExecutor
 from executor_service.executor_task_table import TaskTable, TaskTableItem
 from executor_service.service_config_util import ServiceConfigUtil
-from flask import Flask, jsonify, request, render_template, send_from_directory
+from flask import Flask, Response, jsonify, request, render_template, send_from_directory
 from flask_sockets import Sockets
 from geventwebsocket.handler import WebSocketHandler
 from geventwebsocket.exceptions import WebSocketError
@@ -26,6 +30,9 @@ config_utils = ServiceConfigUtil()
 
 executor_container = {}
 
+# The seconds to wait for the owner node when routing a request in cluster mode.
+ROUTE_TIMEOUT = 30
+
 time_format = {
     'one': "%H:%M:%S",
     'best': "%a, %d %b %Y %H:%M:%S +0000",
@@ -55,26 +62,101 @@ def data():
 
     table = TaskTable(table_items)
 
+    backpressure_state = executor_container['executor'].get_backpressure_state()
+    backpressure = 'Admission: ' + backpressure_state['state']
+    if backpressure_state['reason']:
+        backpressure += ' (' + backpressure_state['reason'] + ')'
+
     info = {'value': now,
             'contents': table.__html__(),
+            'backpressure': backpressure,
             'format': fmt}
     return jsonify(info)
 
 
+@app.route("/metrics", methods=['GET'])
+def metrics():
+    """
+    Provides the executor metrics in the Prometheus text exposition format.
+    """
+    registry = executor_container['executor'].collect_metrics()
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route("/register_contract/<contract_address>")
 def register_contract(contract_address):
-    if executor_container['executor'].register_contract(contract_address, {}):
+    """
+    Register the contract, the optional query parameters are:
+        priority: float, the weight of the contract when scheduling executions of several contracts.
+        deadline_blocks: int, the number of blocks the settlement must land within after the commitment opening.
+        prover_backend: string, the prover of the contract, one of ProverBackend.ALL_BACKENDS.
+    """
+    contract_info = {}
+    priority = request.args.get('priority', type=float)
+    if priority is not None:
+        if priority <= 0:
+            return "Registration failed: priority must be positive"
+        contract_info['priority'] = priority
+    deadline_blocks = request.args.get('deadline_blocks', type=int)
+    if deadline_blocks is not None:
+        contract_info['deadline_blocks'] = deadline_blocks
+    prover_backend = request.args.get('prover_backend', type=str)
+    if prover_backend is not None:
+        if prover_backend not in ProverBackend.ALL_BACKENDS:
+            return "Registration failed: prover_backend must be one of " + ", ".join(ProverBackend.ALL_BACKENDS)
+        contract_info['prover_backend'] = prover_backend
+    executor = executor_container['executor']
+    if executor.cluster is not None:
+        if request.args.get('routed'):
+            # Routed from another node which found this node the owner.
+            executor.cluster.rebalance()
+        else:
+            node_id, node_url = executor.cluster.route_registration(contract_address, contract_info)
+            if node_id is None:
+                return "Registration failed: no live node in the cluster"
+            if not executor.cluster.is_local_node(node_id):
+                return route_request(node_id, node_url)
+        if contract_address in executor.registered_contracts:
+            return "Registration succeeded"
+        return "Registration failed"
+    if executor.register_contract(contract_address, contract_info):
         return "Registration succeeded"
     return "Registration failed"
 
 
 @app.route("/unregister_contract/<contract_address>")
 def unregister_contract(contract_address):
-    if executor_container['executor'].unregister_contract(contract_address):
+    executor = executor_container['executor']
+    if executor.cluster is not None and not request.args.get('routed'):
+        node_id, node_url = executor.cluster.route_unregistration(contract_address)
+        if node_id is not None and not executor.cluster.is_local_node(node_id):
+            return route_request(node_id, node_url)
+    if executor.unregister_contract(contract_address):
         return "Unregistration succeeded"
     return "Unregistration failed"
 
 
+def route_request(node_id, node_url):
+    """
+    Route the current request to the owner node of the contract in cluster mode.
+    Args:
+        node_id: string, the id of the owner node.
+        node_url: string, the url of the executor service of the owner node.
+
+    Returns:
+        string, the response of the owner node.
+    """
+    query = request.args.to_dict()
+    query['routed'] = 1
+    url = node_url + request.path + '?' + urllib.parse.urlencode(query)
+    try:
+        with urllib.request.urlopen(url, timeout=ROUTE_TIMEOUT) as response:
+            return response.read().decode() + " on node " + node_id
+    except (urllib.error.URLError, OSError) as e:
+        return "Routed to node " + node_id + ", which did not respond (" + str(e) + "). The node follows the " \
+               "cluster registry on its next heartbeat."
+
+
 @sockets.route('/updated')
 def updated(ws):
     """
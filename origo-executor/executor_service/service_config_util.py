@@ -1,4 +1,5 @@
 import argparse
+import socket
 from executor.utils.log_utils import LogUtils
 from pathlib import Path
 
@@ -24,7 +25,59 @@ class ServiceConfigUtil:
                        'account_public_key': '0x45cb118D08d0cb4bc3b8E4338635A8BBdF907136',
                        'encryption_type': 'rsa',
                        'rsa_key_path': '/home/origo-executor/tmp/private.pem',
-                       'listener_poll_interval': 2}
+                       'listener_poll_interval': 2,
+                       'max_concurrent_executions': 2,
+                       'max_queued_executions': 1000,
+                       'event_queue_size': 1000,
+                       'execution_queue_size': 1000,
+                       'block_interval': 15,
+                       'deadline_urgency_window': 120,
+                       'worker_backend': 'greenlet',
+                       'process_pool_size': 0,
+                       'decryption_pool_size': 0,
+                       'decryption_batch_size': 16,
+                       'chain_pool_size': 10,
+                       'receipt_poll_interval': 1.0,
+                       'receipt_timeout': 120,
+                       'settlement_tracking': 'receipt',
+                       'artifact_staging': 'auto',
+                       'prover_socket_path': '',
+                       'prover_backend': 'zokrates',
+                       'fake_witness_latency': 0.0,
+                       'fake_proof_latency': 0.0,
+                       'witness_timeout': 600,
+                       'proof_timeout': 3600,
+                       'witness_input': 'auto',
+                       'scratch_path': '',
+                       'scratch_capacity': 1024,
+                       'proof_cache_path': '',
+                       'proof_cache_capacity': 1024,
+                       'commitment_hash_threads': 0,
+                       'journal_path': '/home/origo/working/executor_journal.db',
+                       'cluster_membership_path': '',
+                       'cluster_node_id': '',
+                       'cluster_node_url': '',
+                       'cluster_heartbeat_timeout': 20,
+                       'latency_metrics': True,
+                       'admission_control': True,
+                       'admission_min_free_memory': 512,
+                       'admission_max_load_per_cpu': 2.0,
+                       'admission_min_free_disk': 1024,
+                       'admission_memory_factor': 3.0}
+
+    # Options which should be parsed as integer from the configuration file.
+    INTEGER_OPTIONS = ['listener_poll_interval', 'service_port', 'max_concurrent_executions', 'max_queued_executions',
+                       'event_queue_size', 'execution_queue_size', 'block_interval', 'deadline_urgency_window',
+                       'process_pool_size', 'cluster_heartbeat_timeout', 'admission_min_free_memory',
+                       'admission_min_free_disk', 'witness_timeout', 'proof_timeout',
+                       'scratch_capacity', 'proof_cache_capacity', 'commitment_hash_threads',
+                       'decryption_pool_size', 'decryption_batch_size', 'chain_pool_size',
+                       'receipt_timeout']
+    # Options which should be parsed as float from the configuration file.
+    FLOAT_OPTIONS = ['admission_max_load_per_cpu', 'admission_memory_factor', 'fake_witness_latency',
+                     'fake_proof_latency', 'receipt_poll_interval']
+    # Options which should be parsed as boolean from the configuration file.
+    BOOLEAN_OPTIONS = ['use_existing_data', 'debug_mode', 'latency_metrics', 'admission_control']
 
     def __init__(self):
         """
@@ -97,6 +150,141 @@ class ServiceConfigUtil:
                             help='The listener poll interval seconds. Default: ' +
                                  str(self.DEFAULT_OPTIONS['listener_poll_interval']))
 
+        # Worker pool related args.
+        parser.add_argument('--max-concurrent-executions', dest='max_concurrent_executions', type=int,
+                            help='The maximum number of executions (proof generations) running at the same time. '
+                                 'Default: ' + str(self.DEFAULT_OPTIONS['max_concurrent_executions']))
+        parser.add_argument('--max-queued-executions', dest='max_queued_executions', type=int,
+                            help='The maximum number of executions waiting for a free worker, the executions beyond '
+                                 'it are rejected. Default: ' + str(self.DEFAULT_OPTIONS['max_queued_executions']))
+        parser.add_argument('--worker-backend', dest='worker_backend', type=str,
+                            help='Where the CPU-bound stages of the workers run: greenlet, process_pool. Default: ' +
+                                 self.DEFAULT_OPTIONS['worker_backend'])
+        parser.add_argument('--process-pool-size', dest='process_pool_size', type=int,
+                            help='The number of processes of the process_pool worker backend, 0 means the number of '
+                                 'CPUs. Default: ' + str(self.DEFAULT_OPTIONS['process_pool_size']))
+        parser.add_argument('--chain-pool-size', dest='chain_pool_size', type=int,
+                            help='The maximum number of HTTP connections to the chain node, shared by the listeners '
+                                 'and the workers. Default: ' + str(self.DEFAULT_OPTIONS['chain_pool_size']))
+        parser.add_argument('--receipt-poll-interval', dest='receipt_poll_interval', type=float,
+                            help='The seconds between the checks of the latest block, the receipts of the submitted '
+                                 'transactions are checked in one batch per new block. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['receipt_poll_interval']))
+        parser.add_argument('--receipt-timeout', dest='receipt_timeout', type=int,
+                            help='The seconds a submitted transaction may take to be mined, the execution fails to '
+                                 'submit its proof beyond it. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['receipt_timeout']))
+        parser.add_argument('--settlement-tracking', dest='settlement_tracking', type=str,
+                            help='How the workers learn the outcomes of their verifyAndSettle transactions: receipt, '
+                                 'from the receipts of the transactions, or event, from one VerifyAndSettle filter per '
+                                 'contract. Default: ' + self.DEFAULT_OPTIONS['settlement_tracking'])
+        parser.add_argument('--decryption-pool-size', dest='decryption_pool_size', type=int,
+                            help='The number of processes decrypting the encrypted inputs, 0 means the number of '
+                                 'CPUs. Default: ' + str(self.DEFAULT_OPTIONS['decryption_pool_size']))
+        parser.add_argument('--decryption-batch-size', dest='decryption_batch_size', type=int,
+                            help='The number of encrypted inputs decrypted by a decryption process at once. '
+                                 'Default: ' + str(self.DEFAULT_OPTIONS['decryption_batch_size']))
+        parser.add_argument('--artifact-staging', dest='artifact_staging', type=str,
+                            help='How the proving artifacts are staged into the working folder of every execution: '
+                                 'auto, hardlink, reflink, symlink, copy. Default: ' +
+                                 self.DEFAULT_OPTIONS['artifact_staging'])
+        parser.add_argument('--prover-socket-path', dest='prover_socket_path', type=str,
+                            help='The folder of the Unix sockets of the prover daemons, one daemon per circuit runs '
+                                 'the ZoKrates commands. Empty runs them in the workers. Default: empty')
+        parser.add_argument('--prover-backend', dest='prover_backend', type=str,
+                            help='The prover of the contracts which do not select one when registered: zokrates, '
+                                 'fake. Default: ' + self.DEFAULT_OPTIONS['prover_backend'])
+        parser.add_argument('--fake-witness-latency', dest='fake_witness_latency', type=float,
+                            help='The seconds the witness computation of the fake prover takes. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['fake_witness_latency']))
+        parser.add_argument('--fake-proof-latency', dest='fake_proof_latency', type=float,
+                            help='The seconds the proof generation of the fake prover takes. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['fake_proof_latency']))
+        parser.add_argument('--witness-timeout', dest='witness_timeout', type=int,
+                            help='The seconds after which ZoKrates compute-witness is killed, 0 means no limit. '
+                                 'Default: ' + str(self.DEFAULT_OPTIONS['witness_timeout']))
+        parser.add_argument('--proof-timeout', dest='proof_timeout', type=int,
+                            help='The seconds after which ZoKrates generate-proof is killed, 0 means no limit. '
+                                 'Default: ' + str(self.DEFAULT_OPTIONS['proof_timeout']))
+        parser.add_argument('--witness-input', dest='witness_input', type=str,
+                            help='How the witness arguments are passed to ZoKrates compute-witness: auto, argv, stdin, '
+                                 'file. Default: ' + self.DEFAULT_OPTIONS['witness_input'])
+        parser.add_argument('--scratch-path', dest='scratch_path', type=str,
+                            help='The fast folder, e.g. on a tmpfs, holding the working folders of the executions. '
+                                 'Empty keeps them under the working path. Default: empty')
+        parser.add_argument('--scratch-capacity', dest='scratch_capacity', type=int,
+                            help='The MB the working folders may use on the scratch path, the executions beyond it '
+                                 'work under the working path. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['scratch_capacity']))
+        parser.add_argument('--proof-cache-path', dest='proof_cache_path', type=str,
+                            help='The folder caching the generated proofs by circuit and inputs. Empty disables the '
+                                 'proof cache. Default: empty')
+        parser.add_argument('--proof-cache-capacity', dest='proof_cache_capacity', type=int,
+                            help='The MB of the proof cache, the least recently used proofs are evicted beyond it. '
+                                 'Default: ' + str(self.DEFAULT_OPTIONS['proof_cache_capacity']))
+        parser.add_argument('--commitment-hash-threads', dest='commitment_hash_threads', type=int,
+                            help='The number of threads hashing the commitments of an execution, 0 hashes them in '
+                                 'the commitment checking stage. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['commitment_hash_threads']))
+        parser.add_argument('--event-queue-size', dest='event_queue_size', type=int,
+                            help='The capacity of the queue between listeners and executor, listeners block when it '
+                                 'is full. Default: ' + str(self.DEFAULT_OPTIONS['event_queue_size']))
+        parser.add_argument('--execution-queue-size', dest='execution_queue_size', type=int,
+                            help='The capacity of the queue between workers and executor, workers block when it is '
+                                 'full. Default: ' + str(self.DEFAULT_OPTIONS['execution_queue_size']))
+
+        # Scheduler related args.
+        parser.add_argument('--block-interval', dest='block_interval', type=int,
+                            help='The average seconds between two blocks, used for the contract deadline in blocks. '
+                                 'Default: ' + str(self.DEFAULT_OPTIONS['block_interval']))
+        parser.add_argument('--deadline-urgency-window', dest='deadline_urgency_window', type=int,
+                            help='The executions whose deadline is within this number of seconds are started before '
+                                 'all the others. Default: ' + str(self.DEFAULT_OPTIONS['deadline_urgency_window']))
+
+        # Admission control related args.
+        parser.add_argument('--disable-admission-control', dest='admission_control', action='store_false',
+                            default=None, help='Start the queued executions regardless of the host resources. '
+                                               'Default: enabled')
+        parser.add_argument('--admission-min-free-memory', dest='admission_min_free_memory', type=int,
+                            help='The memory in MB kept free on top of the peak RSS of the circuit of a new '
+                                 'execution. Default: ' + str(self.DEFAULT_OPTIONS['admission_min_free_memory']))
+        parser.add_argument('--admission-max-load-per-cpu', dest='admission_max_load_per_cpu', type=float,
+                            help='The new executions are held while the 1-minute load average per CPU is above it, '
+                                 '0 disables the check. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['admission_max_load_per_cpu']))
+        parser.add_argument('--admission-min-free-disk', dest='admission_min_free_disk', type=int,
+                            help='The free disk in MB kept under the working path. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['admission_min_free_disk']))
+        parser.add_argument('--admission-memory-factor', dest='admission_memory_factor', type=float,
+                            help='The peak RSS of a circuit is estimated as this factor times its proving key size '
+                                 'until it is measured. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['admission_memory_factor']))
+
+        # Journal related args.
+        parser.add_argument('--journal-path', dest='journal_path', type=str,
+                            help='The SQLite file to journal the registered contracts and the execution stages, so '
+                                 'the executor resumes from them after restart. Empty to disable. Default: ' +
+                                 self.DEFAULT_OPTIONS['journal_path'])
+
+        # Cluster related args.
+        parser.add_argument('--cluster-membership-path', dest='cluster_membership_path', type=str,
+                            help='The membership file shared by the executor nodes of the cluster, the contracts are '
+                                 'partitioned among the nodes. Empty to run a single node. Default: ' +
+                                 self.DEFAULT_OPTIONS['cluster_membership_path'])
+        parser.add_argument('--cluster-node-id', dest='cluster_node_id', type=str,
+                            help='The unique id of this node in the cluster. Default: <hostname>:<service port>')
+        parser.add_argument('--cluster-node-url', dest='cluster_node_url', type=str,
+                            help='The url the other nodes use to route requests to this node. '
+                                 'Default: http://<hostname>:<service port>')
+        parser.add_argument('--cluster-heartbeat-timeout', dest='cluster_heartbeat_timeout', type=int,
+                            help='The seconds after the last heartbeat when a node is considered left and its '
+                                 'contracts are taken over. Default: ' +
+                                 str(self.DEFAULT_OPTIONS['cluster_heartbeat_timeout']))
+
+        # Metrics related args.
+        parser.add_argument('--disable-latency-metrics', dest='latency_metrics', action='store_false', default=None,
+                            help='Disable the latency histograms of the execution stages. Default: enabled')
+
         # Debug mode
         parser.add_argument('--debug-mode', dest='debug_mode', action='store_true', default=False,
                             help='Whether enable the debug mode for Origo Executor. Default: False')
@@ -115,9 +303,11 @@ class ServiceConfigUtil:
                 if len(config_fields) != 2:
                     LogUtils.error("Invalid config item:" + line)
                     exit(0)
-                if config_fields[0] == 'listener_poll_interval' or config_fields[0] == 'service_port':
+                if config_fields[0] in ServiceConfigUtil.INTEGER_OPTIONS:
                     parsed_options[config_fields[0]] = int(config_fields[1])
-                elif config_fields[0] == 'use_existing_data' or config_fields[0] == 'debug_mode':
+                elif config_fields[0] in ServiceConfigUtil.FLOAT_OPTIONS:
+                    parsed_options[config_fields[0]] = float(config_fields[1])
+                elif config_fields[0] in ServiceConfigUtil.BOOLEAN_OPTIONS:
                     if config_fields[1] in ['true', 'True', '1']:
                         parsed_options[config_fields[0]] = True
                     else:
@@ -166,6 +356,46 @@ class ServiceConfigUtil:
         self.options['poll_interval'] = config_options['listener_poll_interval']
         self.options['use_existing_data'] = config_options['use_existing_data']
         self.options['debug_mode'] = config_options['debug_mode']
+        self.options['max_concurrent_executions'] = config_options['max_concurrent_executions']
+        self.options['max_queued_executions'] = config_options['max_queued_executions']
+        self.options['worker_backend'] = config_options['worker_backend']
+        self.options['process_pool_size'] = config_options['process_pool_size']
+        self.options['chain_pool_size'] = config_options['chain_pool_size']
+        self.options['receipt_poll_interval'] = config_options['receipt_poll_interval']
+        self.options['receipt_timeout'] = config_options['receipt_timeout']
+        self.options['settlement_tracking'] = config_options['settlement_tracking']
+        self.options['decryption_pool_size'] = config_options['decryption_pool_size']
+        self.options['decryption_batch_size'] = config_options['decryption_batch_size']
+        self.options['artifact_staging'] = config_options['artifact_staging']
+        self.options['prover_socket_path'] = config_options['prover_socket_path']
+        self.options['prover_backend'] = config_options['prover_backend']
+        self.options['fake_witness_latency'] = config_options['fake_witness_latency']
+        self.options['fake_proof_latency'] = config_options['fake_proof_latency']
+        self.options['witness_timeout'] = config_options['witness_timeout']
+        self.options['proof_timeout'] = config_options['proof_timeout']
+        self.options['witness_input'] = config_options['witness_input']
+        self.options['scratch_path'] = config_options['scratch_path']
+        self.options['scratch_capacity'] = config_options['scratch_capacity']
+        self.options['proof_cache_path'] = config_options['proof_cache_path']
+        self.options['proof_cache_capacity'] = config_options['proof_cache_capacity']
+        self.options['commitment_hash_threads'] = config_options['commitment_hash_threads']
+        self.options['journal_path'] = config_options['journal_path']
+        self.options['cluster_membership_path'] = config_options['cluster_membership_path']
+        self.options['cluster_node_id'] = config_options['cluster_node_id'] or \
+            socket.gethostname() + ':' + str(config_options['service_port'])
+        self.options['cluster_node_url'] = config_options['cluster_node_url'] or \
+            'http://' + socket.gethostname() + ':' + str(config_options['service_port'])
+        self.options['cluster_heartbeat_timeout'] = config_options['cluster_heartbeat_timeout']
+        self.options['latency_metrics'] = config_options['latency_metrics']
+        self.options['admission_control'] = config_options['admission_control']
+        self.options['admission_min_free_memory'] = config_options['admission_min_free_memory']
+        self.options['admission_max_load_per_cpu'] = config_options['admission_max_load_per_cpu']
+        self.options['admission_min_free_disk'] = config_options['admission_min_free_disk']
+        self.options['admission_memory_factor'] = config_options['admission_memory_factor']
+        self.options['event_queue_size'] = config_options['event_queue_size']
+        self.options['execution_queue_size'] = config_options['execution_queue_size']
+        self.options['block_interval'] = config_options['block_interval']
+        self.options['deadline_urgency_window'] = config_options['deadline_urgency_window']
 
         if config_options['chain_provider_type'] == 'http':
             self.options['chain_config']['http_uri'] = config_options['http_uri']
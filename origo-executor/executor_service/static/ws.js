@@ -59,6 +59,7 @@ function display_data(data) {
         }
         // update the contents of several HTML divs via jQuery
         $('div#value').html(delta_msg);
+        $('div#backpressure').html(data.backpressure);
         $('div#contents').html(data.contents);
 
         // remember this data, in case want to compare it to next update
@@ -0,0 +1,181 @@
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import unittest
+
+from executor.chain_interface.chain_client_pool import ChainClientPool
+from executor.chain_interface.eth_localabi_interface import EthLocalABIInterface
+from executor.constants.eth_interface_constants import EthInterfaceConstants
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from web3 import Web3
+
+
+class FakeNodeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def respond(self, request):
+        self.server.requests.append(request['method'])
+        if request['method'] == 'eth_blockNumber':
+            result = self.server.block_numbers.pop(0) if self.server.block_numbers else '0x10'
+        elif request['method'] == 'eth_call':
+            self.server.call_blocks.append(request['params'][1])
+            result = self.server.call_results[request['params'][0]['data']]
+        else:
+            result = '0x10'
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.posts += 1
+        self.server.connections.add(self.client_address)
+        if isinstance(request, list):
+            response = [self.respond(item) for item in request] if self.server.support_batch else \
+                {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'batch not supported'}}
+        else:
+            response = self.respond(request)
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeIPCNodeHandler(socketserver.BaseRequestHandler):
+    respond = FakeNodeHandler.respond
+
+    def handle(self):
+        data = b''
+        while True:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            data += chunk
+            try:
+                request = json.loads(data.decode())
+            except ValueError:
+                continue
+            data = b''
+            self.server.posts += 1
+            response = [self.respond(item) for item in request] if isinstance(request, list) else \
+                self.respond(request)
+            self.request.sendall(json.dumps(response).encode())
+
+
+class ChainClientPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.node = ThreadingHTTPServer(('127.0.0.1', 0), FakeNodeHandler)
+        self.node.requests = []
+        self.node.connections = set()
+        self.node.posts = 0
+        self.node.block_numbers = []
+        self.node.call_blocks = []
+        self.node.call_results = {}
+        self.node.support_batch = True
+        threading.Thread(target=self.node.serve_forever, daemon=True).start()
+        self.chain_config = {'provider_type': 'http', 'abi_path': '', 'default_account': None,
+                             'http_uri': 'http://127.0.0.1:' + str(self.node.server_address[1])}
+        self.pool = ChainClientPool(pool_size=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.node.shutdown()
+        self.node.server_close()
+
+    def test_clients_are_shared_per_chain_config(self):
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(
+            self.pool.get_client(EthLocalABIInterface, dict(self.chain_config)))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(8, len(clients))
+        self.assertTrue(all(client is clients[0] for client in clients))
+        # The connection to the node is checked once.
+        self.assertEqual(1, len(self.node.requests))
+
+        other_config = dict(self.chain_config, default_account='0x' + '1' * 40)
+        self.assertIsNot(clients[0], self.pool.get_client(EthLocalABIInterface, other_config))
+
+    def test_websocket_clients_are_not_shared(self):
+        class RecordingInterface:
+            def __init__(self, options, provider=None):
+                self.provider = provider
+
+        websocket_config = {'provider_type': 'websocket', 'websocket_uri': 'ws://127.0.0.1:8546'}
+        first = self.pool.get_client(RecordingInterface, websocket_config)
+        self.assertIsNot(first, self.pool.get_client(RecordingInterface, dict(websocket_config)))
+        self.assertIsNone(first.provider)
+        ipc_config = {'provider_type': 'ipc', 'ipc_path': '/tmp/geth.ipc'}
+        self.assertIs(self.pool.get_client(RecordingInterface, ipc_config),
+                      self.pool.get_client(RecordingInterface, dict(ipc_config)))
+
+    def test_requests_reuse_pooled_connections(self):
+        web3 = Web3(self.pool.create_provider(self.chain_config))
+        for _ in range(20):
+            self.assertEqual(16, web3.eth.blockNumber)
+        self.assertEqual(20, len(self.node.requests))
+        self.assertEqual(1, len(self.node.connections))
+
+    def set_metadata(self):
+        contract = Web3().eth.contract(abi=EthInterfaceConstants.DEFAULT_ABI)
+        metadata = {}
+        for function_name in EthInterfaceConstants.METADATA_FUNCTIONS:
+            output_types = [output['type'] for output in
+                            next(item for item in EthInterfaceConstants.DEFAULT_ABI if item.get('name') == function_name)
+                            ['outputs']]
+            value = 'https://artifacts/' + function_name if output_types == ['string'] else len(function_name)
+            metadata[function_name] = value
+            result = Web3().codec.encode_abi(output_types, [value])
+            self.node.call_results[contract.encodeABI(fn_name=function_name)] = '0x' + result.hex()
+        return metadata
+
+    def test_batch_call_reads_metadata_in_one_round_trip(self):
+        client = self.pool.get_client(EthLocalABIInterface, dict(self.chain_config, default_account='0x' + '1' * 40))
+        metadata = self.set_metadata()
+        posts = self.node.posts
+        self.assertEqual(metadata, client.batch_call('0x' + '2' * 40, EthInterfaceConstants.METADATA_FUNCTIONS))
+        self.assertEqual(posts + 1, self.node.posts)
+        self.assertEqual(['latest'] * len(metadata), self.node.call_blocks)
+
+    def test_batch_call_pins_block_when_it_changes(self):
+        client = self.pool.get_client(EthLocalABIInterface, dict(self.chain_config, default_account='0x' + '1' * 40))
+        metadata = self.set_metadata()
+        self.node.block_numbers = ['0x10', '0x11']
+        posts = self.node.posts
+        self.assertEqual(metadata, client.batch_call('0x' + '2' * 40, EthInterfaceConstants.METADATA_FUNCTIONS))
+        self.assertEqual(posts + 2, self.node.posts)
+        self.assertEqual(['0x11'] * len(metadata), self.node.call_blocks[len(metadata):])
+
+    def test_batch_call_falls_back_to_single_calls(self):
+        client = self.pool.get_client(EthLocalABIInterface, dict(self.chain_config, default_account='0x' + '1' * 40))
+        metadata = self.set_metadata()
+        self.node.support_batch = False
+        self.assertEqual(metadata, client.batch_call('0x' + '2' * 40, EthInterfaceConstants.METADATA_FUNCTIONS))
+        self.assertEqual(len(metadata), self.node.requests.count('eth_call'))
+
+    def test_batch_call_reads_metadata_in_one_round_trip_over_ipc(self):
+        with tempfile.TemporaryDirectory() as working_dir:
+            ipc_path = os.path.join(working_dir, 'geth.ipc')
+            ipc_node = socketserver.ThreadingUnixStreamServer(ipc_path, FakeIPCNodeHandler)
+            ipc_node.daemon_threads = True
+            for name in ['requests', 'block_numbers', 'call_blocks']:
+                setattr(ipc_node, name, [])
+            ipc_node.posts = 0
+            threading.Thread(target=ipc_node.serve_forever, daemon=True).start()
+            self.addCleanup(ipc_node.server_close)
+            self.addCleanup(ipc_node.shutdown)
+            ipc_node.call_results = self.node.call_results
+            metadata = self.set_metadata()
+            client = self.pool.get_client(EthLocalABIInterface, {'provider_type': 'ipc', 'ipc_path': ipc_path,
+                                                                 'abi_path': '', 'default_account': '0x' + '1' * 40})
+            posts = ipc_node.posts
+            self.assertEqual(metadata, client.batch_call('0x' + '2' * 40, EthInterfaceConstants.METADATA_FUNCTIONS))
+            self.assertEqual(posts + 1, ipc_node.posts)
+            self.assertEqual(len(metadata), ipc_node.requests.count('eth_call'))
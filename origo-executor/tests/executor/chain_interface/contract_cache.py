@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+
+from executor.chain_interface.contract_cache import ContractCache
+from executor.constants.eth_interface_constants import EthInterfaceConstants
+from executor.metrics.executor_metrics import ExecutorMetrics
+from web3 import Web3
+
+
+class ContractCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.cache = ContractCache()
+        self.web3 = Web3()
+        self.addresses = [Web3.toChecksumAddress('0x' + digit * 40) for digit in '12']
+        self.abi_paths = []
+        for address in self.addresses:
+            abi_path = os.path.join(self.working_dir.name, address + '.abi')
+            with open(abi_path, 'w') as abi_file:
+                json.dump(EthInterfaceConstants.DEFAULT_ABI, abi_file)
+            self.abi_paths.append(abi_path)
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    def test_identical_abis_are_parsed_once(self):
+        first_key, first_abi = self.cache.load_abi_file(self.addresses[0], self.abi_paths[0])
+        second_key, second_abi = self.cache.load_abi_file(self.addresses[1], self.abi_paths[1])
+        self.assertEqual(first_key, second_key)
+        self.assertIs(first_abi, second_abi)
+        self.assertIs(first_abi, self.cache.load_abi_file(self.addresses[0], self.abi_paths[0])[1])
+
+        first_contract = self.cache.get_contract(self.web3, self.addresses[0], first_key, first_abi)
+        second_contract = self.cache.get_contract(self.web3, self.addresses[1], second_key, second_abi)
+        self.assertEqual(self.addresses[0], first_contract.address)
+        self.assertIs(type(first_contract), type(second_contract))
+        self.assertIs(first_contract, self.cache.get_contract(self.web3, self.addresses[0], first_key, first_abi))
+        self.assertGreater(ExecutorMetrics.get_registry().get_value(ExecutorMetrics.CONTRACT_CACHE_HIT_RATIO,
+                                                                    {'cache': 'contract'}), 0)
+
+    def test_changed_abi_file_is_parsed_again(self):
+        abi_key, abi = self.cache.load_abi_file(self.addresses[0], self.abi_paths[0])
+        with open(self.abi_paths[0], 'w') as abi_file:
+            json.dump(EthInterfaceConstants.DEFAULT_ABI[:1], abi_file)
+        os.utime(self.abi_paths[0], ns=(0, 0))
+        changed_key, changed_abi = self.cache.load_abi_file(self.addresses[0], self.abi_paths[0])
+        self.assertNotEqual(abi_key, changed_key)
+        self.assertEqual(1, len(changed_abi))
+
+    def test_invalidate(self):
+        abi_key, abi = self.cache.load_abi_file(self.addresses[0], self.abi_paths[0])
+        contract = self.cache.get_contract(self.web3, self.addresses[0], abi_key, abi)
+        self.cache.invalidate(self.addresses[0])
+        self.assertIsNot(contract, self.cache.get_contract(self.web3, self.addresses[0], abi_key, abi))
+        os.remove(self.abi_paths[0])
+        with self.assertRaises(FileNotFoundError):
+            self.cache.load_abi_file(self.addresses[0], self.abi_paths[0])
@@ -0,0 +1,103 @@
+import threading
+import unittest
+
+from executor.chain_interface.nonce_manager import NonceManager
+from executor.metrics.executor_metrics import ExecutorMetrics
+
+
+class FakeEth:
+    def __init__(self, transaction_count):
+        self.transaction_count = transaction_count
+        self.latest_count = transaction_count
+        self.count_reads = 0
+
+    def getTransactionCount(self, account, block_identifier):
+        if block_identifier == 'latest':
+            return self.latest_count
+        self.count_reads += 1
+        return self.transaction_count
+
+
+class FakeWeb3:
+    def __init__(self, transaction_count=5):
+        self.eth = FakeEth(transaction_count)
+
+
+class NonceManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.web3 = FakeWeb3()
+        self.manager = NonceManager(self.web3, '0x' + '1' * 40)
+
+    def test_nonces_are_assigned_locally(self):
+        nonces = []
+        threads = [threading.Thread(target=lambda: nonces.append(self.manager.allocate())) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(list(range(5, 21)), sorted(nonces))
+        self.assertEqual(1, self.web3.eth.count_reads)
+
+    def test_failed_broadcast_resyncs_from_chain(self):
+        registry = ExecutorMetrics.get_registry()
+        resyncs = registry.get_value(ExecutorMetrics.NONCE_RESYNCS_TOTAL) or 0
+        self.assertEqual(5, self.manager.send_transaction(lambda nonce: nonce))
+
+        def fail(nonce):
+            raise ValueError({'code': -32000, 'message': 'insufficient funds for gas * price + value'})
+        self.assertRaises(ValueError, self.manager.send_transaction, fail)
+        self.assertEqual(resyncs + 1, registry.get_value(ExecutorMetrics.NONCE_RESYNCS_TOTAL))
+        # The nonce 6 of the failed transaction is reused.
+        self.web3.eth.transaction_count = 6
+        self.assertEqual(6, self.manager.send_transaction(lambda nonce: nonce))
+        self.assertEqual(2, self.web3.eth.count_reads)
+
+    def test_rejected_nonce_is_resent(self):
+        self.manager.allocate()
+        # The account sent other transactions, the local nonce 6 is behind the chain.
+        self.web3.eth.transaction_count = 9
+        sent = []
+
+        def send(nonce):
+            sent.append(nonce)
+            if nonce < 9:
+                raise ValueError({'code': -32000, 'message': 'nonce too low'})
+            return nonce
+        self.assertEqual(9, self.manager.send_transaction(send))
+        self.assertEqual([6, 9], sent)
+
+    def test_managers_are_shared_per_account(self):
+        manager = NonceManager.get(self.web3, '0x' + 'a' * 40)
+        self.assertIs(manager, NonceManager.get(FakeWeb3(), '0x' + 'A' * 40))
+        self.assertIsNot(manager, NonceManager.get(self.web3, '0x' + 'b' * 40))
+
+    def test_known_transaction_is_not_resent(self):
+        sent = []
+
+        def send(nonce):
+            sent.append(nonce)
+            raise ValueError({'code': -32000, 'message': 'already known'})
+        self.assertTrue(NonceManager.is_known_transaction_error(ValueError({'message': 'known transaction: 0x1'})))
+        self.assertFalse(NonceManager.is_nonce_error(ValueError({'message': 'already known'})))
+        self.assertRaises(ValueError, self.manager.send_transaction, send)
+        self.assertEqual([5], sent)
+
+    def test_dropped_transaction_gap_is_resynced(self):
+        for nonce in range(5, 8):
+            tx_hash = self.manager.send_transaction(lambda nonce: nonce.to_bytes(32, 'big'))
+            self.assertEqual(nonce, int.from_bytes(tx_hash, 'big'))
+        self.assertEqual(3, self.manager.get_outstanding_count())
+        # All the transactions are in the pool.
+        self.web3.eth.transaction_count = 8
+        self.assertFalse(self.manager.check_gap())
+        # The nonce 5 is mined, the nonce 6 is dropped, so the nonce 7 is held in the queue.
+        self.web3.eth.latest_count = 6
+        self.web3.eth.transaction_count = 6
+        self.assertTrue(self.manager.check_gap())
+        self.assertEqual(2, self.manager.get_outstanding_count())
+        self.assertEqual(6, self.manager.allocate())
+
+    def test_confirmed_transaction_is_forgotten(self):
+        tx_hash = self.manager.send_transaction(lambda nonce: nonce.to_bytes(32, 'big'))
+        self.manager.confirm('0x' + tx_hash.hex())
+        self.assertEqual(0, self.manager.get_outstanding_count())
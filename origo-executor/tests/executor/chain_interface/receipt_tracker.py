@@ -0,0 +1,107 @@
+import unittest
+
+from executor.chain_interface.eth_interface import EthInterface
+from executor.chain_interface.receipt_tracker import ReceiptTracker
+from web3 import Web3
+from web3.exceptions import TimeExhausted
+
+
+VERIFY_AND_SETTLE_ABI = [{'anonymous': False, 'name': 'VerifyAndSettle', 'type': 'event',
+                          'inputs': [{'indexed': False, 'name': 'execution_id', 'type': 'uint256'},
+                                     {'indexed': False, 'name': 'success', 'type': 'bool'}]}]
+
+
+class FakeNonceManager:
+    def __init__(self):
+        self.confirmed = []
+        self.gap_checks = 0
+
+    def confirm(self, tx_hash):
+        self.confirmed.append(tx_hash)
+
+    def check_gap(self):
+        self.gap_checks += 1
+        return True
+
+
+class FakeChainInterface:
+    def __init__(self):
+        self.block_number = 1
+        self.receipts = {}
+        self.receipt_reads = []
+        self.nonce_manager = FakeNonceManager()
+
+    def get_nonce_manager(self):
+        return self.nonce_manager
+
+    def get_block_number(self):
+        return self.block_number
+
+    def get_transaction_receipts(self, tx_hashes):
+        self.receipt_reads.append(list(tx_hashes))
+        return {tx_hash: self.receipts.get(tx_hash) for tx_hash in tx_hashes}
+
+    def get_verify_and_settle_result(self, contract_address, execution_id, receipt):
+        return receipt['status'] == 1
+
+
+class ReceiptTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.chain_interface = FakeChainInterface()
+        self.tracker = ReceiptTracker(self.chain_interface, 0.01, 60)
+
+    def test_pending_receipts_are_checked_in_one_batch(self):
+        futures = [self.tracker.track('0x1', execution_id, '0x' + str(execution_id)) for execution_id in range(3)]
+        self.chain_interface.receipts = {'0x0': {'status': 1}, '0x2': {'status': 0}}
+        self.tracker.check_receipts()
+        self.assertEqual([['0x0', '0x1', '0x2']], self.chain_interface.receipt_reads)
+        self.assertEqual({'receipt': {'status': 1}, 'success': True}, futures[0].get(timeout=1))
+        self.assertFalse(futures[1].ready())
+        self.assertFalse(futures[2].get(timeout=1)['success'])
+        self.assertEqual(1, self.tracker.get_pending_count())
+        self.assertEqual(['0x0', '0x2'], self.chain_interface.nonce_manager.confirmed)
+
+    def test_receipts_are_checked_once_per_block(self):
+        future = self.tracker.track('0x1', 0, '0x0')
+        self.tracker.start()
+        try:
+            self.tracker.join(timeout=0.1)
+            self.assertEqual(1, len(self.chain_interface.receipt_reads))
+            self.chain_interface.receipts = {'0x0': {'status': 1}}
+            self.chain_interface.block_number = 2
+            self.assertTrue(future.get(timeout=1)['success'])
+        finally:
+            self.tracker.stop()
+            self.tracker.join()
+
+    def test_transactions_not_mined_before_deadline_fail(self):
+        tracker = ReceiptTracker(self.chain_interface, 0.01, 0.05)
+        future = tracker.track('0x1', 0, '0x0')
+        tracker.start()
+        try:
+            self.assertRaises(TimeExhausted, future.get, timeout=1)
+            self.assertEqual(0, tracker.get_pending_count())
+            self.assertEqual(['0x0'], self.chain_interface.nonce_manager.confirmed)
+            self.assertEqual(1, self.chain_interface.nonce_manager.gap_checks)
+        finally:
+            tracker.stop()
+            tracker.join()
+
+    def test_stop_fails_pending_futures(self):
+        future = self.tracker.track('0x1', 0, '0x0')
+        self.tracker.stop()
+        self.assertRaises(Exception, future.get, timeout=1)
+
+    def test_format_raw_receipt(self):
+        contract = Web3().eth.contract(address='0x' + '2' * 40, abi=VERIFY_AND_SETTLE_ABI)
+        topic = Web3.keccak(text='VerifyAndSettle(uint256,bool)').hex()
+        log = {'address': '0x' + '2' * 40, 'topics': [topic], 'data': '0x' + '%064x' % 7 + '%064x' % 1,
+               'blockNumber': '0x10', 'blockHash': '0x' + '3' * 64, 'logIndex': '0x0', 'transactionIndex': '0x0',
+               'transactionHash': '0x' + '4' * 64}
+        receipt = EthInterface._format_receipt({'status': '0x1', 'blockNumber': '0x10', 'gasUsed': '0x5208',
+                                                'logs': [log]})
+        self.assertEqual(1, receipt.status)
+        self.assertEqual(16, receipt.blockNumber)
+        event = contract.events.VerifyAndSettle().processReceipt(receipt)[0]
+        self.assertEqual(7, event.args.execution_id)
+        self.assertTrue(event.args.success)
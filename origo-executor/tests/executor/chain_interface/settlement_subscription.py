@@ -0,0 +1,112 @@
+import unittest
+
+from executor.chain_interface.settlement_subscription import SettlementSubscription
+from web3.datastructures import AttributeDict
+
+
+def create_event(execution_id, success=True):
+    return AttributeDict({'args': AttributeDict({'execution_id': execution_id, 'success': success})})
+
+
+class FakeFilter:
+    def __init__(self, from_block):
+        self.from_block = from_block
+        self.entries = []
+        self.all_entries = []
+        self.polls = 0
+        self.lost = False
+
+    def get_new_entries(self):
+        if self.lost:
+            raise ValueError({'code': -32000, 'message': 'filter not found'})
+        self.polls += 1
+        entries, self.entries = self.entries, []
+        return entries
+
+    def get_all_entries(self):
+        return self.all_entries
+
+
+class FakeChainInterface:
+    def __init__(self):
+        self.filters = {}
+        self.block_number = 10
+        self.missed_events = []
+
+    def get_block_number(self):
+        return self.block_number
+
+    def init_verify_and_settle_event_listener(self, contract_address, from_block='latest'):
+        self.filters[contract_address] = FakeFilter(from_block)
+        self.filters[contract_address].all_entries, self.missed_events = self.missed_events, []
+        return self.filters[contract_address]
+
+
+class SettlementSubscriptionTests(unittest.TestCase):
+    def setUp(self):
+        self.chain_interface = FakeChainInterface()
+        self.subscription = SettlementSubscription(self.chain_interface, 0.01, 2)
+
+    def test_events_are_demultiplexed_from_one_filter_per_contract(self):
+        futures = [self.subscription.watch('0x1', execution_id) for execution_id in range(3)]
+        other = self.subscription.watch('0x2', 0)
+        self.assertEqual(['0x1', '0x2'], sorted(self.chain_interface.filters.keys()))
+        self.chain_interface.filters['0x1'].entries = [create_event(2, False), create_event(0)]
+        self.subscription.poll()
+        self.assertTrue(futures[0].get(timeout=1)['success'])
+        self.assertFalse(futures[1].ready())
+        self.assertFalse(futures[2].get(timeout=1)['success'])
+        self.assertFalse(other.ready())
+
+    def test_events_arriving_before_the_watch_are_buffered(self):
+        self.subscription.watch('0x1', 0)
+        self.chain_interface.filters['0x1'].entries = [create_event(1), create_event(2), create_event(3, False)]
+        self.subscription.poll()
+        # The oldest event is dropped beyond the buffer size.
+        self.assertEqual(2, self.subscription.get_buffered_count())
+        self.assertFalse(self.subscription.watch('0x1', 3).get(timeout=1)['success'])
+        self.assertFalse(self.subscription.watch('0x1', 1).ready())
+        self.assertEqual(1, self.subscription.get_buffered_count())
+
+    def test_single_greenlet_polls_all_filters(self):
+        future = self.subscription.watch('0x1', 0)
+        self.subscription.watch('0x2', 0)
+        self.subscription.start()
+        try:
+            self.chain_interface.filters['0x1'].entries = [create_event(0)]
+            self.assertTrue(future.get(timeout=1)['success'])
+            self.assertGreater(self.chain_interface.filters['0x2'].polls, 0)
+        finally:
+            self.subscription.stop()
+            self.subscription.join()
+
+    def test_lost_filter_is_created_again_from_the_last_polled_block(self):
+        future = self.subscription.watch('0x1', 0)
+        self.chain_interface.block_number = 12
+        self.subscription.poll()
+        lost_filter = self.chain_interface.filters['0x1']
+        lost_filter.lost = True
+        # The event is emitted while the filter is lost, the recreated filter reads it from its first block.
+        self.chain_interface.missed_events = [create_event(0)]
+        self.chain_interface.block_number = 15
+        self.subscription.poll()
+        recreated_filter = self.chain_interface.filters['0x1']
+        self.assertIsNot(lost_filter, recreated_filter)
+        self.assertEqual(12, recreated_filter.from_block)
+        self.assertTrue(future.get(timeout=1)['success'])
+        self.subscription.poll()
+        self.assertEqual(1, recreated_filter.polls)
+
+    def test_unwatch_drops_the_waiter(self):
+        self.subscription.watch('0x1', 0)
+        self.subscription.unwatch('0x1', 0)
+        self.chain_interface.filters['0x1'].entries = [create_event(0)]
+        self.subscription.poll()
+        # The event is buffered as nobody waits for it.
+        self.assertEqual(1, self.subscription.get_buffered_count())
+
+    def test_remove_contract_fails_its_waiters(self):
+        future = self.subscription.watch('0x1', 0)
+        self.subscription.remove_contract('0x1')
+        self.assertRaises(Exception, future.get, timeout=1)
+        self.subscription.poll()
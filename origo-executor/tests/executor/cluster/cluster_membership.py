@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from executor.cluster.cluster_membership import ClusterMembership
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ClusterMembershipTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.membership_path = os.path.join(self.working_dir.name, 'membership.json')
+        self.clock = FakeClock()
+        self.contracts = ['0x' + format(index, '040x') for index in range(50)]
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    def create_node(self, node_id):
+        return ClusterMembership(self.membership_path, node_id, 'http://' + node_id, 20, 64, self.clock)
+
+    def test_single_node_claims_all_contracts(self):
+        node = self.create_node('node-1')
+        node.heartbeat()
+        for contract in self.contracts:
+            self.assertEqual(('node-1', 'http://node-1'), node.register_contract(contract, {'priority': 2}))
+        claimed, handoff = node.rebalance()
+        self.assertEqual(set(self.contracts), set(claimed.keys()))
+        self.assertEqual({'priority': 2}, claimed[self.contracts[0]])
+        self.assertEqual([], handoff)
+
+    def test_contract_is_handed_off_to_joined_node(self):
+        node_1 = self.create_node('node-1')
+        node_2 = self.create_node('node-2')
+        node_1.heartbeat()
+        for contract in self.contracts:
+            node_1.register_contract(contract, {})
+        node_1.rebalance()
+        node_2.heartbeat()
+        claimed_1, handoff = node_1.rebalance()
+        self.assertTrue(handoff)
+        # Not claimed by node-2 before node-1 releases it.
+        claimed_2, _ = node_2.rebalance()
+        self.assertFalse(set(handoff) & set(claimed_2.keys()))
+        node_1.release_contracts(handoff)
+        claimed_2, _ = node_2.rebalance()
+        claimed_1, _ = node_1.rebalance()
+        self.assertEqual(set(handoff), set(claimed_2.keys()))
+        self.assertEqual(set(self.contracts), set(claimed_1.keys()) | set(claimed_2.keys()))
+        self.assertFalse(set(claimed_1.keys()) & set(claimed_2.keys()))
+
+    def test_contracts_of_left_node_are_taken_over(self):
+        node_1 = self.create_node('node-1')
+        node_2 = self.create_node('node-2')
+        node_1.heartbeat()
+        node_2.heartbeat()
+        for contract in self.contracts:
+            node_1.register_contract(contract, {})
+        node_1.rebalance()
+        node_2.rebalance()
+        # node-2 stops its heartbeat.
+        self.clock.now += 30
+        claimed, handoff = node_1.rebalance()
+        self.assertEqual(set(self.contracts), set(claimed.keys()))
+        self.assertEqual([], handoff)
+
+    def test_unregister_contract_returns_owner(self):
+        node = self.create_node('node-1')
+        node.heartbeat()
+        node.register_contract('0x1', {})
+        self.assertEqual((None, None), node.unregister_contract('0x2'))
+        node.rebalance()
+        self.assertEqual(('node-1', 'http://node-1'), node.unregister_contract('0x1'))
+        claimed, _ = node.rebalance()
+        self.assertEqual({}, claimed)
+
+    def test_owner_is_checked_before_submission(self):
+        node_1 = self.create_node('node-1')
+        node_2 = self.create_node('node-2')
+        node_1.heartbeat()
+        node_1.register_contract('0x1', {})
+        node_1.rebalance()
+        self.assertTrue(node_1.is_owner('0x1'))
+        self.assertFalse(node_2.is_owner('0x1'))
+        # node-1 stops its heartbeat, and node-2 takes its contract over.
+        self.clock.now += 30
+        node_2.rebalance()
+        self.assertTrue(node_2.is_owner('0x1'))
+        self.assertFalse(node_1.is_owner('0x1'))
@@ -0,0 +1,36 @@
+import unittest
+
+from executor.cluster.hash_ring import HashRing
+
+
+class HashRingTests(unittest.TestCase):
+    def setUp(self):
+        self.contracts = ['0x' + format(index, '040x') for index in range(500)]
+
+    def test_get_node_of_empty_ring(self):
+        self.assertIsNone(HashRing().get_node('0x1'))
+
+    def test_contracts_are_spread_over_nodes(self):
+        ring = HashRing(['node-1', 'node-2', 'node-3'])
+        owners = [ring.get_node(contract) for contract in self.contracts]
+        for node in ['node-1', 'node-2', 'node-3']:
+            self.assertGreater(owners.count(node), len(self.contracts) / 10)
+
+    def test_adding_node_only_moves_contracts_to_it(self):
+        ring = HashRing(['node-1', 'node-2', 'node-3'])
+        before = {contract: ring.get_node(contract) for contract in self.contracts}
+        ring.add_node('node-4')
+        for contract in self.contracts:
+            owner = ring.get_node(contract)
+            self.assertIn(owner, {before[contract], 'node-4'})
+
+    def test_removing_node_only_moves_its_contracts(self):
+        ring = HashRing(['node-1', 'node-2', 'node-3'])
+        before = {contract: ring.get_node(contract) for contract in self.contracts}
+        ring.remove_node('node-2')
+        self.assertEqual({'node-1', 'node-3'}, ring.get_nodes())
+        for contract in self.contracts:
+            if before[contract] != 'node-2':
+                self.assertEqual(before[contract], ring.get_node(contract))
+            else:
+                self.assertIn(ring.get_node(contract), {'node-1', 'node-3'})
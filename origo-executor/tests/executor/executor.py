@@ -0,0 +1,175 @@
+import os
+import tempfile
+import time
+import unittest
+
+from executor.cluster.cluster_coordinator import ClusterCoordinator
+from executor.executor import Executor, TaskStatus
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.worker.execution_result import ExecutionResult
+
+
+class FakeWorker:
+    def __init__(self, contract_address, execution_id):
+        self.contract_address = contract_address
+        self.execution_id = execution_id
+        self.started = False
+        self.finished = False
+
+    def start(self):
+        self.started = True
+
+    def ready(self):
+        return self.finished
+
+    def stop(self):
+        self.finished = True
+
+    def join(self):
+        pass
+
+
+class FakeListener(FakeWorker):
+    def __init__(self):
+        FakeWorker.__init__(self, None, None)
+
+
+class FakeExecutor(Executor):
+    def __init__(self, options):
+        Executor.__init__(self, options)
+        self.created_workers = []
+
+    @staticmethod
+    def check_options(options):
+        pass
+
+    def create_listener(self, listener_config, event_queue):
+        return FakeListener()
+
+    def create_worker(self, contract_address, execution_id, commitments, execution_queue):
+        worker = FakeWorker(contract_address, execution_id)
+        self.created_workers.append(worker)
+        return worker
+
+
+def generate_options(max_concurrent_executions=2, max_queued_executions=10):
+    return {'chain_config': {}, 'poll_interval': 1, 'proving_key_path': '', 'code_path': '', 'abi_path': '',
+            'working_path': '', 'zokrates_path': '', 'use_existing_data': False,
+            'max_concurrent_executions': max_concurrent_executions,
+            'max_queued_executions': max_queued_executions, 'admission_control': False}
+
+
+class ExecutorTests(unittest.TestCase):
+    def setUp(self):
+        self.executor = FakeExecutor(generate_options())
+        self.executor.register_contract('0x1', {})
+        self.executor.update_worker_status('0x1', TaskStatus.LISTENING)
+        self.executor.task_status.start_executions('0x1', 3)
+        self.executor.update_worker_status('0x1', TaskStatus.EXECUTING)
+
+    def test_dispatch_pending_executions_respects_max_concurrent_executions(self):
+        for execution_id in range(3):
+            self.assertTrue(self.executor.enqueue_execution('0x1', execution_id, []))
+        self.executor.dispatch_pending_executions()
+        self.assertEqual(2, len(self.executor.created_workers))
+        self.assertEqual(1, self.executor.get_queued_execution_count())
+
+        # Nothing more can be started before any worker finishes.
+        self.executor.dispatch_pending_executions()
+        self.assertEqual(2, len(self.executor.created_workers))
+
+        self.executor.created_workers[0].finished = True
+        self.executor.dispatch_pending_executions()
+        self.assertEqual(3, len(self.executor.created_workers))
+        self.assertEqual(0, self.executor.get_queued_execution_count())
+
+    def test_enqueue_execution_rejects_when_queue_is_full(self):
+        executor = FakeExecutor(generate_options(max_queued_executions=1))
+        self.assertTrue(executor.enqueue_execution('0x1', 0, []))
+        self.assertFalse(executor.enqueue_execution('0x1', 1, []))
+
+    def test_handle_execution_result_finishes_contract(self):
+        for execution_id in range(3):
+            self.executor.handle_execution_result(
+                {'execution_result': ExecutionResult.SUCCESS if execution_id else ExecutionResult.QUEUE_FULL,
+                 'contract_address': '0x1', 'execution_id': execution_id, 'debug_msg': None})
+        task_status = self.executor.get_all_task_status()['0x1']
+        self.assertEqual(1, task_status['finished_task'])
+        self.assertEqual(0, task_status['successful_task'])
+        self.assertIn(0, task_status['failed_tasks'])
+
+    def test_handle_execution_result_with_peak_rss_without_admission_control(self):
+        self.assertIsNone(self.executor.admission)
+        self.executor.handle_execution_result({'execution_result': ExecutionResult.SUCCESS, 'contract_address': '0x1',
+                                               'execution_id': 0, 'debug_msg': None, 'peak_rss': 64 * 1024 * 1024})
+        self.assertEqual(1, self.executor.task_status.get('0x1').result_count)
+
+    def test_unregister_contract_drops_queued_executions(self):
+        self.executor.enqueue_execution('0x1', 0, [])
+        self.executor.unregister_contract('0x1')
+        self.assertEqual(0, self.executor.get_queued_execution_count())
+
+    def test_run_wakes_up_on_execution_result(self):
+        self.executor.start()
+        try:
+            self.executor.execution_queue.put({'execution_result': ExecutionResult.SUCCESS, 'contract_address': '0x1',
+                                               'execution_id': 0, 'debug_msg': None})
+            deadline = time.monotonic() + 1
+            while self.executor.task_status.get('0x1').result_count == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(1, self.executor.task_status.get('0x1').result_count)
+        finally:
+            self.executor.stop()
+            self.executor.join()
+
+    def test_cluster_registers_assigned_contracts(self):
+        with tempfile.TemporaryDirectory() as working_dir:
+            options = generate_options()
+            options.update({'cluster_membership_path': os.path.join(working_dir, 'membership.json'),
+                            'cluster_node_id': 'node-1', 'cluster_node_url': 'http://node-1'})
+            executor = FakeExecutor(options)
+            node_id, _ = executor.cluster.route_registration('0x2', {'priority': 2})
+            self.assertEqual('node-1', node_id)
+            self.assertEqual({'priority': 2}, executor.registered_contracts['0x2'])
+            executor.cluster.route_unregistration('0x2')
+            executor.cluster.rebalance()
+            self.assertNotIn('0x2', executor.registered_contracts)
+
+    def test_cluster_stops_contracts_once_heartbeat_expires(self):
+        with tempfile.TemporaryDirectory() as working_dir:
+            options = generate_options()
+            options.update({'cluster_membership_path': os.path.join(working_dir, 'membership.json'),
+                            'cluster_node_id': 'node-1', 'cluster_node_url': 'http://node-1',
+                            'cluster_heartbeat_interval': 5, 'cluster_heartbeat_timeout': 20})
+            executor = FakeExecutor(options)
+            clock = [0.0]
+            executor.cluster = ClusterCoordinator(executor, options, clock=lambda: clock[0])
+            executor.cluster.route_registration('0x2', {})
+            self.assertTrue(executor.cluster.owns_contract('0x2'))
+            # The shared storage cannot be reached.
+            membership_path = executor.cluster.membership.membership_path
+            executor.cluster.membership.membership_path = os.path.join(working_dir, 'missing', 'membership.json')
+            clock[0] = 10.0
+            executor.cluster.tick()
+            self.assertIn('0x2', executor.registered_contracts)
+            clock[0] = 25.0
+            executor.cluster.tick()
+            self.assertNotIn('0x2', executor.registered_contracts)
+            self.assertFalse(executor.cluster.owns_contract('0x2'))
+            # The contracts are registered again once the heartbeat is refreshed.
+            executor.cluster.membership.membership_path = membership_path
+            clock[0] = 30.0
+            executor.cluster.tick()
+            self.assertIn('0x2', executor.registered_contracts)
+
+    def test_collect_metrics(self):
+        proofs_total = self.executor.metrics.get_value(ExecutorMetrics.PROOFS_TOTAL) or 0
+        self.executor.enqueue_execution('0x1', 0, [])
+        self.executor.handle_execution_result({'execution_result': ExecutionResult.SUCCESS, 'contract_address': '0x1',
+                                               'execution_id': 1, 'debug_msg': None})
+        registry = self.executor.collect_metrics()
+        self.assertEqual(proofs_total + 1, registry.get_value(ExecutorMetrics.PROOFS_TOTAL))
+        self.assertEqual(1, registry.get_value(ExecutorMetrics.WORKERS, {'state': 'queued'}))
+        self.assertEqual(0, registry.get_value(ExecutorMetrics.QUEUE_DEPTH, {'queue': 'event'}))
+        self.assertGreater(registry.get_value(ExecutorMetrics.PROOFS_PER_SECOND), 0)
+        self.assertIn('origo_executor_stage_latency_seconds_count{stage="prove"}', registry.render())
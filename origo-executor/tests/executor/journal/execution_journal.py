@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from executor.journal.execution_journal import ExecutionJournal, ExecutionStage
+
+
+class ExecutionJournalTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.working_dir.name, 'journal.db')
+        self.journal = ExecutionJournal(self.journal_path)
+        self.digest = ExecutionJournal.digest_commitments([1, 2, 3])
+
+    def tearDown(self):
+        self.journal.close()
+        self.working_dir.cleanup()
+
+    def test_digest_commitments(self):
+        self.assertEqual(self.digest, ExecutionJournal.digest_commitments([1, 2, 3]))
+        self.assertNotEqual(self.digest, ExecutionJournal.digest_commitments([1, 2, 4]))
+
+    def test_record_stage_keeps_former_artifacts(self):
+        self.assertIsNone(self.journal.get_execution('0x1', 0, self.digest))
+        self.journal.record_stage('0x1', 0, self.digest, ExecutionStage.STARTED)
+        self.journal.record_stage('0x1', 0, self.digest, ExecutionStage.PREPARED, witness='/tmp/witness')
+        self.journal.record_stage('0x1', 0, self.digest, ExecutionStage.PROVED, output=[1, 0], proof={'a': ['0x1']})
+        execution = self.journal.get_execution('0x1', 0, self.digest)
+        self.assertEqual(ExecutionStage.PROVED, execution['stage'])
+        self.assertEqual('/tmp/witness', execution['witness'])
+        self.assertEqual([1, 0], execution['output'])
+        self.assertEqual({'a': ['0x1']}, execution['proof'])
+        self.assertIsNone(execution['tx_hash'])
+        stages = [stage for stage, _ in self.journal.get_stage_transitions('0x1', 0, self.digest)]
+        self.assertEqual([ExecutionStage.STARTED, ExecutionStage.PREPARED, ExecutionStage.PROVED], stages)
+
+    def test_journal_survives_reopen(self):
+        self.journal.record_registration('0x1', {'priority': 2})
+        self.journal.record_stage('0x1', 0, self.digest, ExecutionStage.SUBMITTED, tx_hash='0xabc')
+        self.journal.close()
+        self.journal = ExecutionJournal(self.journal_path)
+        self.assertEqual({'0x1': {'priority': 2}}, self.journal.get_registered_contracts())
+        self.assertEqual('0xabc', self.journal.get_execution('0x1', 0, self.digest)['tx_hash'])
+
+    def test_record_unregistration_forgets_executions(self):
+        self.journal.record_registration('0x1', {})
+        self.journal.record_stage('0x1', 0, self.digest, ExecutionStage.SETTLED, result=0)
+        self.journal.record_unregistration('0x1')
+        self.assertEqual({}, self.journal.get_registered_contracts())
+        self.assertIsNone(self.journal.get_execution('0x1', 0, self.digest))
+        self.assertEqual([], self.journal.get_stage_transitions('0x1', 0, self.digest))
+
+    def test_only_latest_opening_is_kept(self):
+        self.journal.record_stage('0x1', 0, self.digest, ExecutionStage.SETTLED, result=0)
+        self.journal.record_stage('0x1', 1, self.digest, ExecutionStage.SETTLED, result=0)
+        next_digest = ExecutionJournal.digest_commitments([4, 5, 6])
+        self.journal.record_stage('0x1', 0, next_digest, ExecutionStage.STARTED)
+        self.assertIsNone(self.journal.get_execution('0x1', 0, self.digest))
+        self.assertEqual([], self.journal.get_stage_transitions('0x1', 0, self.digest))
+        self.assertEqual(ExecutionStage.STARTED, self.journal.get_execution('0x1', 0, next_digest)['stage'])
+        # The other executions keep their journal until their next opening.
+        self.assertIsNotNone(self.journal.get_execution('0x1', 1, self.digest))
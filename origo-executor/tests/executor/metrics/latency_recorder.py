@@ -0,0 +1,58 @@
+import unittest
+
+from executor.metrics.latency_recorder import LatencyHistogram, LatencyRecorder, LatencyStage
+
+
+class LatencyHistogramTests(unittest.TestCase):
+    def test_empty_histogram(self):
+        self.assertEqual({'count': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0},
+                         LatencyHistogram().get_summary())
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for millisecond in range(1, 1001):
+            histogram.observe(millisecond / 1000)
+        summary = histogram.get_summary()
+        self.assertEqual(1000, summary['count'])
+        self.assertEqual(1.0, summary['max'])
+        for percentile in ['p50', 'p95', 'p99']:
+            expected = int(percentile[1:]) / 100
+            self.assertGreaterEqual(summary[percentile], expected)
+            self.assertLessEqual(summary[percentile], expected * 1.19)
+
+    def test_latency_beyond_last_bucket(self):
+        histogram = LatencyHistogram()
+        histogram.observe(10000.0)
+        self.assertEqual(10000.0, histogram.get_percentile(0.99))
+
+
+class LatencyRecorderTests(unittest.TestCase):
+    def test_record_per_stage_contract_and_execution(self):
+        recorder = LatencyRecorder()
+        recorder.record(LatencyStage.PROVE, '0x1', 0, 2.0)
+        recorder.record(LatencyStage.PROVE, '0x2', 0, 4.0)
+        with recorder.span(LatencyStage.SUBMIT, '0x1', 0):
+            pass
+        self.assertEqual(2, recorder.get_stage_stats()[LatencyStage.PROVE]['count'])
+        self.assertEqual(4.0, recorder.get_stage_stats()[LatencyStage.PROVE]['max'])
+        self.assertEqual(2.0, recorder.get_stage_stats('0x1')[LatencyStage.PROVE]['max'])
+        self.assertEqual({LatencyStage.PROVE, LatencyStage.SUBMIT}, set(recorder.get_execution_spans('0x1', 0)))
+        recorder.remove_contract('0x1')
+        self.assertEqual({}, recorder.get_stage_stats('0x1'))
+        self.assertEqual({}, recorder.get_execution_spans('0x1', 0))
+        self.assertEqual(2, recorder.get_stage_stats()[LatencyStage.PROVE]['count'])
+
+    def test_recent_executions_are_bounded(self):
+        recorder = LatencyRecorder(max_recent_executions=2)
+        for execution_id in range(3):
+            recorder.record(LatencyStage.PROVE, '0x1', execution_id, 1.0)
+        self.assertEqual({}, recorder.get_execution_spans('0x1', 0))
+        self.assertEqual({LatencyStage.PROVE: 1.0}, recorder.get_execution_spans('0x1', 2))
+
+    def test_disabled_recorder(self):
+        recorder = LatencyRecorder(enabled=False)
+        with recorder.span(LatencyStage.PROVE, '0x1', 0):
+            pass
+        recorder.record(LatencyStage.PROVE, '0x1', 0, 1.0)
+        self.assertEqual(0, recorder.get_stage_stats()[LatencyStage.PROVE]['count'])
+        self.assertIs(recorder.span(LatencyStage.PROVE, '0x1', 0), recorder.span(LatencyStage.SUBMIT, '0x1', 1))
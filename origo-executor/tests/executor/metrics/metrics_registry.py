@@ -0,0 +1,37 @@
+import unittest
+
+from executor.metrics.metrics_registry import MetricsRegistry
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.describe('test_calls_total', MetricsRegistry.COUNTER, 'Calls.')
+        self.registry.describe('test_peak', MetricsRegistry.GAUGE, 'Peak.')
+        self.registry.describe('test_latency_seconds', MetricsRegistry.HISTOGRAM, 'Latency.')
+
+    def test_counter_and_gauge(self):
+        self.registry.increment('test_calls_total', 1, {'method': 'eth_call'})
+        self.registry.increment('test_calls_total', 2, {'method': 'eth_call'})
+        self.registry.set_max('test_peak', 5)
+        self.registry.set_max('test_peak', 3)
+        self.assertEqual(3, self.registry.get_value('test_calls_total', {'method': 'eth_call'}))
+        self.assertEqual(5, self.registry.get_value('test_peak'))
+        text = self.registry.render()
+        self.assertIn('# TYPE test_calls_total counter\n', text)
+        self.assertIn('test_calls_total{method="eth_call"} 3\n', text)
+        self.assertIn('test_peak 5\n', text)
+
+    def test_histogram(self):
+        self.registry.observe('test_latency_seconds', 0.0015, {'stage': 'prove'})
+        self.registry.observe('test_latency_seconds', 3.0, {'stage': 'prove'})
+        text = self.registry.render()
+        self.assertIn('test_latency_seconds_bucket{stage="prove",le="0.002"} 1\n', text)
+        self.assertIn('test_latency_seconds_bucket{stage="prove",le="4.096"} 2\n', text)
+        self.assertIn('test_latency_seconds_bucket{stage="prove",le="+Inf"} 2\n', text)
+        self.assertIn('test_latency_seconds_sum{stage="prove"} 3.0015\n', text)
+        self.assertIn('test_latency_seconds_count{stage="prove"} 2\n', text)
+
+    def test_label_values_are_escaped(self):
+        self.registry.increment('test_calls_total', 1, {'method': 'a"b'})
+        self.assertIn('test_calls_total{method="a\\"b"} 1\n', self.registry.render())
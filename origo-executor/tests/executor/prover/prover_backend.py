@@ -0,0 +1,90 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+
+from executor.prover.fake_prover_backend import FakeProverBackend
+from executor.prover.prover_backend import ProverJob
+from executor.prover.zokrates_cli_backend import ZokratesCliBackend
+from executor.utils.subprocess_runner import SubprocessRunner
+from executor.worker.executor_worker_exception import PreparationException
+from executor.worker.zokrates_worker import ZokratesWorker
+
+# Writes the number of witness arguments as the output, and fails without a witness argument.
+FAKE_ZOKRATES = """#!/bin/sh
+if [ "$1" = "compute-witness" ]; then
+    output="$5"
+    shift 6
+    [ $# -gt 0 ] || exit 3
+    echo "~out_0 $#" > "$output"
+    echo "~one 1" >> "$output"
+    exit 0
+fi
+echo '{"proof": {"A": ["0x1", "0x2"]}}' > proof.json
+"""
+
+
+class FakeProverWorker(ZokratesWorker):
+    def submit_proof_to_chain(self, contract_id, execution_id, output, proof):
+        return None
+
+
+class ProverBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.root = self.working_dir.name
+        self.execution_path = os.path.join(self.root, '0x1_0')
+        os.makedirs(self.execution_path)
+        self.job = ProverJob('0x1', 0, self.execution_path, subprocess_runner=SubprocessRunner())
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    def test_zokrates_cli_backend(self):
+        zokrates_path = os.path.join(self.root, 'zokrates')
+        with open(zokrates_path, 'w') as zokrates:
+            zokrates.write(FAKE_ZOKRATES)
+        os.chmod(zokrates_path, stat.S_IRWXU)
+        backend = ZokratesCliBackend(zokrates_path, os.path.join(self.root, 'keys'), self.root)
+        self.assertEqual(os.path.join(self.root, 'keys', '0x1.pk'), backend.get_artifacts('0x1')['proving.key'])
+
+        with self.assertRaises(PreparationException):
+            backend.compute_witness(self.job, [])
+        self.assertFalse(backend.has_witness(self.job))
+        backend.compute_witness(self.job, ['1', '2', '3'])
+        self.assertTrue(backend.has_witness(self.job))
+        backend.generate_proof(self.job)
+        self.assertEqual((['3'], {'A': ['0x1', '0x2']}), backend.parse_output(self.job))
+
+    def test_fake_backend_is_deterministic(self):
+        backend = FakeProverBackend(witness_latency=0.05)
+        self.assertEqual({}, backend.get_artifacts('0x1'))
+        self.assertIsNone(backend.get_cache_files('0x1'))
+        start = time.monotonic()
+        backend.compute_witness(self.job, ['1', '2'])
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        backend.generate_proof(self.job)
+        output, proof = backend.parse_output(self.job)
+        self.assertEqual(1, len(output))
+        self.assertEqual(2, len(proof['B']))
+
+        backend.compute_witness(self.job, ['1', '2'])
+        backend.generate_proof(self.job)
+        self.assertEqual((output, proof), backend.parse_output(self.job))
+        backend.compute_witness(self.job, ['1', '3'])
+        backend.generate_proof(self.job)
+        self.assertNotEqual(output, backend.parse_output(self.job)[0])
+
+    def test_worker_with_fake_backend(self):
+        execution_info = {'encryption_info': {'type': 'null'}, 'commitments': [], 'contract_address': '0x1',
+                          'execution_id': 1, 'working_path': self.root, 'proving_key_path': self.root,
+                          'code_path': self.root, 'zokrates_path': 'zokrates', 'prover_backend': FakeProverBackend()}
+        worker = FakeProverWorker(execution_info, None)
+        worker.commitments, worker.randoms, worker.hashes = [4], [1], [5]
+        worker.prepare_proof_generation('0x1', 1)
+        self.assertTrue(worker.restore_witness(worker.get_witness_artifact()))
+        output, proof = worker.generate_proof('0x1', 1)
+        self.assertEqual(1, len(output))
+        self.assertIn('K', proof)
+        self.assertFalse(os.path.exists(os.path.join(self.root, '0x1_1')))
@@ -0,0 +1,91 @@
+import os
+import stat
+import tempfile
+import threading
+import unittest
+
+from executor.prover.prover_client import ProverClient
+from executor.prover.prover_daemon import ProverDaemon
+from executor.prover.prover_daemon_pool import ProverDaemonPool
+
+# Writes the arguments into the witness, and fails for generate-proof without a proving key.
+FAKE_ZOKRATES = """#!/bin/sh
+if [ "$1" = "compute-witness" ]; then
+    output="$5"
+    shift 6
+    echo "$@" > "$output"
+    exit 0
+fi
+[ -f proving.key ] || { echo "missing proving.key" >&2; exit 2; }
+[ -f slow ] && sleep 30
+echo '{"proof": {}}' > proof.json
+"""
+
+
+class ProverDaemonTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.root = self.working_dir.name
+        self.zokrates_path = os.path.join(self.root, 'zokrates')
+        with open(self.zokrates_path, 'w') as zokrates:
+            zokrates.write(FAKE_ZOKRATES)
+        os.chmod(self.zokrates_path, stat.S_IRWXU)
+        self.execution_path = os.path.join(self.root, '0x1_0')
+        os.makedirs(self.execution_path)
+        with open(os.path.join(self.execution_path, 'out'), 'w') as program:
+            program.write('program')
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    def start_daemon(self):
+        daemon = ProverDaemon(os.path.join(self.root, '0x1.sock'), self.zokrates_path)
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        self.addCleanup(daemon.server_close)
+        self.addCleanup(daemon.shutdown)
+        return daemon
+
+    def test_runs_jobs(self):
+        daemon = self.start_daemon()
+        client = ProverClient(daemon.socket_path)
+        self.assertTrue(client.ping())
+
+        response = client.run('compute-witness', self.execution_path, [1, 2, 3])
+        self.assertEqual(0, response['returncode'])
+        with open(os.path.join(self.execution_path, 'witness')) as witness:
+            self.assertEqual('1 2 3', witness.read().strip())
+        self.assertGreaterEqual(response['cpu_seconds'], 0)
+
+        response = client.run('generate-proof', self.execution_path)
+        self.assertEqual(2, response['returncode'])
+        self.assertIn('missing proving.key', response['stderr'])
+
+    def test_times_out_and_cancels_jobs(self):
+        daemon = self.start_daemon()
+        for name in ['proving.key', 'slow']:
+            open(os.path.join(self.execution_path, name), 'w').close()
+        response = ProverClient(daemon.socket_path).run('generate-proof', self.execution_path, timeout=0.3)
+        self.assertLess(response['returncode'], 0)
+        self.assertIn('timed out', response['stderr'])
+
+        client = ProverClient(daemon.socket_path)
+        threading.Timer(0.3, client.cancel).start()
+        with self.assertRaises(OSError):
+            client.run('generate-proof', self.execution_path)
+
+    def test_rejects_unknown_commands(self):
+        daemon = self.start_daemon()
+        response = ProverClient(daemon.socket_path).run('rm', self.execution_path, ['-rf', '/'])
+        self.assertEqual(-1, response['returncode'])
+
+    def test_pool_starts_and_stops_daemons(self):
+        pool = ProverDaemonPool(os.path.join(self.root, 'sockets'), self.zokrates_path)
+        self.addCleanup(pool.shutdown)
+        client = pool.get_client('0x1')
+        self.assertEqual(0, client.run('compute-witness', self.execution_path, [4])['returncode'])
+        pool.stop('0x1')
+        self.assertFalse(client.ping())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from executor.scheduler.admission_controller import AdmissionController, AdmissionState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class AdmissionControllerTests(unittest.TestCase):
+    MB = 1024 * 1024
+
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.meminfo_path = os.path.join(self.working_dir.name, 'meminfo')
+        self.write_meminfo(4096)
+        with open(os.path.join(self.working_dir.name, '0x1.pk'), 'wb') as f:
+            f.truncate(100 * self.MB)
+        self.clock = FakeClock()
+        self.controller = AdmissionController(
+            {'working_path': self.working_dir.name, 'proving_key_path': self.working_dir.name,
+             'admission_min_free_memory': 512, 'admission_max_load_per_cpu': 0, 'admission_min_free_disk': 0,
+             'admission_memory_factor': 3.0}, self.meminfo_path, self.clock)
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    def write_meminfo(self, available_mb):
+        with open(self.meminfo_path, 'w') as f:
+            f.write('MemTotal:       16777216 kB\nMemFree:          102400 kB\n')
+            f.write('MemAvailable:   ' + str(available_mb * 1024) + ' kB\n')
+
+    def test_peak_rss_estimated_then_measured(self):
+        self.assertEqual(300 * self.MB, self.controller.get_peak_rss('0x1'))
+        self.assertEqual(0, self.controller.get_peak_rss('0x2'))
+        self.controller.record_peak_rss('0x1', 50 * self.MB)
+        self.assertEqual(50 * self.MB, self.controller.get_peak_rss('0x1'))
+
+    def test_memory_is_reserved_for_admitted_executions(self):
+        # 4096MB available: every execution reserves 300MB and keeps 512MB free.
+        admitted = 0
+        while self.controller.admit('0x1', active_worker_count=1 + admitted):
+            admitted += 1
+        self.assertEqual(11, admitted)
+        state = self.controller.get_backpressure_state()
+        self.assertEqual('held', state['state'])
+        self.assertIn('available memory', state['reason'])
+        # The reservations expire once the provers had the time to load the key.
+        self.clock.now += 60
+        self.assertTrue(self.controller.admit('0x1', active_worker_count=12))
+        self.assertEqual(AdmissionState.OPEN, self.controller.state)
+
+    def test_idle_executor_always_admits(self):
+        self.write_meminfo(100)
+        self.assertFalse(self.controller.admit('0x1', active_worker_count=1))
+        self.assertTrue(self.controller.admit('0x1', active_worker_count=0))
+
+    def test_free_disk_holds_idle_executor(self):
+        controller = AdmissionController({'working_path': self.working_dir.name,
+                                          'admission_min_free_disk': 1024 * 1024 * 1024}, self.meminfo_path)
+        self.assertFalse(controller.admit('0x1', active_worker_count=0))
+        self.assertIn('free disk', controller.get_backpressure_state()['reason'])
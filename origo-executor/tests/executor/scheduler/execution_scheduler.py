@@ -0,0 +1,77 @@
+import unittest
+
+from executor.scheduler.execution_scheduler import ExecutionScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ExecutionSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = ExecutionScheduler(100, 10, self.clock)
+
+    def _pop_contracts(self, count):
+        return [self.scheduler.pop().contract_address for _ in range(count)]
+
+    def test_fair_queuing_across_contracts(self):
+        for execution_id in range(6):
+            self.scheduler.push('0xa', execution_id, [])
+        for execution_id in range(2):
+            self.scheduler.push('0xb', execution_id, [])
+        # 0xb opened after 0xa but does not wait for all the executions of 0xa.
+        self.assertEqual(['0xa', '0xb', '0xa', '0xb', '0xa', '0xa'], self._pop_contracts(6))
+
+    def test_executions_of_same_contract_keep_order(self):
+        for execution_id in range(3):
+            self.scheduler.push('0xa', execution_id, [])
+        self.assertEqual([0, 1, 2], [self.scheduler.pop().execution_id for _ in range(3)])
+        self.assertIsNone(self.scheduler.pop())
+
+    def test_weighted_fair_queuing(self):
+        self.scheduler.set_contract_weight('0xb', 2)
+        for execution_id in range(4):
+            self.scheduler.push('0xa', execution_id, [])
+            self.scheduler.push('0xb', execution_id, [])
+        self.assertEqual(['0xb', '0xa', '0xb', '0xb', '0xa', '0xb'], self._pop_contracts(6))
+
+    def test_urgent_deadline_first(self):
+        for execution_id in range(3):
+            self.scheduler.push('0xa', execution_id, [])
+        self.scheduler.push('0xb', 0, [], deadline=100)
+        self.scheduler.push('0xc', 0, [], deadline=5)
+        # 0xc is urgent, 0xb is not urgent yet.
+        self.assertEqual(['0xc', '0xa'], self._pop_contracts(2))
+        self.clock.now = 95
+        self.assertEqual(['0xb'], self._pop_contracts(1))
+
+    def test_missed_deadline_is_counted(self):
+        self.scheduler.push('0xa', 0, [], deadline=1)
+        self.clock.now = 2
+        self.scheduler.pop()
+        self.assertEqual(1, self.scheduler.get_queue_state('0xa')['missed_deadlines'])
+
+    def test_max_queued_executions(self):
+        scheduler = ExecutionScheduler(1, 10, self.clock)
+        self.assertTrue(scheduler.push('0xa', 0, []))
+        self.assertFalse(scheduler.push('0xb', 0, []))
+
+    def test_remove_contract(self):
+        self.scheduler.push('0xa', 0, [])
+        self.scheduler.push('0xb', 0, [])
+        self.scheduler.remove_contract('0xa')
+        self.assertEqual(1, len(self.scheduler))
+        self.assertEqual(['0xb'], self._pop_contracts(1))
+        self.assertIsNone(self.scheduler.pop())
+
+    def test_get_queue_state(self):
+        self.scheduler.set_contract_weight('0xa', 3)
+        self.scheduler.push('0xa', 0, [], deadline=30)
+        self.clock.now = 10
+        self.assertEqual({'queued': 1, 'weight': 3, 'deadline_in': 20, 'missed_deadlines': 0},
+                         self.scheduler.get_queue_state('0xa'))
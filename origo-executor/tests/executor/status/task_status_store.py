@@ -0,0 +1,91 @@
+import threading
+import unittest
+
+from executor.status.task_status_store import TaskStatus, TaskStatusStore
+from executor.worker.execution_result import ExecutionResult
+
+
+class TaskStatusStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = TaskStatusStore(max_recent_failures=3)
+        self.assertTrue(self.store.register('0x1'))
+
+    def test_register_again(self):
+        self.assertFalse(self.store.register('0x1'))
+        self.store.set_status('0x1', TaskStatus.UNREGISTERED)
+        self.assertTrue(self.store.register('0x1'))
+
+    def test_record_results(self):
+        self.store.set_status('0x1', TaskStatus.EXECUTING)
+        self.store.start_executions('0x1', 4)
+        self.assertFalse(self.store.record_result('0x1', 0, ExecutionResult.SUCCESS))
+        self.assertFalse(self.store.record_result('0x1', 1, ExecutionResult.FAIL, 'reverted'))
+        snapshot = self.store.get_snapshot('0x1')
+        self.assertEqual(0.5, snapshot['progress'])
+        self.assertEqual({1: str(ExecutionResult.FAIL) + ' (reverted)'}, snapshot['failed_tasks'])
+        self.assertFalse(self.store.record_result('0x1', 2, ExecutionResult.SUCCESS))
+        self.assertTrue(self.store.record_result('0x1', 3, ExecutionResult.SUCCESS))
+        self.store.finish_executions('0x1', still_listening=True)
+        snapshot = self.store.get_snapshot('0x1')
+        self.assertEqual(TaskStatus.LISTENING, snapshot['status'])
+        self.assertEqual(1, snapshot['finished_task'])
+        self.assertEqual(0, snapshot['successful_task'])
+        self.assertEqual(0.0, snapshot['progress'])
+
+    def test_successful_task(self):
+        self.store.start_executions('0x1', 1)
+        self.assertTrue(self.store.record_result('0x1', 0, ExecutionResult.SUCCESS))
+        self.store.finish_executions('0x1', still_listening=False)
+        snapshot = self.store.get_snapshot('0x1')
+        self.assertEqual(TaskStatus.FINISHED, snapshot['status'])
+        self.assertEqual(1, snapshot['successful_task'])
+
+    def test_recent_failures_are_bounded(self):
+        self.store.start_executions('0x1', 10000)
+        for execution_id in range(10000):
+            self.store.record_result('0x1', execution_id, ExecutionResult.HASH_NOT_MATCH)
+        self.assertEqual([9997, 9998, 9999], sorted(self.store.get_snapshot('0x1')['failed_tasks']))
+        self.assertEqual(10000, self.store.get('0x1').failed_count)
+
+    def test_snapshot_is_a_copy(self):
+        self.store.add_info('0x1', 'setup failed')
+        snapshots = self.store.get_all_snapshots()
+        self.assertEqual('setup failed; ', snapshots['0x1']['info'])
+        snapshots['0x1']['failed_tasks'][0] = 'changed'
+        self.assertEqual({}, self.store.get_snapshot('0x1')['failed_tasks'])
+
+    def test_unregistered_records_are_capped(self):
+        store = TaskStatusStore(max_unregistered_records=2)
+        for contract_address in ['0x1', '0x2', '0x3']:
+            store.register(contract_address)
+            store.set_status(contract_address, TaskStatus.UNREGISTERED)
+        # The registered again contract is kept whatever the number of unregistered ones.
+        store.register('0x1')
+        store.register('0x4')
+        store.set_status('0x4', TaskStatus.UNREGISTERED)
+        self.assertEqual(['0x1', '0x3', '0x4'], sorted(store.get_all_snapshots()))
+        self.assertIsNone(store.get('0x2'))
+        self.assertNotIn('0x2', store)
+        self.assertTrue(store.register('0x2'))
+
+    def test_concurrent_updates_and_reads(self):
+        store = TaskStatusStore(max_unregistered_records=1)
+        errors = []
+
+        def churn(index):
+            try:
+                for _ in range(200):
+                    contract_address = '0x' + str(index)
+                    store.register(contract_address)
+                    store.add_info(contract_address, 'registered')
+                    store.set_status(contract_address, TaskStatus.UNREGISTERED)
+                    store.get_all_snapshots()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=churn, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertEqual(1, len(store.get_all_snapshots()))
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from executor.utils.subprocess_runner import SubprocessRunner
+
+
+class SubprocessRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self.runner = SubprocessRunner()
+
+    def test_run_captures_stderr_without_shell(self):
+        with tempfile.TemporaryDirectory() as working_dir:
+            result = self.runner.run(['sh', '-c', 'echo $0 >&2; pwd; exit 3', 'a;b'], cwd=working_dir)
+        self.assertEqual(3, result.returncode)
+        self.assertFalse(result.succeeded)
+        self.assertEqual('a;b', result.stderr.strip())
+
+    def test_run_passes_stdin(self):
+        with tempfile.TemporaryDirectory() as working_dir:
+            output_path = os.path.join(working_dir, 'output')
+            data = b'1 2 3 ' * 100000
+            result = self.runner.run(['sh', '-c', 'cat > ' + output_path], stdin_data=data)
+            self.assertTrue(result.succeeded)
+            with open(output_path, 'rb') as output:
+                self.assertEqual(data, output.read())
+
+            input_path = os.path.join(working_dir, 'input')
+            with open(input_path, 'wb') as input_file:
+                input_file.write(b'4 5 6')
+            self.assertTrue(self.runner.run(['sh', '-c', 'cat > ' + output_path], stdin_path=input_path).succeeded)
+            with open(output_path, 'rb') as output:
+                self.assertEqual(b'4 5 6', output.read())
+
+    def test_run_samples_usage(self):
+        result = self.runner.run([sys.executable, '-c', 'import time\nend = time.time() + 0.3\n'
+                                                        'while time.time() < end: pass'])
+        self.assertTrue(result.succeeded)
+        self.assertGreater(result.peak_rss, 0)
+        self.assertGreater(result.cpu_seconds, 0)
+
+    def test_timeout_kills_the_process_group(self):
+        with tempfile.TemporaryDirectory() as working_dir:
+            pid_path = os.path.join(working_dir, 'child.pid')
+            start = time.monotonic()
+            result = self.runner.run(['sh', '-c', 'sleep 30 & echo $! > ' + pid_path + '; wait'], timeout=0.3)
+            self.assertLess(time.monotonic() - start, 5)
+            self.assertTrue(result.timed_out)
+            with open(pid_path) as pid_file:
+                child_pid = int(pid_file.read())
+        # The background child in the same process group is killed too.
+        deadline = time.monotonic() + 2
+        while self._is_running(child_pid) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self._is_running(child_pid))
+
+    def test_cancel_kills_the_running_subprocess(self):
+        threading.Timer(0.2, self.runner.cancel).start()
+        start = time.monotonic()
+        result = self.runner.run(['sleep', '30'])
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(result.cancelled)
+        self.assertTrue(self.runner.run(['true']).cancelled)
+
+    @staticmethod
+    def _is_running(pid):
+        try:
+            with open('/proc/' + str(pid) + '/stat') as stat_file:
+                # A zombie is already killed, only waiting for its parent.
+                return stat_file.read().rsplit(')', 1)[1].split()[0] != 'Z'
+        except FileNotFoundError:
+            return False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+
+from executor.worker.artifact_stager import ArtifactStager, StagingMode
+
+
+class ArtifactStagerTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.root = self.working_dir.name
+        self.sources = {}
+        for name in ['out', 'proving.key', 'variables.inf']:
+            self.sources[name] = os.path.join(self.root, '0x1_' + name)
+            with open(self.sources[name], 'w') as source:
+                source.write(name + ' content')
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    def create_working_path(self, execution_id):
+        working_path = os.path.join(self.root, 'working', '0x1_' + str(execution_id))
+        os.makedirs(working_path)
+        return working_path
+
+    def read_staged(self, working_path, name):
+        with open(os.path.join(working_path, name)) as staged:
+            return staged.read()
+
+    def test_hardlink_shares_the_artifact_set(self):
+        stager = ArtifactStager(os.path.join(self.root, 'artifacts'), StagingMode.HARDLINK)
+        first_path = self.create_working_path(0)
+        second_path = self.create_working_path(1)
+        self.assertEqual(StagingMode.HARDLINK, stager.stage('0x1', self.sources, first_path))
+        self.assertEqual(StagingMode.HARDLINK, stager.stage('0x1', self.sources, second_path))
+        first_stat = os.stat(os.path.join(first_path, 'proving.key'))
+        self.assertTrue(os.path.samestat(first_stat, os.stat(os.path.join(second_path, 'proving.key'))))
+        self.assertFalse(os.path.samestat(first_stat, os.stat(self.sources['proving.key'])))
+        self.assertFalse(first_stat.st_mode & stat.S_IWUSR)
+        self.assertEqual('out content', self.read_staged(second_path, 'out'))
+        stats = stager.get_stats()
+        self.assertEqual(1, stats['artifact_sets'])
+        self.assertEqual(2, stats[StagingMode.HARDLINK])
+
+    def test_symlink_points_to_the_artifact_set(self):
+        stager = ArtifactStager(os.path.join(self.root, 'artifacts'), StagingMode.SYMLINK)
+        working_path = self.create_working_path(0)
+        self.assertEqual(StagingMode.SYMLINK, stager.stage('0x1', self.sources, working_path))
+        staged_path = os.path.join(working_path, 'variables.inf')
+        self.assertTrue(os.path.islink(staged_path))
+        self.assertTrue(os.path.realpath(staged_path).startswith(os.path.join(self.root, 'artifacts')))
+        self.assertEqual('variables.inf content', self.read_staged(working_path, 'variables.inf'))
+
+    def test_falls_back_to_copy_when_linking_is_not_supported(self):
+        class NoLinkArtifactStager(ArtifactStager):
+            def _link(self, mode, source_path, destination_path):
+                if mode != StagingMode.COPY:
+                    raise OSError(18, 'Invalid cross-device link')
+                ArtifactStager._link(self, mode, source_path, destination_path)
+
+        stager = NoLinkArtifactStager(os.path.join(self.root, 'artifacts'))
+        working_path = self.create_working_path(0)
+        self.assertEqual(StagingMode.COPY, stager.stage('0x1', self.sources, working_path))
+        self.assertEqual('proving.key content', self.read_staged(working_path, 'proving.key'))
+        self.assertEqual(1, stager.get_stats()[StagingMode.COPY])
+        self.assertGreater(stager.get_stats()['bytes_copied'], 0)
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm') and os.stat('/dev/shm').st_dev != os.stat(tempfile.gettempdir()).st_dev,
+                         'requires a tmpfs on another device than the temporary folder')
+    def test_modes_are_verified_per_filesystem(self):
+        stager = ArtifactStager(os.path.join(self.root, 'artifacts'))
+        # The first execution is spilled to the working path, the next one is placed on the scratch path.
+        spilled_path = self.create_working_path(0)
+        self.assertEqual(StagingMode.HARDLINK, stager.stage('0x1', self.sources, spilled_path))
+        with tempfile.TemporaryDirectory(dir='/dev/shm') as scratch_path:
+            self.assertNotEqual(StagingMode.HARDLINK, stager.stage('0x1', self.sources, scratch_path))
+            self.assertEqual('out content', self.read_staged(scratch_path, 'out'))
+        self.assertEqual(StagingMode.HARDLINK, stager.stage('0x1', self.sources, self.create_working_path(1)))
+
+    def test_changed_sources_build_a_new_artifact_set(self):
+        stager = ArtifactStager(os.path.join(self.root, 'artifacts'), StagingMode.HARDLINK)
+        first_path = self.create_working_path(0)
+        stager.stage('0x1', self.sources, first_path)
+        with open(self.sources['proving.key'], 'w') as source:
+            source.write('new proving key')
+        future = time.time() + 10
+        os.utime(self.sources['proving.key'], (future, future))
+        second_path = self.create_working_path(1)
+        stager.stage('0x1', self.sources, second_path)
+        # The running execution keeps the former proving key.
+        self.assertEqual('proving.key content', self.read_staged(first_path, 'proving.key'))
+        self.assertEqual('new proving key', self.read_staged(second_path, 'proving.key'))
+        self.assertEqual(2, stager.get_stats()['artifact_sets'])
+
+        stager.release('0x1')
+        self.assertEqual([], os.listdir(os.path.join(self.root, 'artifacts')))
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(Exception):
+            ArtifactStager(self.root, 'rsync')
+
+
+if __name__ == '__main__':
+    unittest.main()
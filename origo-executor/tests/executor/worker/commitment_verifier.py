@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from executor.utils.hash_utils import HashUtils
+from executor.worker.commitment_verifier import CommitmentVerifier
+from executor.worker.executor_worker_exception import CommitmentHashNotMatch
+from executor.worker.zokrates_worker import ZokratesWorker
+
+
+def biased_bit_string(commitment, r, sign=1):
+    c_str = "{0:0512b}".format(commitment)
+    return "".join("{0:0128b}".format((int(c_str[start:start + 128], 2) + sign * r) % ZokratesWorker.FIELD_PRIME)
+                   for start in range(0, 512, 128))
+
+
+class CommitmentVerifierTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        # Include a commitment wider than 512 bits and randoms biasing the limbs beyond 128 bits.
+        self.commitments = [4, 0] + [rng.getrandbits(512) for _ in range(20)] + [rng.getrandbits(530)]
+        self.randoms = [1, 0] + [rng.getrandbits(128) for _ in range(20)] + [rng.getrandbits(200)]
+        self.randoms[5] = ZokratesWorker.FIELD_PRIME - 1
+        self.hashes = [HashUtils.compute_sha256_for_bitstr(biased_bit_string(c, r))
+                       for c, r in zip(self.commitments, self.randoms)]
+
+    def test_hashes_match_bit_strings(self):
+        verifier = CommitmentVerifier()
+        self.assertEqual([], verifier.find_mismatches(self.commitments, self.randoms, self.hashes))
+        ZokratesWorker.verify_commitment_hashes(self.commitments, self.randoms, self.hashes, None)
+
+    def test_find_mismatches(self):
+        self.hashes[3] += 1
+        self.hashes[17] = 0
+        for verifier in (CommitmentVerifier(), CommitmentVerifier(thread_pool_size=4)):
+            self.assertEqual([3, 17], verifier.find_mismatches(self.commitments, self.randoms, self.hashes))
+            self.assertEqual([17], verifier.find_mismatches(self.commitments, self.randoms, self.hashes, [3]))
+        with self.assertRaises(CommitmentHashNotMatch):
+            ZokratesWorker.verify_commitment_hashes(self.commitments, self.randoms, self.hashes, [3], 2)
+        ZokratesWorker.verify_commitment_hashes(self.commitments, self.randoms, self.hashes, [3, 17], 2)
+
+    def test_unbias(self):
+        expected = [int(biased_bit_string(c, r, -1), 2) for c, r in zip(self.commitments, self.randoms)]
+        self.assertEqual(expected, CommitmentVerifier.get().unbias(self.commitments, self.randoms))
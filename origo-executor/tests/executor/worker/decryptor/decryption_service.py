@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from Crypto.Cipher import PKCS1_v1_5
+from Crypto.PublicKey import RSA
+from executor.metrics.executor_metrics import ExecutorMetrics
+from executor.worker.decryptor.decryption_service import DecryptionService
+from executor.worker.executor_worker_exception import DecryptionException
+
+
+class DecryptionServiceTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.working_dir = tempfile.TemporaryDirectory()
+        key = RSA.generate(1024)
+        cls.key_path = os.path.join(cls.working_dir.name, 'key.pem')
+        with open(cls.key_path, 'wb') as key_file:
+            key_file.write(key.exportKey())
+        encryptor = PKCS1_v1_5.new(key.publickey())
+        # Five commitments followed by their randoms.
+        cls.values = list(range(100, 110))
+        cls.encrypted_values = [int.from_bytes(encryptor.encrypt(value.to_bytes(32, 'big')), 'big')
+                                for value in cls.values]
+        cls.service = DecryptionService({'type': 'rsa', 'rsa_key': cls.key_path}, pool_size=2, batch_size=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+        cls.working_dir.cleanup()
+
+    def test_decrypt_in_order(self):
+        registry = ExecutorMetrics.get_registry()
+        histogram = registry.get_value(ExecutorMetrics.DECRYPTION_BATCH_LATENCY)
+        batches = histogram.count if histogram is not None else 0
+        self.assertEqual(self.values, self.service.decrypt(self.encrypted_values, None))
+        self.assertEqual(batches + 4, registry.get_value(ExecutorMetrics.DECRYPTION_BATCH_LATENCY).count)
+
+    def test_decrypt_keeps_skipped_inputs(self):
+        decrypted_values = self.service.decrypt(self.encrypted_values, [1, 4])
+        expected = [self.encrypted_values[index] if index % 5 in (1, 4) else self.values[index]
+                    for index in range(10)]
+        self.assertEqual(expected, decrypted_values)
+
+    def test_decrypt_failure(self):
+        with self.assertRaises(DecryptionException):
+            self.service.decrypt(self.encrypted_values[:4] + [1 << 1100], None)
+
+    def test_null_encryption(self):
+        service = DecryptionService({'type': 'null'})
+        self.assertEqual([1, 2, 3, 4], service.decrypt([1, 2, 3, 4], [0]))
+        service.shutdown()
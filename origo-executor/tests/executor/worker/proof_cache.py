@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+import unittest
+
+from executor.worker.proof_cache import ProofCache
+
+
+class ProofCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.root = self.working_dir.name
+        self.cache_path = os.path.join(self.root, 'cache')
+        self.code_path = os.path.join(self.root, 'out')
+        self.pk_path = os.path.join(self.root, 'proving.key')
+        for file_path in [self.code_path, self.pk_path]:
+            with open(file_path, 'w') as artifact:
+                artifact.write(file_path)
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    def test_key_depends_on_circuit_and_arguments(self):
+        cache = ProofCache(self.cache_path, 1024 * 1024)
+        key = cache.get_key(self.code_path, self.pk_path, ['1', '2'])
+        self.assertEqual(key, cache.get_key(self.code_path, self.pk_path, [1, 2]))
+        self.assertNotEqual(key, cache.get_key(self.code_path, self.pk_path, ['1', '3']))
+        with open(self.pk_path, 'w') as proving_key:
+            proving_key.write('another proving key')
+        self.assertNotEqual(key, cache.get_key(self.code_path, self.pk_path, ['1', '2']))
+
+    def test_put_get_and_remove(self):
+        cache = ProofCache(self.cache_path, 1024 * 1024)
+        key = cache.get_key(self.code_path, self.pk_path, ['1'])
+        self.assertIsNone(cache.get(key))
+        cache.put(key, ['5'], {'A': ['0x1', '0x2']})
+        self.assertEqual((['5'], {'A': ['0x1', '0x2']}), cache.get(key))
+        # The entries on the disk are indexed again after a restart.
+        cache = ProofCache(self.cache_path, 1024 * 1024)
+        self.assertEqual(1, len(cache))
+        self.assertEqual(['5'], cache.get(key)[0])
+        cache.remove(key)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(0, cache.size)
+
+    def test_evicts_least_recently_used(self):
+        cache = ProofCache(self.cache_path, 1024 * 1024)
+        proof = {'A': ['0x' + '1' * 64] * 4}
+        cache.put('a', ['1'], proof)
+        entry_size = cache.size
+        cache = ProofCache(self.cache_path, entry_size * 2)
+        cache.put('b', ['2'], proof)
+        # The access makes 'a' more recent than 'b'.
+        time.sleep(0.01)
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c', ['3'], proof)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertLessEqual(cache.size, entry_size * 2)
+        self.assertEqual(['a.json', 'c.json'], sorted(os.listdir(self.cache_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from executor.worker.scratch_workspace import ScratchWorkspacePool
+
+
+class ScratchWorkspacePoolTests(unittest.TestCase):
+    MB = 1024 * 1024
+
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.scratch_path = os.path.join(self.working_dir.name, 'scratch')
+        self.spill_path = os.path.join(self.working_dir.name, 'working')
+        self.pool = ScratchWorkspacePool(self.scratch_path, self.spill_path, 10 * self.MB, 2,
+                                         default_estimate=4 * self.MB)
+
+    def tearDown(self):
+        self.working_dir.cleanup()
+
+    @staticmethod
+    def write_file(folder, name, size):
+        with open(os.path.join(folder, name), 'wb') as output:
+            output.write(b'\x01' * size)
+
+    def test_workspaces_are_pooled(self):
+        self.assertEqual(2, len(os.listdir(self.scratch_path)))
+        workspace = self.pool.acquire('0x1', 0)
+        self.assertTrue(workspace.on_scratch)
+        self.assertEqual(4 * self.MB, self.pool.reserved_bytes)
+        self.write_file(workspace.path, 'witness', 1024)
+        os.makedirs(os.path.join(workspace.path, 'nested'))
+        self.pool.release(workspace)
+        self.assertEqual(0, self.pool.reserved_bytes)
+        self.assertEqual([], os.listdir(workspace.path))
+
+        # The emptied folder is reused without being created again.
+        self.assertEqual(workspace.path, self.pool.acquire('0x1', 1).path)
+        self.assertEqual(2, len(os.listdir(self.scratch_path)))
+
+    def test_spills_beyond_capacity(self):
+        first = self.pool.acquire('0x1', 0)
+        second = self.pool.acquire('0x1', 1)
+        spilled = self.pool.acquire('0x1', 2)
+        self.assertTrue(first.on_scratch and second.on_scratch)
+        self.assertFalse(spilled.on_scratch)
+        self.assertEqual(os.path.join(self.spill_path, '0x1_2'), spilled.path)
+        self.pool.release(spilled)
+        self.assertFalse(os.path.exists(spilled.path))
+
+    def test_estimate_follows_the_measured_usage(self):
+        workspace = self.pool.acquire('0x1', 0)
+        self.write_file(workspace.path, 'witness', 6 * self.MB)
+        self.pool.release(workspace)
+        self.assertGreaterEqual(self.pool.get_estimate('0x1'), 6 * self.MB)
+        self.assertTrue(self.pool.acquire('0x1', 1).on_scratch)
+        # The second execution of the measured circuit does not fit any more.
+        self.assertFalse(self.pool.acquire('0x1', 2).on_scratch)
+        self.assertTrue(self.pool.acquire('0x2', 0).on_scratch)
+        self.pool.remove_contract('0x1')
+        self.assertEqual(4 * self.MB, self.pool.get_estimate('0x1'))
+
+    def test_linked_artifacts_are_not_counted(self):
+        workspace = self.pool.acquire('0x1', 0)
+        artifact_path = os.path.join(self.working_dir.name, 'proving.key')
+        self.write_file(self.working_dir.name, 'proving.key', self.MB)
+        os.link(artifact_path, os.path.join(workspace.path, 'proving.key'))
+        os.symlink(artifact_path, os.path.join(workspace.path, 'variables.inf'))
+        self.assertEqual(0, ScratchWorkspacePool.get_used_bytes(workspace.path))
+        self.pool.release(workspace)
+        self.assertTrue(os.path.exists(artifact_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from executor.worker.executor_worker import ExecutorWorker
+from executor.worker.executor_worker_exception import CommitmentValidationFailed
+from executor.worker.stage_runner import StageRunner, InlineStageRunner, ProcessPoolStageRunner
+
+
+class StageRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self.process_pool_stage_runner = ProcessPoolStageRunner(2)
+
+    def tearDown(self):
+        self.process_pool_stage_runner.shutdown()
+
+    def test_create(self):
+        self.assertIsInstance(StageRunner.create({}), InlineStageRunner)
+        stage_runner = StageRunner.create({'worker_backend': 'process_pool', 'process_pool_size': 0})
+        self.assertIsInstance(stage_runner, ProcessPoolStageRunner)
+        self.assertGreater(stage_runner.pool_size, 0)
+        stage_runner.shutdown()
+
+    def test_run_in_process_pool(self):
+        self.assertEqual([1, 2, 3, 4], self.process_pool_stage_runner.run(
+            ExecutorWorker.decrypt_data, {'type': 'null'}, [1, 2, 3, 4], [0]))
+
+    def test_run_in_process_pool_raises_stage_exception(self):
+        with self.assertRaises(CommitmentValidationFailed):
+            self.process_pool_stage_runner.run(ExecutorWorker._check_commitments_validation, [])
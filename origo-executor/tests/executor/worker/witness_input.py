@@ -0,0 +1,59 @@
+import os
+import random
+import tempfile
+import unittest
+
+from executor.worker.witness_input import WitnessInput, WitnessLayout
+
+
+def build_arguments_with_bit_strings(commitments, randoms, hashes):
+    # The former implementation formatting every value as a bit string.
+    arguments = []
+    for i in range(0, len(commitments)):
+        bits_str = "{0:0512b}".format(commitments[i])
+        arguments += [int(bits_str[j:j + 128], 2) for j in range(0, 512, 128)]
+        arguments.append(randoms[i])
+        bits_str = "{0:0256b}".format(hashes[i])
+        arguments += [int(bits_str[0:128], 2), int(bits_str[128:256], 2)]
+    return [str(argument) for argument in arguments]
+
+
+class WitnessInputTests(unittest.TestCase):
+    def test_layout_matches_bit_string_slicing(self):
+        rng = random.Random(7)
+        commitments = [rng.getrandbits(512) for _ in range(20)] + [4, 0, 1 << 600]
+        randoms = [rng.getrandbits(128) for _ in range(len(commitments))]
+        hashes = [rng.getrandbits(256) for _ in range(len(commitments) - 1)] + [(1 << 300) - 1]
+        layout = WitnessLayout.get()
+        self.assertIs(layout, WitnessLayout.get(512, 256, 128))
+        self.assertEqual(7, layout.arguments_per_input)
+        self.assertEqual(build_arguments_with_bit_strings(commitments, randoms, hashes),
+                         layout.get_arguments(commitments, randoms, hashes))
+
+    def test_channels(self):
+        command = ['zokrates', 'compute-witness']
+        arguments = ['1', '2', '3']
+        with tempfile.TemporaryDirectory() as working_path:
+            self.assertEqual((command + ['-a', '1', '2', '3'], None, None),
+                             WitnessInput.build(WitnessInput.ARGV, command, arguments, working_path))
+            self.assertEqual((command + ['--stdin'], b'1 2 3\n', None),
+                             WitnessInput.build(WitnessInput.STDIN, command, arguments, working_path))
+            argv, stdin_data, stdin_path = WitnessInput.build(WitnessInput.FILE, command, arguments, working_path)
+            self.assertEqual((command + ['--stdin'], None), (argv, stdin_data))
+            self.assertEqual(os.path.join(working_path, WitnessInput.ARGUMENTS_FILE), stdin_path)
+            with open(stdin_path, 'rb') as arguments_file:
+                self.assertEqual(b'1 2 3\n', arguments_file.read())
+
+    def test_auto_channel_switches_to_file_beyond_the_argv_limit(self):
+        command = ['zokrates', 'compute-witness']
+        with tempfile.TemporaryDirectory() as working_path:
+            argv, _, _ = WitnessInput.build(WitnessInput.AUTO, command, ['1'] * 10, working_path)
+            self.assertIn('-a', argv)
+            arguments = ['1' * 100] * (WitnessInput.ARGV_LIMIT // 100)
+            argv, _, stdin_path = WitnessInput.build(WitnessInput.AUTO, command, arguments, working_path)
+            self.assertEqual(command + ['--stdin'], argv)
+            self.assertIsNotNone(stdin_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
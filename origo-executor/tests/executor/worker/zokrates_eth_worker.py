@@ -0,0 +1,115 @@
+import os
+import queue
+import tempfile
+import unittest
+
+from executor.journal.execution_journal import ExecutionJournal, ExecutionStage
+from executor.worker.execution_result import ExecutionResult
+from executor.worker.zokrates_eth_worker import ZokratesEthWorker
+from gevent.event import AsyncResult
+from web3.exceptions import TimeExhausted
+
+
+class FakeChainInterface:
+    def __init__(self):
+        self.submitted = []
+        self.receipts = {}
+
+    def submit_verify_and_settle(self, contract_address, execution_id, verification_data):
+        self.submitted.append(verification_data)
+        return '0xnew' + str(len(self.submitted))
+
+    def get_transaction_receipts(self, tx_hashes):
+        return {tx_hash: self.receipts.get(tx_hash) for tx_hash in tx_hashes}
+
+    def get_verify_and_settle_result(self, contract_address, execution_id, receipt):
+        return receipt['status'] == 1
+
+
+class FakeChainClientPool:
+    def __init__(self, chain_interface):
+        self.chain_interface = chain_interface
+
+    def get_client(self, interface_class, chain_config):
+        return self.chain_interface
+
+
+class FakeProverBackend:
+    def get_artifacts(self, contract_address):
+        return {}
+
+
+class FakeReceiptTracker:
+    def __init__(self):
+        self.tracked = []
+        # {transaction hash: the settlement, or the exception failing it}, the others settle successfully.
+        self.outcomes = {}
+
+    def track(self, contract_address, execution_id, tx_hash):
+        self.tracked.append(tx_hash)
+        future = AsyncResult()
+        outcome = self.outcomes.get(tx_hash, {'receipt': {'status': 1}, 'success': True})
+        if isinstance(outcome, Exception):
+            future.set_exception(outcome)
+        else:
+            future.set(outcome)
+        return future
+
+
+class ZokratesEthWorkerResumeTests(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.TemporaryDirectory()
+        self.journal = ExecutionJournal(os.path.join(self.working_dir.name, 'journal.db'))
+        self.commitments = [1, 2, 3]
+        self.digest = ExecutionJournal.digest_commitments(self.commitments)
+        self.chain_interface = FakeChainInterface()
+        self.receipt_tracker = FakeReceiptTracker()
+        self.results = queue.Queue()
+
+    def tearDown(self):
+        self.journal.close()
+        self.working_dir.cleanup()
+
+    def run_worker(self, stage, tx_hash=None):
+        self.journal.record_stage('0x1', 0, self.digest, stage, output=['1'], proof={'proof': {'a': ['0x1']}},
+                                  tx_hash=tx_hash)
+        execution_info = {'contract_address': '0x1', 'execution_id': 0, 'commitments': self.commitments,
+                          'encryption_info': {}, 'decryption_service': object(), 'working_path': self.working_dir.name,
+                          'proving_key_path': '', 'code_path': '', 'zokrates_path': '', 'journal': self.journal,
+                          'prover_backend': FakeProverBackend(),
+                          'chain_client_pool': FakeChainClientPool(self.chain_interface),
+                          'receipt_tracker': self.receipt_tracker}
+        worker = ZokratesEthWorker(execution_info, {}, self.results)
+        worker._run()
+        return self.results.get_nowait()['execution_result']
+
+    def test_proved_execution_submits_proof(self):
+        self.assertEqual(ExecutionResult.SUCCESS, self.run_worker(ExecutionStage.PROVED))
+        self.assertEqual([{'inputs': [1], 'proof': {'a': ['0x1']}}], self.chain_interface.submitted)
+        self.assertEqual(['0xnew1'], self.receipt_tracker.tracked)
+        execution = self.journal.get_execution('0x1', 0, self.digest)
+        self.assertEqual((ExecutionStage.SETTLED, '0xnew1'), (execution['stage'], execution['tx_hash']))
+
+    def test_submitted_execution_settles_from_mined_receipt(self):
+        # The transaction settled before the restart, but the settlement was not recorded.
+        self.chain_interface.receipts['0xold'] = {'status': 1}
+        self.assertEqual(ExecutionResult.SUCCESS, self.run_worker(ExecutionStage.SUBMITTED, '0xold'))
+        self.assertEqual([], self.chain_interface.submitted)
+        self.assertEqual(ExecutionStage.SETTLED, self.journal.get_execution('0x1', 0, self.digest)['stage'])
+
+    def test_submitted_execution_waits_for_pending_transaction(self):
+        self.receipt_tracker.outcomes['0xold'] = {'receipt': {'status': 0}, 'success': False}
+        self.assertEqual(ExecutionResult.FAIL, self.run_worker(ExecutionStage.SUBMITTED, '0xold'))
+        self.assertEqual(['0xold'], self.receipt_tracker.tracked)
+        self.assertEqual([], self.chain_interface.submitted)
+
+    def test_submitted_execution_submits_again_if_transaction_is_not_mined(self):
+        self.receipt_tracker.outcomes['0xold'] = TimeExhausted('0xold is not mined')
+        self.assertEqual(ExecutionResult.SUCCESS, self.run_worker(ExecutionStage.SUBMITTED, '0xold'))
+        self.assertEqual(['0xold', '0xnew1'], self.receipt_tracker.tracked)
+        self.assertEqual(1, len(self.chain_interface.submitted))
+        self.assertEqual('0xnew1', self.journal.get_execution('0x1', 0, self.digest)['tx_hash'])
+
+
+if __name__ == '__main__':
+    unittest.main()